@@ -0,0 +1,587 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo local (SQLite + FTS5) de todos os comunicas lidos do SIAFE.
+
+Depois de lido, o corpo de um comunica só existia no e-mail enviado. Aqui cada
+comunica fica guardado com número, assunto, remetente, corpo, decisão, conceito
+e trecho, com um índice FTS5 sobre o texto normalizado (e o assunto). Serve
+para buscar no histórico e como corpus para o backtest das regras
+(classificacao_offline.py), sem voltar ao SIAFE.
+
+Os corpos ficam em uma tabela à parte, endereçados pelo hash (SHA-256) do
+texto: o mesmo corpo entra uma vez só, mesmo vindo em números diferentes.
+Cada corpo é comprimido com zstd (pacote zstandard, opcional) ou zlib
+(biblioteca padrão), usando um dicionário treinado com os próprios comunicas
+(cabeçalhos, assinaturas e respostas citadas se repetem muito). O dicionário
+é treinado sozinho quando o arquivo junta AMOSTRAS_MINIMAS_DICIONARIO corpos,
+e pode ser retreinado pelo comando `treinar`. Cada corpo guarda o codec e o
+dicionário com que foi comprimido, então corpos antigos continuam legíveis.
+
+O índice FTS5 não guarda o texto (contentless); o trecho mostrado na busca é
+montado a partir do corpo descomprimido.
+
+As gravações são acumuladas durante a execução e escritas em uma única
+transação (gravar()), chamada no fim do ciclo.
+
+Uso:
+    python arquivo.py buscar "dados bancarios" [--limite 20] [--enviados | --bloqueados]
+    python arquivo.py mostrar 2024/101
+    python arquivo.py exportar -o corpus.jsonl      # entrada do classificacao_offline.py
+    python arquivo.py treinar [--recomprimir]       # novo dicionário de compressão
+    python arquivo.py estatisticas                  # tamanho bruto x armazenado
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import zlib
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from classificador import normalizar
+from estado import hash_do_corpo
+
+# Opcional: zstandard comprime melhor e descomprime mais rápido (sem ele usa zlib)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARQUIVO_PADRAO = "arquivo_comunicas.db"
+
+# Comunicas acumulados antes de uma gravação automática (o resto vai no gravar() do fim)
+LOTE_MAXIMO = 500
+
+CODECS = ("zstd", "zlib", "nenhum")
+CODEC_PADRAO = "zstd" if zstandard is not None else "zlib"
+NIVEL_ZSTD = 9
+NIVEL_ZLIB = 9
+
+# Dicionário: treinado com até AMOSTRAS_MAXIMAS_DICIONARIO corpos recentes quando
+# o arquivo tem pelo menos AMOSTRAS_MINIMAS_DICIONARIO (a janela do zlib é de 32 KB)
+AMOSTRAS_MINIMAS_DICIONARIO = 100
+AMOSTRAS_MAXIMAS_DICIONARIO = 2000
+TAMANHO_DICIONARIO = {"zstd": 64 * 1024, "zlib": 32 * 1024}
+
+# Caracteres de contexto de cada lado do termo no trecho da busca
+CONTEXTO_TRECHO = 60
+
+VERSAO_ESQUEMA = 2
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS comunicas (
+    id                INTEGER PRIMARY KEY,
+    numero            TEXT NOT NULL,
+    assunto           TEXT NOT NULL,
+    remetente         TEXT NOT NULL,
+    hash_corpo        TEXT NOT NULL REFERENCES corpos (hash),
+    enviado           INTEGER NOT NULL,
+    categoria         TEXT NOT NULL,
+    conceito          TEXT NOT NULL,
+    trecho            TEXT NOT NULL,
+    arquivado_em      TEXT NOT NULL,
+    UNIQUE (numero, hash_corpo)
+);
+CREATE INDEX IF NOT EXISTS comunicas_arquivado_em ON comunicas (arquivado_em);
+
+CREATE TABLE IF NOT EXISTS corpos (
+    hash       TEXT PRIMARY KEY,
+    codec      TEXT NOT NULL,
+    dicionario INTEGER NOT NULL,
+    tamanho    INTEGER NOT NULL,
+    dados      BLOB NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS dicionarios (
+    id        INTEGER PRIMARY KEY,
+    codec     TEXT NOT NULL,
+    criado_em TEXT NOT NULL,
+    dados     BLOB NOT NULL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS comunicas_fts USING fts5(
+    assunto, corpo_normalizado,
+    content='',
+    tokenize='unicode61 remove_diacritics 2'
+);
+"""
+
+COLUNAS = ("numero", "assunto", "remetente", "hash_corpo", "enviado", "categoria", "conceito",
+           "trecho", "arquivado_em")
+
+_OPERADORES_FTS = {"and", "or", "not", "near"}
+_TERMO_FTS = re.compile(r'"([^"]+)"|([^\s()"]+)')
+# Para reescrever a consulta: "frase" (aspas sem fechamento vão até o fim), parênteses ou termo solto
+_PECA_FTS = re.compile(r'"([^"]*)"?|([()])|([^\s()"]+)')
+
+# ==============================================================================
+# COMPRESSÃO
+# ==============================================================================
+
+def treinar_zdict(amostras, tamanho):
+    """
+    Dicionário para o zlib (zdict): as linhas que se repetem em mais de um
+    comunica, as mais valiosas (repetições x tamanho) no fim, onde o zlib as
+    alcança com as menores distâncias.
+    """
+    documentos = Counter()
+    for amostra in amostras:
+        documentos.update({linha.strip() for linha in amostra.decode("utf-8", "replace").splitlines()
+                           if len(linha.strip()) >= 8})
+    repetidas = sorted(((n * len(linha), linha) for linha, n in documentos.items() if n > 1))
+    partes, total = [], 0
+    for _, linha in reversed(repetidas):
+        dados = (linha + "\n").encode("utf-8")
+        if total + len(dados) > tamanho:
+            break
+        partes.append(dados)
+        total += len(dados)
+    return b"".join(reversed(partes))
+
+
+def treinar_dicionario(codec, amostras, tamanho=None):
+    """Bytes do dicionário do codec treinado com as amostras (b"" se não der para treinar)."""
+    tamanho = tamanho or TAMANHO_DICIONARIO.get(codec, 0)
+    if codec == "zstd":
+        try:
+            return zstandard.train_dictionary(tamanho, amostras).as_bytes()
+        except zstandard.ZstdError:
+            return b""  # poucas amostras ou amostras pequenas demais
+    if codec == "zlib":
+        return treinar_zdict(amostras, tamanho)
+    return b""
+
+
+class Codificador:
+    """Comprime e descomprime corpos com um codec e (opcionalmente) um dicionário."""
+
+    def __init__(self, codec, dicionario=b""):
+        if codec not in CODECS:
+            raise ValueError(f"Codec desconhecido: {codec!r} (use {', '.join(CODECS)})")
+        if codec == "zstd" and zstandard is None:
+            raise RuntimeError("Corpo comprimido com zstd, mas o pacote zstandard não está instalado")
+        self.codec = codec
+        self.dicionario = dicionario
+        if codec == "zstd":
+            dict_data = zstandard.ZstdCompressionDict(dicionario) if dicionario else None
+            self._compressor = zstandard.ZstdCompressor(level=NIVEL_ZSTD, dict_data=dict_data)
+            self._descompressor = zstandard.ZstdDecompressor(dict_data=dict_data)
+
+    def comprimir(self, dados):
+        if self.codec == "zstd":
+            return self._compressor.compress(dados)
+        if self.codec == "zlib":
+            if not self.dicionario:
+                return zlib.compress(dados, NIVEL_ZLIB)
+            compressor = zlib.compressobj(NIVEL_ZLIB, zdict=self.dicionario)
+            return compressor.compress(dados) + compressor.flush()
+        return dados
+
+    def descomprimir(self, dados):
+        if self.codec == "zstd":
+            return self._descompressor.decompress(dados)
+        if self.codec == "zlib":
+            if not self.dicionario:
+                return zlib.decompress(dados)
+            descompressor = zlib.decompressobj(zdict=self.dicionario)
+            return descompressor.decompress(dados) + descompressor.flush()
+        return dados
+
+# ==============================================================================
+# ARQUIVO
+# ==============================================================================
+
+class ArquivoComunicas:
+    """
+    Arquivo de comunicas com gravação em lote; o mesmo número com o mesmo corpo
+    entra uma vez só, e o mesmo corpo é guardado uma vez só.
+
+    `codec` escolhe a compressão dos corpos novos (padrão: zstd se instalado, senão zlib);
+    `dicionario=False` desliga o treino automático do dicionário.
+    """
+
+    def __init__(self, caminho=ARQUIVO_PADRAO, codec=None, dicionario=True):
+        self.caminho = str(caminho)
+        self.codec = codec or CODEC_PADRAO
+        self.usar_dicionario = dicionario
+        Codificador(self.codec)  # valida o codec
+        self.conexao = sqlite3.connect(self.caminho)
+        self.conexao.row_factory = sqlite3.Row
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self._codificadores = {}
+        self.pendentes = []
+        self._migrar()
+
+    # --- esquema ---
+
+    def _migrar(self):
+        """Cria o esquema; um arquivo da versão 1 (corpo em texto na própria linha) é convertido."""
+        colunas = {linha["name"] for linha in self.conexao.execute("PRAGMA table_info(comunicas)")}
+        if "corpo" not in colunas:
+            self.conexao.executescript(ESQUEMA)
+            self.conexao.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+            return
+
+        antigos = self.conexao.execute(
+            "SELECT numero, assunto, remetente, corpo, enviado, categoria, conceito, trecho, arquivado_em "
+            "FROM comunicas ORDER BY id"
+        ).fetchall()
+        with self.conexao:
+            self.conexao.executescript("""
+                DROP TRIGGER IF EXISTS comunicas_ai;
+                DROP TRIGGER IF EXISTS comunicas_ad;
+                DROP TABLE IF EXISTS comunicas_fts;
+                DROP TABLE comunicas;
+            """)
+        self.conexao.executescript(ESQUEMA)
+        self.pendentes = [(linha["numero"], linha["assunto"], linha["remetente"], linha["corpo"],
+                           linha["enviado"], linha["categoria"], linha["conceito"], linha["trecho"],
+                           linha["arquivado_em"], None) for linha in antigos]
+        self.gravar()
+        self.conexao.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+        self.conexao.execute("VACUUM")
+
+    # --- compressão ---
+
+    def _codificador(self, codec, id_dicionario):
+        chave = (codec, id_dicionario)
+        if chave not in self._codificadores:
+            dicionario = b""
+            if id_dicionario:
+                dicionario = self.conexao.execute(
+                    "SELECT dados FROM dicionarios WHERE id = ?", (id_dicionario,)
+                ).fetchone()["dados"]
+            self._codificadores[chave] = Codificador(codec, dicionario)
+        return self._codificadores[chave]
+
+    def _dicionario_atual(self):
+        """Id do dicionário mais recente do codec em uso (0 = sem dicionário)."""
+        linha = self.conexao.execute(
+            "SELECT MAX(id) AS id FROM dicionarios WHERE codec = ?", (self.codec,)
+        ).fetchone()
+        return linha["id"] or 0
+
+    def _descomprimir(self, linha):
+        return self._codificador(linha["codec"], linha["dicionario"]).descomprimir(linha["dados"]).decode("utf-8")
+
+    def treinar_dicionario(self, recomprimir=False):
+        """
+        Treina um dicionário com os corpos mais recentes e o usa nos próximos;
+        com `recomprimir`, os corpos já guardados passam para ele. Devolve o id (0 = não treinou).
+        """
+        if self.codec == "nenhum":
+            return 0
+        linhas = self.conexao.execute(
+            "SELECT codec, dicionario, dados FROM corpos ORDER BY rowid DESC LIMIT ?",
+            (AMOSTRAS_MAXIMAS_DICIONARIO,),
+        ).fetchall()
+        dados = treinar_dicionario(self.codec, [self._descomprimir(l).encode("utf-8") for l in linhas])
+        if not dados:
+            return 0
+        with self.conexao:
+            id_dicionario = self.conexao.execute(
+                "INSERT INTO dicionarios (codec, criado_em, dados) VALUES (?, ?, ?)",
+                (self.codec, datetime.now().isoformat(timespec="seconds"), dados),
+            ).lastrowid
+        if recomprimir:
+            codificador = self._codificador(self.codec, id_dicionario)
+            with self.conexao:
+                for linha in self.conexao.execute("SELECT hash, codec, dicionario, dados FROM corpos").fetchall():
+                    texto = self._descomprimir(linha).encode("utf-8")
+                    self.conexao.execute(
+                        "UPDATE corpos SET codec = ?, dicionario = ?, dados = ? WHERE hash = ?",
+                        (self.codec, id_dicionario, codificador.comprimir(texto), linha["hash"]),
+                    )
+        return id_dicionario
+
+    # --- gravação ---
+
+    def adicionar(self, comunica, decisao, corpo_normalizado=None, remetente=""):
+        """Acumula o comunica para a próxima gravação (o corpo normalizado vai só para o índice)."""
+        self.pendentes.append((
+            comunica.numero, comunica.assunto, remetente, comunica.texto, int(decisao.enviar),
+            decisao.categoria, decisao.conceito, decisao.trecho, datetime.now().isoformat(timespec="seconds"),
+            corpo_normalizado,
+        ))
+        if len(self.pendentes) >= LOTE_MAXIMO:
+            self.gravar()
+
+    def gravar(self):
+        """Grava os comunicas acumulados em uma transação; devolve quantos eram."""
+        pendentes, self.pendentes = self.pendentes, []
+        if not pendentes:
+            return 0
+
+        id_dicionario = self._dicionario_atual() if self.usar_dicionario else 0
+        codificador = self._codificador(self.codec, id_dicionario)
+        with self.conexao:
+            for numero, assunto, remetente, corpo, *decisao, arquivado_em, normalizado in pendentes:
+                hash_corpo = hash_do_corpo(corpo)
+                if self.conexao.execute("SELECT 1 FROM corpos WHERE hash = ?", (hash_corpo,)).fetchone() is None:
+                    dados = corpo.encode("utf-8")
+                    self.conexao.execute(
+                        "INSERT INTO corpos (hash, codec, dicionario, tamanho, dados) VALUES (?, ?, ?, ?, ?)",
+                        (hash_corpo, codificador.codec, id_dicionario, len(dados), codificador.comprimir(dados)),
+                    )
+                cursor = self.conexao.execute(
+                    f"INSERT OR IGNORE INTO comunicas ({', '.join(COLUNAS)}) VALUES ({', '.join('?' * len(COLUNAS))})",
+                    (numero, assunto, remetente, hash_corpo, *decisao, arquivado_em),
+                )
+                if cursor.rowcount:
+                    self.conexao.execute(
+                        "INSERT INTO comunicas_fts (rowid, assunto, corpo_normalizado) VALUES (?, ?, ?)",
+                        (cursor.lastrowid, assunto, normalizado if normalizado is not None else normalizar(corpo)),
+                    )
+
+        if self.usar_dicionario and not id_dicionario:
+            total = self.conexao.execute("SELECT COUNT(*) FROM corpos").fetchone()[0]
+            if total >= AMOSTRAS_MINIMAS_DICIONARIO:
+                self.treinar_dicionario(recomprimir=True)
+        return len(pendentes)
+
+    # --- consultas ---
+
+    def buscar(self, consulta, limite=20, enviado=None):
+        """
+        Comunicas que casam com a consulta FTS5 (termos, "frase", AND/OR/NOT, prefixo*),
+        do mais relevante para o menos; `enviado` True/False filtra pela decisão.
+        Lança ValueError se a consulta não for válida (ex.: operador sem termo depois).
+        """
+        filtro = "" if enviado is None else "AND c.enviado = ?"
+        # O tokenizador já ignora acentos e maiúsculas; os termos vão entre aspas (consulta_fts)
+        parametros = [consulta_fts(consulta)] + ([] if enviado is None else [int(enviado)]) + [limite]
+        try:
+            linhas = self.conexao.execute(
+                f"""
+                SELECT c.numero, c.assunto, c.remetente, c.enviado, c.categoria, c.conceito, c.arquivado_em,
+                       b.codec, b.dicionario, b.dados
+                FROM comunicas_fts JOIN comunicas AS c ON c.id = comunicas_fts.rowid
+                                   JOIN corpos AS b ON b.hash = c.hash_corpo
+                WHERE comunicas_fts MATCH ? {filtro}
+                ORDER BY bm25(comunicas_fts) LIMIT ?
+                """,
+                parametros,
+            ).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Consulta inválida {consulta!r}: {e}") from e
+        termos = termos_da_consulta(consulta)
+        return [{**{k: linha[k] for k in linha.keys() if k not in ("codec", "dicionario", "dados")},
+                 "trecho_encontrado": trecho_com_termo(normalizar(self._descomprimir(linha)), termos)}
+                for linha in linhas]
+
+    def por_numero(self, numero):
+        """Todas as versões arquivadas do comunica (a mais recente primeiro), com o corpo."""
+        linhas = self.conexao.execute(
+            "SELECT c.*, b.codec, b.dicionario, b.dados FROM comunicas AS c JOIN corpos AS b ON b.hash = c.hash_corpo "
+            "WHERE c.numero = ? ORDER BY c.arquivado_em DESC, c.id DESC", (numero,)
+        ).fetchall()
+        return [{**{k: linha[k] for k in linha.keys() if k not in ("codec", "dicionario", "dados")},
+                 "corpo": self._descomprimir(linha)} for linha in linhas]
+
+    def comunicas(self):
+        """Gera {'id', 'assunto', 'texto'} (formato do classificacao_offline.py) em ordem de arquivamento."""
+        for linha in self.conexao.execute(
+            "SELECT c.numero, c.assunto, b.codec, b.dicionario, b.dados "
+            "FROM comunicas AS c JOIN corpos AS b ON b.hash = c.hash_corpo ORDER BY c.id"
+        ):
+            yield {"id": linha["numero"], "assunto": linha["assunto"], "texto": self._descomprimir(linha)}
+
+    def estatisticas(self):
+        """Comunicas, corpos distintos, bytes brutos x armazenados e dicionários."""
+        corpos = self.conexao.execute(
+            "SELECT COUNT(*) AS n, COALESCE(SUM(tamanho), 0) AS bruto, COALESCE(SUM(LENGTH(dados)), 0) AS guardado "
+            "FROM corpos"
+        ).fetchone()
+        bruto_total = self.conexao.execute(
+            "SELECT COALESCE(SUM(b.tamanho), 0) FROM comunicas AS c JOIN corpos AS b ON b.hash = c.hash_corpo"
+        ).fetchone()[0]
+        dicionarios = self.conexao.execute(
+            "SELECT COUNT(*) AS n, COALESCE(SUM(LENGTH(dados)), 0) AS bytes FROM dicionarios"
+        ).fetchone()
+        return {
+            "comunicas": len(self),
+            "corpos": corpos["n"],
+            "bytes_brutos": bruto_total,
+            "bytes_corpos_distintos": corpos["bruto"],
+            "bytes_guardados": corpos["guardado"],
+            "dicionarios": dicionarios["n"],
+            "bytes_dicionarios": dicionarios["bytes"],
+            "codec": self.codec,
+        }
+
+    def __len__(self):
+        return self.conexao.execute("SELECT COUNT(*) FROM comunicas").fetchone()[0]
+
+    def fechar(self):
+        self.gravar()
+        self.conexao.close()
+
+
+def consulta_fts(consulta):
+    """
+    Reescreve a consulta do usuário para o MATCH do FTS5: cada termo solto vai
+    entre aspas (hífen, barra e ponto viram frase em vez de erro de sintaxe),
+    o * final continua prefixo; frases, parênteses e AND/OR/NOT/NEAR em
+    maiúsculas ficam como operadores. Aspas sem fechamento fecham no fim.
+    """
+    pecas = []
+    for frase, parentese, termo in _PECA_FTS.findall(consulta):
+        if parentese:
+            pecas.append(parentese)
+        elif termo in ("AND", "OR", "NOT", "NEAR"):
+            pecas.append(termo)
+        elif termo:
+            prefixo = termo.endswith("*")
+            termo = termo.rstrip("*")
+            if termo:
+                pecas.append(f'"{termo}"' + ("*" if prefixo else ""))
+        elif frase.strip():
+            pecas.append(f'"{frase}"')
+    return " ".join(pecas)
+
+
+def termos_da_consulta(consulta):
+    """Termos (e frases) de uma consulta FTS5, normalizados e sem operadores."""
+    termos = []
+    for frase, termo in _TERMO_FTS.findall(consulta):
+        texto = normalizar(frase or termo).rstrip("*").strip()
+        if texto and (frase or texto not in _OPERADORES_FTS):
+            termos.append(texto)
+    return termos
+
+
+def trecho_com_termo(texto_normalizado, termos):
+    """Trecho do texto em volta do primeiro termo encontrado, com o termo entre colchetes."""
+    for termo in termos:
+        posicao = texto_normalizado.find(termo)
+        if posicao >= 0:
+            inicio = max(0, posicao - CONTEXTO_TRECHO)
+            fim = min(len(texto_normalizado), posicao + len(termo) + CONTEXTO_TRECHO)
+            antes = ("…" if inicio else "") + texto_normalizado[inicio:posicao]
+            depois = texto_normalizado[posicao + len(termo):fim] + ("…" if fim < len(texto_normalizado) else "")
+            return f"{antes}[{termo}]{depois}"
+    return texto_normalizado[:2 * CONTEXTO_TRECHO]
+
+# ==============================================================================
+# LINHA DE COMANDO
+# ==============================================================================
+
+def comando_buscar(args, arquivo):
+    enviado = True if args.enviados else False if args.bloqueados else None
+    try:
+        linhas = arquivo.buscar(args.consulta, args.limite, enviado)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    for linha in linhas:
+        decisao = "ENVIADO" if linha["enviado"] else "BLOQUEADO"
+        print(f"{linha['numero']} | {linha['arquivado_em']} | {decisao} ({linha['conceito'] or linha['categoria']}) "
+              f"| {linha['assunto']}")
+        print(f"    {linha['trecho_encontrado']}")
+    print(f"\n{len(linhas)} resultado(s).", file=sys.stderr)
+    return 0
+
+
+def comando_mostrar(args, arquivo):
+    versoes = arquivo.por_numero(args.numero)
+    if not versoes:
+        print(f"Comunica {args.numero} não está no arquivo.", file=sys.stderr)
+        return 1
+    for linha in versoes:
+        print(f"=== {linha['numero']} - {linha['assunto']} ({linha['arquivado_em']}) ===")
+        print(f"Remetente: {linha['remetente'] or '-'}")
+        print(f"Decisão: {'ENVIADO' if linha['enviado'] else 'BLOQUEADO'} | {linha['categoria']} | "
+              f"{linha['conceito'] or '-'} | {linha['trecho'] or '-'}\n")
+        print(linha["corpo"])
+        print()
+    return 0
+
+
+def comando_exportar(args, arquivo):
+    saida = open(args.saida, "w", encoding="utf-8") if args.saida else sys.stdout
+    total = 0
+    try:
+        for comunica in arquivo.comunicas():
+            saida.write(json.dumps(comunica, ensure_ascii=False) + "\n")
+            total += 1
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+    print(f"{total} comunica(s) exportado(s).", file=sys.stderr)
+    return 0
+
+
+def comando_treinar(args, arquivo):
+    id_dicionario = arquivo.treinar_dicionario(recomprimir=args.recomprimir)
+    if not id_dicionario:
+        print("Não foi possível treinar um dicionário (poucos corpos?).", file=sys.stderr)
+        return 1
+    print(f"Dicionário {id_dicionario} ({arquivo.codec}) treinado"
+          f"{' e corpos recomprimidos' if args.recomprimir else ''}.", file=sys.stderr)
+    return comando_estatisticas(args, arquivo)
+
+
+def comando_estatisticas(args, arquivo):
+    e = arquivo.estatisticas()
+    guardado = e["bytes_guardados"] + e["bytes_dicionarios"]
+    print(f"Comunicas: {e['comunicas']} ({e['corpos']} corpos distintos)")
+    print(f"Corpos brutos: {e['bytes_brutos'] / 1024:.0f} KB "
+          f"(distintos: {e['bytes_corpos_distintos'] / 1024:.0f} KB)")
+    print(f"Guardado: {guardado / 1024:.0f} KB com {e['dicionarios']} dicionário(s) "
+          f"-> {e['bytes_brutos'] / guardado if guardado else 0:.1f}x menor (codec {e['codec']})")
+    return 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Consulta ao arquivo local de comunicas.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--db", default=ARQUIVO_PADRAO, help=f"arquivo SQLite (padrão: {ARQUIVO_PADRAO})")
+    parser.add_argument("--codec", choices=CODECS, help=f"compressão dos corpos novos (padrão: {CODEC_PADRAO})")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    buscar = subcomandos.add_parser("buscar", help="busca de texto completo (FTS5) no corpo e no assunto")
+    buscar.add_argument("consulta", help='termos, "frase exata", AND/OR/NOT, prefixo*')
+    buscar.add_argument("--limite", type=int, default=20)
+    decisao = buscar.add_mutually_exclusive_group()
+    decisao.add_argument("--enviados", action="store_true", help="só os enviados por e-mail")
+    decisao.add_argument("--bloqueados", action="store_true", help="só os bloqueados")
+    buscar.set_defaults(funcao=comando_buscar)
+
+    mostrar = subcomandos.add_parser("mostrar", help="mostra um comunica pelo número")
+    mostrar.add_argument("numero")
+    mostrar.set_defaults(funcao=comando_mostrar)
+
+    exportar = subcomandos.add_parser("exportar", help="exporta o arquivo em .jsonl (id, assunto, texto)")
+    exportar.add_argument("-o", "--saida", help="arquivo .jsonl; padrão: stdout")
+    exportar.set_defaults(funcao=comando_exportar)
+
+    treinar = subcomandos.add_parser("treinar", help="treina um novo dicionário de compressão com os corpos recentes")
+    treinar.add_argument("--recomprimir", action="store_true", help="recomprime os corpos já guardados")
+    treinar.set_defaults(funcao=comando_treinar)
+
+    estatisticas = subcomandos.add_parser("estatisticas", help="tamanho bruto x armazenado")
+    estatisticas.set_defaults(funcao=comando_estatisticas)
+
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if not Path(args.db).exists():
+        print(f"Arquivo {args.db} não encontrado.", file=sys.stderr)
+        return 1
+    arquivo = ArquivoComunicas(args.db, codec=args.codec)
+    try:
+        return args.funcao(args, arquivo)
+    finally:
+        arquivo.fechar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,41 +1,68 @@
 # --- Imports Selenium ---
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 # --- Imports de email ---
-import smtplib
-import email.message
+from mensagens import corpo_comunica, corpo_falha, corpo_log, montar_mensagem, texto_comunica
+from log_execucao import COMUNICA, DECISAO, INFORMATIVO, LISTA, LogExecucao
+from correio import CorreioSMTP, FilaCorreio, MAX_MENSAGENS_POR_CONEXAO, TAMANHO_FILA_PADRAO
+from caixa_saida import CAIXA_SAIDA_PADRAO, MAX_TENTATIVAS, CaixaDeSaida
+from resumo import MODO_ENVIO_PADRAO, MODOS_ENVIO, TAMANHO_MAXIMO_RESUMO_KB, Resumo, envio_imediato
 # --- Outros Imports ---
 import time
-import re
 import schedule
-import html
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 import traceback
 import socket
-import unicodedata
+import functools
+from types import SimpleNamespace
+
+# --- Regras de classificação (normalização + dicionários de regex) ---
+from classificador import (
+    normalizar,
+    DICIONARIO_DE_ENVIO_PRIORITARIO,
+    PALAVRAS_DE_ENVIO_OBRIGATORIO,
+    DICIONARIO_DE_BLOQUEIO_REGEX,
+    Decisao,
+    EstatisticasConceitos,
+    classificar,
+)
+# --- Esperas por estado da página do SIAFE (ADF), filtro salvo, leitura da lista e do comunica ---
+from siafe import (
+    Comunica,
+    aguardar_adf_ocioso,
+    aguardar_contagem_estavel,
+    aguardar_navegacao,
+    aplicar_filtro_salvo,
+    capturar_comunica,
+    capturar_filtro,
+    carregar_filtro,
+    conferir_lista_filtrada,
+    listar_comunicas,
+    localizar_linha,
+    salvar_filtro,
+)
+# --- Sessão do SIAFE reaproveitada entre execuções ---
+from sessao import SessaoSiafe
+# --- Leitura dos comunicas por HTTP (sem navegador) ---
+from siafe_http import ComunicasHTTP, carregar_gravacao
+# --- Navegadores auxiliares para ler vários detalhes ao mesmo tempo ---
+from pool_navegadores import TAMANHO_MAXIMO, TAMANHO_PADRAO, PoolNavegadores
+# --- Fábrica de navegadores (perfil de desempenho, binários em cache, pré-aquecimento) ---
+from drivers import ConfiguracaoDriver, FabricaDrivers
+# --- Registro dos comunicas já tratados (pula o que uma execução anterior já fez) ---
+from estado import EstadoComunicas
+# --- Arquivo local (SQLite + FTS5) de todos os comunicas lidos ---
+from arquivo import ArquivoComunicas
 
 
 
 # Carrega as variáveis do arquivo .env
 load_dotenv()
 
-# ==============================================================================
-# FUNÇÃO DE NORMALIZAÇÃO (REMOVE ACENTOS + MINÚSCULAS)
-# ==============================================================================
-
-def normalizar(txt: str) -> str:
-    """
-    Normaliza texto removendo acentos e convertendo para minúsculas.
-    Isso torna as regex mais simples e robustas.
-    """
-    txt = unicodedata.normalize("NFD", txt)
-    txt = "".join(ch for ch in txt if unicodedata.category(ch) != "Mn")  # remove acentos
-    return txt.lower()
 
 # --- Configurações pro Selenium e SIAFERIO ---
 PATH_DO_DRIVER = "msedgedriver.exe"
@@ -57,328 +84,99 @@ setor_excluir_pesquisa = "SUGESC"
 # Defina quantos comunicas você quer processar
 #numero_de_comunicas_para_processar = 50 # Colocar um número alto para pegar todos
 
-
-import re
-
-# ==============================================================================
-# 1. PADRÕES AUXILIARES GLOBAIS (Constantes de Reutilização)
-# ==============================================================================
-
-# Sufixos de ação: cobre ão, õe, oes, ao (ex: Inscrição, Inscricao, Inclusões)
-SFX_ACAO = r'(?:[ãa]o|[õo]es|c[ao]e?s?)'
-
-# Preposições: cobre de, do, da, dos, das, em, para, no, na... (com opcionais)
-PREP = r'(?:[dn]?[oa]s?|de|em|para)'
-
-# Padrão SIAFE: Cobre Siafe, Siaferio, Siafe-Rio, Siafe.Rio, Siafem
-SIAFE_PATTERN = r'(?:siaf[-\s]*e(?:m)?(?:[-\s.]*rio)?)'
-
-# Verbos de Manipulação (Substantivos e Verbos misturados)
-# Cobre: cadastro, cadastrar, alteração, alterar, inclusão, atualizar, liberar, inativar
-VERBOS_GERAIS = (
-    rf'\b(?:alterac{SFX_ACAO}|alterar?|'
-    rf'cadastr(?:o|ar|ad[oa]s?|amento)|'
-    rf'atualizac{SFX_ACAO}|atualizar?|'
-    rf'inclus{SFX_ACAO}|incluir|'
-    rf'liberac{SFX_ACAO}|liberar?|'
-    rf'inativac{SFX_ACAO}|inativar?)'
-)
-
-# Objeto Específico: Programa de Trabalho
-PT_OBJ = r'programa(?:s)?\s*(?:de|-)?\s*trabalho(?:s)?'
-
-
-# ==============================================================================
-# 2. DICIONÁRIO DE ENVIO PRIORITÁRIO (Otimizado)
-# ==============================================================================
-
-DICIONARIO_DE_ENVIO_PRIORITARIO = {
-    # ── SISTEMAS E TECNOLOGIA ──────────────────────────────────────────────────
-    'Problemas SIAFERIO':
-        rf'\b(?:problema(?:s)?|erro(?:s)?|falha(?:s)?|indisponibilidade|instabilidade|lentid[ãa]o)'
-        rf'(?:\s+(?:no|do|com|em))?\s+{SIAFE_PATTERN}\b'
-        rf'|\b{SIAFE_PATTERN}\s+(?:fora\s+do\s+ar|inoperante|com\s+problema(?:s)?|n[ãa]o\s+(?:funciona|carrega|abre))\b',
-
-    'FlexVision':
-        r'\bflexvision\b|\bflex[-\s]*vision\b',
-
-    'Sistemas Fora do Ar':
-        rf'\b(?:sistema(?:s)?|servi[çc]o(?:s)?|aplica(?:[çc][ãa]o|[çc][õo]es))\s+(?:fora\s+do\s+ar|indispon[íi]vel(?:eis)?|inoperante(?:s)?)\b'
-        rf'|\b(?:sem\s+acesso|n[ãa]o\s+(?:acessa|conecta|funciona))\s+(?:ao\s+)?(?:sistema(?:s)?|{SIAFE_PATTERN})\b'
-        rf'|\b{SIAFE_PATTERN}\s+fora\s+do\s+ar\b',
-
-    # ── URGÊNCIAS E PROBLEMAS CRÍTICOS ─────────────────────────────────────────
-    'Urgente':
-        r'\burgent(?:e|es?|[íi]ssim[ao])\b|\bpriorit[áa]ri[ao](?:s)?\b|\bemerg[eê]ncia\b'
-        r'|\basap\b|\bcom\s+urg[eê]ncia\b|\bpara\s+hoje\b|\bimediato\b',
-
-    'Erro Crítico':
-        r'\b(?:erro\s+(?:cr[íi]tico|grave|fatal|sistema)|falha\s+(?:cr[íi]tica|grave|geral))\b'
-        r'|\b(?:n[ãa]o\s+(?:consegue|consigo)|imposs[íi]vel)\s+(?:acessar|executar|processar|finalizar)\b'
-        r'|\bsistema\s+(?:travado|congelado|n[ãa]o\s+responde)\b',
-
-    # ── FECHAMENTO/FIM DE PERÍODO ──────────────────────────────────────────────
-    'Fechamento':
-        r'\b(?:fechamento|encerramento)\s+(?:do\s+)?(?:m[êe]s|per[íi]odo|exerc[íi]cio|balan[çc]o)\b'
-        r'|\bfim\s+do\s+(?:m[êe]s|ano|exerc[íi]cio|per[íi]odo)\b'
-        r'|\b(?:presta(?:[çc][ãa]o|[çc][õo]es)|envio)\s+de\s+contas?\b',
-
-    'Relatório Urgente':
-        r'\b(?:relat[óo]rio(?:s)?|demonstrativo(?:s)?)\s+(?:urgente(?:s)?|priorit[áa]rio(?:s)?|para\s+(?:hoje|amanh[aã]))\b'
-        r'|\b(?:balancete|dre|demonstra(?:[çc][ãa]o|[çc][õo]es))\s+(?:urgente|priorit[áa]ri[ao])\b',
-}
-
-# Lista Simples (Mantida)
-PALAVRAS_DE_ENVIO_OBRIGATORIO = ['flexvision']
-
-
-# ==============================================================================
-# 3. DICIONÁRIO DE BLOQUEIO (Com Lógica Modular e Robustez)
-# ==============================================================================
-
-DICIONARIO_DE_BLOQUEIO_REGEX = {
-    # ── PARTE CADASTRAL FINANCEIRA ──────────────────────────────────────────
-
-    'Inscricao Generica':
-    rf'\binscric{SFX_ACAO}\s+gen[ée]ri(?:c)?(?:a|as)?\b|\bigs\b',
-
-    'Credor Generico':
-        r'\bcredor(?:es)?\s+gen[ée]ric(?:o|os)\b|\bcgs\b',
-
-    'Bloqueio Judicial':
-        rf'\bbloqueio(?:s)?\s+judicia(?:l|is)\b|\bcria(?:[çc][ãa]o|[çc][õo]es)\s+de\s+bj\b|\bbj\b',
-
-    'Codigo de Barras':
-        r'\b(?:cod(?:\.|\s*)barras?|c[óo]digo(?:s)?\s+de\s+barras?)\b'
-        rf'|\balterac{SFX_ACAO}\s+de\s+cnpj\s+em\s+(?:cod(?:\.|\s*)barras?|c[óo]digo\s+de\s+barras?)\b',
-
-    # === BLOCO OTIMIZADO DE DADOS BANCÁRIOS ===
-    'Dados Bancarios':
-        # 1. Termos diretos
-        r'\b(?:dados\s+banc[áa]ri(?:o|os)|domic[íi]lio\s+banc[áa]ri(?:o|os))\b'
-        r'|'
-        # 2. Ação + Preposição + Objeto + (Opcional: Credor Genérico)
-        rf'{VERBOS_GERAIS}\s+'
-        rf'(?:{PREP})?\s*'
-        r'(?:banco(?:s)?|ag[êe]ncia(?:s)?|conta(?:s)?\s+(?:corrent(?:e|es)|banc[áa]ria(?:s)?))'
-        # O '?' no final pega com ou sem o complemento
-        r'(?:\s+em\s+credor(?:es)?\s+gen[ée]ric(?:o|os))?\b',
-
-    'Boleto/Credor':
-        r'\bboletos?\b|\bcredor(?:es)?\b',
-
-    'Alteracao de Razao Social':
-        rf'\balterac{SFX_ACAO}\s+(?:da|de)\s+raz[ãa]o\s+social\b',
-
-    # ── PARTE CADASTRAL ─────────────────────────────────────────────────────
-
-    'Cadastro em Geral':
-        rf'\binforma(?:[çc][õo]es|coes)\s+cadastrais\b'
-        r'|\brequisi(?:[çc][ãa]o|[çc][õo]es)\s+de\s+pequeno(?:s)?\s+valor(?:es)?\b',
-
-    'Cadastro de Convenio':
-        r'\bcadastro(?:s)?\s+(?:de\s+)?conta(?:s)?\s+(?:de\s+)?conv[êe]nio(?:s)?\b'
-        r'|\bconta(?:s)?\s+(?:de\s+)?conv[êe]nio(?:s)?\s+cadastrad(?:a|as|o|os)\b',
-
-    'Atualizacao de Dados':
-        rf'\batualizac{SFX_ACAO}\s+(?:de\s+)?dados?\b'
-        rf'|\bnomeac{SFX_ACAO}\s+de\s+contador(?:es)?\b'
-        r'|\balterar?\s+nome(?:s)?\s+(?:de|das|nas)\s+unidade(?:s)?\s+gestora(?:s)?\b',
-
-    # === BLOCO OTIMIZADO DE PROGRAMA DE TRABALHO ===
-    'Programa de Trabalho':
-        r'\b(?:'
-        # Ação -> Objeto (ex: Cadastrar Programa de Trabalho)
-        rf'(?:{VERBOS_GERAIS}(?:\s+(?:o|a|os|as))?\s*(?:\s+no\s+sistema)?(?:\s+{PREP})?\s+{PT_OBJ})'
-        r'|'
-        # Objeto -> Ação (ex: Programa de Trabalho foi cadastrado)
-        # Nota: {{0,6}} é usado porque dentro de f-string chaves duplas viram chaves literais regex
-        rf'(?:{PT_OBJ}(?:\s+no\s+sistema)?(?:\s+(?:foi|foram|est[áa](?:o)?|ser[áa](?:o)?))?\s*(?:\w+\s+){{0,6}}{VERBOS_GERAIS})'
-        r')\b',
-
-    'Detalhamento de Fonte':
-        r'\bcadastro(?:s)?\s+(?:de\s+)?detalhamento(?:s)?\s+(?:de\s+)?fonte(?:s)?\b'
-        r'|\bdetalhamento(?:s)?\s+(?:da|de)\s+fonte(?:s)?\b'
-        r'|\bfonte(?:s)?\s+detalhad(?:a|as|o|os)\b',
-
-    # ── ACESSO E PERFIL ─────────────────────────────────────────────────────
-
-    'Acesso ou Senha':
-        rf'(?:(?:\bacesso(?:s)?\b|\bsenha(?:s)?\b).{{0,25}}\b{SIAFE_PATTERN}\b|\b{SIAFE_PATTERN}\b)',
-
-    'Reativacao':
-        rf'\breativ(?:ar|ac{SFX_ACAO}|ado(?:s)?|ada(?:s)?)\b'
-        r'|\bdesbloqueio(?:s)?\s+de\s+usu[áa]rio(?:s)?\b'
-        rf'|\breativac{SFX_ACAO}\s+de\s+perfil\b',
-
-    # === BLOCO OTIMIZADO DE GESTOR E PERFIL ===
-    'Perfil ou Gestor de Usuarios':
-       r'\bgestor(?:a|as|es)?\s+de\s+usu[áa]rio(?:s)?\b'
-       r'|\b(?:perfil|perfis)\s+de\s+usu[áa]rio(?:s)?\b'
-       r'|\btroca\s+de\s+gestor(?:a|as|es)?\b'
-       # Cobre: Gestor do Siafe Rio, Gestora Siaferio, etc.
-       rf'|\bgestor(?:a|as|es)?\s+(?:d[oa]|de)?\s*{SIAFE_PATTERN}\b',
-
-    # ── OUTROS ──────────────────────────────────────────────────────────────
-
-    'LISCONTIR':
-        r'\bliscontir\b|\bdesbloqueio\s+de\s+empenho(?:s)?\b',
-
-    'Desconsiderar':
-        r'\bdesconsider(?:ar|e|em)\b',
-}
-
-# # ==============================================================================
-# # DICIONÁRIO DE ENVIO PRIORITÁRIO COM REGEX (TEXTO NORMALIZADO)
-# # ==============================================================================
-
-# DICIONARIO_DE_ENVIO_PRIORITARIO = {
-#     # ── SISTEMAS E TECNOLOGIA ──────────────────────────────────────────────────
-#     'Problemas SIAFERIO':
-#         r'\b(?:problema(?:s)?|erro(?:s)?|falha(?:s)?|indisponibilidade|instabilidade|lentidao)'
-#         r'(?:\s+(?:no|do|com|em))?\s+(?:siaferio|siafe[-\s]*rio|siaf[-\s]*e[-\s]*rio)\b'
-#         r'|\bsiaferio\s+(?:fora\s+do\s+ar|inoperante|com\s+problema(?:s)?|nao\s+(?:funciona|carrega|abre))\b',
-
-#     'FlexVision':
-#         r'\bflexvision\b|\bflex[-\s]*vision\b',
-
-#     'Sistemas Fora do Ar':
-#         r'\b(?:sistema(?:s)?|servico(?:s)?|aplicacao(?:oes)?)\s+(?:fora\s+do\s+ar|indisponivel(?:eis)?|inoperante(?:s)?)\b'
-#         r'|\b(?:sem\s+acesso|nao\s+(?:acessa|conecta|funciona))\s+(?:ao\s+)?(?:sistema(?:s)?|siaferio|siafem)\b'
-#         r'|\b(?:siaferio|siafe[-\s]*rio|siaf[-\s]*e[-\s]*rio|siafem|siaf[-\s]*em)\s+fora\s+do\s+ar\b',
-
-#     # ── URGÊNCIAS E PROBLEMAS CRÍTICOS ─────────────────────────────────────────
-#     'Urgente':
-#         r'\burgent(?:e|es?|issim[ao])\b|\bpriorit[aá]ri[ao](?:s)?\b|\bemerg[eê]ncia\b'
-#         r'|\basap\b|\bcom\s+urg[eê]ncia\b|\bpara\s+hoje\b|\bimediato\b',
-
-#     'Erro Crítico':
-#         r'\b(?:erro\s+(?:critico|grave|fatal|sistema)|falha\s+(?:critica|grave|geral))\b'
-#         r'|\b(?:nao\s+(?:consegue|consigo)|impossivel)\s+(?:acessar|executar|processar|finalizar)\b'
-#         r'|\bsistema\s+(?:travado|congelado|nao\s+responde)\b',
-
-
-#     # ── FECHAMENTO/FIM DE PERÍODO ──────────────────────────────────────────────
-#     'Fechamento':
-#         r'\b(?:fechamento|encerramento)\s+(?:do\s+)?(?:mes|periodo|exercicio|balanco)\b'
-#         r'|\bfim\s+do\s+(?:mes|ano|exercicio|periodo)\b'
-#         r'|\b(?:prestacao|envio)\s+de\s+contas?\b',
-
-#     'Relatório Urgente':
-#         r'\b(?:relatorio(?:s)?|demonstrativo(?:s)?)\s+(?:urgente(?:s)?|prioritario(?:s)?|para\s+(?:hoje|amanh[aã]))\b'
-#         r'|\b(?:balancete|dre|demonstracao)\s+(?:urgente|prioritari[ao])\b',
-# }
-
-# # --- Lista Simples de Palavras de ENVIO PRIORITÁRIO (mantida para compatibilidade) ---
-# PALAVRAS_DE_ENVIO_OBRIGATORIO = [
-#     'flexvision',  # mantida para compatibilidade com código existente
-# ]
-
-
-# # ==============================================================================
-# # PADRÕES AUXILIARES PARA REUTILIZAÇÃO EM REGEX
-# # ==============================================================================
-
-# PREP = r'(?:de|do|da|dos|das|no|na|nos|nas)'
-# PT_OBJ = r'programa(?:s)?\s*(?:de|-)?\s*trabalho(?:s)?'   # "programa(s) de trabalho(s)"
-# ACOES = r'(?:cadastr(?:o(?:s)?|ar|ado(?:s)?|amento|ou)|libera(?:cao|r|do(?:s)?)|inativa(?:cao|r|do(?:s)?))'
-
-# # ==============================================================================
-# # DICIONÁRIO DE BLOQUEIO COM REGEX ROBUSTAS (TEXTO NORMALIZADO)
-# # ==============================================================================
-
-# DICIONARIO_DE_BLOQUEIO_REGEX = {
-#     # ── PARTE CADASTRAL FINANCEIRA ───────────────────────────────────────────────
-#     'Inscricao Generica':
-#         r'\binscri(?:cao|coes)\s+gen(?:erica|eria)(?:s)?\b|\bigs\b',
-
-#     'Credor Generico':
-#         r'\bcredor(?:es)?\s+generic(?:o|os)\b|\bcgs\b',
-
-#     'Bloqueio Judicial':
-#         r'\bbloqueio(?:s)?\s+judicia(?:l|is)\b|\bcriaca(?:o|oes)\s+de\s+bj\b|\bbj\b',
-
-#     'Codigo de Barras':
-#         r'\b(?:cod(?:\.|\s*)barras?|codigo(?:s)?\s+de\s+barras?)\b'
-#         r'|\balterac(?:ao|oes)\s+de\s+cnpj\s+em\s+(?:cod(?:\.|\s*)barras?|codigo\s+de\s+barras?)\b',
-
-#     'Dados Bancarios':
-#         # Bloco 1: Termos diretos
-#         r'\b(?:dados\s+banc[áa]ri(?:o|os)|domic[íi]lio\s+banc[áa]ri(?:o|os))\b'
-#         r'|'
-#         # Bloco 2: Ação (Alterar, Cadastrar, Atualizar, Inclusão)
-#         r'\b(?:alterac(?:[ãa]o|[õo]es)|cadastr(?:o|ar)|atualizac(?:[ãa]o|[õo]es)|inclus(?:[ãa]o))\s+'
-#         # Bloco 3: Preposição (Opcional e flexível)
-#         r'(?:d?[oa]s?|de|em|para)?\s*'
-#         # Bloco 4: Objeto (Banco, Agência, Conta Corrente/Bancária)
-#         r'(?:banco(?:s)?|ag[êe]ncia(?:s)?|conta(?:s)?\s+(?:corrent(?:e|es)|banc[áa]ria(?:s)?))'
-#         # Bloco 5: Complemento "Credor Genérico" (Opcional com ?)
-#         # O '?' no final do grupo faz com que ele pegue a frase COM ou SEM essa parte final
-#         r'(?:\s+em\s+credor(?:es)?\s+gen[ée]ric(?:o|os))?\b',
-
-
-#     'Boleto/Credor':
-#         r'\bboletos?\b|\bcredor(?:es)?\b',
-
-#     'Alteracao de Razao Social':
-#         r'\balterac(?:ao|oes)\s+(?:da|de)\s+razao\s+social\b',
-
-
-#     # ── PARTE CADASTRAL ─────────────────────────────────────────────────────────
-#     'Cadastro em Geral':
-#         r'\binformac(?:oes)?\s+cadastrais\b'
-#         r'|\brequisic(?:ao|oes)\s+de\s+pequeno(?:s)?\s+valor(?:es)?\b',
-
-#     'Cadastro de Convenio':
-#         r'\bcadastro(?:s)?\s+(?:de\s+)?conta(?:s)?\s+(?:de\s+)?convenio(?:s)?\b'
-#         r'|\bconta(?:s)?\s+(?:de\s+)?convenio(?:s)?\s+cadastrad(?:a|as|o|os)\b',
-
-#     'Atualizacao de Dados':
-#         r'\batualizac(?:ao|oes)\s+(?:de\s+)?dados?\b'
-#         r'|\bnomeac(?:ao|oes)\s+de\s+contador(?:es)?\b'
-#         r'|\balterar?\s+nome(?:s)?\s+(?:de|das|nas)\s+unidade(?:s)?\s+gestora(?:s)?\b',
-
-#     # **Programa de Trabalho** (ordem ação→objeto OU objeto→ação)
-#     'Programa de Trabalho':
-#         r'\b(?:'
-#         rf'(?:{ACOES}(?:\s+(?:o|a|os|as))?\s*(?:\s+no\s+sistema)?(?:\s+{PREP})?\s+{PT_OBJ})'
-#         r'|'
-#         rf'(?:{PT_OBJ}(?:\s+no\s+sistema)?(?:\s+(?:foi|foram|esta(?:o)?|sera(?:o)?))?\s*(?:\w+\s+){{0,6}}{ACOES})'
-#         r')\b',
-
-#     'Detalhamento de Fonte':
-#         r'\bcadastro(?:s)?\s+(?:de\s+)?detalhamento(?:s)?\s+(?:de\s+)?fonte(?:s)?\b'
-#         r'|\bdetalhamento(?:s)?\s+(?:da|de)\s+fonte(?:s)?\b'
-#         r'|\bfonte(?:s)?\s+detalhad(?:a|as|o|os)\b',
-
-#     # ── ACESSO E PERFIL ─────────────────────────────────────────────────────────
-#     'Acesso ou Senha':
-#         r'(?:(?:\bacesso(?:s)?\b|\bsenha(?:s)?\b).{0,25}\b(?:siafem|siaferio)\b|\bsiafem\b|\bsiaferio\b)',
-
-#     'Reativacao':
-#         r'\breativ(?:ar|acao|acoes|ado(?:s)?|ada(?:s)?)\b'
-#         r'|\bdesbloqueio(?:s)?\s+de\s+usuario(?:s)?\b'
-#         r'|\breativac(?:ao|oes)\s+de\s+perfil\b',
-
-#     'Perfil ou Gestor de Usuarios':
-#        r'\bgestor(?:a|as|es)?\s+de\s+usu[áa]rio(?:s)?\b'
-#        r'|\b(?:perfil|perfis)\s+de\s+usu[áa]rio(?:s)?\b'  
-#        r'|\btroca\s+de\s+gestor(?:a|as|es)?\b'
-#        r'|\bgestor(?:a|as|es)?\s+(?:d[oa]|de)?\s*siafe(?:[.\-\s]*rio)?\b',
-
-#     # ── OUTROS ──────────────────────────────────────────────────────────────────
-#     'LISCONTIR':
-#         r'\bliscontir\b|\bdesbloqueio\s+de\s+empenho(?:s)?\b',
-
-#     'Desconsiderar':
-#         r'\bdesconsider(?:ar|e|em)\b',
-# }
-
+# Os dicionários DICIONARIO_DE_ENVIO_PRIORITARIO / DICIONARIO_DE_BLOQUEIO_REGEX
+# ficam em classificador.py (importados acima).
+
+# Tempo máximo de regex por comunica (ms), conferido entre as camadas da
+# classificação. Se estourar, o comunica é enviado para análise em vez de
+# bloqueado. 0 desliga o limite.
+CLASSIFICACAO_ORCAMENTO_MS = float(os.getenv("CLASSIFICACAO_ORCAMENTO_MS", "2000").strip() or 0)
+# Mede o tempo de cada conceito de regex em 1 a cada N comunicas (caminho lento,
+# um re.search por conceito; vai para o log final). 0 desliga.
+CLASSIFICACAO_AMOSTRAGEM = int(os.getenv("CLASSIFICACAO_AMOSTRAGEM", "0").strip() or 0)
+
+# Limite superior (s) de cada espera no SIAFE: clique, carregamento da tela,
+# recarga da lista. As esperas terminam assim que a página fica pronta.
+SIAFE_ESPERA_MAXIMA_S = float(os.getenv("SIAFE_ESPERA_MAXIMA_S", "30").strip() or 30)
+
+# Como percorrer a lista filtrada:
+#   "recarregar" - abre sempre o primeiro item e espera a lista recarregar a cada comunica
+#   "snapshot"   - lê todas as linhas (ID, assunto, remetente) de uma vez e abre cada uma direto
+#                  (pula os já tratados só pelo número, sem conferir o corpo; ver estado.py)
+SIAFE_MODO_LISTA = os.getenv("SIAFE_MODO_LISTA", "recarregar").strip().lower() or "recarregar"
+
+# Mantém o navegador logado aberto entre as execuções do agendador (login só quando a sessão expira)
+SIAFE_MANTER_SESSAO = os.getenv("SIAFE_MANTER_SESSAO", "1").strip().lower() in {"1", "true", "on", "yes"}
+# Diretório de perfil do navegador (opcional): cookies e cache sobrevivem a um reinício do processo
+SIAFE_DIRETORIO_PERFIL = os.getenv("SIAFE_DIRETORIO_PERFIL", "").strip()
+# Perfil de desempenho do navegador (ver perfil_navegador.py):
+#   "completo" - todos os recursos, janela 1920x1080 (como antes)
+#   "enxuto"   - sem imagens, fontes e analytics, carregamento "eager" e cache em disco entre execuções
+#   "minimo"   - o "enxuto" sem as folhas de estilo também
+SIAFE_PERFIL_NAVEGADOR = os.getenv("SIAFE_PERFIL_NAVEGADOR", "completo").strip().lower() or "completo"
+# Cache em disco do perfil enxuto (vazio: pasta temporária fixa, reaproveitada entre execuções)
+SIAFE_DIRETORIO_CACHE = os.getenv("SIAFE_DIRETORIO_CACHE", "").strip()
+# JSON com os caminhos do driver/navegador já resolvidos (vazio: pasta temporária)
+SIAFE_CACHE_DRIVERS = os.getenv("SIAFE_CACHE_DRIVERS", "").strip()
+# Antecedência (s) com que o agendador abre o navegador antes do próximo horário,
+# quando não há um navegador mantido da execução anterior. 0 desliga.
+SIAFE_PREAQUECER_S = float(os.getenv("SIAFE_PREAQUECER_S", "120").strip() or 0)
+
+# Arquivo com o filtro de setor capturado (atalho de um passo nas próximas execuções).
+# Vazio desliga o atalho e o filtro é sempre montado pela tela.
+SIAFE_FILTRO_SALVO = os.getenv("SIAFE_FILTRO_SALVO", "filtro_siafe.json").strip()
+
+# Como ler os comunicas depois do login e do filtro:
+#   "selenium" - abre cada comunica no navegador
+#   "http"     - repete por HTTP as requisições ADF gravadas em SIAFE_HTTP_GRAVACAO, com os
+#                cookies do navegador (se falhar, continua pelo Selenium)
+#   "paralelo" - lista no navegador principal e abre os detalhes em SIAFE_NAVEGADORES
+#                navegadores auxiliares com a mesma sessão (o que falhar volta para o principal)
+SIAFE_BACKEND = os.getenv("SIAFE_BACKEND", "selenium").strip().lower() or "selenium"
+SIAFE_HTTP_GRAVACAO = os.getenv("SIAFE_HTTP_GRAVACAO", "siafe_http.json").strip()
+# Banco SQLite com os comunicas já tratados (número, hash do corpo, decisão, hora).
+# Vazio: o registro vale só enquanto o processo estiver rodando.
+SIAFE_ESTADO_DB = os.getenv("SIAFE_ESTADO_DB", "comunicas_processados.db").strip()
+# Arquivo de todos os comunicas lidos, com busca de texto (consulta: python arquivo.py buscar ...).
+# Vazio desliga o arquivo.
+SIAFE_ARQUIVO_DB = os.getenv("SIAFE_ARQUIVO_DB", "arquivo_comunicas.db").strip()
+# Navegadores auxiliares do backend "paralelo" (poucos, para não sobrecarregar o SIAFE)
+SIAFE_NAVEGADORES = min(int(os.getenv("SIAFE_NAVEGADORES", str(TAMANHO_PADRAO)).strip() or TAMANHO_PADRAO),
+                        TAMANHO_MAXIMO)
+
+# Este seletor CSS é muito mais preciso. Ele procura por QUALQUER elemento que:
+# 1. Comece com (id^=) 'pt1:binbox:messagesTableViewer:tabViewerDec:'
+# 2. E termine com (id$=) ':j_id8'
+seletor_preciso_comunica = "[id^='pt1:binbox:messagesTableViewer:tabViewerDec:'][id$=':j_id8']"
 
 
 # Configurações de e-mail
 EMAIL_REMETENTE = os.getenv("EMAIL_REMETENTE", "").strip()
 SENHA_REMETENTE = os.getenv("SENHA_REMETENTE", "").strip()
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com").strip()
+SMTP_PORTA = int(os.getenv("SMTP_PORTA", "587").strip() or 587)
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1").strip().lower() in {"1", "true", "on", "yes"}
+# Mensagens enviadas pela mesma conexão antes de reconectar
+SMTP_MAX_MENSAGENS = int(os.getenv("SMTP_MAX_MENSAGENS", str(MAX_MENSAGENS_POR_CONEXAO)).strip()
+                         or MAX_MENSAGENS_POR_CONEXAO)
+# E-mails de comunicas esperando envio antes de o loop principal bloquear
+SMTP_FILA_MAXIMA = int(os.getenv("SMTP_FILA_MAXIMA", str(TAMANHO_FILA_PADRAO)).strip() or TAMANHO_FILA_PADRAO)
+# Caixa de saída: e-mails gravados antes do envio e tentados de novo até serem aceitos
+# (vazio: só na memória do processo)
+SMTP_CAIXA_SAIDA_DB = os.getenv("SMTP_CAIXA_SAIDA_DB", CAIXA_SAIDA_PADRAO).strip()
+SMTP_MAX_TENTATIVAS = int(os.getenv("SMTP_MAX_TENTATIVAS", str(MAX_TENTATIVAS)).strip() or MAX_TENTATIVAS)
+# No fim da execução, por quanto tempo (s) ainda reenviar os e-mails que falharam nela
+# (a espera entre tentativas corre dentro desse prazo; 0: só na execução seguinte)
+SMTP_DRENAR_S = float(os.getenv("SMTP_DRENAR_S", "300").strip() or 300)
+# individual: um e-mail por comunica | resumo: todos em e-mails de resumo |
+# hibrido: prioritários na hora, o resto no resumo
+SMTP_MODO_ENVIO = os.getenv("SMTP_MODO_ENVIO", MODO_ENVIO_PADRAO).strip().lower()
+if SMTP_MODO_ENVIO not in MODOS_ENVIO:
+    SMTP_MODO_ENVIO = MODO_ENVIO_PADRAO
+# Tamanho máximo (HTML) de cada e-mail de resumo; passou disso, o resumo é dividido
+SMTP_RESUMO_MAXIMO_KB = int(os.getenv("SMTP_RESUMO_MAXIMO_KB", str(TAMANHO_MAXIMO_RESUMO_KB)).strip()
+                            or TAMANHO_MAXIMO_RESUMO_KB)
+
 
 
 def salvar_screenshot_debug(driver, nome_arquivo, descricao=""):
@@ -402,20 +200,28 @@ def salvar_screenshot_debug(driver, nome_arquivo, descricao=""):
 
         
 
+def montar_email(destinatarios, assunto, corpo_html, texto=None):
+    """Mensagem pronta para o SMTP (UTF-8, HTML + texto puro)."""
+    return montar_mensagem(EMAIL_REMETENTE, destinatarios.split(';'), assunto, corpo_html, texto).as_bytes()
+
+
+def enfileirar_email(destinatarios, assunto, corpo_html, texto=None, itens_resumo=()):
+    """Põe o e-mail na fila de envio em segundo plano e volta na hora."""
+    _recursos().fila_correio.enfileirar(EMAIL_REMETENTE, destinatarios.split(';'),
+                                        montar_email(destinatarios, assunto, corpo_html, texto), descricao=assunto,
+                                        itens_resumo=itens_resumo)
+
+
+def enfileirar_resumo(partes):
+    """E-mails das partes de resumo fechadas (os itens saem do resumo em aberto da caixa de saída)."""
+    for parte in partes:
+        enfileirar_email(destinatarios=DESTINATARIOS, assunto=parte.assunto, corpo_html=parte.corpo_html,
+                         itens_resumo=parte.itens)
+
+
 def enviar_email(destinatarios, assunto, corpo_html):
     try:
-        msg = email.message.Message()
-        msg['Subject'] = assunto
-        msg['From'] = EMAIL_REMETENTE
-        msg['To'] = destinatarios
-        msg.add_header('Content-Type', 'text/html')
-        msg.set_payload(corpo_html, 'iso-8859-1')
-
-        s = smtplib.SMTP('smtp.gmail.com: 587')
-        s.starttls()
-        s.login(EMAIL_REMETENTE, SENHA_REMETENTE)
-        s.sendmail(EMAIL_REMETENTE, destinatarios.split(';'), msg.as_string().encode('iso-8859-1'))
-        s.quit()
+        _recursos().correio.enviar(EMAIL_REMETENTE, destinatarios.split(';'), montar_email(destinatarios, assunto, corpo_html))
         print("--> E-mail enviado com sucesso.")
         return True
     except Exception as e:
@@ -425,7 +231,7 @@ def enviar_email(destinatarios, assunto, corpo_html):
 
 
 
-def enviar_alerta_falha(exc: Exception, log_da_execucao, driver=None):
+def enviar_alerta_falha(exc: Exception, log_execucao, driver=None):
     """Manda e-mail SOMENTE quando ocorre erro na automação."""
     tb = traceback.format_exc()
     host = socket.gethostname()
@@ -436,25 +242,13 @@ def enviar_alerta_falha(exc: Exception, log_da_execucao, driver=None):
     except:
         pass
 
-    # Reaproveita seu formatador de log
+    # Log já renderizado em HTML até o ponto da falha
     try:
-        log_html = formatar_log_para_html(log_da_execucao)
+        log_html = log_execucao.html()
     except Exception:
         log_html = "<i>(Falha ao formatar log)</i>"
 
-    corpo_html = f"""
-    <div style="font-family:Arial, sans-serif; line-height:1.5">
-      <h3>🛑 Falha na Automação</h3>
-      <p><b>Host:</b> {host}</p>
-      <p><b>URL atual:</b> {html.escape(url_atual)}</p>
-      <p><b>Erro:</b> <code>{html.escape(repr(exc))}</code></p>
-      <p><b>Traceback:</b></p>
-      <pre style="white-space:pre-wrap">{html.escape(tb)}</pre>
-      <hr>
-      <h4>Log parcial da execução</h4>
-      <div style="border:1px solid #ddd; padding:10px; background:#f9f9f9">{log_html}</div>
-    </div>
-    """
+    corpo_html = corpo_falha(host=host, url=url_atual, erro=repr(exc), traceback=tb, log_html=log_html)
     enviar_email(
         destinatarios=DESTINATARIOS,
         assunto=f"🛑 Falha na Automação (host {host})",
@@ -468,340 +262,535 @@ def enviar_alerta_falha(exc: Exception, log_da_execucao, driver=None):
 # ==============================================================================
     
 
-def formatar_log_para_html(lista_de_logs):
-    """
-    Processa a lista de logs e a transforma em um HTML bem formatado,
-    com separadores, cores e destaques.
-    """
-    html_lines = []
-    # Itera sobre cada linha de log que foi registrada
-    for linha in lista_de_logs:
-        # Pula linhas em branco para não poluir o log
-        if not linha.strip():
-            continue
-
-        linha_segura = html.escape(linha).strip()
-
-        # --- AQUI COMEÇA A NOVA LÓGICA DE FORMATAÇÃO ---
-
-        # 1. Destaca a linha do ID do Comunica
-        # Usamos regex para encontrar a linha do ID e formatar apenas o número
-        padrao_id = r"(--- ID do comunica )(\d+)( ---)"
-        match = re.search(padrao_id, linha_segura)
-        if match:
-            # Remonta a linha, colocando o ID em negrito e com fundo amarelo claro
-            linha_formatada = f'{match.group(1)}<b style="background-color: #fcf8e3; padding: 2px 5px; border-radius: 3px;">{match.group(2)}</b>{match.group(3)}'
-        
-        # 2. Transforma as linhas de verificação em títulos e adiciona um separador
-        elif "--- Verificando a lista de comunicas..." in linha_segura:
-            # Adiciona uma linha horizontal ANTES de cada novo bloco de verificação (exceto o primeiro)
-            if html_lines:
-                html_lines.append('<hr style="border: none; border-top: 1px dashed #ccc; margin: 20px 0;">')
-            linha_formatada = f'<h4>{linha_segura}</h4>'
-
-        # 3. Colore as linhas de status (como antes)
-        elif "[BLOQUEADO]" in linha_segura:
-            linha_formatada = f'<div style="color: #d9534f; font-weight: bold;">{linha_segura}</div>' # Vermelho
-        elif "[ENVIO DE EMAIL PARA ANALISE]" in linha_segura:
-            linha_formatada = f'<div style="color: #5cb85c; font-weight: bold;">{linha_segura}</div>' # Verde
-        elif "[INFORMATIVO]" in linha_segura:
-             linha_formatada = f'<div style="color: #5bc0de; font-weight: bold;">{linha_segura}</div>' # Azul
-        elif "[ENVIO PRIORITÁRIO]" in linha_segura:
-             linha_formatada = f'<div style="color: #bc0ec7; font-weight: bold;">{linha_segura}</div>' # Roxo
-        
-
-        # 4. Linhas normais (sem formatação especial)
-        else:
-            linha_formatada = linha_segura
-        
-        html_lines.append(linha_formatada)
-    
-    # Junta todas as linhas HTML formatadas com uma quebra de linha
-    return "<br>".join(html_lines)
-
 # ==============================================================================
-# AUTOMAÇÃO (FLUXO PRINCIPAL)
+# NAVEGADOR, LOGIN E FILTRO
 # ==============================================================================
 
-def main():
+# Abre os navegadores: Chromium headless no Linux (VPS/Docker), Edge no Windows
+FABRICA_DRIVERS = FabricaDrivers(ConfiguracaoDriver(
+    perfil=SIAFE_PERFIL_NAVEGADOR,
+    diretorio_perfil=SIAFE_DIRETORIO_PERFIL,
+    diretorio_cache=SIAFE_DIRETORIO_CACHE,
+    cache_resolucao=SIAFE_CACHE_DRIVERS,
+))
 
-    """
-    Esta função contém todo o ciclo de automação, desde o login até o fim.
-    Será chamada pelo agendador nos horários programados.
-    """
-    # A LISTA DE LOG É CRIADA NO INÍCIO DE CADA EXECUÇÃO
-    log_da_execucao = []
-    
-    # A FUNÇÃO DE LOG É INTERNA E USA A LISTA LOCAL
-    def registrar_log(mensagem):
-        """Função interna que usa a lista 'log_desta_execucao'."""
-        print(mensagem)
-        log_da_execucao.append(mensagem)
 
+def criar_driver():
+    print("Iniciando navegador com Selenium...")
+    return FABRICA_DRIVERS.criar()
 
-    #registrar_log(f"Automação realizada para {numero_de_comunicas_para_processar} comunica(s).")
-    time.sleep(2)
 
-    # --- INÍCIO DA AUTOMAÇÃO COM SELENIUM (VERSÃO CORRIGIDA) ---
-    print("Iniciando navegador com Selenium...")
+def criar_driver_auxiliar():
+    return FABRICA_DRIVERS.criar(auxiliar=True)
 
-    # Detectar se está rodando em ambiente Docker/Linux (VPS) ou Windows (local)
-    import platform
-    sistema = platform.system()
-
-    if sistema == "Linux":
-        # Configuração para ambiente headless (VPS/Docker)
-        print("Ambiente Linux detectado. Usando Chromium headless...")
-        from selenium.webdriver.chrome.options import Options
-        from selenium.webdriver.chrome.service import Service
-
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-
-        # Usar chromium instalado no sistema
-        chrome_options.binary_location = '/usr/bin/chromium'
-        service = Service('/usr/bin/chromedriver')
-
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-    else:
-        # Configuração para ambiente Windows (local)
-        print("Ambiente Windows detectado. Usando Edge...")
-        driver = webdriver.Edge()
 
+def entrar_no_siafe(driver):
+    """Login no SIAFE e confirmação da mensagem pós-login (deixa o navegador na página inicial)."""
     driver.get(url_do_siafe)
     print("Página de login aberta")
 
     # Salva screenshot inicial apenas quando debug está habilitado
     salvar_screenshot_debug(driver, "debug_01_pagina_inicial.png", "página inicial")
 
+    # Cria um objeto de espera (limite configurável, 30s por padrão para ambientes lentos).
+    wait = WebDriverWait(driver, SIAFE_ESPERA_MAXIMA_S)
+
+    print("Aguardando campo de usuário...")
+    # AÇÕES NA TELA DE LOGIN
     try:
-        # Cria um objeto de espera. Aumentei para 30s para dar mais margem em ambientes lentos.
-        wait = WebDriverWait(driver, 30)
+        campo_usuario = wait.until(EC.element_to_be_clickable((By.ID, "loginBox:itxUsuario::content")))
+        print(f"Campo de usuário encontrado. Preenchendo com usuário...")
+        campo_usuario.clear()
+        campo_usuario.send_keys(USUARIO)
 
-        print("Aguardando campo de usuário...")
-        # AÇÕES NA TELA DE LOGIN
-        try:
-            campo_usuario = wait.until(EC.element_to_be_clickable((By.ID, "loginBox:itxUsuario::content")))
-            print(f"Campo de usuário encontrado. Preenchendo com usuário...")
-            campo_usuario.clear()
-            campo_usuario.send_keys(USUARIO)
-            time.sleep(2)
+        # Screenshot após preencher usuário (opcional)
+        salvar_screenshot_debug(driver, "debug_02_usuario_preenchido.png", "usuário preenchido")
 
-            # Screenshot após preencher usuário (opcional)
-            salvar_screenshot_debug(driver, "debug_02_usuario_preenchido.png", "usuário preenchido")
+    except Exception as e:
+        print(f"ERRO ao localizar/preencher campo de usuário: {e}")
+        salvar_screenshot_debug(driver, "debug_erro_usuario.png", "erro ao preencher usuário")
+        if DEBUG_SCREENSHOTS_ENABLED:
+            try:
+                print(f"HTML da página: {driver.page_source[:500]}")  # Primeiros 500 caracteres
+            except Exception as html_err:
+                print(f"Falha ao obter HTML para debug: {html_err}")
+        raise
 
-        except Exception as e:
-            print(f"ERRO ao localizar/preencher campo de usuário: {e}")
-            salvar_screenshot_debug(driver, "debug_erro_usuario.png", "erro ao preencher usuário")
-            if DEBUG_SCREENSHOTS_ENABLED:
-                try:
-                    print(f"HTML da página: {driver.page_source[:500]}")  # Primeiros 500 caracteres
-                except Exception as html_err:
-                    print(f"Falha ao obter HTML para debug: {html_err}")
-            raise
+    print("Aguardando campo de senha...")
+    try:
+        campo_senha = wait.until(EC.element_to_be_clickable((By.ID, "loginBox:itxSenhaAtual::content")))
+        print(f"Campo de senha encontrado. Preenchendo...")
+        campo_senha.clear()
+        campo_senha.send_keys(SENHA)
+    except Exception as e:
+        print(f"ERRO ao localizar/preencher campo de senha: {e}")
+        salvar_screenshot_debug(driver, "debug_erro_senha.png", "erro ao preencher senha")
+        raise
 
-        print("Aguardando campo de senha...")
-        try:
-            campo_senha = wait.until(EC.element_to_be_clickable((By.ID, "loginBox:itxSenhaAtual::content")))
-            print(f"Campo de senha encontrado. Preenchendo...")
-            campo_senha.clear()
-            campo_senha.send_keys(SENHA)
-            time.sleep(2)
-        except Exception as e:
-            print(f"ERRO ao localizar/preencher campo de senha: {e}")
-            salvar_screenshot_debug(driver, "debug_erro_senha.png", "erro ao preencher senha")
-            raise
+    print("Aguardando botão OK...")
+    try:
+        botao_ok = wait.until(EC.element_to_be_clickable((By.ID, "loginBox:btnConfirmar")))
+        print("Botão OK encontrado. Clicando...")
+        # Screenshot antes de clicar
+        salvar_screenshot_debug(driver, "debug_03_antes_login.png", "antes de clicar em login")
+        botao_ok.click()
+        print("Botão OK clicado. Aguardando resposta...")
+    except Exception as e:
+        print(f"ERRO ao localizar/clicar botão OK: {e}")
+        salvar_screenshot_debug(driver, "debug_erro_botao_ok.png", "erro ao clicar em OK")
+        raise
 
-        print("Aguardando botão OK...")
-        try:
-            botao_ok = wait.until(EC.element_to_be_clickable((By.ID, "loginBox:btnConfirmar")))
-            print("Botão OK encontrado. Clicando...")
-            # Screenshot antes de clicar
-            salvar_screenshot_debug(driver, "debug_03_antes_login.png", "antes de clicar em login")
-            botao_ok.click()
-            print("Botão OK clicado. Aguardando resposta...")
-        except Exception as e:
-            print(f"ERRO ao localizar/clicar botão OK: {e}")
-            salvar_screenshot_debug(driver, "debug_erro_botao_ok.png", "erro ao clicar em OK")
-            raise
+    # Aguardar o redirecionamento após o login (a página de login sai do DOM)
+    print("Aguardando redirecionamento pós-login...")
+    aguardar_navegacao(driver, botao_ok, SIAFE_ESPERA_MAXIMA_S)
 
-        # Aguardar o redirecionamento após o login (espera a URL mudar)
-        print("Aguardando redirecionamento pós-login...")
-        time.sleep(5)
+    # Screenshot após login
+    salvar_screenshot_debug(driver, "debug_04_apos_login.png", "após login")
+    if DEBUG_SCREENSHOTS_ENABLED:
+        print(f"URL atual: {driver.current_url}")
 
-        # Screenshot após login
-        salvar_screenshot_debug(driver, "debug_04_apos_login.png", "após login")
-        if DEBUG_SCREENSHOTS_ENABLED:
-            print(f"URL atual: {driver.current_url}")
+    # AÇÕES NA TELA DE MENSAGEM PÓS-LOGIN
 
-        # AÇÕES NA TELA DE MENSAGEM PÓS-LOGIN
+    print("Procurando botão OK da mensagem pós-login...")
 
-        print("Procurando botão OK da mensagem pós-login...")
+    # Estratégia 1: Tentar pelo ID original
+    botao_ok_encontrado = False
+    try:
+        print("Tentativa 1: Procurando por ID completo...")
+        botao_ok_mensagem_tela = wait.until(EC.element_to_be_clickable((By.ID, "pt1:warnMessageDec:frmExec:btnNewWarnMessageOK")))
+        print("✓ Botão OK mensagem encontrado pelo ID. Clicando...")
+        botao_ok_mensagem_tela.click()
+        botao_ok_encontrado = True
+        aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
 
-        # Estratégia 1: Tentar pelo ID original
-        botao_ok_encontrado = False
+        salvar_screenshot_debug(driver, "debug_05_apos_ok_mensagem.png", "após confirmar mensagem")
+
+    except Exception as e1:
+        print(f"Tentativa 1 falhou: {e1}")
+
+        # Estratégia 2: Tentar por CSS Selector parcial
         try:
-            print("Tentativa 1: Procurando por ID completo...")
-            botao_ok_mensagem_tela = wait.until(EC.element_to_be_clickable((By.ID, "pt1:warnMessageDec:frmExec:btnNewWarnMessageOK")))
-            print("✓ Botão OK mensagem encontrado pelo ID. Clicando...")
+            print("Tentativa 2: Procurando por CSS Selector parcial...")
+            botao_ok_mensagem_tela = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "[id*='btnNewWarnMessageOK']")))
+            print("✓ Botão OK mensagem encontrado por CSS. Clicando...")
             botao_ok_mensagem_tela.click()
             botao_ok_encontrado = True
-            time.sleep(4)
+            aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
 
             salvar_screenshot_debug(driver, "debug_05_apos_ok_mensagem.png", "após confirmar mensagem")
 
-        except Exception as e1:
-            print(f"Tentativa 1 falhou: {e1}")
+        except Exception as e2:
+            print(f"Tentativa 2 falhou: {e2}")
 
-            # Estratégia 2: Tentar por CSS Selector parcial
+            # Estratégia 3: Tentar por texto do botão (se for OK)
             try:
-                print("Tentativa 2: Procurando por CSS Selector parcial...")
-                botao_ok_mensagem_tela = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "[id*='btnNewWarnMessageOK']")))
-                print("✓ Botão OK mensagem encontrado por CSS. Clicando...")
+                print("Tentativa 3: Procurando botão com texto 'OK'...")
+                botao_ok_mensagem_tela = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'OK') or @value='OK']")))
+                print("✓ Botão OK mensagem encontrado por texto. Clicando...")
                 botao_ok_mensagem_tela.click()
                 botao_ok_encontrado = True
-                time.sleep(4)
+                aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
 
                 salvar_screenshot_debug(driver, "debug_05_apos_ok_mensagem.png", "após confirmar mensagem")
 
-            except Exception as e2:
-                print(f"Tentativa 2 falhou: {e2}")
+            except Exception as e3:
+                print(f"Tentativa 3 falhou: {e3}")
+                print("AVISO: Botão OK mensagem não encontrado por nenhuma estratégia (pode não existir)")
+                # Salva screenshot para análise
+                salvar_screenshot_debug(driver, "debug_aviso_sem_ok_mensagem.png", "sem botão OK pós-login")
+                if DEBUG_SCREENSHOTS_ENABLED:
+                    print(f"URL atual: {driver.current_url}")
+                    print("Continuando sem clicar no botão OK...")
 
-                # Estratégia 3: Tentar por texto do botão (se for OK)
-                try:
-                    print("Tentativa 3: Procurando botão com texto 'OK'...")
-                    botao_ok_mensagem_tela = wait.until(EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'OK') or @value='OK']")))
-                    print("✓ Botão OK mensagem encontrado por texto. Clicando...")
-                    botao_ok_mensagem_tela.click()
-                    botao_ok_encontrado = True
-                    time.sleep(4)
-
-                    salvar_screenshot_debug(driver, "debug_05_apos_ok_mensagem.png", "após confirmar mensagem")
-
-                except Exception as e3:
-                    print(f"Tentativa 3 falhou: {e3}")
-                    print("AVISO: Botão OK mensagem não encontrado por nenhuma estratégia (pode não existir)")
-                    # Salva screenshot para análise
-                    salvar_screenshot_debug(driver, "debug_aviso_sem_ok_mensagem.png", "sem botão OK pós-login")
-                    if DEBUG_SCREENSHOTS_ENABLED:
-                        print(f"URL atual: {driver.current_url}")
-                        print("Continuando sem clicar no botão OK...")
-
-        print("Aguardando botão de entrar em comunica...")
-        try:
-            botao_entrar_comunica = wait.until(EC.element_to_be_clickable((By.ID, "pt1:itLinks:1:j_id__ctru33")))
-            print("Botão entrar comunica encontrado. Clicando...")
-            botao_entrar_comunica.click()
 
-            # Pausa final para garantir que a página principal carregou completamente
-            # antes de o robô prosseguir para a próxima parte da automação (tela de comunicas).
-            time.sleep(10)
 
-            salvar_screenshot_debug(driver, "debug_06_tela_comunicas.png", "tela de comunicas")
-            if DEBUG_SCREENSHOTS_ENABLED:
-                print(f"URL atual: {driver.current_url}")
+def entrar_em_comunicas(driver):
+    """Da página inicial para a tela de comunicas (caixa de entrada)."""
+    wait = WebDriverWait(driver, SIAFE_ESPERA_MAXIMA_S)
+
+    print("Aguardando botão de entrar em comunica...")
+    try:
+        botao_entrar_comunica = wait.until(EC.element_to_be_clickable((By.ID, "pt1:itLinks:1:j_id__ctru33")))
+        print("Botão entrar comunica encontrado. Clicando...")
+        botao_entrar_comunica.click()
+
+        # Garante que a página principal carregou completamente antes de o robô
+        # prosseguir para a próxima parte da automação (tela de comunicas).
+        aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+
+        salvar_screenshot_debug(driver, "debug_06_tela_comunicas.png", "tela de comunicas")
+        if DEBUG_SCREENSHOTS_ENABLED:
+            print(f"URL atual: {driver.current_url}")
+
+    except Exception as e:
+        print(f"ERRO ao localizar/clicar botão entrar comunica: {e}")
+        salvar_screenshot_debug(driver, "debug_erro_entrar_comunica.png", "erro ao entrar em comunicas")
+        if DEBUG_SCREENSHOTS_ENABLED:
+            print(f"URL atual: {driver.current_url}")
+        raise
+
+
+def aplicar_filtro_interativo(driver):
+    """Monta o filtro "Origem Remetente NÃO termina com <setor>" pelos widgets da tela."""
+    wait = WebDriverWait(driver, SIAFE_ESPERA_MAXIMA_S)
+
+    botao_de_filtro = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:sdtFilter::disAcr")))
+    botao_de_filtro.click()
+    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+    botao_de_propriedade = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:table_rtfFilter:0:cbx_col_sel_rtfFilter::content")))
+    botao_de_propriedade.click()
+    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+    # ESCOLHA DO ORIGEM REMETENTE >> Enviamos a letra "R" e a tecla "Enter" para o mesmo elemento que acabamos de clicar
+    botao_de_propriedade.send_keys("O" + Keys.ENTER)
+    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+    botao_de_negar = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:table_rtfFilter:0:chk_neg_rtfFilter::content")))
+    botao_de_negar.click()
+    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+    botao_de_operador = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:table_rtfFilter:0:cbx_op_sel_rtfFilter::content")))
+    botao_de_operador.click()
+    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+    # ESCOLHA DO TERMINA COM >> Enviamos a letra "T" e a tecla "Enter" para o mesmo elemento que acabamos de clicar
+    botao_de_operador.send_keys("T" + Keys.ENTER)
+    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+    campo_valor_filtro = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:table_rtfFilter:0:in_value_rtfFilter::content")))
+    campo_valor_filtro.send_keys(setor_excluir_pesquisa)
+    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+    campo_valor_filtro.send_keys(Keys.TAB)
+    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+
+
+def aplicar_filtro_de_setor(driver, registrar_log, salvar=True):
+    """
+    Filtro de exclusão do setor: tenta o filtro salvo (um único passo) e, se ele
+    não existir, falhar ou a lista continuar com comunicas do setor, recarrega a
+    tela e monta o filtro pelos widgets. Com `salvar`, grava o resultado para as
+    próximas execuções (só o navegador principal: os auxiliares do backend
+    paralelo rodam em threads e não podem escrever o arquivo ao mesmo tempo).
+    """
+    componentes = carregar_filtro(SIAFE_FILTRO_SALVO, setor_excluir_pesquisa) if SIAFE_FILTRO_SALVO else None
+    if componentes:
+        inicio = time.perf_counter()
+        try:
+            aplicar_filtro_salvo(driver, componentes, SIAFE_ESPERA_MAXIMA_S)
+            conferir_lista_filtrada(driver, seletor_preciso_comunica, setor_excluir_pesquisa, SIAFE_ESPERA_MAXIMA_S)
+            registrar_log(f"[FILTRO] Filtro salvo aplicado em {time.perf_counter() - inicio:.1f} s.")
+            return
+        except Exception as e:
+            registrar_log(f"[FILTRO] Filtro salvo falhou ({e}). Montando o filtro pela tela.")
+            # Estado do painel desconhecido: recomeça da página inicial
+            driver.get(SESSAO_SIAFE.url_inicial)
+            aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+            entrar_em_comunicas(driver)
+
+    inicio = time.perf_counter()
+    aplicar_filtro_interativo(driver)
+    registrar_log(f"[FILTRO] Filtro montado pela tela em {time.perf_counter() - inicio:.1f} s.")
 
+    if SIAFE_FILTRO_SALVO and salvar:
+        try:
+            componentes = capturar_filtro(driver)
+            if componentes:
+                salvar_filtro(SIAFE_FILTRO_SALVO, setor_excluir_pesquisa, componentes)
         except Exception as e:
-            print(f"ERRO ao localizar/clicar botão entrar comunica: {e}")
-            salvar_screenshot_debug(driver, "debug_erro_entrar_comunica.png", "erro ao entrar em comunicas")
-            if DEBUG_SCREENSHOTS_ENABLED:
-                print(f"URL atual: {driver.current_url}")
-            raise 
+            registrar_log(f"[FILTRO] Não foi possível salvar o filtro: {e}")
+
+
+def abrir_detalhe_e_voltar(driver, linha_do_comunica, numero_anterior=""):
+    """Abre o detalhe da linha, lê o Comunica e volta para a lista."""
+    wait = WebDriverWait(driver, SIAFE_ESPERA_MAXIMA_S)
+
+    # Clicamos na linha do comunica
+    linha_do_comunica.click()
+    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+
+    # O botão de visualizar continua o mesmo
+    botao_de_visualizar = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:btnView")))
+    botao_de_visualizar.click()
+
+    # EXTRAÇÃO DE DADOS: um único snapshot do detalhe (ID, assunto e corpo do
+    # iframe) lido localmente; repete só enquanto o ID exibido não muda
+    comunica = capturar_comunica(driver, numero_anterior, SIAFE_ESPERA_MAXIMA_S)
+
+    # Botão de "Sair" da visualização do Comunica
+    botao_de_sair_comunica = wait.until(EC.element_to_be_clickable((By.ID, "pt1:m1:btnVoltar")))
+    botao_de_sair_comunica.click()
+    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)  # a lista é reencontrada por quem chamou
+
+    return comunica
+
+
+# --- Navegadores auxiliares (SIAFE_BACKEND="paralelo"), um por thread do pool ---
+
+def abrir_navegador_auxiliar(cookies):
+    """Navegador com a sessão do principal, já na lista de comunicas filtrada."""
+    driver = SESSAO_SIAFE.abrir_navegador_adicional(cookies)
+    try:
+        entrar_em_comunicas(driver)
+        aplicar_filtro_de_setor(driver, print, salvar=False)
+    except Exception:
+        driver.quit()
+        raise
+    return {"driver": driver, "numero": ""}
+
+
+def ler_comunica_da_lista(contexto, chave):
+    """Comunica da chave, aberto no navegador auxiliar (LookupError se saiu da lista)."""
+    driver = contexto["driver"]
+    aguardar_contagem_estavel(driver, (By.CSS_SELECTOR, seletor_preciso_comunica), SIAFE_ESPERA_MAXIMA_S)
+    elemento = localizar_linha(driver, seletor_preciso_comunica, chave)
+    if elemento is None:
+        raise LookupError(f"comunica '{chave}' não está mais na lista")
+    comunica = abrir_detalhe_e_voltar(driver, elemento, contexto["numero"])
+    contexto["numero"] = comunica.numero
+    return comunica._replace(chave=chave)
+
+
+def fechar_navegador_auxiliar(contexto):
+    contexto["driver"].quit()
+
+
+@functools.lru_cache(maxsize=None)
+def _recursos():
+    """
+    Conexão SMTP, caixa de saída, fila de envio, registro e arquivo de comunicas,
+    criados na primeira execução e reaproveitados pelas seguintes (importar o
+    módulo, como fazem os benchmarks, não cria os bancos SQLite).
+    """
+    # Uma conexão SMTP autenticada por execução (STARTTLS e login uma vez só)
+    correio = CorreioSMTP(SMTP_HOST, SMTP_PORTA, EMAIL_REMETENTE, SENHA_REMETENTE, starttls=SMTP_STARTTLS,
+                          max_mensagens=SMTP_MAX_MENSAGENS)
+    # Envio dos e-mails de comunicas em segundo plano (a raspagem não espera o SMTP)
+    caixa_saida = CaixaDeSaida(SMTP_CAIXA_SAIDA_DB or ":memory:", max_tentativas=SMTP_MAX_TENTATIVAS)
+    return SimpleNamespace(
+        correio=correio,
+        caixa_saida=caixa_saida,
+        fila_correio=FilaCorreio(correio, SMTP_FILA_MAXIMA, caixa_saida=caixa_saida),
+        # Comunicas já tratados, consultados antes de abrir cada detalhe
+        estado_comunicas=EstadoComunicas(SIAFE_ESTADO_DB or ":memory:"),
+        # Histórico pesquisável dos comunicas (gravado em lote no fim de cada execução)
+        arquivo_comunicas=ArquivoComunicas(SIAFE_ARQUIVO_DB) if SIAFE_ARQUIVO_DB else None,
+    )
+
+# Navegador logado reaproveitado entre as execuções do agendador
+SESSAO_SIAFE = SessaoSiafe(criar_driver, entrar_no_siafe, SIAFE_ESPERA_MAXIMA_S, manter_aberta=SIAFE_MANTER_SESSAO,
+                           criar_driver_adicional=criar_driver_auxiliar)
+
+
+# ==============================================================================
+# AUTOMAÇÃO (FLUXO PRINCIPAL)
+# ==============================================================================
+
+def main():
+
+    """
+    Esta função contém todo o ciclo de automação, desde o login até o fim.
+    Será chamada pelo agendador nos horários programados.
+    """
+    recursos = _recursos()
+    correio, caixa_saida, fila_correio = recursos.correio, recursos.caixa_saida, recursos.fila_correio
+    estado_comunicas, arquivo_comunicas = recursos.estado_comunicas, recursos.arquivo_comunicas
+
+    # O LOG É CRIADO NO INÍCIO DE CADA EXECUÇÃO: cada evento já vira HTML ao ser registrado
+    log_execucao = LogExecucao()
+    # Tempo de regex por conceito nos comunicas amostrados (CLASSIFICACAO_AMOSTRAGEM; vai para o log final)
+    estatisticas_regex = EstatisticasConceitos()
+    # Tempo de cada classificação (regex combinada), para o log final
+    tempos_classificacao = []
+    # Comunicas encaminhados que vão juntos em e-mails de resumo (SMTP_MODO_ENVIO)
+    resumo = Resumo(SMTP_RESUMO_MAXIMO_KB * 1024)
+    
+    # Imprime e grava no log; quem sabe o tipo do evento passa `tipo` (e os campos)
+    registrar_log = log_execucao.registrar
+
+
+    #registrar_log(f"Automação realizada para {numero_de_comunicas_para_processar} comunica(s).")
+
+    driver = None
+    falhou = False
+
+    try:
+        # E-mails que não saíram em execuções anteriores voltam para a fila (enviados em segundo plano)
+        retomados = fila_correio.retomar_pendentes()
+        if retomados:
+            registrar_log(f"{retomados} e-mail(s) pendente(s) da caixa de saída reenfileirado(s).")
+        # Comunicas que estavam no resumo em aberto de uma execução interrompida voltam ao resumo
+        itens_interrompidos = caixa_saida.resumo_aberto()
+        for item in itens_interrompidos:
+            enfileirar_resumo(resumo.adicionar(
+                Comunica(item.numero, item.assunto, item.texto),
+                Decisao(True, item.categoria, item.conceito, item.trecho, item.motivo),
+                item.id,
+            ))
+        if itens_interrompidos:
+            registrar_log(f"{len(itens_interrompidos)} comunica(s) do resumo de uma execução interrompida retomado(s).")
+
+        # Navegador já logado: reaproveita a sessão da execução anterior quando ainda é válida
+        driver = SESSAO_SIAFE.obter(registrar_log)
+
+        entrar_em_comunicas(driver)
 
         # AÇÕES NA TELA DE COMUNICAS (FILTRO)
-        
-        botao_de_filtro = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:sdtFilter::disAcr")))
-        botao_de_filtro.click()
-        time.sleep(1)
-        botao_de_propriedade = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:table_rtfFilter:0:cbx_col_sel_rtfFilter::content")))
-        botao_de_propriedade.click()
-        time.sleep(4) 
-        # ESCOLHA DO ORIGEM REMETENTE >> Enviamos a letra "R" e a tecla "Enter" para o mesmo elemento que acabamos de clicar
-        botao_de_propriedade.send_keys("O" + Keys.ENTER)
-        time.sleep(4) 
-        botao_de_negar = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:table_rtfFilter:0:chk_neg_rtfFilter::content")))
-        botao_de_negar.click()
-        time.sleep(2) 
-        botao_de_operador = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:table_rtfFilter:0:cbx_op_sel_rtfFilter::content")))
-        botao_de_operador.click()
-        time.sleep(4) 
-        # ESCOLHA DO TERMINA COM >> Enviamos a letra "T" e a tecla "Enter" para o mesmo elemento que acabamos de clicar
-        botao_de_operador.send_keys("T" + Keys.ENTER)
-        time.sleep(4)
-        campo_valor_filtro = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:table_rtfFilter:0:in_value_rtfFilter::content")))
-        campo_valor_filtro.send_keys(setor_excluir_pesquisa)
-        time.sleep(4) 
-        campo_valor_filtro.send_keys(Keys.TAB)
-        time.sleep(20) 
+        aplicar_filtro_de_setor(driver, registrar_log)
 
         # --- LOOP DINÂMICO PARA PROCESSAR TODOS OS ITENS ATÉ A LISTA FICAR VAZIA ---
 
         # Inicializamos um contador para o log
         comunicas_processados_neste_ciclo = 0
-
-        while True:
-            registrar_log(f"\n--- Verificando a lista de comunicas... ---")
-            
-            # VERIFICAÇÃO: AINDA EXISTEM COMUNICAS NA LISTA?
-            
-            # >>> A MUDANÇA ESTÁ AQUI <<<
-            # Este seletor CSS é muito mais preciso. Ele procura por QUALQUER elemento que:
-            # 1. Comece com (id^=) 'pt1:binbox:messagesTableViewer:tabViewerDec:'
-            # 2. E termine com (id$=) ':j_id8'
-            seletor_preciso_comunica = "[id^='pt1:binbox:messagesTableViewer:tabViewerDec:'][id$=':j_id8']"
-            lista_de_comunicas = driver.find_elements(By.CSS_SELECTOR, seletor_preciso_comunica)
-            
-            # Se a lista que o Selenium encontrou estiver vazia, significa que não há mais itens.
-            if not lista_de_comunicas: # 'if not lista' é uma forma mais Pythonica de checar se a lista está vazia
-                registrar_log("[INFORMATIVO] Fim da lista detectado. Não há mais comunicas para processar.")
-                break # Interrompe o loop while True
-                
-            registrar_log(f"Encontrados {len(lista_de_comunicas)} comunica(s) na lista. Processando o primeiro...")
+        orcamento_classificacao_s = CLASSIFICACAO_ORCAMENTO_MS / 1000 if CLASSIFICACAO_ORCAMENTO_MS > 0 else None
+        # Remetente de cada chave lida na lista (o detalhe não mostra), para o arquivo
+        remetentes = {}
+
+        def comunicas_da_lista(ja_processados=()):
+            """(elemento, chave da linha) de cada comunica a abrir, conforme SIAFE_MODO_LISTA (chave "" se não lida)."""
+            if SIAFE_MODO_LISTA != "snapshot":
+                while True:
+                    registrar_log(f"\n--- Verificando a lista de comunicas... ---", tipo=LISTA)
+
+                    # VERIFICAÇÃO: AINDA EXISTEM COMUNICAS NA LISTA?
+                    # Espera a tabela (re)carregar: página ociosa e quantidade de linhas estável
+                    lista_de_comunicas = aguardar_contagem_estavel(
+                        driver, (By.CSS_SELECTOR, seletor_preciso_comunica), SIAFE_ESPERA_MAXIMA_S
+                    )
+
+                    # Se a lista que o Selenium encontrou estiver vazia, significa que não há mais itens.
+                    if not lista_de_comunicas:
+                        registrar_log("[INFORMATIVO] Fim da lista detectado. Não há mais comunicas para processar.", tipo=INFORMATIVO)
+                        return
+
+                    registrar_log(f"Encontrados {len(lista_de_comunicas)} comunica(s) na lista. Processando o primeiro...")
+                    # AÇÃO: PROCESSAR O PRIMEIRO ITEM DA LISTA
+                    yield lista_de_comunicas[0], ""
+
+            # Modo snapshot: lê todas as linhas de uma vez e abre cada uma pela chave,
+            # sem esperar a lista estabilizar entre um comunica e outro. Uma nova leitura
+            # só acontece quando as linhas lidas acabam (pega o que a tabela não tinha
+            # renderizado ou o que chegou durante o ciclo).
+            processados = set(ja_processados)
+            while True:
+                registrar_log(f"\n--- Verificando a lista de comunicas... (snapshot) ---", tipo=LISTA)
+                aguardar_contagem_estavel(driver, (By.CSS_SELECTOR, seletor_preciso_comunica), SIAFE_ESPERA_MAXIMA_S)
+                linhas = listar_comunicas(driver, seletor_preciso_comunica)
+                pendentes = [linha for linha in linhas if linha.chave not in processados]
+                # Já tratados em outra execução: não abre o detalhe de novo (só pela chave da
+                # linha, o corpo não é conferido; ver estado.py)
+                tratados = [linha for linha in pendentes if estado_comunicas.chave_processada(linha.chave)]
+                if tratados:
+                    registrar_log(f"[INFORMATIVO] {len(tratados)} comunica(s) já tratado(s) em execução anterior. Pulando.", tipo=INFORMATIVO)
+                    processados.update(linha.chave for linha in tratados)
+                    pendentes = [linha for linha in pendentes if linha.chave not in processados]
+                if not pendentes:
+                    registrar_log("[INFORMATIVO] Fim da lista detectado. Não há mais comunicas para processar.", tipo=INFORMATIVO)
+                    return
+
+                registrar_log(f"Encontrados {len(linhas)} comunica(s) na lista, {len(pendentes)} a processar.")
+                remetentes.update((linha.chave, linha.remetente) for linha in linhas)
+                for i, linha in enumerate(pendentes):
+                    processados.add(linha.chave)
+                    # A primeira linha ainda é o elemento lido; depois de voltar do detalhe a tabela foi redesenhada
+                    elemento = linha.elemento if i == 0 else localizar_linha(driver, seletor_preciso_comunica, linha.chave)
+                    if elemento is None:
+                        registrar_log(f"[INFORMATIVO] Comunica '{linha.chave}' não está mais na lista. Pulando.", tipo=INFORMATIVO)
+                        continue
+                    registrar_log(f"Processando '{linha.chave} - {linha.assunto}' (remetente: {linha.remetente or '-'})")
+                    yield elemento, linha.chave
+
+        def comunicas_pelo_navegador(ja_processados=()):
+            """Abre cada linha no Selenium e lê o detalhe (um Comunica por linha)."""
+            numero_anterior = ""
+            for linha_do_comunica, chave in comunicas_da_lista(ja_processados):
+                comunica = abrir_detalhe_e_voltar(driver, linha_do_comunica, numero_anterior)
+                numero_anterior = comunica.numero
+                yield comunica._replace(chave=chave)
+
+        def comunicas_em_paralelo():
+            """
+            Lê a lista no navegador principal e abre os detalhes nos navegadores
+            auxiliares; devolve as chaves lidas (as que falharam ficam para o principal),
+            ou None se a lista estava vazia.
+            """
+            registrar_log(f"\n--- Verificando a lista de comunicas... (paralelo) ---", tipo=LISTA)
+            aguardar_contagem_estavel(driver, (By.CSS_SELECTOR, seletor_preciso_comunica), SIAFE_ESPERA_MAXIMA_S)
+            linhas = listar_comunicas(driver, seletor_preciso_comunica)
+            if not linhas:
+                return None
+            # Só pela chave da linha, sem abrir o detalhe: corpo alterado não é conferido (ver estado.py)
+            chaves = [linha.chave for linha in linhas if not estado_comunicas.chave_processada(linha.chave)]
+            remetentes.update((linha.chave, linha.remetente) for linha in linhas)
+            if len(chaves) < len(linhas):
+                registrar_log(f"[INFORMATIVO] {len(linhas) - len(chaves)} comunica(s) já tratado(s) "
+                              "em execução anterior. Pulando.", tipo=INFORMATIVO)
+            registrar_log(f"Encontrados {len(linhas)} comunica(s) na lista. "
+                          f"Abrindo em até {SIAFE_NAVEGADORES} navegadores auxiliares...")
+
+            # Cookies lidos aqui: o driver principal não é usado pelas threads do pool
+            cookies = driver.get_cookies()
+            pool = PoolNavegadores(
+                abrir=lambda indice: abrir_navegador_auxiliar(cookies),
+                ler=ler_comunica_da_lista,
+                fechar=fechar_navegador_auxiliar,
+                tamanho=SIAFE_NAVEGADORES,
+                registrar_log=registrar_log,
+            )
+            lidos = set()
+            for resultado in pool.processar(chaves):
+                if resultado.erro is not None:
+                    registrar_log(f"[POOL] Comunica '{resultado.chave}' não lido ({resultado.erro}). "
+                                  "Fica para o navegador principal.")
+                    continue
+                lidos.add(resultado.chave)
+                yield resultado.comunica
+            return lidos
+
+        def comunicas_a_processar():
+            """Comunicas pelo backend configurado; se o HTTP ou o pool falhar, continua pelo navegador."""
+            ja_processados = set()
+            if SIAFE_BACKEND == "paralelo":
+                lidos = yield from comunicas_em_paralelo()
+                if lidos is not None:
+                    # A tabela do principal ficou desatualizada: recarrega para pegar o que
+                    # falhou nos auxiliares e o que chegou durante o ciclo
+                    # (no modo snapshot as chaves já lidas são puladas)
+                    ja_processados = lidos
+                    driver.get(SESSAO_SIAFE.url_inicial)
+                    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+                    entrar_em_comunicas(driver)
+                    aplicar_filtro_de_setor(driver, registrar_log)
+            if SIAFE_BACKEND == "http":
+                try:
+                    cliente = ComunicasHTTP.do_navegador(driver, carregar_gravacao(SIAFE_HTTP_GRAVACAO))
+                    registrar_log(f"\n--- Verificando a lista de comunicas... (HTTP) ---", tipo=LISTA)
+                    yield from cliente.comunicas(estado_comunicas.chave_processada)
+                    registrar_log(f"[INFORMATIVO] Fim da lista detectado ({cliente.requisicoes} requisições HTTP).", tipo=INFORMATIVO)
+                    return
+                except Exception as e:
+                    registrar_log(f"[HTTP] Leitura por HTTP falhou ({e}). Continuando pelo navegador.")
+                    # As requisições HTTP avançaram o estado da página no servidor: recomeça a tela
+                    driver.get(SESSAO_SIAFE.url_inicial)
+                    aguardar_adf_ocioso(driver, SIAFE_ESPERA_MAXIMA_S)
+                    entrar_em_comunicas(driver)
+                    aplicar_filtro_de_setor(driver, registrar_log)
+            yield from comunicas_pelo_navegador(ja_processados)
+
+        for comunica in comunicas_a_processar():
             comunicas_processados_neste_ciclo += 1
-            
-            # AÇÃO: PROCESSAR O PRIMEIRO ITEM DA LISTA
-            
-            # Clicamos no primeiro elemento da lista que acabamos de encontrar
-            primeiro_comunica_da_lista = lista_de_comunicas[0]
-            primeiro_comunica_da_lista.click()
-            time.sleep(4)
-            
-            # O botão de visualizar continua o mesmo
-            botao_de_visualizar = wait.until(EC.element_to_be_clickable((By.ID, "pt1:binbox:messagesTableViewer:btnView")))
-            botao_de_visualizar.click()
-            time.sleep(30)
-            
-            # EXTRAÇÃO DE DADOS (Lógica permanece a mesma)
-
-            # COPIAR O NUMERO DO COMUNICA
-            elemento_id = wait.until(EC.visibility_of_element_located((By.ID, "pt1:m1:itxIdentificador::content")))
-            numero_comunica_copiado = elemento_id.text.strip()
-
-            # COPIAR O ASSUNTO DO COMUNICA
-            assunto_comunica = wait.until(EC.visibility_of_element_located((By.ID, "pt1:m1:txtSubject::content")))
-            assunto_comunica_copiado = assunto_comunica.text.strip()
-            
-            # COPIAR O TEXTO DO COMUNICA (IFRAME)
-            wait.until(EC.frame_to_be_available_and_switch_to_it(2))
-            corpo_do_iframe = wait.until(EC.visibility_of_element_located((By.TAG_NAME, "body")))
-            comunica_recebido = corpo_do_iframe.text.strip()
-            driver.switch_to.default_content()
+            numero_comunica_copiado = comunica.numero
+            assunto_comunica_copiado = comunica.assunto
+            comunica_recebido = comunica.texto
 
             # NORMALIZAÇÃO DO TEXTO (remove acentos + minúsculas)
             comunica_normalizado = normalizar(comunica_recebido)
 
-            # Botão de "Sair" da visualização do Comunica
-            botao_de_sair_comunica = wait.until(EC.element_to_be_clickable((By.ID, "pt1:m1:btnVoltar")))
-            botao_de_sair_comunica.click()
-            time.sleep(20) # Tempo para a lista principal recarregar
-            
-            registrar_log(f"--- Análise do Comunica ID '{numero_comunica_copiado} - {assunto_comunica_copiado}' ---")
+            registrar_log(f"--- Análise do Comunica ID '{numero_comunica_copiado} - {assunto_comunica_copiado}' ---",
+                          tipo=COMUNICA, numero=numero_comunica_copiado, assunto=assunto_comunica_copiado)
+
+            if comunica.chave and comunica.chave != numero_comunica_copiado:
+                registrar_log(f"[INFORMATIVO] Chave da linha da lista '{comunica.chave}' difere do número "
+                              "do detalhe; o registro guarda as duas.", tipo=INFORMATIVO)
+
+            # Mesmo número e mesmo corpo já tratados (modo "recarregar" abre o detalhe antes de saber)
+            if estado_comunicas.ja_processado(numero_comunica_copiado, comunica_recebido):
+                registrar_log("[INFORMATIVO] Comunica já tratado em execução anterior. Pulando.", tipo=INFORMATIVO)
+                continue
 
 
             
@@ -809,89 +798,42 @@ def main():
             # INÍCIO DA NOVA LÓGICA DE DECISÃO HIERÁRQUICA
             # #######################################################################
 
-            email_deve_ser_enviado = False
-            motivo_da_decisao = ""
-
-            # ETAPA A: Verificação de Prioridade (Envio Obrigatório)
-            # Usa texto normalizado para busca mais robusta
-            encontrou_prioritaria = False
-            conceito_prioritario = ""
-            trecho_prioritario = ""
-            
-            # A1: Verificar dicionário de prioridades com REGEX
-            for conceito, padrao in DICIONARIO_DE_ENVIO_PRIORITARIO.items():
-                match = re.search(padrao, comunica_normalizado, flags=re.IGNORECASE|re.DOTALL)
-                if match:
-                    encontrou_prioritaria = True
-                    conceito_prioritario = conceito
-                    trecho_prioritario = match.group(0)
-                    motivo_da_decisao = f"[ENVIO PRIORITÁRIO] {conceito_prioritario} detectado (trecho: \"{trecho_prioritario}\")."
-                    break
-            
-            # A2: Se não encontrou no dicionário, verifica a lista simples (compatibilidade)
-            if not encontrou_prioritaria:
-                for palavra in PALAVRAS_DE_ENVIO_OBRIGATORIO:
-                    palavra_normalizada = normalizar(palavra)
-                    padrao = r'\b' + re.escape(palavra_normalizada) + r'\b'
-                    if re.search(padrao, comunica_normalizado, re.IGNORECASE):
-                        encontrou_prioritaria = True
-                        motivo_da_decisao = f"[ENVIO PRIORITÁRIO] Palavra-chave '{palavra}' encontrada."
-                        break
-
-            if encontrou_prioritaria:
-                email_deve_ser_enviado = True
-
-            else:
-                # ETAPA B: Verificação de Bloqueio com REGEX melhoradas (Só se não for prioritário)
-                # Texto normalizado para as buscas de bloqueio
-                texto = comunica_normalizado
-                
-                encontrou_bloqueio = False
-                conceito_encontrado = ""
-                trecho_casado = ""
-
-                # Itera sobre o dicionário de padrões de regex
-                for conceito, padrao in DICIONARIO_DE_BLOQUEIO_REGEX.items():
-                    match = re.search(padrao, texto, flags=re.IGNORECASE|re.DOTALL)
-                    if match:
-                        encontrou_bloqueio = True
-                        conceito_encontrado = conceito
-                        trecho_casado = match.group(0)
-                        break
-
-                if encontrou_bloqueio:
-                    email_deve_ser_enviado = False
-                    motivo_da_decisao = f"[BLOQUEADO] Assunto impeditivo: '{conceito_encontrado}' (trecho: \"{trecho_casado}\")."
-
-
-                else:
-                    # ETAPA C: Caso Padrão (Nenhuma palavra especial encontrada)
-                    email_deve_ser_enviado = True
-                    motivo_da_decisao = "[ENVIO DE EMAIL PARA ANALISE] Nenhuma palavra impeditiva encontrada."
+            # Um único objeto (Classifier) com todos os conceitos pré-compilados:
+            # ETAPA A (prioridade) -> ETAPA B (bloqueio) -> ETAPA C (padrão)
+            # Amostra: o 1º comunica do ciclo e depois 1 a cada CLASSIFICACAO_AMOSTRAGEM
+            amostrado = (CLASSIFICACAO_AMOSTRAGEM > 0
+                         and (comunicas_processados_neste_ciclo - 1) % CLASSIFICACAO_AMOSTRAGEM == 0)
+            inicio_classificacao = time.perf_counter()
+            decisao = classificar(comunica_normalizado, orcamento_classificacao_s,
+                                  estatisticas_regex if amostrado else None)
+            tempos_classificacao.append(time.perf_counter() - inicio_classificacao)
+            email_deve_ser_enviado = decisao.enviar
+            motivo_da_decisao = decisao.motivo
 
             # BLOCO DE AÇÃO FINAL (Toma a ação baseada na decisão)
-            registrar_log(motivo_da_decisao)
-
-            if email_deve_ser_enviado:
-                registrar_log("################# E-mail do Comunica enviado ######################")
-                comunica_formatado = comunica_recebido.replace('\n', '<br>')
-                corpo_email_comunica = f"""
-                <p>Prezados,</p>
-                <p>Segue abaixo o comunica ({numero_comunica_copiado} - {assunto_comunica_copiado}) extraído da automação:</p>
-                <div style="border: 1px solid #ccc; padding: 10px; font-family: monospace; background-color: #f9f9f9;">
-                    {comunica_formatado}
-                </div>
-                <p>---</p>
-                <p>Este é um e-mail automático.</p>
-                """
-                enviar_email(
+            registrar_log(motivo_da_decisao, tipo=DECISAO, categoria=decisao.categoria)
+
+            if email_deve_ser_enviado and not envio_imediato(SMTP_MODO_ENVIO, decisao):
+                registrar_log("################# Comunica incluído no resumo ######################")
+                # Gravado na caixa de saída antes de o comunica ser marcado como tratado
+                id_item = caixa_saida.guardar_no_resumo(comunica, decisao)
+                enfileirar_resumo(resumo.adicionar(comunica, decisao, id_item))
+            elif email_deve_ser_enviado:
+                registrar_log("################# E-mail do Comunica enfileirado ######################")
+                enfileirar_email(
                     destinatarios=DESTINATARIOS,
                     assunto=f'Comunica ({numero_comunica_copiado} - {assunto_comunica_copiado}) Processado Automaticamente - {time.strftime("%d/%m/%Y")}',
-                    corpo_html=corpo_email_comunica
+                    corpo_html=corpo_comunica(comunica),
+                    texto=texto_comunica(comunica)
                 )
             else:
                 registrar_log("################# E-mail Não enviado ######################")
-                continue
+
+            # Só depois da ação: uma queda antes do e-mail faz o comunica ser tratado de novo
+            estado_comunicas.registrar(comunica, decisao)
+            if arquivo_comunicas is not None:
+                arquivo_comunicas.adicionar(comunica, decisao, comunica_normalizado,
+                                            comunica.remetente or remetentes.get(comunica.chave or comunica.numero, ""))
 
 
 
@@ -899,10 +841,11 @@ def main():
 
     # Bloco de exceção e finalização permanecem os mesmos
     except Exception as e:
+        falhou = True
         print(f"Ocorreu um erro durante a automação: {e}")
         # dispara e-mail SOMENTE em caso de erro
         try:
-            enviar_alerta_falha(e, log_da_execucao, driver)
+            enviar_alerta_falha(e, log_execucao, driver)
         finally:
             # opcional: re-lançar para manter código de saída e logs de erro
             raise
@@ -911,12 +854,15 @@ def main():
 
     finally:
         registrar_log("\n--- Finalizando ciclo ---")
-        if driver:
+        # Fecha o navegador só em caso de falha (ou com SIAFE_MANTER_SESSAO desligado)
+        SESSAO_SIAFE.liberar(falhou, registrar_log)
+
+        # Comunicas da execução gravados no arquivo em uma única transação
+        if arquivo_comunicas is not None:
             try:
-                driver.quit()
-                registrar_log("Navegador fechado.")
+                registrar_log(f"{arquivo_comunicas.gravar()} comunica(s) gravado(s) no arquivo local.")
             except Exception as e:
-                registrar_log(f"Erro ao fechar navegador: {e}")
+                registrar_log(f"Erro ao gravar o arquivo local de comunicas: {e}")
         
         # ==============================================================================
         # ENVIO DO LOG FINAL (APÓS O FIM DO LOOP)
@@ -924,29 +870,53 @@ def main():
 
         registrar_log("\n--- Fim do processamento de todos os comunicas ---")
 
-        # --- AQUI ESTÁ A MUDANÇA: Usamos a nova função para formatar o log ---
-        log_final_formatado_html = formatar_log_para_html(log_da_execucao)
-
-        # --- O corpo do e-mail agora usa um estilo mais limpo ---
-        corpo_email_log = f"""
-        <div style="font-family: Arial, sans-serif; line-height: 1.6;">
-            <h3>Log de Processamento do Robô</h3>
-            <p>Análise só com Palavras Chave</p>
-            <p>Execução finalizada em: {time.strftime("%d/%m/%Y às %H:%M:%S")}</p>
-            <hr>
-            <div style="border: 1px solid #ddd; padding: 15px; border-radius: 5px; background-color: #f9f9f9;">
-                {log_final_formatado_html}
-            </div>
-            <hr>
-            <p>Este é um e-mail de resumo automático.</p>
-        </div>
-        """
+        # Última parte do resumo (os comunicas que não saíram em e-mail próprio)
+        enfileirar_resumo(resumo.fechar())
+        if resumo.comunicas:
+            registrar_log(f"{resumo.comunicas} comunica(s) em {resumo.partes} e-mail(s) de resumo.")
+
+        # E-mails de comunicas ainda na fila saem antes do log final (que vai no resumo);
+        # os que falharam são tentados de novo enquanto a espera vencer dentro do prazo
+        reenviados = fila_correio.drenar(SMTP_DRENAR_S)
+        if reenviados:
+            registrar_log(f"{reenviados} e-mail(s) que falharam nesta execução tentado(s) de novo.")
+        envio = fila_correio.encerrar()
+        if envio["enviados"] or envio["falhas"]:
+            registrar_log(f"E-mails de comunicas: {envio['enviados']} enviado(s), {len(envio['falhas'])} falha(s); "
+                          f"latência p50 {envio['latencia_p50_s']*1000:.0f} ms, máx. {envio['latencia_max_s']*1000:.0f} ms; "
+                          f"fila máx. {envio['profundidade_maxima']}, espera máx. {envio['espera_max_s']:.1f} s")
+        for assunto, erro in envio["falhas"]:
+            registrar_log(f"Falha no envio de '{assunto}': {erro}")
+        for assunto in envio["mortas"]:
+            registrar_log(f"[ATENÇÃO] E-mail '{assunto}' desistido após {SMTP_MAX_TENTATIVAS} tentativas "
+                          f"(python caixa_saida.py reativar).")
+        aguardando, mortas = caixa_saida.contagem()
+        if aguardando or mortas:
+            registrar_log(f"Caixa de saída: {aguardando} e-mail(s) para a próxima tentativa, {mortas} morto(s).")
+
+        if tempos_classificacao:
+            registrar_log(f"Classificação: {len(tempos_classificacao)} comunica(s), "
+                          f"máx. {max(tempos_classificacao)*1000:.1f} ms, total {sum(tempos_classificacao)*1000:.1f} ms")
+        # Conceitos de regex mais lentos nos comunicas amostrados (ajuda a achar regex com backtracking)
+        for conceito, chamadas, total_s, maximo_s in estatisticas_regex.mais_lentos(3):
+            registrar_log(f"Regex '{conceito}': {chamadas} busca(s), máx. {maximo_s*1000:.1f} ms, total {total_s*1000:.1f} ms")
+
+        # Log já renderizado em HTML durante a execução
+        log_final_formatado_html = log_execucao.html()
+
+        corpo_email_log = corpo_log(log_final_formatado_html, time.strftime("%d/%m/%Y às %H:%M:%S"))
 
         enviar_email(
             destinatarios=DESTINATARIOS, 
             assunto=f'Log da Automação de Comunicas às {time.strftime("%d/%m/%Y %H:%M:%S")}', 
             corpo_html=corpo_email_log
         )
+        log_execucao.fechar()
+
+        # Fim da execução: QUIT na conexão SMTP (a próxima execução abre outra)
+        correio.fechar()
+        print(f"[SMTP] {correio.mensagens} e-mail(s) em {correio.conexoes} conexão(ões), "
+              f"{correio.tempo_conectando_s:.1f} s conectando.")
 
 
 
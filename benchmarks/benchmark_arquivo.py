@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark do armazenamento dos corpos no arquivo local (arquivo.py): espaço em
+disco e velocidade de leitura de cada codec, com e sem dicionário treinado.
+
+O corpus é sintético (cabeçalhos, assinaturas e respostas citadas que se
+repetem, como nos comunicas reais, e uma parte de duplicados) ou um corpus
+gravado (--corpus, mesmo formato do classificacao_offline.py).
+
+Para cada configuração mede:
+  - gravação: tempo para arquivar o corpus inteiro (uma transação);
+  - espaço: bytes dos corpos brutos x guardados (+ dicionário) e tamanho do .db;
+  - leitura: varredura completa (comunicas(), o caminho do backtest) em docs/s e
+    MB/s, e mostrar um comunica pelo número (p50/p99);
+  - referência: normalizar() + classificar() do mesmo corpus, para ver se a
+    descompressão pesa no backtest (coluna "leitura/classif.").
+
+Uso:
+    python benchmarks/benchmark_arquivo.py [--documentos 3000] [--json saida.json]
+    python benchmarks/benchmark_arquivo.py --corpus historico.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import arquivo  # noqa: E402
+from classificacao_offline import ler_comunicas  # noqa: E402
+from classificador import CLASSIFICADOR, Decisao, normalizar  # noqa: E402
+from siafe import Comunica  # noqa: E402
+
+CABECALHOS = (
+    "GOVERNO DO ESTADO DO RIO DE JANEIRO\nSECRETARIA DE ESTADO DE FAZENDA\n"
+    "SUBSECRETARIA DE FINANÇAS\nSUPERINTENDÊNCIA DE CONTABILIDADE GERAL\n",
+    "GOVERNO DO ESTADO DO RIO DE JANEIRO\nSECRETARIA DE ESTADO DE FAZENDA\n"
+    "SUPERINTENDÊNCIA DE GESTÃO DE CONTAS\nCOORDENAÇÃO DE SISTEMAS\n",
+    "Prezados,\n",
+)
+ASSINATURAS = tuple(
+    f"\nAtenciosamente,\n\n{nome}\n{cargo}\nSecretaria de Estado de Fazenda - SEFAZ/RJ\n"
+    f"Av. Presidente Vargas, 670 - Centro - Rio de Janeiro/RJ\nTel.: (21) 2334-{4000 + i:04d}\n"
+    "Antes de imprimir, pense em sua responsabilidade e compromisso com o MEIO AMBIENTE.\n"
+    for i, (nome, cargo) in enumerate(
+        (n, c) for n in ("Ana Souza", "Bruno Lima", "Carla Dias", "Diego Alves", "Elaine Rocha", "Fábio Nunes")
+        for c in ("Analista de Finanças Públicas", "Coordenador de Contabilidade", "Assessora Técnica")
+    )
+)
+PALAVRAS = (
+    "solicitamos encaminhamos informamos conforme processo nota empenho liquidação pagamento credor "
+    "unidade gestora exercício fonte recurso programa trabalho dados bancários inscrição genérica "
+    "prazo fechamento mês urgente alteração cadastro usuário perfil acesso sistema SIAFE-Rio "
+    "orçamentária financeira contábil despesa receita documento anexo análise providências"
+).split()
+
+
+def corpus_sintetico(documentos, semente=0, proporcao_duplicados=0.1):
+    rnd = random.Random(semente)
+    corpus = []
+    for i in range(documentos):
+        if corpus and rnd.random() < proporcao_duplicados:
+            corpus.append({**rnd.choice(corpus), "id": f"2024/{i:05d}"})  # mesmo corpo, outro número
+            continue
+        paragrafos = [" ".join(rnd.choice(PALAVRAS) for _ in range(rnd.randint(20, 80))).capitalize() + "."
+                      for _ in range(rnd.randint(1, 4))]
+        texto = rnd.choice(CABECALHOS) + "\n".join(paragrafos) + rnd.choice(ASSINATURAS)
+        if corpus and rnd.random() < 0.3:  # resposta com a mensagem anterior citada
+            citado = rnd.choice(corpus)["texto"]
+            texto += "\n-----Mensagem original-----\n" + "\n".join("> " + linha for linha in citado.splitlines())
+        corpus.append({"id": f"2024/{i:05d}", "assunto": " ".join(rnd.sample(PALAVRAS, 4)), "texto": texto})
+    return corpus
+
+
+def configuracoes():
+    """(nome, codec, com dicionário) de cada configuração disponível."""
+    lista = [("nenhum", "nenhum", False), ("zlib", "zlib", False), ("zlib+dicionário", "zlib", True)]
+    if arquivo.zstandard is not None:
+        lista += [("zstd", "zstd", False), ("zstd+dicionário", "zstd", True)]
+    return lista
+
+
+def percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def medir(corpus, codec, dicionario, pasta, consultas=300):
+    caminho = Path(pasta) / f"{codec}_{int(dicionario)}.db"
+    decisao = Decisao(False, "padrao", "", "", "")
+    arq = arquivo.ArquivoComunicas(caminho, codec=codec, dicionario=False)
+
+    inicio = time.perf_counter()
+    if dicionario:
+        # Dicionário treinado com a primeira parte do corpus (o histórico), usado no resto
+        corte = min(len(corpus), arquivo.AMOSTRAS_MAXIMAS_DICIONARIO) // 2
+        for c in corpus[:corte]:
+            arq.adicionar(Comunica(c["id"], c["assunto"], c["texto"]), decisao)
+        arq.gravar()
+        arq.treinar_dicionario(recomprimir=True)
+        arq.usar_dicionario = True
+        restantes = corpus[corte:]
+    else:
+        restantes = corpus
+    for c in restantes:
+        arq.adicionar(Comunica(c["id"], c["assunto"], c["texto"]), decisao)
+    arq.gravar()
+    gravacao_s = time.perf_counter() - inicio
+    arq.conexao.execute("VACUUM")
+    estatisticas = arq.estatisticas()
+
+    inicio = time.perf_counter()
+    lidos = sum(len(c["texto"]) for c in arq.comunicas())
+    leitura_s = time.perf_counter() - inicio
+
+    rnd = random.Random(1)
+    tempos = []
+    for c in rnd.sample(corpus, min(consultas, len(corpus))):
+        inicio = time.perf_counter()
+        arq.por_numero(c["id"])
+        tempos.append(time.perf_counter() - inicio)
+    tempos.sort()
+    arq.fechar()
+
+    megabytes = estatisticas["bytes_brutos"] / 1e6
+    guardado = estatisticas["bytes_guardados"] + estatisticas["bytes_dicionarios"]
+    return {
+        "gravacao_s": gravacao_s,
+        "bytes_brutos": estatisticas["bytes_brutos"],
+        "bytes_guardados": guardado,
+        "razao": estatisticas["bytes_brutos"] / guardado if guardado else 0.0,
+        "tamanho_db": caminho.stat().st_size,
+        "leitura_docs_s": len(corpus) / leitura_s if leitura_s else 0.0,
+        "leitura_mb_s": megabytes / leitura_s if leitura_s else 0.0,
+        "leitura_s": leitura_s,
+        "caracteres_lidos": lidos,
+        "mostrar_p50_us": percentil(tempos, 50) * 1e6,
+        "mostrar_p99_us": percentil(tempos, 99) * 1e6,
+    }
+
+
+def tempo_classificacao(corpus):
+    inicio = time.perf_counter()
+    for c in corpus:
+        CLASSIFICADOR.classificar(normalizar(c["texto"]))
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", nargs="+", help="comunicas gravados no lugar do corpus sintético")
+    parser.add_argument("--documentos", type=int, default=3000)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--json", help="grava os resultados em JSON")
+    args = parser.parse_args()
+
+    corpus = list(ler_comunicas(args.corpus)) if args.corpus else corpus_sintetico(args.documentos, args.semente)
+    classificacao_s = tempo_classificacao(corpus)
+
+    resultado = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "documentos": len(corpus),
+        "classificacao_s": classificacao_s,
+        "configuracoes": {},
+    }
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, codec, dicionario in configuracoes():
+            resultado["configuracoes"][nome] = medir(corpus, codec, dicionario, pasta)
+
+    print(f"{len(corpus)} comunicas; normalizar + classificar: {len(corpus) / classificacao_s:.0f} docs/s\n")
+    print(f"{'configuração':<17} {'bruto KB':>9} {'guardado KB':>12} {'razão':>6} {'.db KB':>8} "
+          f"{'grava (s)':>10} {'lê docs/s':>10} {'lê MB/s':>8} {'mostrar p50/p99 (us)':>21} {'leitura/classif.':>17}")
+    for nome, r in resultado["configuracoes"].items():
+        print(f"{nome:<17} {r['bytes_brutos'] / 1024:>9.0f} {r['bytes_guardados'] / 1024:>12.0f} "
+              f"{r['razao']:>5.1f}x {r['tamanho_db'] / 1024:>8.0f} {r['gravacao_s']:>10.2f} "
+              f"{r['leitura_docs_s']:>10.0f} {r['leitura_mb_s']:>8.1f} "
+              f"{r['mostrar_p50_us']:>10.0f}/{r['mostrar_p99_us']:<10.0f} "
+              f"{r['leitura_s'] / classificacao_s:>16.0%}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo_json:
+            json.dump(resultado, arquivo_json, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
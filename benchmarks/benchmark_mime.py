@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark da montagem dos e-mails (mensagens.py): tempo para montar a
+mensagem e tamanho final codificado, para corpos de vários tamanhos.
+
+Compara quatro formas de montar o mesmo corpo HTML:
+  - legado:       email.message.Message com o HTML em ISO-8859-1 (como era);
+                  falha com caracteres fora do Latin-1;
+  - stdlib:       EmailMessage UTF-8 só com HTML, codificação escolhida pela
+                  heurística do set_content (olha só as 10 primeiras linhas);
+  - mensagens:    montar_mensagem() (HTML + texto puro tirado do HTML,
+                  codificação de cada parte escolhida pelo tamanho);
+  - +texto:       o mesmo, com o texto puro do modelo COMUNICA_TEXTO (como o
+                  main() monta o e-mail de cada comunica).
+E o preenchimento do modelo do comunica (Modelo.preencher x str.format).
+
+Uso:
+    python benchmarks/benchmark_mime.py [--repeticoes 20] [--json saida.json]
+"""
+
+import argparse
+import email.message
+import html
+import json
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from email.message import EmailMessage
+from email.policy import SMTP
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mensagens  # noqa: E402
+from siafe import Comunica  # noqa: E402
+
+PALAVRAS = (
+    "solicitamos encaminhamos informamos conforme processo nota empenho liquidação pagamento credor "
+    "unidade gestora exercício fonte recurso programa trabalho dados bancários inscrição genérica "
+    "prazo fechamento mês urgente alteração cadastro usuário perfil acesso sistema SIAFE-Rio "
+    "orçamentária financeira contábil despesa receita documento anexo análise providências"
+).split()
+EXTRAS = ("“", "”", "–", "🙂", "📎")
+
+TAMANHOS_KB = (2, 20, 200, 1000)
+
+
+def texto_de(tamanho, semente, extras):
+    rnd = random.Random(semente)
+    linhas, total = [], 0
+    while total < tamanho:
+        linha = " ".join(rnd.choice(PALAVRAS) for _ in range(rnd.randint(8, 20))).capitalize() + "."
+        if extras and rnd.random() < 0.3:
+            linha += " " + rnd.choice(EXTRAS)
+        linhas.append(linha)
+        total += len(linha.encode("utf-8")) + 1
+    return "\n".join(linhas)
+
+
+def legado(corpo_html):
+    msg = email.message.Message()
+    msg["Subject"] = "Comunica"
+    msg["From"] = "robo@sefaz"
+    msg["To"] = "a@sefaz"
+    msg.add_header("Content-Type", "text/html")
+    msg.set_payload(corpo_html, "iso-8859-1")
+    return msg.as_string().encode("iso-8859-1")
+
+
+def stdlib(corpo_html):
+    msg = EmailMessage(policy=SMTP)
+    msg["Subject"] = "Comunica"
+    msg["From"] = "robo@sefaz"
+    msg["To"] = "a@sefaz"
+    msg.set_content(corpo_html, subtype="html")
+    return msg.as_bytes()
+
+
+def novo(corpo_html, texto=None):
+    return mensagens.montar_mensagem("robo@sefaz", ["a@sefaz"], "Comunica", corpo_html, texto).as_bytes()
+
+
+FORMAS = ("legado", "stdlib", "mensagens", "+texto")
+
+MODELO_FORMAT = mensagens.COMUNICA.partes and "".join(
+    literal + ("{" + campo + "}" if campo is not None else "") for literal, campo in mensagens.COMUNICA.partes)
+
+
+def medir(funcao, repeticoes):
+    try:
+        saida = funcao()
+    except UnicodeEncodeError:
+        return None
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {"ms": statistics.median(tempos) * 1000, "bytes": len(saida)}
+
+
+def codificacoes(saida):
+    lida = email.message_from_bytes(saida)
+    partes = lida.get_payload() if lida.is_multipart() else [lida]
+    return "+".join(p.get("Content-Transfer-Encoding", "7bit") for p in partes)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    parser.add_argument("--json", help="grava os resultados em JSON")
+    args = parser.parse_args()
+
+    resultado = {"data": datetime.now().isoformat(timespec="seconds"), "corpos": []}
+    print(f"{'corpo':<18} {'HTML KB':>8}  " + "  ".join(f"{nome + ' ms | KB':>20}" for nome in FORMAS)
+          + f"  {'codificação (mensagens)':>24}")
+    for extras in (False, True):
+        for tamanho_kb in TAMANHOS_KB:
+            texto = texto_de(tamanho_kb * 1024, tamanho_kb, extras)
+            comunica = Comunica("2024/00001", "Análise do processo", texto)
+            corpo_html = mensagens.corpo_comunica(comunica)
+            repeticoes = max(3, args.repeticoes * 20 // (tamanho_kb + 20))
+            texto_puro = mensagens.texto_comunica(comunica)
+            funcoes = (lambda: legado(corpo_html), lambda: stdlib(corpo_html), lambda: novo(corpo_html),
+                       lambda: novo(corpo_html, texto_puro))
+            medidas = {nome: medir(funcao, repeticoes) for nome, funcao in zip(FORMAS, funcoes)}
+            nome_corpo = f"{tamanho_kb} KB {'UTF-8' if extras else 'Latin-1'}"
+            bytes_html = len(corpo_html.encode("utf-8"))
+            celulas = [f"{'falha (não Latin-1)':>20}" if m is None else f"{m['ms']:>8.2f} | {m['bytes'] / 1024:>8.1f}"
+                       for m in medidas.values()]
+            print(f"{nome_corpo:<18} {bytes_html / 1024:>8.1f}  " + "  ".join(celulas)
+                  + f"  {codificacoes(novo(corpo_html)):>24}")
+            resultado["corpos"].append({"corpo": nome_corpo, "bytes_html": bytes_html, "medidas": medidas})
+
+    comunica = Comunica("2024/00001", "Análise do processo", texto_de(20 * 1024, 0, True))
+    texto_html = mensagens.texto_em_html(comunica.texto)
+    tempos = {}
+    for nome, funcao in (
+        ("Modelo.preencher", lambda: mensagens.COMUNICA.preencher(numero=comunica.numero, assunto=comunica.assunto,
+                                                                  texto_html=texto_html)),
+        ("str.format", lambda: MODELO_FORMAT.format(numero=html.escape(comunica.numero),
+                                                    assunto=html.escape(comunica.assunto), texto_html=texto_html)),
+    ):
+        inicio = time.perf_counter()
+        for _ in range(2000):
+            funcao()
+        tempos[nome] = (time.perf_counter() - inicio) / 2000 * 1e6
+    print("\nModelo do comunica (20 KB): " + ", ".join(f"{nome} {us:.1f} us" for nome, us in tempos.items()))
+    resultado["modelo_us"] = tempos
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo_json:
+            json.dump(resultado, arquivo_json, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Compara os perfis do navegador (perfil_navegador.py): tempo de carregamento de
+cada página e memória residente do navegador, com a mesma fábrica (drivers.py) do robô.
+
+Para cada perfil abre um navegador, carrega as URLs (--url, padrão a tela de
+login do SIAFE) --repeticoes vezes e mede:
+  - DOM pronto e load (ms, Navigation Timing) da primeira carga (cache frio)
+    e a mediana das seguintes (cache quente);
+  - recursos baixados e bytes transferidos;
+  - RSS (MB) do driver + navegador + processos filhos depois das cargas.
+
+Só mede páginas abertas sem login; o restante do fluxo depende da sessão.
+
+Uso:
+    python benchmarks/benchmark_navegador.py [--perfis completo enxuto] [--url URL ...] [--json saida.json]
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import automacao_por_palavra  # noqa: E402
+from drivers import ConfiguracaoDriver, FabricaDrivers  # noqa: E402
+from perfil_navegador import PERFIS, rss_do_navegador_mb, tempo_de_carregamento  # noqa: E402
+from siafe import aguardar_adf_ocioso  # noqa: E402
+
+
+def medir_perfil(perfil, urls, repeticoes, limite_s):
+    fabrica = FabricaDrivers(ConfiguracaoDriver(perfil=perfil,
+                                                diretorio_cache=automacao_por_palavra.SIAFE_DIRETORIO_CACHE))
+    inicio = time.perf_counter()
+    driver = fabrica.criar()
+    abertura_s = time.perf_counter() - inicio
+    paginas = {}
+    try:
+        for url in urls:
+            cargas = []
+            for _ in range(repeticoes):
+                driver.get(url)
+                aguardar_adf_ocioso(driver, limite_s)
+                cargas.append(tempo_de_carregamento(driver) or {})
+            seguintes = cargas[1:] or cargas
+            paginas[url] = {
+                "frio_dom_ms": cargas[0].get("dom_pronto", 0),
+                "frio_load_ms": cargas[0].get("carregada", 0),
+                "quente_dom_ms": statistics.median(c.get("dom_pronto", 0) for c in seguintes),
+                "quente_load_ms": statistics.median(c.get("carregada", 0) for c in seguintes),
+                "recursos": cargas[0].get("recursos", 0),
+                "bytes": cargas[0].get("bytes", 0),
+            }
+        rss_mb = rss_do_navegador_mb(driver)
+    finally:
+        driver.quit()
+    return {"abertura_s": abertura_s, "rss_mb": rss_mb, "paginas": paginas}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--perfis", nargs="+", choices=PERFIS, default=["completo", "enxuto"])
+    parser.add_argument("--url", nargs="+", default=[automacao_por_palavra.url_do_siafe])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--limite-s", type=float, default=automacao_por_palavra.SIAFE_ESPERA_MAXIMA_S)
+    parser.add_argument("--json", help="grava os resultados em JSON")
+    args = parser.parse_args()
+
+    resultado = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "perfis": {perfil: medir_perfil(perfil, args.url, max(1, args.repeticoes), args.limite_s)
+                   for perfil in args.perfis},
+    }
+
+    print(f"\n{'perfil':<10} {'página':<45} {'DOM frio':>9} {'load frio':>10} {'DOM quente':>11} "
+          f"{'load quente':>12} {'recursos':>9} {'KB':>8}")
+    for perfil, r in resultado["perfis"].items():
+        for url, p in r["paginas"].items():
+            print(f"{perfil:<10} {url[-45:]:<45} {p['frio_dom_ms']:>9.0f} {p['frio_load_ms']:>10.0f} "
+                  f"{p['quente_dom_ms']:>11.0f} {p['quente_load_ms']:>12.0f} {p['recursos']:>9} "
+                  f"{p['bytes'] / 1024:>8.0f}")
+    print(f"\n{'perfil':<10} {'abertura (s)':>13} {'RSS (MB)':>10}")
+    for perfil, r in resultado["perfis"].items():
+        print(f"{perfil:<10} {r['abertura_s']:>13.1f} {r['rss_mb']:>10.0f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark da normalizar(): implementação original (NFD + unicodedata.category
+por caractere) contra os caminhos rápidos (ASCII, tabela latina, cache).
+
+Uso:
+    python benchmarks/benchmark_normalizar.py [--repeticoes 200]
+"""
+
+import argparse
+import sys
+import timeit
+import unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classificador import normalizar, normalizar_com_cache  # noqa: E402
+
+
+def normalizar_original(txt: str) -> str:
+    txt = unicodedata.normalize("NFD", txt)
+    txt = "".join(ch for ch in txt if unicodedata.category(ch) != "Mn")
+    return txt.lower()
+
+
+PARAGRAFO_LATINO = (
+    "Prezados, solicitamos a alteração da razão social e a atualização dos dados "
+    "cadastrais do credor, conforme informações anexas. Após a conclusão, favor "
+    "confirmar a inclusão no SIAFE-Rio. Atenciosamente, Coordenação de Gestão. "
+)
+
+TEXTOS = {
+    "ascii (~20 KB)": normalizar_original(PARAGRAFO_LATINO) * 100,
+    "latino (~20 KB)": PARAGRAFO_LATINO * 100,
+    "exotico (~20 KB)": (PARAGRAFO_LATINO + "“Ok” 🛑 ") * 100,
+}
+
+
+def medir(funcao, texto, repeticoes):
+    return min(timeit.repeat(lambda: funcao(texto), number=repeticoes, repeat=5)) / repeticoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'texto':<18} {'original':>12} {'rápida':>12} {'cache':>12} {'ganho':>8}")
+    for nome, texto in TEXTOS.items():
+        assert normalizar(texto) == normalizar_original(texto), nome
+        t_original = medir(normalizar_original, texto, args.repeticoes)
+        t_rapida = medir(normalizar, texto, args.repeticoes)
+        t_cache = medir(normalizar_com_cache, texto, args.repeticoes)
+        print(f"{nome:<18} {t_original*1e6:>10.1f}us {t_rapida*1e6:>10.1f}us "
+              f"{t_cache*1e6:>10.1f}us {t_original / t_rapida:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark das regras de classificação com os dicionários REAIS de
+automacao_por_palavra, sobre um corpus sintético (tamanho e comprimento
+configuráveis) ou um corpus gravado de comunicas (.jsonl/.csv/.txt, mesmo
+formato do comando `classify`).
+
+Mede separadamente:
+  - normalização: normalizar() do corpo bruto (docs/s, MB/s);
+  - classificação: classificar() do texto já normalizado (docs/s, MB/s);
+  - conceitos: p50/p99 de re.search de cada conceito em todos os documentos
+    (sem a parada no primeiro casamento, para que regras novas ou mais lentas
+    apareçam mesmo quando um conceito de maior prioridade casa antes).
+
+Os resultados vão para um JSON (--json) que pode ser comparado com o de outro
+commit (--comparar); a saída é 1 quando alguma métrica piora além de --tolerancia.
+
+Uso:
+    python benchmarks/benchmark_regex.py [--documentos 2000] [--palavras 150] [--json atual.json]
+    python benchmarks/benchmark_regex.py --corpus arquivo/ --comparar anterior.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from automacao_por_palavra import (  # noqa: E402
+    DICIONARIO_DE_BLOQUEIO_REGEX,
+    DICIONARIO_DE_ENVIO_PRIORITARIO,
+    PALAVRAS_DE_ENVIO_OBRIGATORIO,
+)
+from classificacao_offline import ler_comunicas  # noqa: E402
+from classificador import FLAGS_PADRAO, Classifier, EstatisticasConceitos, normalizar  # noqa: E402
+
+# Texto comum de comunica, sem termos das regras (o caso mais frequente)
+PALAVRAS_NEUTRAS = (
+    "prezados encaminhamos para conhecimento a nota técnica referente ao pagamento de despesas "
+    "do exercício corrente conforme orientação da coordenação solicitamos atenção aos prazos "
+    "informamos que o processo administrativo será analisado pela unidade gestora responsável "
+    "atenciosamente secretaria estado fazenda órgão execução orçamentária financeira contábil"
+).split()
+
+# Trechos que disparam (ou quase disparam) as regras
+TRECHOS_DAS_REGRAS = (
+    "solicito inscrição genérica para o credor", "alterar código de barras do boleto",
+    "programa de trabalho foi cadastrado no sistema", "cadastrar o programa de trabalho",
+    "preciso de acesso ao SIAFE-Rio", "senha do SIAFERIO bloqueada", "bloqueio judicial",
+    "alteração dos dados bancários", "URGENTE para hoje", "fechamento do mês",
+    "reativação de perfil de usuário", "FlexVision fora do ar", "desconsiderar o pedido",
+    "detalhamento de fonte", "alteração de razão social", "LISCONTIR",
+)
+
+
+def corpus_sintetico(documentos, palavras, proporcao_regras=0.3, semente=0):
+    """Comunicas com acentos (custo real da normalização); parte deles com trechos das regras."""
+    rnd = random.Random(semente)
+    corpus = []
+    for _ in range(documentos):
+        texto = [rnd.choice(PALAVRAS_NEUTRAS) for _ in range(palavras)]
+        if rnd.random() < proporcao_regras:
+            texto.insert(rnd.randrange(len(texto) + 1), rnd.choice(TRECHOS_DAS_REGRAS))
+        corpus.append(" ".join(texto).capitalize() + ".")
+    return corpus
+
+
+def regex_por_conceito():
+    """{conceito: regex compilada} na ordem de avaliação do fluxo principal."""
+    regex = {c: re.compile(p, FLAGS_PADRAO) for c, p in DICIONARIO_DE_ENVIO_PRIORITARIO.items()}
+    for palavra in PALAVRAS_DE_ENVIO_OBRIGATORIO:
+        regex[palavra] = re.compile(r"\b" + re.escape(normalizar(palavra)) + r"\b", re.IGNORECASE)
+    regex.update({c: re.compile(p, FLAGS_PADRAO) for c, p in DICIONARIO_DE_BLOQUEIO_REGEX.items()})
+    return regex
+
+
+def percentil(ordenados, p):
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def melhor_tempo(funcao, textos, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for texto in textos:
+            funcao(texto)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def vazao(segundos, textos):
+    megabytes = sum(len(t.encode("utf-8")) for t in textos) / 1e6
+    return {
+        "segundos": segundos,
+        "docs_s": len(textos) / segundos if segundos else 0.0,
+        "mb_s": megabytes / segundos if segundos else 0.0,
+    }
+
+
+def commit_atual():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True, cwd=Path(__file__).resolve().parent).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def executar(brutos, repeticoes):
+    normalizados = [normalizar(t) for t in brutos]
+    classificador = Classifier(DICIONARIO_DE_ENVIO_PRIORITARIO, DICIONARIO_DE_BLOQUEIO_REGEX,
+                               PALAVRAS_DE_ENVIO_OBRIGATORIO)
+
+    estatisticas = EstatisticasConceitos(guardar_amostras=True)
+    for conceito, regex in regex_por_conceito().items():
+        for texto in normalizados:
+            inicio = time.perf_counter()
+            regex.search(texto)
+            estatisticas.registrar(conceito, time.perf_counter() - inicio)
+
+    conceitos = {}
+    for conceito, amostras in estatisticas.amostras.items():
+        ordenados = sorted(amostras)
+        conceitos[conceito] = {
+            "p50_us": percentil(ordenados, 50) * 1e6,
+            "p99_us": percentil(ordenados, 99) * 1e6,
+            "max_us": ordenados[-1] * 1e6,
+        }
+
+    return {
+        "normalizacao": vazao(melhor_tempo(normalizar, brutos, repeticoes), brutos),
+        "classificacao": vazao(melhor_tempo(classificador.classificar, normalizados, repeticoes), normalizados),
+        "conceitos": conceitos,
+    }
+
+
+def comparar(atual, anterior, tolerancia):
+    """Lista de regressões (texto) entre dois resultados."""
+    regressoes = []
+    for etapa in ("normalizacao", "classificacao"):
+        antes, agora = anterior[etapa]["docs_s"], atual[etapa]["docs_s"]
+        if agora < antes * (1 - tolerancia):
+            regressoes.append(f"{etapa}: {antes:.0f} -> {agora:.0f} docs/s")
+    for conceito, agora in atual["conceitos"].items():
+        antes = anterior["conceitos"].get(conceito)
+        if antes and agora["p99_us"] > antes["p99_us"] * (1 + tolerancia):
+            regressoes.append(f"{conceito}: p99 {antes['p99_us']:.1f} -> {agora['p99_us']:.1f} us")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", nargs="+", help="comunicas gravados no lugar do corpus sintético")
+    parser.add_argument("--documentos", type=int, default=2000)
+    parser.add_argument("--palavras", type=int, default=150, help="palavras por documento sintético")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--json", help="grava os resultados em JSON")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora relativa aceita (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    if args.corpus:
+        brutos = [c["texto"] for c in ler_comunicas(args.corpus)]
+    else:
+        brutos = corpus_sintetico(args.documentos, args.palavras, semente=args.semente)
+
+    resultado = {
+        "commit": commit_atual(),
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "corpus": {
+            "origem": args.corpus or "sintetico",
+            "documentos": len(brutos),
+            "palavras": None if args.corpus else args.palavras,
+            "semente": None if args.corpus else args.semente,
+        },
+        **executar(brutos, args.repeticoes),
+    }
+
+    for etapa in ("normalizacao", "classificacao"):
+        r = resultado[etapa]
+        print(f"{etapa:<14} {r['docs_s']:>10.0f} docs/s {r['mb_s']:>8.2f} MB/s")
+    print(f"\n{'conceito':<30} {'p50 (us)':>10} {'p99 (us)':>10} {'máx (us)':>10}")
+    for conceito, r in sorted(resultado["conceitos"].items(), key=lambda item: item[1]["p99_us"], reverse=True):
+        print(f"{conceito:<30} {r['p50_us']:>10.1f} {r['p99_us']:>10.1f} {r['max_us']:>10.1f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+        regressoes = comparar(resultado, anterior, args.tolerancia)
+        print(f"\nComparação com {anterior.get('commit') or args.comparar}: "
+              f"{'sem regressões' if not regressoes else f'{len(regressoes)} regressão(ões)'}")
+        for linha in regressoes:
+            print(f"  ⚠️ {linha}")
+        if regressoes:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
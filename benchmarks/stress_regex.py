@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Estresse das regex de DICIONARIO_DE_BLOQUEIO_REGEX e DICIONARIO_DE_ENVIO_PRIORITARIO
+com textos normalizados adversariais (repetições de âncoras que quase casam,
+corredores longos de espaços/palavras, lixo aleatório com termos das regras).
+
+Para cada conceito mostra o pior tempo de re.search, o gerador que o causou e o
+crescimento entre o menor e o maior tamanho medido (muito acima da razão de
+tamanhos indica backtracking super-linear). Os tamanhos maiores de um gerador
+são pulados quando a medição atual, projetada como quadrática para o próximo
+tamanho, passaria de --limite-s (para o script não travar).
+
+Uso:
+    python benchmarks/stress_regex.py [--tamanhos 1000 4000 16000] [--json saida.json]
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classificador import (  # noqa: E402
+    CLASSIFICADOR,
+    DICIONARIO_DE_BLOQUEIO_REGEX,
+    DICIONARIO_DE_ENVIO_PRIORITARIO,
+    FLAGS_PADRAO,
+)
+
+# Palavras que aparecem nas regras, para montar quase-casamentos
+TERMOS = (
+    "programa de trabalho foi esta sera no sistema o a os as de do da cadastro cadastrar "
+    "alteracao alterar atualizacao inclusao liberacao inativacao acesso acessos senha senhas "
+    "siafe siaf siaferio siafe-rio siafem rio gestor gestora perfil usuario credor credores "
+    "generico inscricao bloqueio judicial banco agencia conta corrente dados bancarios "
+    "codigo barras urgente prioritario sistema fora ar erro falha fechamento fim mes "
+    "relatorio demonstrativo detalhamento fonte reativacao desbloqueio"
+).split()
+
+
+def _repetir(trecho, tamanho):
+    return (trecho * (tamanho // max(len(trecho), 1) + 1))[:tamanho]
+
+
+def geradores(tamanho, semente=0):
+    """{nome: texto} com os padrões adversariais para um tamanho de texto."""
+    rnd = random.Random(semente)
+    ancoras = sorted({a for conjunto in CLASSIFICADOR.ancoras_por_conceito().values() if conjunto for a in conjunto})
+    return {
+        # objeto de 'Programa de Trabalho' seguido de muitas palavras e nenhum verbo
+        "programa + palavras": _repetir("programa de trabalho foi " + "palavra " * 8, tamanho),
+        # 'acesso'/'senha' seguidos de 25+ caracteres sem siafe (corredor .{0,25})
+        "acesso sem siafe": _repetir("acesso senha " + "x" * 20 + " ", tamanho),
+        # verbos sem objeto ('Dados Bancarios' / 'Programa de Trabalho')
+        "verbos sem objeto": _repetir("alteracao cadastro atualizacao inclusao liberacao de ", tamanho),
+        # verbo, corredor de espaços e nenhum objeto logo depois (quantificadores de espaço sobrepostos)
+        "espacos longos": "cadastrar" + " " * (tamanho - 20) + "x programa",
+        "palavra longa": "a" * tamanho,
+        "siafe quebrado": _repetir("siaf- - - -e- - -", tamanho),
+        "ancoras aleatorias": " ".join(rnd.choice(ancoras) for _ in range(tamanho // 6))[:tamanho],
+        "termos aleatorios": " ".join(rnd.choice(TERMOS) for _ in range(tamanho // 6))[:tamanho],
+    }
+
+
+def medir(regex, texto, repeticoes):
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        regex.search(texto)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1_000, 4_000, 16_000])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--limite-s", type=float, default=1.0,
+                        help="tempo projetado que interrompe o crescimento do texto")
+    parser.add_argument("--json", help="grava os resultados em JSON")
+    args = parser.parse_args()
+
+    tamanhos = sorted(args.tamanhos)
+    textos = {tamanho: geradores(tamanho) for tamanho in tamanhos}
+    conceitos = {**DICIONARIO_DE_ENVIO_PRIORITARIO, **DICIONARIO_DE_BLOQUEIO_REGEX}
+
+    resultados = []
+    for conceito, padrao in conceitos.items():
+        regex = re.compile(padrao, FLAGS_PADRAO)
+        pior = None
+        for nome in textos[tamanhos[0]]:
+            tempos = []
+            for i, tamanho in enumerate(tamanhos):
+                tempo = medir(regex, textos[tamanho][nome], args.repeticoes)
+                tempos.append((tamanho, tempo))
+                if i + 1 < len(tamanhos) and tempo * (tamanhos[i + 1] / tamanho) ** 2 > args.limite_s:
+                    break
+            (menor_tamanho, menor), (tamanho, tempo) = tempos[0], tempos[-1]
+            if pior is None or tempo * 1000 > pior["pior_ms"]:
+                pior = {
+                    "conceito": conceito,
+                    "pior_ms": tempo * 1000,
+                    "gerador": nome,
+                    "tamanho": tamanho,
+                    "crescimento": tempo / menor if menor else 0.0,
+                    "razao_tamanhos": tamanho / menor_tamanho,
+                }
+        resultados.append(pior)
+
+    resultados.sort(key=lambda r: r["pior_ms"], reverse=True)
+    print(f"{'conceito':<30} {'pior (ms)':>10} {'crescimento':>12}  gerador (tamanho)")
+    for r in resultados:
+        super_linear = r["razao_tamanhos"] > 1 and r["crescimento"] > r["razao_tamanhos"] * 3
+        print(f"{r['conceito']:<30} {r['pior_ms']:>10.2f} {r['crescimento']:>11.0f}x  "
+              f"{r['gerador']} ({r['tamanho']}){'  ⚠️ super-linear' if super_linear else ''}")
+    print(f"\n(crescimento linear ≈ razão entre os tamanhos medidos; {tamanhos[0]} a {tamanhos[-1]} caracteres)")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as arquivo:
+            json.dump({"tamanhos": tamanhos, "resultados": resultados}, arquivo, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Caixa de saída persistente (SQLite) dos e-mails de comunicas.
+
+Antes, um erro no envio (limite do Gmail, TLS lento, rede fora) só virava uma
+linha no log: o comunica já estava marcado como tratado e o e-mail se perdia,
+e recuperar exigia voltar ao SIAFE. Agora a mensagem montada é gravada aqui
+antes do envio e só sai da caixa quando o servidor aceita:
+  - falhou, volta a ser tentada depois de uma espera exponencial com jitter
+    (ESPERA_BASE_S, dobrando a cada tentativa até ESPERA_MAXIMA_S; metade fixa,
+    metade aleatória, para várias mensagens não voltarem todas juntas);
+  - depois de `max_tentativas` falhas, vai para a lista de mortas e fica à
+    espera de uma reativação manual (comando `reativar`).
+No início de cada execução o main() põe na fila de envio as mensagens cuja
+espera já passou (de execuções anteriores ou que caíram no meio do envio); no
+fim, antes de encerrar a fila, reenvia por um prazo limitado as que vencem
+nesse prazo (FilaCorreio.drenar), para uma falha passageira não esperar a
+execução seguinte.
+
+Os comunicas que vão no resumo (resumo.py) também são gravados aqui, um a um,
+na hora em que entram na parte em aberto (tabela resumo_aberto); saem dela na
+mesma transação que grava o e-mail da parte. Se o processo morrer com a parte
+ainda aberta, a execução seguinte os devolve ao resumo.
+
+Uso:
+    python caixa_saida.py listar [--mortas]
+    python caixa_saida.py reativar [ID ...]      # sem IDs: todas as mortas
+"""
+
+import argparse
+import random
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+CAIXA_SAIDA_PADRAO = "caixa_saida.db"
+
+MAX_TENTATIVAS = 6
+ESPERA_BASE_S = 60
+ESPERA_MAXIMA_S = 3600
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS mensagens (
+    id                INTEGER PRIMARY KEY,
+    remetente         TEXT NOT NULL,
+    destinatarios     TEXT NOT NULL,
+    descricao         TEXT NOT NULL,
+    mensagem          BLOB NOT NULL,
+    tentativas        INTEGER NOT NULL DEFAULT 0,
+    proxima_tentativa REAL NOT NULL,
+    ultimo_erro       TEXT NOT NULL DEFAULT '',
+    morta             INTEGER NOT NULL DEFAULT 0,
+    criada_em         TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS mensagens_pendentes ON mensagens (morta, proxima_tentativa);
+CREATE TABLE IF NOT EXISTS resumo_aberto (
+    id        INTEGER PRIMARY KEY,
+    numero    TEXT NOT NULL,
+    assunto   TEXT NOT NULL,
+    texto     TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    conceito  TEXT NOT NULL,
+    trecho    TEXT NOT NULL,
+    motivo    TEXT NOT NULL,
+    criado_em TEXT NOT NULL
+);
+"""
+
+
+class Mensagem(NamedTuple):
+    id: int
+    remetente: str
+    destinatarios: list
+    descricao: str
+    mensagem: bytes
+    tentativas: int
+    ultimo_erro: str
+
+
+class ItemResumo(NamedTuple):
+    """Comunica de uma parte de resumo ainda não fechada (campos do Comunica e da Decisao)."""
+    id: int
+    numero: str
+    assunto: str
+    texto: str
+    categoria: str
+    conceito: str
+    trecho: str
+    motivo: str
+
+
+def espera_da_tentativa(tentativas, base_s=ESPERA_BASE_S, maxima_s=ESPERA_MAXIMA_S, aleatorio=random.random):
+    """Espera até a próxima tentativa depois de `tentativas` falhas (exponencial, metade com jitter)."""
+    espera = min(maxima_s, base_s * 2 ** max(0, tentativas - 1))
+    return espera / 2 + espera / 2 * aleatorio()
+
+
+class CaixaDeSaida:
+    """
+    Mensagens aguardando envio. `caminho` ":memory:" vale só para o processo.
+
+    A conexão é compartilhada com a thread da fila de envio (check_same_thread
+    desligado); leituras e escritas passam por uma trava.
+    """
+
+    def __init__(self, caminho, max_tentativas=MAX_TENTATIVAS, espera_base_s=ESPERA_BASE_S,
+                 espera_maxima_s=ESPERA_MAXIMA_S, relogio=time.time, aleatorio=random.random):
+        self.caminho = str(caminho)
+        self.max_tentativas = max(1, max_tentativas)
+        self.espera_base_s = espera_base_s
+        self.espera_maxima_s = espera_maxima_s
+        self.relogio = relogio
+        self.aleatorio = aleatorio
+        self._trava = threading.Lock()
+        self.conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.executescript(ESQUEMA)
+        self.conexao.commit()
+
+    def guardar(self, remetente, destinatarios, mensagem, descricao="", itens_resumo=()):
+        """
+        Grava a mensagem antes do envio; devolve o id usado em concluir()/falhou().
+        `itens_resumo`: ids de resumo_aberto que a mensagem leva (saem na mesma transação).
+        """
+        if isinstance(mensagem, str):
+            mensagem = mensagem.encode("utf-8")
+        with self._trava, self.conexao:
+            cursor = self.conexao.execute(
+                "INSERT INTO mensagens (remetente, destinatarios, descricao, mensagem, proxima_tentativa, criada_em) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (remetente, ";".join(destinatarios), descricao, mensagem, self.relogio(),
+                 datetime.now().isoformat(timespec="seconds")),
+            )
+            self.conexao.executemany("DELETE FROM resumo_aberto WHERE id = ?", [(i,) for i in itens_resumo])
+        return cursor.lastrowid
+
+    def guardar_no_resumo(self, comunica, decisao):
+        """Grava o comunica que entrou na parte de resumo em aberto; devolve o id do item."""
+        with self._trava, self.conexao:
+            cursor = self.conexao.execute(
+                "INSERT INTO resumo_aberto (numero, assunto, texto, categoria, conceito, trecho, motivo, criado_em) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (comunica.numero, comunica.assunto, comunica.texto, decisao.categoria, decisao.conceito,
+                 decisao.trecho, decisao.motivo, datetime.now().isoformat(timespec="seconds")),
+            )
+        return cursor.lastrowid
+
+    def resumo_aberto(self):
+        """Itens de resumo ainda sem e-mail (de uma execução interrompida), na ordem em que entraram."""
+        with self._trava:
+            linhas = self.conexao.execute(
+                "SELECT id, numero, assunto, texto, categoria, conceito, trecho, motivo FROM resumo_aberto ORDER BY id"
+            ).fetchall()
+        return [ItemResumo(*linha) for linha in linhas]
+
+    def pendentes(self):
+        """Mensagens vivas cuja espera já passou, da mais antiga para a mais nova."""
+        return self._mensagens("WHERE morta = 0 AND proxima_tentativa <= ? ORDER BY id", (self.relogio(),))
+
+    def proxima_tentativa(self):
+        """Hora (no relógio da caixa) da próxima tentativa entre as vivas, ou None se não há nenhuma."""
+        with self._trava:
+            return self.conexao.execute(
+                "SELECT MIN(proxima_tentativa) FROM mensagens WHERE morta = 0").fetchone()[0]
+
+    def vivas(self):
+        """Todas as mensagens ainda não enviadas nem mortas (inclusive as em espera)."""
+        return self._mensagens("WHERE morta = 0 ORDER BY id")
+
+    def mortas(self):
+        return self._mensagens("WHERE morta = 1 ORDER BY id")
+
+    def concluir(self, id_mensagem):
+        """Servidor aceitou: a mensagem sai da caixa."""
+        with self._trava:
+            self.conexao.execute("DELETE FROM mensagens WHERE id = ?", (id_mensagem,))
+            self.conexao.commit()
+
+    def falhou(self, id_mensagem, erro):
+        """Conta a falha e agenda a próxima tentativa; devolve True se a mensagem foi para as mortas."""
+        with self._trava:
+            linha = self.conexao.execute("SELECT tentativas FROM mensagens WHERE id = ?", (id_mensagem,)).fetchone()
+            if linha is None:
+                return False
+            tentativas = linha[0] + 1
+            morta = tentativas >= self.max_tentativas
+            espera = espera_da_tentativa(tentativas, self.espera_base_s, self.espera_maxima_s, self.aleatorio)
+            self.conexao.execute(
+                "UPDATE mensagens SET tentativas = ?, proxima_tentativa = ?, ultimo_erro = ?, morta = ? WHERE id = ?",
+                (tentativas, self.relogio() + espera, str(erro), int(morta), id_mensagem),
+            )
+            self.conexao.commit()
+        return morta
+
+    def reativar(self, ids=None):
+        """Devolve mortas (todas, ou só `ids`) à fila com as tentativas zeradas; devolve quantas."""
+        filtro, parametros = "WHERE morta = 1", [self.relogio()]
+        if ids:
+            filtro += f" AND id IN ({','.join('?' * len(ids))})"
+            parametros += list(ids)
+        with self._trava:
+            cursor = self.conexao.execute(
+                f"UPDATE mensagens SET morta = 0, tentativas = 0, proxima_tentativa = ? {filtro}", parametros)
+            self.conexao.commit()
+        return cursor.rowcount
+
+    def contagem(self):
+        """(vivas, mortas) na caixa."""
+        with self._trava:
+            return self.conexao.execute(
+                "SELECT COALESCE(SUM(morta = 0), 0), COALESCE(SUM(morta = 1), 0) FROM mensagens").fetchone()
+
+    def fechar(self):
+        self.conexao.close()
+
+    def _mensagens(self, filtro, parametros=()):
+        with self._trava:
+            linhas = self.conexao.execute(
+                "SELECT id, remetente, destinatarios, descricao, mensagem, tentativas, ultimo_erro "
+                f"FROM mensagens {filtro}", parametros
+            ).fetchall()
+        return [Mensagem(l[0], l[1], l[2].split(";"), l[3], l[4], l[5], l[6]) for l in linhas]
+
+# ==============================================================================
+# LINHA DE COMANDO
+# ==============================================================================
+
+def comando_listar(args, caixa):
+    mensagens = caixa.mortas() if args.mortas else caixa.vivas()
+    for m in mensagens:
+        print(f"{m.id:>5}  {m.tentativas} tentativa(s)  {m.descricao}"
+              f"{f'  [{m.ultimo_erro}]' if m.ultimo_erro else ''}")
+    vivas, mortas = caixa.contagem()
+    print(f"{vivas} aguardando envio, {mortas} morta(s).", file=sys.stderr)
+    return 0
+
+
+def comando_reativar(args, caixa):
+    print(f"{caixa.reativar(args.ids)} mensagem(ns) reativada(s); saem na próxima execução.", file=sys.stderr)
+    return 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Consulta à caixa de saída de e-mails.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    parser.add_argument("--db", default=CAIXA_SAIDA_PADRAO, help=f"arquivo SQLite (padrão: {CAIXA_SAIDA_PADRAO})")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    listar = subcomandos.add_parser("listar", help="mensagens aguardando envio")
+    listar.add_argument("--mortas", action="store_true", help="só as que esgotaram as tentativas")
+    listar.set_defaults(funcao=comando_listar)
+
+    reativar = subcomandos.add_parser("reativar", help="devolve mensagens mortas à fila de envio")
+    reativar.add_argument("ids", nargs="*", type=int)
+    reativar.set_defaults(funcao=comando_reativar)
+
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    if not Path(args.db).exists():
+        print(f"Caixa de saída {args.db} não encontrada.", file=sys.stderr)
+        return 1
+    caixa = CaixaDeSaida(args.db)
+    try:
+        return args.funcao(args, caixa)
+    finally:
+        caixa.fechar()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
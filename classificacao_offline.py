@@ -0,0 +1,369 @@
+"""
+Classificação offline (em lote) de comunicas arquivados, sem Selenium.
+
+Passa cada comunica pela MESMA decisão do robô (normalizar() + classificar():
+prioridade -> bloqueio -> padrão) e grava uma linha de resultado por comunica.
+Serve para testar uma mudança de regex contra o histórico antes de subir.
+
+Entradas aceitas (arquivos ou diretórios, lidos em streaming):
+  - .jsonl : um objeto por linha  -> {"id": ..., "assunto": ..., "texto": ...}
+  - .csv   : colunas id, assunto, texto (com cabeçalho)
+  - .txt   : um comunica por arquivo (id = nome do arquivo)
+  - diretório: todos os arquivos acima, recursivamente, em ordem alfabética
+
+Backtest: classifica o mesmo corpus com duas versões das regras (atual x
+candidata) e relata, agrupado por conceito, os comunicas cuja decisão muda.
+As regras vêm de um módulo/arquivo .py que define DICIONARIO_DE_ENVIO_PRIORITARIO
+e DICIONARIO_DE_BLOQUEIO_REGEX (PALAVRAS_DE_ENVIO_OBRIGATORIO e ANCORAS_MANUAIS
+são opcionais), ex.: uma cópia editada de classificador.py.
+
+Uso:
+    python classificacao_offline.py classify historico.jsonl -o decisoes.jsonl
+    python classificacao_offline.py classify arquivo/ --processos 8 --lote 500
+    python classificacao_offline.py backtest arquivo/ --candidato regras_novas.py -o mudancas.jsonl
+"""
+
+import argparse
+import csv
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from classificador import normalizar_com_cache, Classifier, CLASSIFICADOR
+
+# Nomes de campo aceitos na entrada (o primeiro que existir é usado)
+CAMPOS_ID = ("id", "numero", "numero_comunica")
+CAMPOS_ASSUNTO = ("assunto", "subject")
+CAMPOS_TEXTO = ("texto", "corpo", "comunica", "body")
+
+CAMPOS_SAIDA = ("id", "assunto", "decisao", "enviar", "conceito", "trecho", "motivo")
+
+EXTENSOES_ENTRADA = {".jsonl", ".csv", ".txt"}
+
+# Exemplos de IDs listados por conceito no relatório do backtest
+EXEMPLOS_POR_CONCEITO = 5
+
+# Lotes em voo por processo: limita a memória (só isso fica em fila de cada vez)
+LOTES_POR_PROCESSO = 2
+
+
+# ==============================================================================
+# LEITURA (STREAMING)
+# ==============================================================================
+
+def _campo(registro, nomes, padrao=""):
+    for nome in nomes:
+        valor = registro.get(nome)
+        if valor is not None:
+            return str(valor)
+    return padrao
+
+
+def _comunica(registro, id_padrao):
+    return {
+        "id": _campo(registro, CAMPOS_ID, id_padrao),
+        "assunto": _campo(registro, CAMPOS_ASSUNTO),
+        "texto": _campo(registro, CAMPOS_TEXTO),
+    }
+
+
+def _ler_arquivo(caminho):
+    sufixo = caminho.suffix.lower()
+    if sufixo == ".txt":
+        yield {"id": caminho.stem, "assunto": "", "texto": caminho.read_text(encoding="utf-8", errors="replace")}
+    elif sufixo == ".jsonl":
+        with open(caminho, encoding="utf-8") as arquivo:
+            for n, linha in enumerate(arquivo, 1):
+                if linha.strip():
+                    yield _comunica(json.loads(linha), f"{caminho.name}:{n}")
+    elif sufixo == ".csv":
+        with open(caminho, encoding="utf-8", newline="") as arquivo:
+            for n, registro in enumerate(csv.DictReader(arquivo), 1):
+                yield _comunica(registro, f"{caminho.name}:{n}")
+    else:
+        raise ValueError(f"Formato não suportado: {caminho}")
+
+
+def ler_comunicas(caminhos):
+    """Gera {'id', 'assunto', 'texto'} de cada comunica, sem carregar tudo em memória."""
+    csv.field_size_limit(min(sys.maxsize, 2**31 - 1))  # corpos grandes em uma célula (C long de 32 bits no Windows)
+    for caminho in map(Path, caminhos):
+        if caminho.is_dir():
+            for arquivo in sorted(caminho.rglob("*")):
+                if arquivo.is_file() and arquivo.suffix.lower() in EXTENSOES_ENTRADA:
+                    yield from _ler_arquivo(arquivo)
+        else:
+            yield from _ler_arquivo(caminho)
+
+
+# ==============================================================================
+# CLASSIFICAÇÃO
+# ==============================================================================
+
+def classificar_comunica(comunica, classificador=CLASSIFICADOR):
+    """Mesma decisão do main(): normaliza o corpo e aplica o classificador."""
+    decisao = classificador.classificar(normalizar_com_cache(comunica["texto"]))
+    return {
+        "id": comunica["id"],
+        "assunto": comunica["assunto"],
+        "decisao": decisao.categoria,
+        "enviar": decisao.enviar,
+        "conceito": decisao.conceito,
+        "trecho": decisao.trecho,
+        "motivo": decisao.motivo,
+    }
+
+
+def _classificar_lote(lote):
+    return [classificar_comunica(comunica) for comunica in lote]
+
+
+def em_lotes(iteravel, tamanho):
+    iterador = iter(iteravel)
+    while lote := list(islice(iterador, tamanho)):
+        yield lote
+
+
+def mapear_lotes(funcao, lotes, processos=None, initializer=None, initargs=()):
+    """
+    Aplica `funcao` a cada lote e devolve os resultados NA ORDEM de entrada.
+
+    Com processos > 1 usa um pool de processos com janela deslizante: no máximo
+    LOTES_POR_PROCESSO lotes por processo ficam pendentes, então a memória não
+    cresce com o tamanho da entrada (Pool.imap consumiria a entrada inteira).
+    """
+    processos = processos or os.cpu_count() or 1
+    if processos == 1:
+        if initializer:
+            initializer(*initargs)
+        yield from map(funcao, lotes)
+        return
+
+    with ProcessPoolExecutor(processos, initializer=initializer, initargs=initargs) as pool:
+        pendentes = deque()
+        for lote in lotes:
+            pendentes.append(pool.submit(funcao, lote))
+            if len(pendentes) >= processos * LOTES_POR_PROCESSO:
+                yield pendentes.popleft().result()
+        while pendentes:
+            yield pendentes.popleft().result()
+
+
+# ==============================================================================
+# BACKTEST (REGRAS ATUAIS x CANDIDATAS)
+# ==============================================================================
+
+def carregar_regras(origem):
+    """Monta um Classifier a partir de um arquivo .py ou nome de módulo com os dicionários."""
+    if origem.endswith(".py") or os.sep in origem:
+        caminho = Path(origem).resolve()
+        spec = importlib.util.spec_from_file_location(f"_regras_{caminho.stem}", caminho)
+        modulo = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(modulo)
+    else:
+        modulo = importlib.import_module(origem)
+    return Classifier(
+        modulo.DICIONARIO_DE_ENVIO_PRIORITARIO,
+        modulo.DICIONARIO_DE_BLOQUEIO_REGEX,
+        getattr(modulo, "PALAVRAS_DE_ENVIO_OBRIGATORIO", ()),
+        ancoras_manuais=getattr(modulo, "ANCORAS_MANUAIS", None),
+    )
+
+
+# Preenchido em cada processo pelo initializer (evita mandar as regras a cada lote)
+_REGRAS_BACKTEST = None
+
+
+def _inicializar_backtest(origem_base, origem_candidata):
+    global _REGRAS_BACKTEST
+    _REGRAS_BACKTEST = (carregar_regras(origem_base), carregar_regras(origem_candidata))
+
+
+def _resumo(decisao):
+    return {"decisao": decisao.categoria, "enviar": decisao.enviar,
+            "conceito": decisao.conceito, "trecho": decisao.trecho}
+
+
+def _comparar_lote(lote):
+    """Classifica o lote com as duas regras; devolve (total, só os que mudaram)."""
+    base, candidata = _REGRAS_BACKTEST
+    mudancas = []
+    for comunica in lote:
+        texto = normalizar_com_cache(comunica["texto"])
+        antes = base.classificar(texto)
+        depois = candidata.classificar(texto)
+        if (antes.enviar, antes.categoria, antes.conceito) != (depois.enviar, depois.categoria, depois.conceito):
+            mudancas.append({"id": comunica["id"], "assunto": comunica["assunto"],
+                             "antes": _resumo(antes), "depois": _resumo(depois)})
+    return len(lote), mudancas
+
+
+def tipo_de_mudanca(mudanca):
+    """Classifica a mudança e devolve (tipo, conceito responsável)."""
+    antes, depois = mudanca["antes"], mudanca["depois"]
+    if antes["enviar"] and not depois["enviar"]:
+        return "ENVIADO -> BLOQUEADO", depois["conceito"]
+    if not antes["enviar"] and depois["enviar"]:
+        return "BLOQUEADO -> ENVIADO", antes["conceito"] or depois["conceito"]
+    return "CONCEITO TROCADO", f"{antes['conceito'] or '-'} -> {depois['conceito'] or '-'}"
+
+
+class RelatorioBacktest:
+    """Acumula as mudanças agrupadas por tipo e conceito (sem guardar o corpus)."""
+
+    def __init__(self):
+        self.total = 0
+        self.mudancas = 0
+        self.grupos = defaultdict(lambda: {"quantidade": 0, "exemplos": []})
+
+    def adicionar(self, mudanca):
+        self.mudancas += 1
+        grupo = self.grupos[tipo_de_mudanca(mudanca)]
+        grupo["quantidade"] += 1
+        if len(grupo["exemplos"]) < EXEMPLOS_POR_CONCEITO:
+            grupo["exemplos"].append(mudanca["id"])
+
+    def como_dict(self):
+        por_tipo = defaultdict(dict)
+        for (tipo, conceito), grupo in sorted(self.grupos.items(), key=lambda item: -item[1]["quantidade"]):
+            por_tipo[tipo][conceito] = grupo
+        return {"total": self.total, "mudancas": self.mudancas, "por_tipo": por_tipo}
+
+    def texto(self):
+        linhas = [f"Comunicas analisados: {self.total}",
+                  f"Decisões alteradas:   {self.mudancas}"]
+        for tipo, conceitos in self.como_dict()["por_tipo"].items():
+            linhas.append("")
+            linhas.append(f"== {tipo} ({sum(g['quantidade'] for g in conceitos.values())}) ==")
+            for conceito, grupo in conceitos.items():
+                linhas.append(f"  {grupo['quantidade']:>6}  {conceito}  (ex.: {', '.join(grupo['exemplos'])})")
+        return "\n".join(linhas)
+
+
+# ==============================================================================
+# SAÍDA
+# ==============================================================================
+
+class EscritorResultados:
+    """Grava resultados em JSONL (padrão) ou CSV, conforme a extensão do destino."""
+
+    def __init__(self, destino=None, campos=CAMPOS_SAIDA):
+        self._arquivo = open(destino, "w", encoding="utf-8", newline="") if destino else sys.stdout
+        self._fechar = destino is not None
+        self._csv = None
+        if destino and Path(destino).suffix.lower() == ".csv":
+            self._csv = csv.DictWriter(self._arquivo, fieldnames=campos, extrasaction="ignore")
+            self._csv.writeheader()
+
+    def escrever(self, resultado):
+        if self._csv:
+            self._csv.writerow(resultado)
+        else:
+            self._arquivo.write(json.dumps(resultado, ensure_ascii=False) + "\n")
+
+    def fechar(self):
+        if self._fechar:
+            self._arquivo.close()
+        else:
+            self._arquivo.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+# ==============================================================================
+# COMANDOS
+# ==============================================================================
+
+def comando_classify(args):
+    inicio = time.perf_counter()
+    contagem = Counter()
+    lotes = em_lotes(ler_comunicas(args.entradas), args.lote)
+
+    with EscritorResultados(args.saida) as escritor:
+        for resultados in mapear_lotes(_classificar_lote, lotes, args.processos):
+            for resultado in resultados:
+                escritor.escrever(resultado)
+                contagem[resultado["decisao"]] += 1
+
+    total = sum(contagem.values())
+    duracao = time.perf_counter() - inicio
+    print(f"[CLASSIFY] {total} comunica(s) em {duracao:.1f}s "
+          f"({total / duracao if duracao else 0:.0f}/s): "
+          + ", ".join(f"{decisao}={n}" for decisao, n in contagem.most_common()),
+          file=sys.stderr)
+    return 0
+
+
+def comando_backtest(args):
+    inicio = time.perf_counter()
+    relatorio = RelatorioBacktest()
+    lotes = em_lotes(ler_comunicas(args.entradas), args.lote)
+    resultados = mapear_lotes(_comparar_lote, lotes, args.processos,
+                              initializer=_inicializar_backtest, initargs=(args.base, args.candidato))
+
+    escritor = EscritorResultados(args.saida) if args.saida else None
+    try:
+        for total, mudancas in resultados:
+            relatorio.total += total
+            for mudanca in mudancas:
+                relatorio.adicionar(mudanca)
+                if escritor:
+                    escritor.escrever(mudanca)
+    finally:
+        if escritor:
+            escritor.fechar()
+
+    print(relatorio.texto())
+    if args.relatorio:
+        with open(args.relatorio, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio.como_dict(), arquivo, ensure_ascii=False, indent=2)
+    print(f"[BACKTEST] {relatorio.total} comunica(s) em {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+    return 0
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        description="Classificação offline de comunicas arquivados.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__,
+    )
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    classify = subcomandos.add_parser("classify", help="classifica um arquivo/diretório de comunicas")
+    classify.add_argument("entradas", nargs="+", help="arquivos .jsonl/.csv/.txt ou diretórios")
+    classify.add_argument("-o", "--saida", help="arquivo de saída (.jsonl ou .csv); padrão: stdout")
+    classify.add_argument("--processos", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    classify.add_argument("--lote", type=int, default=500, help="comunicas por lote enviado a cada processo")
+    classify.set_defaults(funcao=comando_classify)
+
+    backtest = subcomandos.add_parser("backtest", help="compara as decisões das regras atuais com as candidatas")
+    backtest.add_argument("entradas", nargs="+", help="arquivos .jsonl/.csv/.txt ou diretórios")
+    backtest.add_argument("--candidato", required=True, help="regras candidatas (arquivo .py ou módulo)")
+    backtest.add_argument("--base", default="classificador", help="regras atuais (padrão: classificador)")
+    backtest.add_argument("-o", "--saida", help="grava cada comunica alterado (.jsonl)")
+    backtest.add_argument("--relatorio", help="grava o relatório agrupado em JSON")
+    backtest.add_argument("--processos", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    backtest.add_argument("--lote", type=int, default=500, help="comunicas por lote enviado a cada processo")
+    backtest.set_defaults(funcao=comando_backtest)
+
+    return parser
+
+
+def main(argv=None):
+    args = criar_parser().parse_args(argv)
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,829 @@
+"""
+Regras de classificação dos comunicas (normalização, dicionários de regex e
+motor de decisão prioridade → bloqueio → padrão).
+
+Fica separado de automacao_por_palavra.py para poder ser importado sem Selenium
+(testes, reprocessamento em lote, backtest de regras).
+"""
+
+import bisect
+import functools
+import logging
+import re
+import time
+import unicodedata
+from collections import defaultdict
+from typing import NamedTuple
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover - Python < 3.11
+    import sre_parse as _sre_parse
+
+# Opcional: pyahocorasick acelera o pré-filtro de âncoras (sem ele usa regex)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+logger = logging.getLogger(__name__)
+
+# ==============================================================================
+# FUNÇÃO DE NORMALIZAÇÃO (REMOVE ACENTOS + MINÚSCULAS)
+# ==============================================================================
+
+def _remover_acentos_nfd(txt: str) -> str:
+    """Implementação de referência: NFD + remoção das marcas (Mn) caractere a caractere."""
+    txt = unicodedata.normalize("NFD", txt)
+    return "".join(ch for ch in txt if unicodedata.category(ch) != "Mn")  # remove acentos
+
+
+# Latin-1 (U+0000..U+00FF), faixa de quase todo texto do SIAFE: cada caractere
+# sem acento vira exatamente um caractere Latin-1 ('ç' -> 'c', 'Ã' -> 'A'), então
+# a remoção cabe numa tabela de 256 bytes aplicada com bytes.translate (em C).
+_TABELA_LATIN1 = bytes(ord(_remover_acentos_nfd(chr(c))) for c in range(256))
+
+
+# Tamanho do cache de normalizar_com_cache() (textos repetidos em lote/backtest)
+NORMALIZAR_CACHE_TAMANHO = 4096
+
+
+def normalizar(txt: str) -> str:
+    """
+    Normaliza texto removendo acentos e convertendo para minúsculas.
+    Isso torna as regex mais simples e robustas.
+
+    Caminhos rápidos (resultado idêntico ao NFD + unicodedata.category original):
+      - texto só ASCII: apenas lower();
+      - texto só Latin-1: tabela pré-calculada com bytes.translate;
+      - demais (Latin Extended, aspas curvas, emoji...): NFD completo, mas as
+        marcas Mn são procuradas só entre os caracteres distintos do texto e
+        removidas com uma regex, sem laço em Python por caractere.
+    """
+    if txt.isascii():
+        return txt.lower()
+    try:
+        dados = txt.encode("latin-1")
+    except UnicodeEncodeError:
+        pass
+    else:
+        return dados.translate(_TABELA_LATIN1).decode("latin-1").lower()
+
+    txt = unicodedata.normalize("NFD", txt)
+    marcas = "".join(ch for ch in set(txt) if unicodedata.category(ch) == "Mn")
+    if marcas:
+        txt = re.sub(f"[{re.escape(marcas)}]+", "", txt)  # remove acentos
+    return txt.lower()
+
+
+@functools.lru_cache(maxsize=NORMALIZAR_CACHE_TAMANHO)
+def normalizar_com_cache(txt: str) -> str:
+    """normalizar() com cache LRU limitado (chave = o próprio texto, via hash)."""
+    return normalizar(txt)
+
+
+# ==============================================================================
+# 1. PADRÕES AUXILIARES GLOBAIS (Constantes de Reutilização)
+# ==============================================================================
+
+# Sufixos de ação: cobre ão, õe, oes, ao (ex: Inscrição, Inscricao, Inclusões)
+SFX_ACAO = r'(?:[ãa]o|[õo]es|c[ao]e?s?)'
+
+# Preposições: cobre de, do, da, dos, das, em, para, no, na... (com opcionais)
+PREP = r'(?:[dn]?[oa]s?|de|em|para)'
+
+# Padrão SIAFE: Cobre Siafe, Siaferio, Siafe-Rio, Siafe.Rio, Siafem
+SIAFE_PATTERN = r'(?:siaf[-\s]*e(?:m)?(?:[-\s.]*rio)?)'
+
+# Verbos de Manipulação (Substantivos e Verbos misturados)
+# Cobre: cadastro, cadastrar, alteração, alterar, inclusão, atualizar, liberar, inativar
+VERBOS_GERAIS = (
+    rf'\b(?:alterac{SFX_ACAO}|alterar?|'
+    rf'cadastr(?:o|ar|ad[oa]s?|amento)|'
+    rf'atualizac{SFX_ACAO}|atualizar?|'
+    rf'inclus{SFX_ACAO}|incluir|'
+    rf'liberac{SFX_ACAO}|liberar?|'
+    rf'inativac{SFX_ACAO}|inativar?)'
+)
+
+# Objeto Específico: Programa de Trabalho
+PT_OBJ = r'programa(?:s)?\s*(?:(?:de|-)\s*)?trabalho(?:s)?'
+
+
+# ==============================================================================
+# 2. DICIONÁRIO DE ENVIO PRIORITÁRIO (Otimizado)
+# ==============================================================================
+
+DICIONARIO_DE_ENVIO_PRIORITARIO = {
+    # ── SISTEMAS E TECNOLOGIA ──────────────────────────────────────────────────
+    'Problemas SIAFERIO':
+        rf'\b(?:problema(?:s)?|erro(?:s)?|falha(?:s)?|indisponibilidade|instabilidade|lentid[ãa]o)'
+        rf'(?:\s+(?:no|do|com|em))?\s+{SIAFE_PATTERN}\b'
+        rf'|\b{SIAFE_PATTERN}\s+(?:fora\s+do\s+ar|inoperante|com\s+problema(?:s)?|n[ãa]o\s+(?:funciona|carrega|abre))\b',
+
+    'FlexVision':
+        r'\bflexvision\b|\bflex[-\s]*vision\b',
+
+    'Sistemas Fora do Ar':
+        rf'\b(?:sistema(?:s)?|servi[çc]o(?:s)?|aplica(?:[çc][ãa]o|[çc][õo]es))\s+(?:fora\s+do\s+ar|indispon[íi]vel(?:eis)?|inoperante(?:s)?)\b'
+        rf'|\b(?:sem\s+acesso|n[ãa]o\s+(?:acessa|conecta|funciona))\s+(?:ao\s+)?(?:sistema(?:s)?|{SIAFE_PATTERN})\b'
+        rf'|\b{SIAFE_PATTERN}\s+fora\s+do\s+ar\b',
+
+    # ── URGÊNCIAS E PROBLEMAS CRÍTICOS ─────────────────────────────────────────
+    'Urgente':
+        r'\burgent(?:e|es?|[íi]ssim[ao])\b|\bpriorit[áa]ri[ao](?:s)?\b|\bemerg[eê]ncia\b'
+        r'|\basap\b|\bcom\s+urg[eê]ncia\b|\bpara\s+hoje\b|\bimediato\b',
+
+    'Erro Crítico':
+        r'\b(?:erro\s+(?:cr[íi]tico|grave|fatal|sistema)|falha\s+(?:cr[íi]tica|grave|geral))\b'
+        r'|\b(?:n[ãa]o\s+(?:consegue|consigo)|imposs[íi]vel)\s+(?:acessar|executar|processar|finalizar)\b'
+        r'|\bsistema\s+(?:travado|congelado|n[ãa]o\s+responde)\b',
+
+    # ── FECHAMENTO/FIM DE PERÍODO ──────────────────────────────────────────────
+    'Fechamento':
+        r'\b(?:fechamento|encerramento)\s+(?:do\s+)?(?:m[êe]s|per[íi]odo|exerc[íi]cio|balan[çc]o)\b'
+        r'|\bfim\s+do\s+(?:m[êe]s|ano|exerc[íi]cio|per[íi]odo)\b'
+        r'|\b(?:presta(?:[çc][ãa]o|[çc][õo]es)|envio)\s+de\s+contas?\b',
+
+    'Relatório Urgente':
+        r'\b(?:relat[óo]rio(?:s)?|demonstrativo(?:s)?)\s+(?:urgente(?:s)?|priorit[áa]rio(?:s)?|para\s+(?:hoje|amanh[aã]))\b'
+        r'|\b(?:balancete|dre|demonstra(?:[çc][ãa]o|[çc][õo]es))\s+(?:urgente|priorit[áa]ri[ao])\b',
+}
+
+# Lista Simples (Mantida)
+PALAVRAS_DE_ENVIO_OBRIGATORIO = ['flexvision']
+
+
+# ==============================================================================
+# 3. DICIONÁRIO DE BLOQUEIO (Com Lógica Modular e Robustez)
+# ==============================================================================
+
+DICIONARIO_DE_BLOQUEIO_REGEX = {
+    # ── PARTE CADASTRAL FINANCEIRA ──────────────────────────────────────────
+
+    'Inscricao Generica':
+    rf'\binscric{SFX_ACAO}\s+gen[ée]ri(?:c)?(?:a|as)?\b|\bigs\b',
+
+    'Credor Generico':
+        r'\bcredor(?:es)?\s+gen[ée]ric(?:o|os)\b|\bcgs\b',
+
+    'Bloqueio Judicial':
+        rf'\bbloqueio(?:s)?\s+judicia(?:l|is)\b|\bcria(?:[çc][ãa]o|[çc][õo]es)\s+de\s+bj\b|\bbj\b',
+
+    'Codigo de Barras':
+        r'\b(?:cod(?:\.|\s*)barras?|c[óo]digo(?:s)?\s+de\s+barras?)\b'
+        rf'|\balterac{SFX_ACAO}\s+de\s+cnpj\s+em\s+(?:cod(?:\.|\s*)barras?|c[óo]digo\s+de\s+barras?)\b',
+
+    # === BLOCO OTIMIZADO DE DADOS BANCÁRIOS ===
+    'Dados Bancarios':
+        # 1. Termos diretos
+        r'\b(?:dados\s+banc[áa]ri(?:o|os)|domic[íi]lio\s+banc[áa]ri(?:o|os))\b'
+        r'|'
+        # 2. Ação + Preposição + Objeto + (Opcional: Credor Genérico)
+        rf'{VERBOS_GERAIS}\s+'
+        rf'(?:{PREP}\s*)?'
+        r'(?:banco(?:s)?|ag[êe]ncia(?:s)?|conta(?:s)?\s+(?:corrent(?:e|es)|banc[áa]ria(?:s)?))'
+        # O '?' no final pega com ou sem o complemento
+        r'(?:\s+em\s+credor(?:es)?\s+gen[ée]ric(?:o|os))?\b',
+
+    'Boleto/Credor':
+        r'\bboletos?\b|\bcredor(?:es)?\b',
+
+    'Alteracao de Razao Social':
+        rf'\balterac{SFX_ACAO}\s+(?:da|de)\s+raz[ãa]o\s+social\b',
+
+    # ── PARTE CADASTRAL ─────────────────────────────────────────────────────
+
+    'Cadastro em Geral':
+        rf'\binforma(?:[çc][õo]es|coes)\s+cadastrais\b'
+        r'|\brequisi(?:[çc][ãa]o|[çc][õo]es)\s+de\s+pequeno(?:s)?\s+valor(?:es)?\b',
+
+    'Cadastro de Convenio':
+        r'\bcadastro(?:s)?\s+(?:de\s+)?conta(?:s)?\s+(?:de\s+)?conv[êe]nio(?:s)?\b'
+        r'|\bconta(?:s)?\s+(?:de\s+)?conv[êe]nio(?:s)?\s+cadastrad(?:a|as|o|os)\b',
+
+    'Atualizacao de Dados':
+        rf'\batualizac{SFX_ACAO}\s+(?:de\s+)?dados?\b'
+        rf'|\bnomeac{SFX_ACAO}\s+de\s+contador(?:es)?\b'
+        r'|\balterar?\s+nome(?:s)?\s+(?:de|das|nas)\s+unidade(?:s)?\s+gestora(?:s)?\b',
+
+    # === BLOCO OTIMIZADO DE PROGRAMA DE TRABALHO ===
+    'Programa de Trabalho':
+        r'\b(?:'
+        # Ação -> Objeto (ex: Cadastrar Programa de Trabalho)
+        rf'(?:{VERBOS_GERAIS}(?:\s+(?:o|a|os|as))?(?:\s+no\s+sistema)?(?:\s+{PREP})?\s+{PT_OBJ})'
+        r'|'
+        # Objeto -> Ação (ex: Programa de Trabalho foi cadastrado)
+        # Nota: {{0,6}} é usado porque dentro de f-string chaves duplas viram chaves literais regex
+        rf'(?:{PT_OBJ}(?:\s+no\s+sistema)?(?:\s+(?:foi|foram|est[áa](?:o)?|ser[áa](?:o)?))?\s*(?:\w+\s+){{0,6}}{VERBOS_GERAIS})'
+        r')\b',
+
+    'Detalhamento de Fonte':
+        r'\bcadastro(?:s)?\s+(?:de\s+)?detalhamento(?:s)?\s+(?:de\s+)?fonte(?:s)?\b'
+        r'|\bdetalhamento(?:s)?\s+(?:da|de)\s+fonte(?:s)?\b'
+        r'|\bfonte(?:s)?\s+detalhad(?:a|as|o|os)\b',
+
+    # ── ACESSO E PERFIL ─────────────────────────────────────────────────────
+
+    'Acesso ou Senha':
+        rf'(?:(?:\bacesso(?:s)?\b|\bsenha(?:s)?\b).{{0,25}}\b{SIAFE_PATTERN}\b|\b{SIAFE_PATTERN}\b)',
+
+    'Reativacao':
+        rf'\breativ(?:ar|ac{SFX_ACAO}|ado(?:s)?|ada(?:s)?)\b'
+        r'|\bdesbloqueio(?:s)?\s+de\s+usu[áa]rio(?:s)?\b'
+        rf'|\breativac{SFX_ACAO}\s+de\s+perfil\b',
+
+    # === BLOCO OTIMIZADO DE GESTOR E PERFIL ===
+    'Perfil ou Gestor de Usuarios':
+       r'\bgestor(?:a|as|es)?\s+de\s+usu[áa]rio(?:s)?\b'
+       r'|\b(?:perfil|perfis)\s+de\s+usu[áa]rio(?:s)?\b'
+       r'|\btroca\s+de\s+gestor(?:a|as|es)?\b'
+       # Cobre: Gestor do Siafe Rio, Gestora Siaferio, etc.
+       rf'|\bgestor(?:a|as|es)?\s+(?:(?:d[oa]|de)\s*)?{SIAFE_PATTERN}\b',
+
+    # ── OUTROS ──────────────────────────────────────────────────────────────
+
+    'LISCONTIR':
+        r'\bliscontir\b|\bdesbloqueio\s+de\s+empenho(?:s)?\b',
+
+    'Desconsiderar':
+        r'\bdesconsider(?:ar|e|em)\b',
+}
+
+# # ==============================================================================
+# # DICIONÁRIO DE ENVIO PRIORITÁRIO COM REGEX (TEXTO NORMALIZADO)
+# # ==============================================================================
+
+# DICIONARIO_DE_ENVIO_PRIORITARIO = {
+#     # ── SISTEMAS E TECNOLOGIA ──────────────────────────────────────────────────
+#     'Problemas SIAFERIO':
+#         r'\b(?:problema(?:s)?|erro(?:s)?|falha(?:s)?|indisponibilidade|instabilidade|lentidao)'
+#         r'(?:\s+(?:no|do|com|em))?\s+(?:siaferio|siafe[-\s]*rio|siaf[-\s]*e[-\s]*rio)\b'
+#         r'|\bsiaferio\s+(?:fora\s+do\s+ar|inoperante|com\s+problema(?:s)?|nao\s+(?:funciona|carrega|abre))\b',
+
+#     'FlexVision':
+#         r'\bflexvision\b|\bflex[-\s]*vision\b',
+
+#     'Sistemas Fora do Ar':
+#         r'\b(?:sistema(?:s)?|servico(?:s)?|aplicacao(?:oes)?)\s+(?:fora\s+do\s+ar|indisponivel(?:eis)?|inoperante(?:s)?)\b'
+#         r'|\b(?:sem\s+acesso|nao\s+(?:acessa|conecta|funciona))\s+(?:ao\s+)?(?:sistema(?:s)?|siaferio|siafem)\b'
+#         r'|\b(?:siaferio|siafe[-\s]*rio|siaf[-\s]*e[-\s]*rio|siafem|siaf[-\s]*em)\s+fora\s+do\s+ar\b',
+
+#     # ── URGÊNCIAS E PROBLEMAS CRÍTICOS ─────────────────────────────────────────
+#     'Urgente':
+#         r'\burgent(?:e|es?|issim[ao])\b|\bpriorit[aá]ri[ao](?:s)?\b|\bemerg[eê]ncia\b'
+#         r'|\basap\b|\bcom\s+urg[eê]ncia\b|\bpara\s+hoje\b|\bimediato\b',
+
+#     'Erro Crítico':
+#         r'\b(?:erro\s+(?:critico|grave|fatal|sistema)|falha\s+(?:critica|grave|geral))\b'
+#         r'|\b(?:nao\s+(?:consegue|consigo)|impossivel)\s+(?:acessar|executar|processar|finalizar)\b'
+#         r'|\bsistema\s+(?:travado|congelado|nao\s+responde)\b',
+
+
+#     # ── FECHAMENTO/FIM DE PERÍODO ──────────────────────────────────────────────
+#     'Fechamento':
+#         r'\b(?:fechamento|encerramento)\s+(?:do\s+)?(?:mes|periodo|exercicio|balanco)\b'
+#         r'|\bfim\s+do\s+(?:mes|ano|exercicio|periodo)\b'
+#         r'|\b(?:prestacao|envio)\s+de\s+contas?\b',
+
+#     'Relatório Urgente':
+#         r'\b(?:relatorio(?:s)?|demonstrativo(?:s)?)\s+(?:urgente(?:s)?|prioritario(?:s)?|para\s+(?:hoje|amanh[aã]))\b'
+#         r'|\b(?:balancete|dre|demonstracao)\s+(?:urgente|prioritari[ao])\b',
+# }
+
+# # --- Lista Simples de Palavras de ENVIO PRIORITÁRIO (mantida para compatibilidade) ---
+# PALAVRAS_DE_ENVIO_OBRIGATORIO = [
+#     'flexvision',  # mantida para compatibilidade com código existente
+# ]
+
+
+# # ==============================================================================
+# # PADRÕES AUXILIARES PARA REUTILIZAÇÃO EM REGEX
+# # ==============================================================================
+
+# PREP = r'(?:de|do|da|dos|das|no|na|nos|nas)'
+# PT_OBJ = r'programa(?:s)?\s*(?:de|-)?\s*trabalho(?:s)?'   # "programa(s) de trabalho(s)"
+# ACOES = r'(?:cadastr(?:o(?:s)?|ar|ado(?:s)?|amento|ou)|libera(?:cao|r|do(?:s)?)|inativa(?:cao|r|do(?:s)?))'
+
+# # ==============================================================================
+# # DICIONÁRIO DE BLOQUEIO COM REGEX ROBUSTAS (TEXTO NORMALIZADO)
+# # ==============================================================================
+
+# DICIONARIO_DE_BLOQUEIO_REGEX = {
+#     # ── PARTE CADASTRAL FINANCEIRA ───────────────────────────────────────────────
+#     'Inscricao Generica':
+#         r'\binscri(?:cao|coes)\s+gen(?:erica|eria)(?:s)?\b|\bigs\b',
+
+#     'Credor Generico':
+#         r'\bcredor(?:es)?\s+generic(?:o|os)\b|\bcgs\b',
+
+#     'Bloqueio Judicial':
+#         r'\bbloqueio(?:s)?\s+judicia(?:l|is)\b|\bcriaca(?:o|oes)\s+de\s+bj\b|\bbj\b',
+
+#     'Codigo de Barras':
+#         r'\b(?:cod(?:\.|\s*)barras?|codigo(?:s)?\s+de\s+barras?)\b'
+#         r'|\balterac(?:ao|oes)\s+de\s+cnpj\s+em\s+(?:cod(?:\.|\s*)barras?|codigo\s+de\s+barras?)\b',
+
+#     'Dados Bancarios':
+#         # Bloco 1: Termos diretos
+#         r'\b(?:dados\s+banc[áa]ri(?:o|os)|domic[íi]lio\s+banc[áa]ri(?:o|os))\b'
+#         r'|'
+#         # Bloco 2: Ação (Alterar, Cadastrar, Atualizar, Inclusão)
+#         r'\b(?:alterac(?:[ãa]o|[õo]es)|cadastr(?:o|ar)|atualizac(?:[ãa]o|[õo]es)|inclus(?:[ãa]o))\s+'
+#         # Bloco 3: Preposição (Opcional e flexível)
+#         r'(?:d?[oa]s?|de|em|para)?\s*'
+#         # Bloco 4: Objeto (Banco, Agência, Conta Corrente/Bancária)
+#         r'(?:banco(?:s)?|ag[êe]ncia(?:s)?|conta(?:s)?\s+(?:corrent(?:e|es)|banc[áa]ria(?:s)?))'
+#         # Bloco 5: Complemento "Credor Genérico" (Opcional com ?)
+#         # O '?' no final do grupo faz com que ele pegue a frase COM ou SEM essa parte final
+#         r'(?:\s+em\s+credor(?:es)?\s+gen[ée]ric(?:o|os))?\b',
+
+
+#     'Boleto/Credor':
+#         r'\bboletos?\b|\bcredor(?:es)?\b',
+
+#     'Alteracao de Razao Social':
+#         r'\balterac(?:ao|oes)\s+(?:da|de)\s+razao\s+social\b',
+
+
+#     # ── PARTE CADASTRAL ─────────────────────────────────────────────────────────
+#     'Cadastro em Geral':
+#         r'\binformac(?:oes)?\s+cadastrais\b'
+#         r'|\brequisic(?:ao|oes)\s+de\s+pequeno(?:s)?\s+valor(?:es)?\b',
+
+#     'Cadastro de Convenio':
+#         r'\bcadastro(?:s)?\s+(?:de\s+)?conta(?:s)?\s+(?:de\s+)?convenio(?:s)?\b'
+#         r'|\bconta(?:s)?\s+(?:de\s+)?convenio(?:s)?\s+cadastrad(?:a|as|o|os)\b',
+
+#     'Atualizacao de Dados':
+#         r'\batualizac(?:ao|oes)\s+(?:de\s+)?dados?\b'
+#         r'|\bnomeac(?:ao|oes)\s+de\s+contador(?:es)?\b'
+#         r'|\balterar?\s+nome(?:s)?\s+(?:de|das|nas)\s+unidade(?:s)?\s+gestora(?:s)?\b',
+
+#     # **Programa de Trabalho** (ordem ação→objeto OU objeto→ação)
+#     'Programa de Trabalho':
+#         r'\b(?:'
+#         rf'(?:{ACOES}(?:\s+(?:o|a|os|as))?\s*(?:\s+no\s+sistema)?(?:\s+{PREP})?\s+{PT_OBJ})'
+#         r'|'
+#         rf'(?:{PT_OBJ}(?:\s+no\s+sistema)?(?:\s+(?:foi|foram|esta(?:o)?|sera(?:o)?))?\s*(?:\w+\s+){{0,6}}{ACOES})'
+#         r')\b',
+
+#     'Detalhamento de Fonte':
+#         r'\bcadastro(?:s)?\s+(?:de\s+)?detalhamento(?:s)?\s+(?:de\s+)?fonte(?:s)?\b'
+#         r'|\bdetalhamento(?:s)?\s+(?:da|de)\s+fonte(?:s)?\b'
+#         r'|\bfonte(?:s)?\s+detalhad(?:a|as|o|os)\b',
+
+#     # ── ACESSO E PERFIL ─────────────────────────────────────────────────────────
+#     'Acesso ou Senha':
+#         r'(?:(?:\bacesso(?:s)?\b|\bsenha(?:s)?\b).{0,25}\b(?:siafem|siaferio)\b|\bsiafem\b|\bsiaferio\b)',
+
+#     'Reativacao':
+#         r'\breativ(?:ar|acao|acoes|ado(?:s)?|ada(?:s)?)\b'
+#         r'|\bdesbloqueio(?:s)?\s+de\s+usuario(?:s)?\b'
+#         r'|\breativac(?:ao|oes)\s+de\s+perfil\b',
+
+#     'Perfil ou Gestor de Usuarios':
+#        r'\bgestor(?:a|as|es)?\s+de\s+usu[áa]rio(?:s)?\b'
+#        r'|\b(?:perfil|perfis)\s+de\s+usu[áa]rio(?:s)?\b'  
+#        r'|\btroca\s+de\s+gestor(?:a|as|es)?\b'
+#        r'|\bgestor(?:a|as|es)?\s+(?:d[oa]|de)?\s*siafe(?:[.\-\s]*rio)?\b',
+
+#     # ── OUTROS ──────────────────────────────────────────────────────────────────
+#     'LISCONTIR':
+#         r'\bliscontir\b|\bdesbloqueio\s+de\s+empenho(?:s)?\b',
+
+#     'Desconsiderar':
+#         r'\bdesconsider(?:ar|e|em)\b',
+# }
+
+
+# ==============================================================================
+# 4. MOTOR DE CLASSIFICAÇÃO (REGEX PRÉ-COMPILADAS EM PASSADA ÚNICA)
+# ==============================================================================
+
+FLAGS_PADRAO = re.IGNORECASE | re.DOTALL
+
+# Texto maior que isso (depois de colapsar os espaços) não passa pelas regex:
+# comunicas reais têm poucos KB e uma busca não pode ser interrompida no meio.
+# Ele vai para análise, como no orçamento estourado; cortar o texto poderia
+# perder um casamento prioritário do fim e deixar valer um bloqueio do começo.
+TAMANHO_MAXIMO_TEXTO = 100_000
+
+# Sequências de espaços viram um só na cópia que as regex percorrem: os padrões
+# usam \s+ / \s*, então a decisão não muda, e nenhum quantificador de espaço
+# percorre corredores longos. O trecho da decisão sai do texto original.
+_ESPACOS = re.compile(r'\s{2,}')
+
+# Categorias possíveis de uma decisão
+PRIORITARIO = "PRIORITARIO"
+PALAVRA_CHAVE = "PALAVRA_CHAVE"
+BLOQUEADO = "BLOQUEADO"
+PADRAO = "PADRAO"
+ORCAMENTO_EXCEDIDO = "ORCAMENTO_EXCEDIDO"
+
+
+class Decisao(NamedTuple):
+    """Resultado da classificação de um comunica."""
+    enviar: bool
+    categoria: str
+    conceito: str
+    trecho: str
+    motivo: str
+
+
+class TextoPreparado(NamedTuple):
+    """Cópia que as regex percorrem (espaços colapsados) e o mapa de volta para o original."""
+    original: str
+    texto: str
+    cortes: tuple     # posição, na cópia, de cada sequência de espaços colapsada
+    removidos: tuple  # caracteres removidos até cada corte (inclusive)
+
+    def posicao_original(self, posicao):
+        k = bisect.bisect_left(self.cortes, posicao)
+        return posicao + (self.removidos[k - 1] if k else 0)
+
+    def trecho(self, inicio, fim):
+        """Trecho do texto original que corresponde a [inicio, fim) da cópia."""
+        if fim <= inicio:
+            return ""
+        return self.original[self.posicao_original(inicio):self.posicao_original(fim - 1) + 1]
+
+
+def preparar_texto(texto_normalizado: str) -> TextoPreparado:
+    """Texto que as regex recebem: espaços repetidos colapsados (o original fica para o trecho)."""
+    cortes, removidos, total = [], [], 0
+    for match in _ESPACOS.finditer(texto_normalizado):
+        cortes.append(match.start() - total)
+        total += match.end() - match.start() - 1
+        removidos.append(total)
+    texto = _ESPACOS.sub(" ", texto_normalizado) if cortes else texto_normalizado
+    return TextoPreparado(texto_normalizado, texto, tuple(cortes), tuple(removidos))
+
+
+# ------------------------------------------------------------------------------
+# 4.1 Pré-filtro por âncoras literais
+# ------------------------------------------------------------------------------
+#
+# Cada conceito tem um conjunto de "âncoras": literais dos quais PELO MENOS UM
+# aparece obrigatoriamente em qualquer casamento (ex.: 'credor'/'cgs' para
+# 'Credor Generico'). Uma única passada multi-padrão no texto diz quais âncoras
+# existem, e só os conceitos com âncora presente chegam a rodar a regex.
+# As âncoras são derivadas automaticamente da própria regex; ANCORAS_MANUAIS
+# permite declarar/sobrescrever as de um conceito.
+
+ANCORAS_MANUAIS = {}
+
+# Âncoras mais curtas que isso não filtram nada (o conceito roda sempre)
+TAMANHO_MINIMO_ANCORA = 2
+
+# Caracteres não-ASCII que o re.IGNORECASE considera iguais a letras ASCII
+# (ex.: 'ſ' casa com 's'). O texto do pré-filtro passa por esta tabela antes do
+# lower() para que a âncora nunca descarte um conceito que a regex casaria.
+_DOBRA_IGNORECASE = str.maketrans({"İ": "i", "ı": "i", "ſ": "s", "K": "k"})
+
+
+def _melhores_ancoras(candidatos):
+    """Escolhe o conjunto de âncoras mais seletivo (maior literal mínimo, depois menos literais)."""
+    melhor = None
+    for conjunto in candidatos:
+        chave = (min(len(s) for s in conjunto), -len(conjunto))
+        if melhor is None or chave > melhor[0]:
+            melhor = (chave, conjunto)
+    return melhor[1] if melhor else None
+
+
+def _literais_obrigatorios(sequencia, prefixo=""):
+    """
+    Percorre a árvore do sre_parse e devolve um conjunto de literais (minúsculos)
+    dos quais ao menos um está em todo casamento, ou None se não houver.
+    `prefixo` é o literal imediatamente anterior (usado para continuar o literal
+    dentro de alternâncias, já que o parser fatoriza prefixos comuns).
+    """
+    candidatos = []
+    atual = prefixo
+
+    for op, av in sequencia:
+        nome = str(op)
+        if nome == "LITERAL" and av < 128:
+            atual += chr(av).lower()
+            continue
+        if nome == "AT":  # \b, ^, $: largura zero, não quebra o literal
+            continue
+
+        if nome == "BRANCH":
+            alternativas = [_literais_obrigatorios(alt, atual) for alt in av[1]]
+            atual = ""
+            if all(alternativas):
+                candidatos.append(frozenset().union(*alternativas))
+            continue
+
+        if nome in ("SUBPATTERN", "ATOMIC_GROUP"):
+            conjunto = _literais_obrigatorios(av[-1], atual)
+            atual = ""
+            if conjunto:
+                candidatos.append(conjunto)
+            continue
+
+        if atual:
+            candidatos.append(frozenset([atual]))
+            atual = ""
+        if nome in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT") and av[0] >= 1:
+            conjunto = _literais_obrigatorios(av[2])
+            if conjunto:
+                candidatos.append(conjunto)
+
+    if atual:
+        candidatos.append(frozenset([atual]))
+    return _melhores_ancoras(candidatos)
+
+
+def derivar_ancoras(padrao, flags=FLAGS_PADRAO):
+    """Âncoras literais obrigatórias de uma regex (None = conceito sem âncora, roda sempre)."""
+    ancoras = _literais_obrigatorios(_sre_parse.parse(padrao, flags))
+    if not ancoras or min(len(a) for a in ancoras) < TAMANHO_MINIMO_ANCORA:
+        return None
+    # 'urgent' já cobre 'urgente': descarta literais que contêm outro do conjunto
+    return frozenset(a for a in ancoras if not any(b != a and b in a for b in ancoras))
+
+
+class _Prefiltro:
+    """
+    Busca multi-padrão das âncoras numa única passada.
+
+    Usa pyahocorasick quando instalado; sem ele, uma regex com lookahead
+    (?=(a1|a2|...)) testada em toda posição, com as âncoras da maior para a menor.
+    Nesse caso só a maior âncora de cada posição é reportada, então cada achado
+    também marca as âncoras contidas nele.
+    """
+
+    def __init__(self, ancoras):
+        self.ancoras = frozenset(ancoras)
+        self._automato = None
+        self._regex = None
+        if not self.ancoras:
+            return
+        if ahocorasick is not None:
+            self._automato = ahocorasick.Automaton()
+            for ancora in self.ancoras:
+                self._automato.add_word(ancora, ancora)
+            self._automato.make_automaton()
+        else:
+            ordenadas = sorted(self.ancoras, key=len, reverse=True)
+            self._regex = re.compile("(?=(" + "|".join(map(re.escape, ordenadas)) + "))")
+            self._contidas = {a: frozenset(b for b in self.ancoras if b in a) for a in self.ancoras}
+
+    def encontrar(self, texto):
+        """Conjunto de âncoras presentes no texto."""
+        if not self.ancoras:
+            return frozenset()
+        texto = texto.translate(_DOBRA_IGNORECASE).lower()
+        if self._automato is not None:
+            return {ancora for _, ancora in self._automato.iter(texto)}
+        encontradas = set()
+        for ancora in set(self._regex.findall(texto)):
+            encontradas |= self._contidas[ancora]
+        return encontradas
+
+
+# ------------------------------------------------------------------------------
+# 4.2 Camadas e classificador
+# ------------------------------------------------------------------------------
+
+class _Camada:
+    """
+    Um nível da hierarquia (prioridade, palavras obrigatórias ou bloqueio).
+
+    Os conceitos candidatos viram UMA regex combinada (p0)|(p1)|... e a busca
+    devolve o mesmo conceito que o laço antigo `for conceito, padrao in
+    dicionario.items(): re.search(...)`:
+      - a regex combinada acha o primeiro casamento (mais à esquerda) na posição p;
+      - o conceito é o primeiro i cujo padrão casa exatamente em p (ordem da alternância);
+      - os conceitos anteriores a i só podem casar depois de p, então a busca
+        continua a partir de p+1 apenas com os candidatos anteriores a i.
+
+    Os grupos são não-nomeados de propósito: grupos nomeados fazem o `re` salvar
+    marcas em toda posição e deixam a varredura mais lenta que os re.search separados.
+    Obs.: os padrões não podem usar grupos numerados/backreferences (\\1).
+    """
+
+    def __init__(self, conceitos, flags, ancoras_manuais=None, nome=""):
+        ancoras_manuais = ancoras_manuais or {}
+        self.nome = nome
+        self.conceitos = tuple(nome for nome, _ in conceitos)
+        self._padroes = tuple(padrao for _, padrao in conceitos)
+        self._flags = flags
+        self.individuais = tuple(re.compile(p, flags) for p in self._padroes)
+        self.ancoras = tuple(
+            frozenset(normalizar(a) for a in ancoras_manuais[nome]) if nome in ancoras_manuais
+            else derivar_ancoras(padrao, flags)
+            for nome, padrao in conceitos
+        )
+        self.todos = tuple(range(len(self.conceitos)))
+        self._sempre = tuple(i for i, ancoras in enumerate(self.ancoras) if ancoras is None)
+        # Cache limitado: uma regex por combinação de candidatos que já apareceu
+        self._combinado = functools.lru_cache(maxsize=256)(self._compilar)
+        # Compila já na criação para acusar regex inválida no import
+        if self.conceitos:
+            self._combinado(self.todos)
+
+    def _compilar(self, indices):
+        return re.compile("|".join(f"(?:{self._padroes[i]})" for i in indices), self._flags)
+
+    def candidatos(self, ancoras_presentes):
+        """Índices (em ordem de prioridade) dos conceitos que valem a pena rodar."""
+        if not ancoras_presentes:
+            return self._sempre
+        return tuple(
+            i for i, ancoras in enumerate(self.ancoras)
+            if ancoras is None or not ancoras.isdisjoint(ancoras_presentes)
+        )
+
+    def buscar(self, texto, indices=None):
+        """Retorna (conceito, match) do conceito de maior prioridade que casa, ou None."""
+        if indices is None:
+            indices = self.todos
+        achado = None
+        pos = 0
+        while indices:
+            match = self._combinado(indices).search(texto, pos)
+            if match is None:
+                break
+            inicio = match.start()
+            for j, i in enumerate(indices):
+                match = self.individuais[i].match(texto, inicio)
+                if match:
+                    break
+            achado = (self.conceitos[i], match)
+            indices = indices[:j]
+            pos = inicio + 1
+        return achado
+
+
+class EstatisticasConceitos:
+    """
+    Tempo de regex por conceito, acumulado ao longo de vários documentos.
+
+    Com `guardar_amostras=True` guarda cada medição (para percentis em benchmark).
+    """
+
+    def __init__(self, guardar_amostras=False):
+        self.chamadas = defaultdict(int)
+        self.total_s = defaultdict(float)
+        self.maximo_s = defaultdict(float)
+        self.amostras = defaultdict(list) if guardar_amostras else None
+
+    def registrar(self, conceito, segundos):
+        self.chamadas[conceito] += 1
+        self.total_s[conceito] += segundos
+        if segundos > self.maximo_s[conceito]:
+            self.maximo_s[conceito] = segundos
+        if self.amostras is not None:
+            self.amostras[conceito].append(segundos)
+
+    def mais_lentos(self, n=None):
+        """[(conceito, chamadas, total_s, maximo_s)] do maior tempo máximo para o menor."""
+        linhas = sorted(
+            ((c, self.chamadas[c], self.total_s[c], self.maximo_s[c]) for c in self.chamadas),
+            key=lambda linha: linha[3],
+            reverse=True,
+        )
+        return linhas[:n] if n else linhas
+
+
+class Classifier:
+    """
+    Classificador construído uma única vez com todos os conceitos compilados.
+
+    Mantém a mesma hierarquia do fluxo principal:
+      A1. DICIONARIO_DE_ENVIO_PRIORITARIO  -> envia
+      A2. PALAVRAS_DE_ENVIO_OBRIGATORIO    -> envia
+      B.  DICIONARIO_DE_BLOQUEIO_REGEX     -> bloqueia
+      C.  nenhum casamento                 -> envia para análise
+
+    Com `prefiltro=True` uma passada de âncoras literais decide antes quais
+    conceitos de cada camada precisam rodar a regex (mesmo resultado, menos trabalho).
+    """
+
+    def __init__(self, prioritario, bloqueio, palavras_obrigatorias=(), flags=FLAGS_PADRAO,
+                 ancoras_manuais=None, prefiltro=True):
+        if ancoras_manuais is None:
+            ancoras_manuais = ANCORAS_MANUAIS
+        self.prioritario = _Camada(list(prioritario.items()), flags, ancoras_manuais, "prioridade")
+        self.palavras = _Camada(
+            [(palavra, r'\b' + re.escape(normalizar(palavra)) + r'\b') for palavra in palavras_obrigatorias],
+            re.IGNORECASE,
+            ancoras_manuais,
+            "palavras obrigatórias",
+        )
+        self.bloqueio = _Camada(list(bloqueio.items()), flags, ancoras_manuais, "bloqueio")
+        self._camadas = (self.prioritario, self.palavras, self.bloqueio)
+
+        self._prefiltro = None
+        if prefiltro:
+            ancoras = set()
+            for camada in self._camadas:
+                for conjunto in camada.ancoras:
+                    ancoras |= conjunto or set()
+            self._prefiltro = _Prefiltro(ancoras)
+
+    def ancoras_por_conceito(self):
+        """{conceito: âncoras} de todas as camadas (None = sem âncora, roda sempre)."""
+        return {nome: ancoras for camada in self._camadas
+                for nome, ancoras in zip(camada.conceitos, camada.ancoras)}
+
+    def classificar(self, texto_normalizado: str, orcamento_s=None, estatisticas=None) -> Decisao:
+        """
+        Classifica um texto JÁ normalizado (ver normalizar()). As regex percorrem
+        a cópia de preparar_texto() (espaços colapsados); o trecho da decisão vem
+        do texto original. Texto acima de TAMANHO_MAXIMO_TEXTO vai para análise
+        sem passar pelas regex.
+
+        orcamento_s: tempo máximo de regex por documento, conferido entre as
+            camadas (ou entre os conceitos, no caminho medido): uma busca em
+            andamento não é interrompida. Se estourar antes de uma decisão,
+            devolve o veredito seguro (enviar para análise) em vez de bloquear às cegas.
+        estatisticas: EstatisticasConceitos que recebe o tempo de cada conceito.
+            Com ela os conceitos rodam um a um (bem mais lento que a regex
+            combinada): só para diagnóstico ou por amostragem.
+        """
+        preparado = preparar_texto(texto_normalizado)
+        texto = preparado.texto
+        if len(texto) > TAMANHO_MAXIMO_TEXTO:
+            return self._texto_longo_demais(len(texto))
+        if self._prefiltro is not None:
+            presentes = self._prefiltro.encontrar(texto)
+            candidatos = tuple(c.candidatos(presentes) for c in self._camadas)
+        else:
+            candidatos = tuple(c.todos for c in self._camadas)
+
+        if estatisticas is not None:
+            return self._classificar_medido(preparado, candidatos, orcamento_s, estatisticas)
+
+        inicio = time.perf_counter()
+        for camada, indices in zip(self._camadas, candidatos):
+            achado = camada.buscar(texto, indices)
+            if achado:
+                conceito, match = achado
+                return self._decisao(camada, conceito, preparado.trecho(*match.span()))
+            if orcamento_s is not None and time.perf_counter() - inicio > orcamento_s:
+                return self._orcamento_excedido(time.perf_counter() - inicio, orcamento_s,
+                                                "camada", camada.nome, len(texto))
+        return self._decisao(None, "", "")
+
+    def _classificar_medido(self, preparado, candidatos, orcamento_s, estatisticas):
+        """Mesma ordem do laço original (um re.search por conceito), cronometrando cada um."""
+        texto = preparado.texto
+        inicio = time.perf_counter()
+        for camada, indices in zip(self._camadas, candidatos):
+            for i in indices:
+                antes = time.perf_counter()
+                match = camada.individuais[i].search(texto)
+                agora = time.perf_counter()
+                estatisticas.registrar(camada.conceitos[i], agora - antes)
+                if match:
+                    return self._decisao(camada, camada.conceitos[i], preparado.trecho(*match.span()))
+                if orcamento_s is not None and agora - inicio > orcamento_s:
+                    return self._orcamento_excedido(agora - inicio, orcamento_s,
+                                                    "conceito", camada.conceitos[i], len(texto))
+        return self._decisao(None, "", "")
+
+    def _orcamento_excedido(self, gasto_s, orcamento_s, tipo, nome, tamanho):
+        gasto_ms = gasto_s * 1000
+        logger.warning("Orçamento de classificação excedido: %.0f ms > %.0f ms (%s '%s', %d caracteres)",
+                       gasto_ms, orcamento_s * 1000, tipo, nome, tamanho)
+        return Decisao(True, ORCAMENTO_EXCEDIDO, nome, "",
+                       f"[ENVIO DE EMAIL PARA ANALISE] Tempo limite da classificação excedido "
+                       f"({gasto_ms:.0f} ms, {tipo} '{nome}'). Enviado para análise manual.")
+
+    def _texto_longo_demais(self, tamanho):
+        logger.warning("Texto com %d caracteres acima do limite de %d: enviado para análise sem classificar",
+                       tamanho, TAMANHO_MAXIMO_TEXTO)
+        return Decisao(True, ORCAMENTO_EXCEDIDO, "", "",
+                       f"[ENVIO DE EMAIL PARA ANALISE] Texto com {tamanho} caracteres acima do limite "
+                       f"da classificação ({TAMANHO_MAXIMO_TEXTO}). Enviado para análise manual.")
+
+    def _decisao(self, camada, conceito, trecho):
+        if camada is self.prioritario:
+            return Decisao(True, PRIORITARIO, conceito, trecho,
+                           f"[ENVIO PRIORITÁRIO] {conceito} detectado (trecho: \"{trecho}\").")
+        if camada is self.palavras:
+            return Decisao(True, PALAVRA_CHAVE, conceito, trecho,
+                           f"[ENVIO PRIORITÁRIO] Palavra-chave '{conceito}' encontrada.")
+        if camada is self.bloqueio:
+            return Decisao(False, BLOQUEADO, conceito, trecho,
+                           f"[BLOQUEADO] Assunto impeditivo: '{conceito}' (trecho: \"{trecho}\").")
+        return Decisao(True, PADRAO, "", "",
+                       "[ENVIO DE EMAIL PARA ANALISE] Nenhuma palavra impeditiva encontrada.")
+
+
+# Construído uma vez no import
+CLASSIFICADOR = Classifier(
+    DICIONARIO_DE_ENVIO_PRIORITARIO,
+    DICIONARIO_DE_BLOQUEIO_REGEX,
+    PALAVRAS_DE_ENVIO_OBRIGATORIO,
+)
+
+
+def classificar(texto_normalizado: str, orcamento_s=None, estatisticas=None) -> Decisao:
+    """Atalho para o classificador padrão (regras deste módulo)."""
+    return CLASSIFICADOR.classificar(texto_normalizado, orcamento_s, estatisticas)
@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+Envio de e-mail por uma conexão SMTP reaproveitada durante a execução.
+
+Antes, cada e-mail (um por comunica encaminhado, mais o log final) abria uma
+conexão nova: TCP, EHLO, STARTTLS, EHLO, AUTH, envio e QUIT. O CorreioSMTP
+mantém uma conexão autenticada e a reaproveita:
+  - depois de INTERVALO_NOOP_S parado, manda um NOOP antes de usar a conexão
+    (o servidor pode ter derrubado a sessão ociosa); se não responder, reconecta;
+  - se o envio der SMTPServerDisconnected, reconecta e tenta de novo uma vez;
+  - depois de `max_mensagens` mensagens, troca de conexão (limite dos provedores).
+
+fechar() manda o QUIT; o main() chama no fim de cada execução.
+
+A FilaCorreio põe o envio numa thread separada: o loop principal enfileira o
+e-mail do comunica e segue para o próximo enquanto o SMTP responde. Com uma
+caixa de saída (caixa_saida.py), cada mensagem é gravada antes de entrar na
+fila e só sai de lá quando o servidor aceita.
+"""
+
+import queue
+import smtplib
+import threading
+import time
+
+SMTP_HOST_PADRAO = "smtp.gmail.com"
+SMTP_PORTA_PADRAO = 587
+
+# Mensagens por conexão antes de reconectar
+MAX_MENSAGENS_POR_CONEXAO = 50
+# Conexão parada há mais que isso é testada com NOOP antes do próximo envio
+INTERVALO_NOOP_S = 30
+TEMPO_LIMITE_SMTP_S = 30
+
+
+class CorreioSMTP:
+    """
+    Uma conexão SMTP autenticada reaproveitada entre os envios.
+
+    `criar_smtp(host, porta, timeout)` abre a conexão (padrão: smtplib.SMTP);
+    sem `usuario` o login é pulado, sem `starttls` a conexão fica sem TLS.
+    """
+
+    def __init__(self, host=SMTP_HOST_PADRAO, porta=SMTP_PORTA_PADRAO, usuario="", senha="", starttls=True,
+                 max_mensagens=MAX_MENSAGENS_POR_CONEXAO, intervalo_noop_s=INTERVALO_NOOP_S,
+                 tempo_limite_s=TEMPO_LIMITE_SMTP_S, registrar_log=print, criar_smtp=smtplib.SMTP):
+        self.host = host
+        self.porta = porta
+        self.usuario = usuario
+        self.senha = senha
+        self.starttls = starttls
+        self.max_mensagens = max(1, max_mensagens)
+        self.intervalo_noop_s = intervalo_noop_s
+        self.tempo_limite_s = tempo_limite_s
+        self.registrar_log = registrar_log
+        self.criar_smtp = criar_smtp
+        self._smtp = None
+        # A conexão é de uma thread por vez (fila de envio e alerta de falha)
+        self._trava = threading.Lock()
+        self._mensagens_na_conexao = 0
+        self._ultimo_uso = 0.0
+        # Estatísticas desde a criação
+        self.conexoes = 0
+        self.reconexoes = 0
+        self.mensagens = 0
+        self.tempo_conectando_s = 0.0
+
+    def enviar(self, remetente, destinatarios, mensagem):
+        """Envia a mensagem (str ou bytes) já montada; devolve os recusados (dict do sendmail)."""
+        with self._trava:
+            return self._enviar(remetente, destinatarios, mensagem)
+
+    def fechar(self):
+        """QUIT na conexão aberta (a próxima mensagem abre outra)."""
+        with self._trava:
+            self._fechar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    # --- conexão ---
+
+    def _enviar(self, remetente, destinatarios, mensagem):
+        smtp = self._conexao()
+        try:
+            recusados = smtp.sendmail(remetente, destinatarios, mensagem)
+        except smtplib.SMTPServerDisconnected as e:
+            self.registrar_log(f"[SMTP] Conexão caiu no envio ({e}). Reconectando...")
+            self._descartar()
+            self.reconexoes += 1
+            recusados = self._conexao().sendmail(remetente, destinatarios, mensagem)
+        self._mensagens_na_conexao += 1
+        self.mensagens += 1
+        self._ultimo_uso = time.monotonic()
+        return recusados
+
+    def _fechar(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+    def _conexao(self):
+        if self._smtp is not None and self._mensagens_na_conexao >= self.max_mensagens:
+            self._fechar()
+        if self._smtp is not None and time.monotonic() - self._ultimo_uso > self.intervalo_noop_s:
+            if not self._viva():
+                self.registrar_log("[SMTP] Conexão ociosa não responde ao NOOP. Reconectando...")
+                self._descartar()
+                self.reconexoes += 1
+        if self._smtp is None:
+            self._conectar()
+        return self._smtp
+
+    def _conectar(self):
+        inicio = time.perf_counter()
+        smtp = self.criar_smtp(self.host, self.porta, timeout=self.tempo_limite_s)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.usuario:
+                smtp.login(self.usuario, self.senha)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self._mensagens_na_conexao = 0
+        self._ultimo_uso = time.monotonic()
+        self.conexoes += 1
+        self.tempo_conectando_s += time.perf_counter() - inicio
+
+    def _viva(self):
+        try:
+            return self._smtp.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+
+    def _descartar(self):
+        smtp, self._smtp = self._smtp, None
+        try:
+            smtp.close()
+        except OSError:
+            pass
+
+
+# ==============================================================================
+# FILA DE ENVIO EM SEGUNDO PLANO
+# ==============================================================================
+
+# Mensagens esperando na fila antes de enfileirar() bloquear o loop principal
+TAMANHO_FILA_PADRAO = 100
+
+
+class FilaCorreio:
+    """
+    Envia as mensagens numa thread separada, para o loop de raspagem não esperar o SMTP.
+
+    enfileirar() volta na hora (só bloqueia com a fila cheia); a thread de envio
+    é criada no primeiro enfileirar() e usa o CorreioSMTP sozinha. encerrar()
+    espera a fila esvaziar, para a thread e devolve as estatísticas da execução.
+    Uma falha de envio não derruba a thread: vai para o log e para `falhas`.
+
+    Com `caixa_saida`, enfileirar() grava a mensagem nela antes; o envio aceito
+    a remove e a falha agenda nova tentativa (ou a manda para as mortas).
+    retomar_pendentes() põe na fila as que ficaram de execuções anteriores;
+    drenar() reenvia, dentro de um prazo, as que falharam na própria execução.
+    """
+
+    def __init__(self, correio, tamanho_maximo=TAMANHO_FILA_PADRAO, registrar_log=print, caixa_saida=None):
+        self.correio = correio
+        self.registrar_log = registrar_log
+        self.caixa_saida = caixa_saida
+        self._fila = queue.Queue(maxsize=max(1, tamanho_maximo))
+        self._thread = None
+        self._zerar()
+
+    def enfileirar(self, remetente, destinatarios, mensagem, descricao="", itens_resumo=()):
+        id_mensagem = None
+        if self.caixa_saida is not None:
+            id_mensagem = self.caixa_saida.guardar(remetente, destinatarios, mensagem, descricao, itens_resumo)
+        self._colocar(id_mensagem, remetente, destinatarios, mensagem, descricao)
+
+    def retomar_pendentes(self):
+        """Enfileira as mensagens da caixa de saída cuja espera já passou; devolve quantas."""
+        if self.caixa_saida is None:
+            return 0
+        pendentes = self.caixa_saida.pendentes()
+        for m in pendentes:
+            self._colocar(m.id, m.remetente, m.destinatarios, m.mensagem, m.descricao)
+        self.retomadas += len(pendentes)
+        return len(pendentes)
+
+    def drenar(self, prazo_s, dormir=time.sleep):
+        """
+        Até `prazo_s` segundos: espera a fila esvaziar e reenfileira as mensagens
+        da caixa de saída cuja próxima tentativa vence dentro do prazo (dormindo
+        até lá). Devolve quantas foram reenfileiradas.
+        """
+        if self.caixa_saida is None or prazo_s <= 0:
+            return 0
+        relogio = self.caixa_saida.relogio
+        limite = relogio() + prazo_s
+        reenfileiradas = 0
+        while True:
+            self.esvaziar()
+            proxima = self.caixa_saida.proxima_tentativa()
+            if proxima is None or proxima > limite:
+                return reenfileiradas
+            if proxima > relogio():
+                dormir(proxima - relogio())
+            reenfileiradas += self.retomar_pendentes()
+
+    def esvaziar(self):
+        """Espera todas as mensagens enfileiradas serem enviadas (ou falharem)."""
+        self._fila.join()
+
+    def encerrar(self):
+        """Esvazia a fila, para a thread de envio e devolve as estatísticas (zeradas em seguida)."""
+        if self._thread is not None:
+            self._fila.put(None)
+            self._thread.join()
+            self._thread = None
+        estatisticas = self.estatisticas()
+        self._zerar()
+        return estatisticas
+
+    def estatisticas(self):
+        latencias = sorted(self.latencias_s)
+        return {
+            "enviados": len(latencias),
+            "falhas": list(self.falhas),
+            "mortas": list(self.mortas),
+            "retomadas": self.retomadas,
+            "profundidade_maxima": self.profundidade_maxima,
+            "latencia_p50_s": latencias[len(latencias) // 2] if latencias else 0.0,
+            "latencia_max_s": latencias[-1] if latencias else 0.0,
+            "espera_max_s": self.espera_max_s,
+        }
+
+    def _zerar(self):
+        self.latencias_s = []
+        self.falhas = []
+        self.mortas = []
+        self.retomadas = 0
+        self.profundidade_maxima = 0
+        self.espera_max_s = 0.0
+
+    def _colocar(self, id_mensagem, remetente, destinatarios, mensagem, descricao):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._enviar_em_segundo_plano, name="fila-correio", daemon=True)
+            self._thread.start()
+        self._fila.put((time.monotonic(), id_mensagem, remetente, destinatarios, mensagem, descricao))
+        self.profundidade_maxima = max(self.profundidade_maxima, self._fila.qsize())
+
+    def _enviar_em_segundo_plano(self):
+        while True:
+            item = self._fila.get()
+            try:
+                if item is None:
+                    return
+                enfileirado_em, id_mensagem, remetente, destinatarios, mensagem, descricao = item
+                inicio = time.monotonic()
+                self.espera_max_s = max(self.espera_max_s, inicio - enfileirado_em)
+                try:
+                    self.correio.enviar(remetente, destinatarios, mensagem)
+                except Exception as e:
+                    self.falhas.append((descricao, str(e)))
+                    self.registrar_log(f"--> ERRO AO ENVIAR E-MAIL '{descricao}': {e}")
+                    if id_mensagem is not None and self.caixa_saida.falhou(id_mensagem, e):
+                        self.mortas.append(descricao)
+                else:
+                    self.latencias_s.append(time.monotonic() - inicio)
+                    if id_mensagem is not None:
+                        self.caixa_saida.concluir(id_mensagem)
+            finally:
+                self._fila.task_done()
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Fábrica dos navegadores do robô: Chromium headless no Linux (VPS/Docker), Edge no Windows.
+
+Abrir um navegador custa alguns segundos na VPS. A fábrica corta o que se repete:
+  - o sistema e as classes do Selenium são resolvidos uma vez, na importação;
+  - o caminho do driver/navegador (Chromium do sistema ou Selenium Manager) é
+    resolvido uma vez por processo e guardado em um JSON, para o próximo
+    processo não chamar o Selenium Manager de novo;
+  - preaquecer() abre um navegador em segundo plano (o agendador chama alguns
+    minutos antes do horário) e o próximo criar() o entrega pronto.
+
+Cada abertura é medida e registrada no log (`tempos_abertura`).
+"""
+
+import atexit
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options as OpcoesChrome
+from selenium.webdriver.chrome.service import Service as ServicoChrome
+from selenium.webdriver.common.selenium_manager import SeleniumManager
+from selenium.webdriver.edge.options import Options as OpcoesEdge
+from selenium.webdriver.edge.service import Service as ServicoEdge
+
+from perfil_navegador import aplicar_bloqueios, configurar_opcoes
+
+SISTEMA = platform.system()
+
+# Chromium e chromedriver instalados pelo Dockerfile
+CHROMIUM_DO_SISTEMA = "/usr/bin/chromium"
+CHROMEDRIVER_DO_SISTEMA = "/usr/bin/chromedriver"
+
+USER_AGENT_LINUX = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+                    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+
+ARGUMENTOS_HEADLESS = (
+    "--headless",
+    "--no-sandbox",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-blink-features=AutomationControlled",
+    f"--user-agent={USER_AGENT_LINUX}",
+)
+
+CACHE_RESOLUCAO_PADRAO = Path(tempfile.gettempdir()) / "siafe_drivers.json"
+
+
+class ConfiguracaoDriver(NamedTuple):
+    perfil: str = "completo"            # perfil de desempenho (perfil_navegador.PERFIS)
+    diretorio_perfil: str = ""          # --user-data-dir do navegador principal
+    diretorio_cache: str = ""           # cache em disco do perfil enxuto
+    cache_resolucao: str = ""           # JSON com os caminhos resolvidos (vazio: pasta temporária)
+
+# ==============================================================================
+# RESOLUÇÃO DOS BINÁRIOS (EM CACHE)
+# ==============================================================================
+
+_resolvidos = {}
+_trava_resolucao = threading.Lock()
+
+
+def _resolver(navegador):
+    """{driver_path, browser_path} do navegador ("chrome" ou "MicrosoftEdge")."""
+    if navegador == "chrome" and os.path.exists(CHROMEDRIVER_DO_SISTEMA) and os.path.exists(CHROMIUM_DO_SISTEMA):
+        return {"driver_path": CHROMEDRIVER_DO_SISTEMA, "browser_path": CHROMIUM_DO_SISTEMA}
+    caminhos = SeleniumManager().binary_paths(["--browser", navegador])
+    return {"driver_path": caminhos.get("driver_path", ""), "browser_path": caminhos.get("browser_path", "")}
+
+
+def _ler_cache(caminho):
+    try:
+        return json.loads(Path(caminho).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def resolver_binarios(navegador, cache_resolucao=""):
+    """Caminhos do driver e do navegador, resolvidos uma vez e guardados em `cache_resolucao`."""
+    with _trava_resolucao:
+        if navegador in _resolvidos:
+            return _resolvidos[navegador]
+
+        caminho_cache = cache_resolucao or CACHE_RESOLUCAO_PADRAO
+        cache = _ler_cache(caminho_cache)
+        caminhos = cache.get(navegador)
+        if not caminhos or not all(os.path.exists(c) for c in caminhos.values() if c):
+            caminhos = _resolver(navegador)
+            cache[navegador] = caminhos
+            try:
+                Path(caminho_cache).write_text(json.dumps(cache, indent=2), encoding="utf-8")
+            except OSError:
+                pass  # sem o arquivo, só este processo aproveita o cache
+
+        _resolvidos[navegador] = caminhos
+        return caminhos
+
+# ==============================================================================
+# FÁBRICA
+# ==============================================================================
+
+class FabricaDrivers:
+    """
+    `criar()` devolve o navegador principal (o pré-aquecido, se houver);
+    `criar(auxiliar=True)` abre um navegador extra sem o diretório de perfil,
+    que só pode estar aberto em um navegador por vez.
+    """
+
+    def __init__(self, configuracao=ConfiguracaoDriver(), registrar_log=print):
+        self.configuracao = configuracao
+        self.registrar_log = registrar_log
+        self.tempos_abertura = []
+        self._reserva = None
+        self._preaquecendo = None
+        self._trava = threading.Lock()
+        atexit.register(self.descartar_reserva)
+
+    def criar(self, auxiliar=False):
+        if not auxiliar:
+            preaquecendo = self._preaquecendo
+            if preaquecendo is not None:
+                preaquecendo.join()
+            with self._trava:
+                reserva, self._reserva = self._reserva, None
+            if reserva is not None and _vivo(reserva):
+                self.registrar_log("[DRIVER] Navegador pré-aquecido entregue sem espera.")
+                return reserva
+            if reserva is not None:
+                _fechar(reserva)
+
+        inicio = time.perf_counter()
+        driver = self._abrir(auxiliar)
+        duracao = time.perf_counter() - inicio
+        self.tempos_abertura.append(duracao)
+        self.registrar_log(f"[DRIVER] Navegador {'auxiliar ' if auxiliar else ''}aberto em {duracao:.1f} s "
+                           f"(perfil {self.configuracao.perfil}).")
+        return driver
+
+    def preaquecer(self):
+        """Abre o próximo navegador principal em segundo plano (False se já existe um)."""
+        with self._trava:
+            if self._reserva is not None or self._preaquecendo is not None:
+                return False
+            self._preaquecendo = threading.Thread(target=self._abrir_reserva, name="preaquecer-driver", daemon=True)
+            self._preaquecendo.start()
+        return True
+
+    def descartar_reserva(self):
+        with self._trava:
+            reserva, self._reserva = self._reserva, None
+        if reserva is not None:
+            _fechar(reserva)
+
+    def _abrir_reserva(self):
+        inicio = time.perf_counter()
+        try:
+            driver = self._abrir(auxiliar=False)
+        except Exception as e:
+            self.registrar_log(f"[DRIVER] Pré-aquecimento falhou ({e}). O navegador abre na hora.")
+            driver = None
+        else:
+            duracao = time.perf_counter() - inicio
+            self.tempos_abertura.append(duracao)
+            self.registrar_log(f"[DRIVER] Navegador pré-aquecido em {duracao:.1f} s.")
+        with self._trava:
+            self._reserva = driver
+            self._preaquecendo = None
+
+    def _abrir(self, auxiliar):
+        configuracao = self.configuracao
+        diretorio_perfil = "" if auxiliar else configuracao.diretorio_perfil
+
+        if SISTEMA == "Linux":
+            # Ambiente headless (VPS/Docker)
+            caminhos = resolver_binarios("chrome", configuracao.cache_resolucao)
+            opcoes = OpcoesChrome()
+            for argumento in ARGUMENTOS_HEADLESS:
+                opcoes.add_argument(argumento)
+            # Tamanho da janela, bloqueios e cache conforme o perfil
+            configurar_opcoes(opcoes, configuracao.perfil, configuracao.diretorio_cache)
+            if caminhos["browser_path"]:
+                opcoes.binary_location = caminhos["browser_path"]
+            servico, classe = ServicoChrome(caminhos["driver_path"] or None), webdriver.Chrome
+        else:
+            # Ambiente Windows (local)
+            caminhos = resolver_binarios("MicrosoftEdge", configuracao.cache_resolucao)
+            opcoes = OpcoesEdge()
+            if configuracao.perfil != "completo":  # Edge local abre com a janela padrão
+                configurar_opcoes(opcoes, configuracao.perfil, configuracao.diretorio_cache)
+            servico, classe = ServicoEdge(caminhos["driver_path"] or None), webdriver.Edge
+
+        # Perfil persistente (cookies/cache sobrevivem a um reinício do processo)
+        if diretorio_perfil:
+            opcoes.add_argument(f"--user-data-dir={diretorio_perfil}")
+
+        driver = classe(service=servico, options=opcoes)
+        # Imagens, fontes e analytics bloqueados pelo CDP (perfis "enxuto" e "minimo")
+        aplicar_bloqueios(driver, configuracao.perfil)
+        return driver
+
+
+def _vivo(driver):
+    try:
+        return driver.execute_script("return 1") == 1
+    except WebDriverException:
+        return False
+
+
+def _fechar(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Registro persistente (SQLite) dos comunicas já tratados.
+
+Sem ele, uma execução que cai no meio, ou um comunica que o SIAFE não marca
+como lido, faz a execução seguinte abrir, classificar e mandar por e-mail o
+mesmo comunica de novo. Cada comunica tratado fica guardado pelo número, com
+o hash do corpo, a decisão e a hora; antes de abrir um detalhe o robô consulta
+o número (uma busca na chave primária) e pula o que já foi tratado.
+
+O número vem da tela de detalhe; os modos que leem a lista antes só têm a
+chave da linha (texto do link na tabela). As duas costumam ser iguais, mas
+nada garante: a chave da linha é guardada junto (coluna `chave`) e a consulta
+pela lista (chave_processada) procura nas duas.
+
+O hash do corpo só é conferido onde o detalhe já foi lido antes da consulta:
+no modo de lista "recarregar" o robô abre sempre a primeira linha, e um
+comunica reaberto com o texto alterado é tratado de novo. Nos modos que leem a
+lista inteira antes (SIAFE_MODO_LISTA="snapshot", backends "paralelo" e
+"http") a consulta é só pela chave da linha, para não abrir o detalhe do que
+já foi tratado: um comunica reaberto com o mesmo número continua pulado. Para
+tratá-lo de novo, apague a linha dele em comunicas_processados.
+"""
+
+import hashlib
+import sqlite3
+from datetime import datetime
+from typing import NamedTuple
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS comunicas_processados (
+    numero        TEXT PRIMARY KEY,
+    hash_corpo    TEXT NOT NULL,
+    enviado       INTEGER NOT NULL,
+    categoria     TEXT NOT NULL,
+    conceito      TEXT NOT NULL,
+    processado_em TEXT NOT NULL,
+    chave         TEXT NOT NULL DEFAULT ''
+)
+"""
+INDICE_CHAVE = "CREATE INDEX IF NOT EXISTS comunicas_processados_chave ON comunicas_processados (chave)"
+
+
+class Registro(NamedTuple):
+    numero: str
+    hash_corpo: str
+    enviado: bool
+    categoria: str
+    conceito: str
+    processado_em: str
+    chave: str = ""
+
+
+def hash_do_corpo(texto):
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class EstadoComunicas:
+    """Comunicas já tratados, por número. `caminho` ":memory:" vale só para o processo."""
+
+    def __init__(self, caminho):
+        self.caminho = str(caminho)
+        self.conexao = sqlite3.connect(self.caminho)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute(ESQUEMA)
+        colunas = {linha[1] for linha in self.conexao.execute("PRAGMA table_info(comunicas_processados)")}
+        if "chave" not in colunas:  # registro de uma versão anterior
+            self.conexao.execute("ALTER TABLE comunicas_processados ADD COLUMN chave TEXT NOT NULL DEFAULT ''")
+        self.conexao.execute(INDICE_CHAVE)
+        self.conexao.commit()
+
+    def registro(self, numero):
+        """Registro do comunica, ou None se ele nunca foi tratado."""
+        linha = self.conexao.execute(
+            "SELECT numero, hash_corpo, enviado, categoria, conceito, processado_em, chave "
+            "FROM comunicas_processados WHERE numero = ?", (numero,)
+        ).fetchone()
+        return Registro(linha[0], linha[1], bool(linha[2]), *linha[3:]) if linha else None
+
+    def ja_processado(self, numero, texto=None):
+        """
+        True se o número já foi tratado. Com `texto`, só se o corpo também é o
+        mesmo; sem ele (lista lida antes do detalhe), vale só o número.
+        """
+        registro = self.registro(numero)
+        if registro is None:
+            return False
+        return texto is None or registro.hash_corpo == hash_do_corpo(texto)
+
+    def chave_processada(self, chave):
+        """
+        True se a linha da lista com essa chave já foi tratada: guardada com
+        essa chave ou, em registros sem chave, com esse número.
+        """
+        return self.conexao.execute(
+            "SELECT 1 FROM comunicas_processados WHERE chave = ? OR numero = ? LIMIT 1", (chave, chave)
+        ).fetchone() is not None
+
+    def registrar(self, comunica, decisao):
+        """
+        Guarda o comunica tratado (chamado depois da ação: e-mail enviado ou bloqueio),
+        com a chave da linha da lista de onde ele foi aberto, quando houver.
+        """
+        self.conexao.execute(
+            "INSERT OR REPLACE INTO comunicas_processados "
+            "(numero, hash_corpo, enviado, categoria, conceito, processado_em, chave) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (comunica.numero, hash_do_corpo(comunica.texto), int(decisao.enviar), decisao.categoria,
+             decisao.conceito, datetime.now().isoformat(timespec="seconds"), comunica.chave),
+        )
+        self.conexao.commit()
+
+    def __len__(self):
+        return self.conexao.execute("SELECT COUNT(*) FROM comunicas_processados").fetchone()[0]
+
+    def fechar(self):
+        self.conexao.close()
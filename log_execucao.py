@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Log da execução em eventos estruturados, renderizado em HTML à medida que
+acontece.
+
+Antes, o log era uma lista de strings que só crescia e, no fim, o
+formatar_log_para_html() passava cada linha por um re.search() e por várias
+buscas de substring ("[BLOQUEADO]", "[INFORMATIVO]"...) para descobrir como
+pintá-la, e juntava tudo numa string só. Agora quem registra diz o tipo do
+evento (e os campos: número do comunica, categoria da decisão), então a linha
+é renderizada na hora, sem regex nem varredura, e escrita num buffer que
+passa para um arquivo temporário quando cresce (SpooledTemporaryFile): a
+memória fica estável numa execução longa e o HTML do e-mail de log está
+pronto no instante em que o loop termina.
+
+Tipos de evento:
+  - TEXTO:       linha comum;
+  - LISTA:       início de uma verificação da lista (separador + título);
+  - COMUNICA:    início da análise de um comunica (`numero`, `assunto`; número destacado);
+  - DECISAO:     resultado da classificação (`categoria`; cor da categoria);
+  - INFORMATIVO: aviso (azul).
+"""
+
+import tempfile
+import threading
+from collections import Counter
+
+from classificador import BLOQUEADO, ORCAMENTO_EXCEDIDO, PADRAO, PALAVRA_CHAVE, PRIORITARIO
+from mensagens import Modelo
+
+TEXTO = "texto"
+LISTA = "lista"
+COMUNICA = "comunica"
+DECISAO = "decisao"
+INFORMATIVO = "informativo"
+
+# HTML guardado em memória antes de passar para o disco
+MEMORIA_MAXIMA_BYTES = 1024 * 1024
+
+VERMELHO, VERDE, AZUL, ROXO = "#d9534f", "#5cb85c", "#5bc0de", "#bc0ec7"
+CORES_DECISAO = {
+    BLOQUEADO: VERMELHO,
+    PADRAO: VERDE,
+    ORCAMENTO_EXCEDIDO: VERDE,
+    PRIORITARIO: ROXO,
+    PALAVRA_CHAVE: ROXO,
+}
+
+SEPARADOR = '<hr style="border: none; border-top: 1px dashed #ccc; margin: 20px 0;">'
+LINHA = Modelo("{mensagem}")
+LINHA_LISTA = Modelo("<h4>{mensagem}</h4>")
+LINHA_COLORIDA = Modelo('<div style="color: {cor}; font-weight: bold;">{mensagem}</div>')
+LINHA_COMUNICA = Modelo("--- Análise do Comunica ID '"
+                        '<b style="background-color: #fcf8e3; padding: 2px 5px; border-radius: 3px;">{numero}</b>'
+                        " - {assunto}' ---")
+
+
+class LogExecucao:
+    """
+    Log de uma execução. registrar() (ou chamar o objeto) imprime a mensagem
+    e grava a linha já em HTML; html() devolve o que foi gravado até agora.
+    Pode ser passado como `registrar_log` para quem só manda a mensagem, e
+    usado de várias threads (o pool de navegadores registra das threads dele).
+    """
+
+    def __init__(self, memoria_maxima=MEMORIA_MAXIMA_BYTES, saida=print):
+        self.saida = saida
+        self._buffer = tempfile.SpooledTemporaryFile(max_size=memoria_maxima, mode="w+", encoding="utf-8")
+        self._trava = threading.Lock()
+        self.contagem = Counter()
+        self.linhas = 0
+
+    def registrar(self, mensagem, tipo=TEXTO, **campos):
+        if self.saida is not None:
+            self.saida(mensagem)
+        mensagem = mensagem.strip()
+        if not mensagem:
+            return
+        with self._trava:
+            self.contagem[tipo] += 1
+            for linha in self._renderizar(mensagem, tipo, campos):
+                if self.linhas:
+                    self._buffer.write("<br>")
+                self._buffer.write(linha)
+                self.linhas += 1
+
+    __call__ = registrar
+
+    def html(self):
+        """HTML das linhas registradas até agora (linhas separadas por <br>)."""
+        with self._trava:
+            self._buffer.flush()
+            posicao = self._buffer.tell()
+            self._buffer.seek(0)
+            conteudo = self._buffer.read()
+            self._buffer.seek(posicao)
+        return conteudo
+
+    @property
+    def em_disco(self):
+        return self._buffer._rolled
+
+    def fechar(self):
+        self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def _renderizar(self, mensagem, tipo, campos):
+        if tipo == LISTA:
+            # Separador antes de cada verificação da lista, menos a primeira linha do log
+            return ([SEPARADOR] if self.linhas else []) + [LINHA_LISTA.preencher(mensagem=mensagem)]
+        if tipo == COMUNICA:
+            return [LINHA_COMUNICA.preencher(numero=campos["numero"], assunto=campos["assunto"])]
+        if tipo == DECISAO and campos.get("categoria") in CORES_DECISAO:
+            return [LINHA_COLORIDA.preencher(cor=CORES_DECISAO[campos["categoria"]], mensagem=mensagem)]
+        if tipo == INFORMATIVO:
+            return [LINHA_COLORIDA.preencher(cor=AZUL, mensagem=mensagem)]
+        return [LINHA.preencher(mensagem=mensagem)]
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Montagem dos e-mails: corpos a partir de modelos compilados e mensagem MIME
+UTF-8 com alternativa em texto puro.
+
+Antes, cada e-mail era um email.message.Message com o HTML em ISO-8859-1:
+qualquer caractere fora do Latin-1 (o 🛑 do assunto do alerta de falha, aspas
+curvas coladas num comunica) derrubava o envio ou virava lixo. Aqui:
+  - a mensagem é um EmailMessage (política SMTP) em UTF-8, multipart/alternative
+    com text/plain + text/html; o texto puro é tirado do próprio HTML (o do
+    comunica sai de um modelo de texto, sem passar pelo parser);
+  - a codificação de transferência de cada parte é escolhida pelo tamanho:
+    7bit se o texto é ASCII com linhas curtas, senão quoted-printable ou
+    base64, o que sair menor (QP gasta 3 bytes por byte não ASCII, base64
+    sempre 4/3);
+  - os corpos (comunica, resumo, log e falha) saem de modelos separados em
+    trechos fixos e campos uma vez só, no import; os campos são escapados,
+    exceto os terminados em `_html`, que já chegam prontos.
+"""
+
+import html
+import string
+from email.message import EmailMessage
+from email.policy import SMTP
+from html.parser import HTMLParser
+
+# Linha mais longa permitida em 7bit (RFC 5322)
+LINHA_MAXIMA_7BIT = 998
+
+# ==============================================================================
+# MODELOS DOS CORPOS
+# ==============================================================================
+
+class Modelo:
+    """
+    Modelo de corpo no formato do str.format, separado em trechos fixos e
+    campos uma vez só. preencher() escapa os campos, menos os `*_html`
+    (modelos de texto puro: `escapar=False`).
+    """
+
+    def __init__(self, texto, escapar=True):
+        self.partes = [(literal, campo) for literal, campo, _, _ in string.Formatter().parse(texto)]
+        self.campos = {campo for _, campo in self.partes if campo is not None}
+        self.escapar = escapar
+
+    def preencher(self, **valores):
+        saida = []
+        for literal, campo in self.partes:
+            saida.append(literal)
+            if campo is not None:
+                valor = str(valores[campo])
+                saida.append(html.escape(valor) if self.escapar and not campo.endswith("_html") else valor)
+        return "".join(saida)
+
+
+COMUNICA = Modelo("""
+<p>Prezados,</p>
+<p>Segue abaixo o comunica ({numero} - {assunto}) extraído da automação:</p>
+<div style="border: 1px solid #ccc; padding: 10px; font-family: monospace; background-color: #f9f9f9;">
+    {texto_html}
+</div>
+<p>---</p>
+<p>Este é um e-mail automático.</p>
+""")
+# Alternativa em texto puro do comunica (evita tirar o texto do HTML, o passo mais caro)
+COMUNICA_TEXTO = Modelo("""Prezados,
+
+Segue abaixo o comunica ({numero} - {assunto}) extraído da automação:
+
+{texto}
+
+---
+Este é um e-mail automático.
+""", escapar=False)
+
+RESUMO_CABECALHO = Modelo("""
+<div style="font-family: Arial, sans-serif; line-height: 1.5;">
+    <p>Prezados,</p>
+    <p>Seguem abaixo os comunicas ({quantidade}) extraídos da automação{parte}:</p>
+    <ul>{indice_html}</ul>
+""")
+RESUMO_ITEM = Modelo('<li><a href="#c{ancora}">{numero} - {assunto}</a></li>')
+RESUMO_SECAO = Modelo("""
+    <hr>
+    <h4 id="c{ancora}">{numero} - {assunto}</h4>
+    <p style="color: #555;">{motivo}</p>
+    <div style="border: 1px solid #ccc; padding: 10px; font-family: monospace; background-color: #f9f9f9;">
+        {texto_html}
+    </div>
+""")
+RESUMO_RODAPE = Modelo("""
+    <p>---</p>
+    <p>Este é um e-mail automático.</p>
+</div>
+""")
+
+LOG = Modelo("""
+<div style="font-family: Arial, sans-serif; line-height: 1.6;">
+    <h3>Log de Processamento do Robô</h3>
+    <p>Análise só com Palavras Chave</p>
+    <p>Execução finalizada em: {finalizado_em}</p>
+    <hr>
+    <div style="border: 1px solid #ddd; padding: 15px; border-radius: 5px; background-color: #f9f9f9;">
+        {log_html}
+    </div>
+    <hr>
+    <p>Este é um e-mail de resumo automático.</p>
+</div>
+""")
+
+FALHA = Modelo("""
+<div style="font-family:Arial, sans-serif; line-height:1.5">
+  <h3>🛑 Falha na Automação</h3>
+  <p><b>Host:</b> {host}</p>
+  <p><b>URL atual:</b> {url}</p>
+  <p><b>Erro:</b> <code>{erro}</code></p>
+  <p><b>Traceback:</b></p>
+  <pre style="white-space:pre-wrap">{traceback}</pre>
+  <hr>
+  <h4>Log parcial da execução</h4>
+  <div style="border:1px solid #ddd; padding:10px; background:#f9f9f9">{log_html}</div>
+</div>
+""")
+
+
+def texto_em_html(texto):
+    """Texto do comunica escapado, com as quebras de linha em <br>."""
+    return html.escape(texto).replace("\n", "<br>")
+
+
+def corpo_comunica(comunica):
+    return COMUNICA.preencher(numero=comunica.numero, assunto=comunica.assunto,
+                              texto_html=texto_em_html(comunica.texto))
+
+
+def texto_comunica(comunica):
+    return COMUNICA_TEXTO.preencher(numero=comunica.numero, assunto=comunica.assunto, texto=comunica.texto)
+
+
+def corpo_log(log_html, finalizado_em):
+    return LOG.preencher(log_html=log_html, finalizado_em=finalizado_em)
+
+
+def corpo_falha(host, url, erro, traceback, log_html):
+    return FALHA.preencher(host=host, url=url, erro=erro, traceback=traceback, log_html=log_html)
+
+# ==============================================================================
+# TEXTO PURO A PARTIR DO HTML
+# ==============================================================================
+
+# Tags que quebram linha no texto puro
+_BLOCOS = {"br", "p", "div", "h1", "h2", "h3", "h4", "h5", "h6", "li", "ul", "ol", "tr", "pre", "hr", "table"}
+
+
+class _ExtratorTexto(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.partes = []
+        self._ignorar = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("style", "script"):
+            self._ignorar += 1
+        elif tag == "hr":
+            self.partes.append("\n----\n")
+        elif tag == "li":
+            self.partes.append("\n- ")
+        elif tag in _BLOCOS:
+            self.partes.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("style", "script"):
+            self._ignorar = max(0, self._ignorar - 1)
+        elif tag in _BLOCOS:
+            self.partes.append("\n")
+
+    def handle_data(self, dados):
+        if not self._ignorar:
+            self.partes.append(dados)
+
+
+def texto_do_html(corpo_html):
+    """Versão em texto puro do corpo (alternativa text/plain do e-mail)."""
+    extrator = _ExtratorTexto()
+    extrator.feed(corpo_html)
+    extrator.close()
+    linhas = (" ".join(linha.split()) for linha in "".join(extrator.partes).splitlines())
+    texto, vazias = [], 0
+    for linha in linhas:
+        vazias = vazias + 1 if not linha else 0
+        if vazias <= 1:
+            texto.append(linha)
+    return "\n".join(texto).strip() + "\n"
+
+# ==============================================================================
+# MENSAGEM MIME
+# ==============================================================================
+
+def codificacao_de_transferencia(texto):
+    """7bit, quoted-printable ou base64: o que deixar a parte menor."""
+    dados = texto.encode("utf-8")
+    nao_ascii = len(dados) - len(texto.encode("ascii", "ignore"))
+    if not nao_ascii and max(map(len, texto.splitlines()), default=0) <= LINHA_MAXIMA_7BIT:
+        return "7bit"
+    # QP: 3 bytes por byte não ASCII ou "=", ~1 quebra suave a cada 76; base64: 4/3 (+ quebras)
+    tamanho_qp = len(dados) + 2 * (nao_ascii + dados.count(b"=")) + len(dados) // 75 * 2
+    tamanho_base64 = (len(dados) + 2) // 3 * 4 * 78 // 76
+    return "quoted-printable" if tamanho_qp <= tamanho_base64 else "base64"
+
+
+def montar_mensagem(remetente, destinatarios, assunto, corpo_html, texto=None):
+    """EmailMessage UTF-8 multipart/alternative (texto puro + HTML; sem `texto`, tirado do HTML)."""
+    if texto is None:
+        texto = texto_do_html(corpo_html)
+    msg = EmailMessage(policy=SMTP)
+    msg["Subject"] = assunto
+    msg["From"] = remetente
+    msg["To"] = ", ".join(destinatarios)
+    msg.set_content(texto, charset="utf-8", cte=codificacao_de_transferencia(texto))
+    msg.add_alternative(corpo_html, subtype="html", charset="utf-8", cte=codificacao_de_transferencia(corpo_html))
+    return msg
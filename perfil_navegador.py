@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Perfis de desempenho do navegador do robô.
+
+  "completo" - como sempre foi: baixa todos os recursos do SIAFE e renderiza em 1920x1080;
+  "enxuto"   - bloqueia imagens, fontes e analytics (CDP Network.setBlockedURLs), desliga
+               extensões, rede em segundo plano e atualização de componentes, usa o
+               carregamento "eager" (DOMContentLoaded) e um cache em disco que fica
+               quente entre as execuções;
+  "minimo"   - o "enxuto" bloqueando também as folhas de estilo. O ADF usa CSS para
+               esconder painéis e popups, então só vale depois de conferir a tela.
+
+As esperas do robô não dependem do evento load (aguardar_adf_ocioso olha o
+estado do ADF), por isso o carregamento "eager" é seguro.
+
+Também tem as medidas usadas no benchmark: tempo de carregamento da página
+(Navigation Timing) e memória residente (RSS) do navegador e dos processos filhos.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+PERFIS = ("completo", "enxuto", "minimo")
+
+TAMANHO_JANELA_COMPLETO = "1920,1080"
+TAMANHO_JANELA_ENXUTO = "1280,800"
+
+ARGUMENTOS_ENXUTO = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--mute-audio",
+)
+
+BLOQUEIO_IMAGENS = ("*.png", "*.jpg", "*.jpeg", "*.gif", "*.svg", "*.ico", "*.webp", "*.bmp")
+BLOQUEIO_FONTES = ("*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot")
+BLOQUEIO_TERCEIROS = (
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*hotjar.com*",
+    "*facebook.net*",
+    "*clarity.ms*",
+)
+BLOQUEIO_CSS = ("*.css",)
+
+# Cache em disco usado quando o perfil enxuto não recebe um diretório
+DIRETORIO_CACHE_PADRAO = Path(tempfile.gettempdir()) / "siafe_cache_navegador"
+
+# Navigation Timing da página atual (ms desde o início da navegação)
+SCRIPT_TEMPO_CARREGAMENTO = """
+var n = performance.getEntriesByType('navigation')[0];
+if (!n) { return null; }
+return {dom_pronto: n.domContentLoadedEventEnd, carregada: n.loadEventEnd,
+        recursos: performance.getEntriesByType('resource').length,
+        bytes: n.transferSize + performance.getEntriesByType('resource')
+                   .reduce(function (t, r) { return t + (r.transferSize || 0); }, 0)};
+"""
+
+
+def padroes_bloqueados(perfil):
+    """Padrões de URL bloqueados no perfil (vazio no "completo")."""
+    if perfil == "completo":
+        return []
+    padroes = [*BLOQUEIO_IMAGENS, *BLOQUEIO_FONTES, *BLOQUEIO_TERCEIROS]
+    if perfil == "minimo":
+        padroes.extend(BLOQUEIO_CSS)
+    return padroes
+
+
+def configurar_opcoes(opcoes, perfil, diretorio_cache=""):
+    """Acrescenta às options do Chromium/Edge os argumentos do perfil."""
+    if perfil not in PERFIS:
+        raise ValueError(f"Perfil de navegador desconhecido: {perfil!r} (use {', '.join(PERFIS)})")
+    if perfil == "completo":
+        opcoes.add_argument(f"--window-size={TAMANHO_JANELA_COMPLETO}")
+        return opcoes
+
+    opcoes.add_argument(f"--window-size={TAMANHO_JANELA_ENXUTO}")
+    for argumento in ARGUMENTOS_ENXUTO:
+        opcoes.add_argument(argumento)
+    opcoes.add_argument(f"--disk-cache-dir={diretorio_cache or DIRETORIO_CACHE_PADRAO}")
+    opcoes.page_load_strategy = "eager"
+    return opcoes
+
+
+def aplicar_bloqueios(driver, perfil):
+    """Liga o bloqueio de URLs do perfil pelo CDP (vale para todas as páginas do driver)."""
+    padroes = padroes_bloqueados(perfil)
+    if not padroes:
+        return
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": padroes})
+
+# ==============================================================================
+# MEDIDAS
+# ==============================================================================
+
+def tempo_de_carregamento(driver):
+    """{dom_pronto, carregada (ms), recursos, bytes} da página atual, ou None."""
+    return driver.execute_script(SCRIPT_TEMPO_CARREGAMENTO)
+
+
+def _filhos(pid):
+    """PIDs dos filhos diretos (Linux, /proc)."""
+    filhos = []
+    for tarefa in Path(f"/proc/{pid}/task").glob("*/children"):
+        try:
+            filhos.extend(int(p) for p in tarefa.read_text().split())
+        except OSError:
+            pass
+    return filhos
+
+
+def _rss_kb(pid):
+    try:
+        for linha in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if linha.startswith("VmRSS:"):
+                return int(linha.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def rss_da_arvore_mb(pid):
+    """RSS (MB) do processo e de todos os descendentes; 0 fora do Linux."""
+    if not os.path.isdir("/proc"):
+        return 0.0
+    total_kb, pendentes, vistos = 0, [pid], set()
+    while pendentes:
+        atual = pendentes.pop()
+        if atual in vistos:
+            continue
+        vistos.add(atual)
+        total_kb += _rss_kb(atual)
+        pendentes.extend(_filhos(atual))
+    return total_kb / 1024
+
+
+def rss_do_navegador_mb(driver):
+    """RSS (MB) do chromedriver/msedgedriver e dos navegadores que ele abriu."""
+    processo = getattr(getattr(driver, "service", None), "process", None)
+    return rss_da_arvore_mb(processo.pid) if processo is not None else 0.0
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Pool de navegadores auxiliares para ler o detalhe de vários comunicas ao mesmo tempo.
+
+A etapa de listagem coloca as chaves dos comunicas em uma fila; cada
+trabalhador (uma thread com o seu próprio navegador, logado com os cookies da
+sessão principal) tira uma chave, abre o detalhe e devolve o Comunica em uma
+fila de resultados. Quem consome (classificação e e-mail) recebe os resultados
+na ordem em que ficam prontos, enquanto os outros detalhes ainda carregam.
+
+O tamanho do pool é pequeno de propósito (2 a 3 navegadores) para não
+sobrecarregar o SIAFE.
+"""
+
+import queue
+import threading
+from typing import NamedTuple
+
+TAMANHO_PADRAO = 2
+TAMANHO_MAXIMO = 4
+
+_FIM = object()
+
+
+class Resultado(NamedTuple):
+    chave: str
+    comunica: object    # Comunica, ou None quando houve erro
+    erro: object        # Exception, ou None
+
+
+class PoolNavegadores:
+    """
+    `abrir(indice)` prepara um trabalhador (navegador logado na lista filtrada) e
+    devolve o seu contexto; `ler(contexto, chave)` devolve o Comunica da chave;
+    `fechar(contexto)` encerra o navegador no fim.
+    """
+
+    def __init__(self, abrir, ler, fechar, tamanho=TAMANHO_PADRAO, registrar_log=print):
+        self.abrir = abrir
+        self.ler = ler
+        self.fechar = fechar
+        self.tamanho = max(1, min(tamanho, TAMANHO_MAXIMO))
+        self.registrar_log = registrar_log
+
+    def processar(self, chaves):
+        """Gera um Resultado por chave, na ordem em que os detalhes ficam prontos."""
+        fila = queue.Queue()
+        resultados = queue.Queue()
+        parar = threading.Event()
+
+        chaves = list(chaves)
+        for chave in chaves:
+            fila.put(chave)
+        quantidade = min(self.tamanho, len(chaves))
+        for _ in range(quantidade):
+            fila.put(_FIM)
+
+        trabalhadores = [
+            threading.Thread(target=self._trabalhar, args=(indice, fila, resultados, parar),
+                             name=f"navegador-{indice}", daemon=True)
+            for indice in range(quantidade)
+        ]
+        for trabalhador in trabalhadores:
+            trabalhador.start()
+
+        try:
+            ativos = quantidade
+            while ativos:
+                resultado = resultados.get()
+                if resultado is _FIM:
+                    ativos -= 1
+                else:
+                    yield resultado
+
+            # Nenhum trabalhador conseguiu abrir: as chaves que sobraram voltam como erro
+            while True:
+                try:
+                    chave = fila.get_nowait()
+                except queue.Empty:
+                    break
+                if chave is not _FIM:
+                    yield Resultado(chave, None, RuntimeError("Nenhum navegador auxiliar disponível"))
+        finally:
+            parar.set()
+            for trabalhador in trabalhadores:
+                trabalhador.join()
+
+    def _trabalhar(self, indice, fila, resultados, parar):
+        try:
+            contexto = self.abrir(indice)
+        except Exception as e:
+            self.registrar_log(f"[POOL] Navegador auxiliar {indice + 1} não abriu: {e}")
+            resultados.put(_FIM)
+            return
+
+        try:
+            while not parar.is_set():
+                chave = fila.get()
+                if chave is _FIM:
+                    break
+                try:
+                    resultados.put(Resultado(chave, self.ler(contexto, chave), None))
+                except Exception as e:
+                    resultados.put(Resultado(chave, None, e))
+        finally:
+            try:
+                self.fechar(contexto)
+            except Exception as e:
+                self.registrar_log(f"[POOL] Erro ao fechar navegador auxiliar {indice + 1}: {e}")
+            resultados.put(_FIM)
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+Modo de envio dos comunicas encaminhados: um e-mail por comunica, um resumo
+com todos da execução, ou misto.
+
+Em dia cheio, um e-mail por comunica (mais o log) são dezenas de mensagens
+por execução e esbarram no limite de envio do Gmail. Com o resumo, os
+comunicas encaminhados são juntados em poucos e-mails:
+  - individual: um e-mail por comunica (como antes);
+  - resumo:     todos no resumo;
+  - hibrido:    os prioritários (DICIONARIO_DE_ENVIO_PRIORITARIO) saem na hora,
+                o resto vai no resumo.
+Cada e-mail de resumo tem no máximo `tamanho_maximo` bytes de HTML: ao passar
+do limite a parte é fechada (e enviada) e outra começa. O padrão fica abaixo
+dos ~102 KB a partir dos quais o Gmail corta a mensagem. Cada comunica é
+gravado na caixa de saída ao entrar na parte em aberto (ver caixa_saida.py),
+então uma queda no meio da execução não perde o que ainda não tinha e-mail.
+"""
+
+import time
+from typing import NamedTuple
+
+from classificador import PRIORITARIO
+from mensagens import RESUMO_CABECALHO, RESUMO_ITEM, RESUMO_RODAPE, RESUMO_SECAO, texto_em_html
+
+MODOS_ENVIO = ("individual", "resumo", "hibrido")
+MODO_ENVIO_PADRAO = "individual"
+TAMANHO_MAXIMO_RESUMO_KB = 90
+
+# Categorias que no modo híbrido não esperam o resumo
+CATEGORIAS_IMEDIATAS = frozenset({PRIORITARIO})
+
+# Cabeçalho e rodapé entram na conta do tamanho de cada parte
+TAMANHO_ESTRUTURA = len((RESUMO_CABECALHO.preencher(quantidade=0, parte="", indice_html="")
+                         + RESUMO_RODAPE.preencher()).encode("utf-8"))
+
+
+class ParteResumo(NamedTuple):
+    assunto: str
+    corpo_html: str
+    itens: tuple        # ids (caixa de saída) dos comunicas desta parte
+
+
+def envio_imediato(modo, decisao):
+    """True se o comunica encaminhado sai no próprio e-mail; False se vai para o resumo."""
+    if modo == "resumo":
+        return False
+    if modo == "hibrido":
+        return decisao.categoria in CATEGORIAS_IMEDIATAS
+    return True
+
+
+class Resumo:
+    """
+    Junta os comunicas encaminhados em e-mails de até `tamanho_maximo` bytes.
+
+    adicionar() devolve as partes fechadas por aquele comunica (nenhuma ou uma)
+    e fechar() a parte em aberto; cada parte é uma ParteResumo, com os
+    `id_item` dos comunicas que ela leva. Um comunica maior que o limite
+    sozinho vai numa parte só dele.
+    """
+
+    def __init__(self, tamanho_maximo, data=None):
+        self.tamanho_maximo = tamanho_maximo
+        self.data = data or time.strftime("%d/%m/%Y")
+        self._secoes = []
+        self._indice = []
+        self._itens = []
+        self._tamanho = TAMANHO_ESTRUTURA
+        self.partes = 0
+        self.comunicas = 0
+
+    def adicionar(self, comunica, decisao, id_item=None):
+        ancora = self.comunicas
+        secao = RESUMO_SECAO.preencher(ancora=ancora, numero=comunica.numero, assunto=comunica.assunto,
+                                       motivo=decisao.motivo, texto_html=texto_em_html(comunica.texto))
+        item = RESUMO_ITEM.preencher(ancora=ancora, numero=comunica.numero, assunto=comunica.assunto)
+        tamanho = len(secao.encode("utf-8")) + len(item.encode("utf-8"))
+        fechadas = []
+        if self._secoes and self._tamanho + tamanho > self.tamanho_maximo:
+            fechadas.append(self._fechar_parte(continua=True))
+        self._secoes.append(secao)
+        self._indice.append(item)
+        if id_item is not None:
+            self._itens.append(id_item)
+        self._tamanho += tamanho
+        self.comunicas += 1
+        return fechadas
+
+    def fechar(self):
+        """Parte em aberto (lista vazia se não sobrou comunica)."""
+        return [self._fechar_parte(continua=False)] if self._secoes else []
+
+    def _fechar_parte(self, continua):
+        self.partes += 1
+        quantidade = len(self._secoes)
+        # Numeradas só quando o resumo da execução passou de um e-mail
+        sufixo = f" (parte {self.partes})" if continua or self.partes > 1 else ""
+        corpo = (RESUMO_CABECALHO.preencher(quantidade=quantidade, parte=sufixo, indice_html="".join(self._indice))
+                 + "".join(self._secoes) + RESUMO_RODAPE.preencher())
+        assunto = f"Resumo de {quantidade} Comunica(s) Processado(s) Automaticamente - {self.data}{sufixo}"
+        parte = ParteResumo(assunto, corpo, tuple(self._itens))
+        self._secoes, self._indice, self._itens, self._tamanho = [], [], [], TAMANHO_ESTRUTURA
+        return parte
@@ -16,8 +16,8 @@ import schedule
 # pip install holidays
 import holidays
 
-# Importar a função main do scraper
-from automacao_por_palavra import main
+# Importar a função main do scraper (e o navegador pré-aquecido antes de cada horário)
+from automacao_por_palavra import FABRICA_DRIVERS, SESSAO_SIAFE, SIAFE_PREAQUECER_S, main
 
 # ====================== Configurações ======================
 
@@ -130,6 +130,22 @@ def run_scraper():
         logger.error(f"💥 ERRO no scheduler: {e}", exc_info=True)
         logger.error("=" * 60)
 
+def preaquecer_navegador():
+    """
+    Abre o navegador em segundo plano pouco antes do próximo horário, quando não
+    há um navegador mantido da execução anterior (falha ou SIAFE_MANTER_SESSAO=0).
+    """
+    if SIAFE_PREAQUECER_S <= 0 or SESSAO_SIAFE.driver is not None:
+        return
+    segundos = schedule.idle_seconds()
+    if segundos is None or segundos > SIAFE_PREAQUECER_S:
+        return
+    hoje = datetime.now(TZ).date()
+    if eh_fim_de_semana(hoje) or eh_feriado(hoje):
+        return
+    if FABRICA_DRIVERS.preaquecer():
+        logger.info(f"🔥 Pré-aquecendo o navegador ({segundos:.0f} s para a próxima execução).")
+
 # ====================== Agendamentos ======================
 
 # IMPORTANTE: 'schedule' usa o timezone do processo/SO.
@@ -159,6 +175,7 @@ logger.info("=" * 60)
 try:
     while True:
         schedule.run_pending()
+        preaquecer_navegador()
         time.sleep(60)  # Verifica a cada 1 minuto
 except KeyboardInterrupt:
     logger.info("Scheduler encerrado pelo usuário")
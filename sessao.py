@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Sessão do SIAFE reaproveitada entre as execuções do agendador.
+
+O scheduler.py chama main() várias vezes ao dia no mesmo processo. Em vez de
+abrir um navegador e logar a cada execução, o navegador logado fica aberto e,
+na execução seguinte:
+  1. navegador vivo?  -> um execute_script simples responde;
+  2. sessão válida?   -> volta para a página inicial pós-login e procura o link
+                         de comunicas (a tela de login indica sessão expirada);
+  3. só então abre outro navegador e/ou faz o login de novo.
+
+Depois de uma falha o navegador é descartado, para a próxima execução começar limpa.
+
+abrir_navegador_adicional() cria outro navegador já logado com os cookies da
+sessão (usado pelos navegadores auxiliares do pool de detalhes).
+"""
+
+import atexit
+import time
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+
+from siafe import aguardar_adf_ocioso
+
+# Elemento que só existe na página inicial de um usuário logado
+ID_LINK_COMUNICAS = "pt1:itLinks:1:j_id__ctru33"
+
+# Campos de get_cookies() aceitos de volta por add_cookie
+CAMPOS_COOKIE = ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")
+
+
+class SessaoSiafe:
+    """
+    Guarda o navegador logado entre execuções.
+
+    `criar_driver()` abre um navegador novo; `entrar(driver)` faz o login e deixa
+    o navegador na página inicial (cuja URL é guardada para a verificação).
+    `criar_driver_adicional()` abre os navegadores extras (padrão: `criar_driver`).
+    """
+
+    def __init__(self, criar_driver, entrar, limite_s, manter_aberta=True, criar_driver_adicional=None):
+        self.criar_driver = criar_driver
+        self.criar_driver_adicional = criar_driver_adicional or criar_driver
+        self.entrar = entrar
+        self.limite_s = limite_s
+        self.manter_aberta = manter_aberta
+        self.driver = None
+        self.url_inicial = None
+        self.logins = 0
+        self.reaproveitamentos = 0
+        atexit.register(self._encerrar_ao_sair)
+
+    def obter(self, registrar_log=print):
+        """Navegador logado na página inicial do SIAFE (reaproveitado quando possível)."""
+        inicio = time.perf_counter()
+
+        if self.driver is not None and not self._vivo():
+            registrar_log("[SESSÃO] Navegador da execução anterior não responde. Abrindo outro.")
+            self._encerrar_ao_sair()
+
+        if self.driver is not None:
+            if self._logado():
+                self.reaproveitamentos += 1
+                registrar_log(f"[SESSÃO] Sessão do SIAFE reaproveitada em {time.perf_counter() - inicio:.1f} s.")
+                return self.driver
+            registrar_log("[SESSÃO] Sessão do SIAFE expirada. Fazendo login novamente.")
+        else:
+            self.driver = self.criar_driver()
+
+        self.entrar(self.driver)
+        self.url_inicial = self.driver.current_url
+        self.logins += 1
+        registrar_log(f"[SESSÃO] Login no SIAFE concluído em {time.perf_counter() - inicio:.1f} s.")
+        return self.driver
+
+    def abrir_navegador_adicional(self, cookies=None):
+        """
+        Outro navegador na página inicial, logado com os cookies do navegador principal.
+        Em threads, passe `cookies` lidos antes (o driver principal não é compartilhado).
+        """
+        if self.driver is None or not self.url_inicial:
+            raise RuntimeError("Sessão do SIAFE ainda não foi aberta")
+        partes = urlsplit(self.url_inicial)
+        if cookies is None:
+            cookies = self.driver.get_cookies()
+
+        driver = self.criar_driver_adicional()
+        try:
+            # add_cookie só aceita cookies do domínio da página aberta
+            driver.get(f"{partes.scheme}://{partes.netloc}/")
+            for cookie in cookies:
+                driver.add_cookie({k: v for k, v in cookie.items() if k in CAMPOS_COOKIE})
+            driver.get(self.url_inicial)
+            aguardar_adf_ocioso(driver, self.limite_s)
+            if not driver.find_elements(By.ID, ID_LINK_COMUNICAS):
+                raise RuntimeError("Navegador adicional não herdou a sessão do SIAFE")
+        except Exception:
+            driver.quit()
+            raise
+        return driver
+
+    def liberar(self, falhou=False, registrar_log=print):
+        """Fim de uma execução: mantém o navegador para a próxima ou o fecha (falha/desligado)."""
+        if self.driver is None:
+            return
+        if self.manter_aberta and not falhou:
+            registrar_log("Navegador mantido aberto para a próxima execução.")
+            return
+        try:
+            self.encerrar()
+            registrar_log("Navegador fechado.")
+        except Exception as e:
+            registrar_log(f"Erro ao fechar navegador: {e}")
+
+    def encerrar(self):
+        driver, self.driver, self.url_inicial = self.driver, None, None
+        if driver is not None:
+            driver.quit()
+
+    def _encerrar_ao_sair(self):
+        try:
+            self.encerrar()
+        except Exception:
+            pass
+
+    def _vivo(self):
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except WebDriverException:
+            return False
+
+    def _logado(self):
+        if not self.url_inicial:
+            return False
+        try:
+            self.driver.get(self.url_inicial)
+            aguardar_adf_ocioso(self.driver, self.limite_s)
+            return bool(self.driver.find_elements(By.ID, ID_LINK_COMUNICAS))
+        except WebDriverException:  # inclui TimeoutException
+            return False
@@ -0,0 +1,459 @@
+# -*- coding: utf-8 -*-
+"""
+Funções de apoio do Selenium para as telas do SIAFE-Rio (Oracle ADF).
+
+Esperas por estado observável da página no lugar de time.sleep fixos:
+  - aguardar_adf_ocioso: sem requisição parcial (PPR) pendente nem tela bloqueada;
+  - aguardar_navegacao: o elemento clicado saiu da página e a nova está ociosa;
+  - aguardar_texto_diferente: o texto de um campo mudou (ex.: ID do comunica);
+  - aguardar_contagem_estavel: a quantidade de linhas da tabela parou de mudar.
+
+Todas recebem o limite superior em segundos e lançam TimeoutException quando
+ele é atingido, como o WebDriverWait.
+
+Extração do detalhe do comunica em uma única ida ao navegador: um
+execute_script devolve o HTML do ID, do assunto e do corpo (iframe), que é
+convertido em texto localmente (html.parser) e vira um registro Comunica.
+
+Leitura da lista filtrada de uma vez (listar_comunicas): chave, assunto e
+remetente de todas as linhas, junto com o elemento clicável de cada uma;
+localizar_linha reencontra uma linha pela chave depois que a tabela é redesenhada.
+
+Filtro salvo: depois do filtro montado pelos widgets, capturar_filtro guarda o
+valor de cada componente ADF do filtro; nas execuções seguintes
+aplicar_filtro_salvo reaplica tudo em um único execute_async_script.
+"""
+
+import json
+import re
+import unicodedata
+from html.parser import HTMLParser
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from selenium.common.exceptions import StaleElementReferenceException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Intervalo entre verificações (s)
+INTERVALO_VERIFICACAO = 0.25
+
+# Leituras consecutivas iguais para considerar a contagem de linhas estável
+LEITURAS_ESTAVEIS = 3
+
+# ADF Faces: página carregada, sem PPR pendente e sem o "glass pane" que bloqueia a tela.
+# Fora de páginas ADF (ex.: login.jsp) só o readyState conta.
+SCRIPT_ADF_OCIOSO = """
+if (document.readyState !== 'complete') return false;
+if (typeof AdfPage !== 'undefined' && AdfPage.PAGE
+        && AdfPage.PAGE.isSynchronizedWithServer && !AdfPage.PAGE.isSynchronizedWithServer()) return false;
+var vidros = document.getElementsByClassName('AFBlockingGlassPane');
+for (var i = 0; i < vidros.length; i++) {
+    if (vidros[i].offsetWidth || vidros[i].offsetHeight) return false;
+}
+return true;
+"""
+
+
+def _esperar(driver, limite_s):
+    return WebDriverWait(driver, limite_s, poll_frequency=INTERVALO_VERIFICACAO,
+                         ignored_exceptions=(StaleElementReferenceException,))
+
+
+def adf_ocioso(driver):
+    """True quando a página terminou de carregar e não há PPR pendente."""
+    try:
+        return bool(driver.execute_script(SCRIPT_ADF_OCIOSO))
+    except WebDriverException:
+        # Navegação em andamento (documento sendo trocado): ainda não está ociosa
+        return False
+
+
+def aguardar_adf_ocioso(driver, limite_s):
+    _esperar(driver, limite_s).until(adf_ocioso, "A página do SIAFE não ficou ociosa")
+
+
+def aguardar_navegacao(driver, elemento_antigo, limite_s):
+    """Espera o elemento clicado sair do DOM (nova página) e a nova página ficar ociosa."""
+    _esperar(driver, limite_s).until(EC.staleness_of(elemento_antigo), "A página não foi trocada")
+    aguardar_adf_ocioso(driver, limite_s)
+
+
+def aguardar_texto_diferente(driver, localizador, texto_anterior, limite_s):
+    """
+    Espera o elemento ficar visível com texto não vazio e diferente de
+    `texto_anterior` e devolve o novo texto (já sem espaços nas pontas).
+    """
+    def texto_novo(drv):
+        elemento = drv.find_element(*localizador)
+        if not elemento.is_displayed():
+            return False
+        texto = elemento.text.strip()
+        return texto if texto and texto != texto_anterior else False
+
+    return _esperar(driver, limite_s).until(
+        texto_novo, f"O texto de {localizador[1]} não mudou de {texto_anterior!r}"
+    )
+
+
+def aguardar_contagem_estavel(driver, localizador, limite_s, leituras=LEITURAS_ESTAVEIS):
+    """
+    Espera a página ficar ociosa e a quantidade de elementos de `localizador`
+    se repetir em `leituras` verificações seguidas. Devolve a lista de elementos
+    da última leitura (pode ser vazia).
+    """
+    historico = []
+
+    def contagem_estavel(drv):
+        if not adf_ocioso(drv):
+            historico.clear()
+            return False
+        elementos = drv.find_elements(*localizador)
+        historico.append(len(elementos))
+        if len(historico) >= leituras and len(set(historico[-leituras:])) == 1:
+            return (elementos,)  # tupla: lista vazia também encerra a espera
+        return False
+
+    (elementos,) = _esperar(driver, limite_s).until(
+        contagem_estavel, f"A quantidade de {localizador[1]} não estabilizou"
+    )
+    return elementos
+
+
+# ==============================================================================
+# SNAPSHOT DO DETALHE DO COMUNICA
+# ==============================================================================
+
+ID_CAMPO_NUMERO = "pt1:m1:itxIdentificador::content"
+ID_CAMPO_ASSUNTO = "pt1:m1:txtSubject::content"
+INDICE_IFRAME_CORPO = 2  # mesmo índice do antigo frame_to_be_available_and_switch_to_it(2)
+
+
+class Comunica(NamedTuple):
+    numero: str
+    assunto: str
+    texto: str
+    remetente: str = ""    # da linha da lista, quando ela foi lida
+    chave: str = ""        # chave da linha da lista de onde foi aberto (LinhaComunica.chave)
+
+
+# Um round trip: HTML dos campos e do corpo (documento do iframe, ou o srcdoc
+# quando o documento não está acessível). null enquanto a tela não está pronta,
+# inclusive com o iframe ainda em about:blank ou com o corpo vazio (o ID do
+# comunica muda antes de o iframe carregar o documento novo).
+SCRIPT_DETALHE_COMUNICA = """
+var numero = document.getElementById(arguments[0]);
+var assunto = document.getElementById(arguments[1]);
+if (!numero || !assunto || document.readyState !== 'complete') return null;
+var corpo = null;
+try {
+    var doc = window.frames[arguments[2]].document;
+    if (doc.readyState === 'complete' && doc.body && doc.location.href !== 'about:blank') corpo = doc.body.innerHTML;
+} catch (e) {
+    try { corpo = window.frames[arguments[2]].frameElement.getAttribute('srcdoc'); } catch (e2) {}
+}
+if (!corpo || !corpo.trim()) return null;
+return {numero: numero.innerHTML, assunto: assunto.innerHTML, corpo: corpo};
+"""
+
+# Elementos que quebram linha no texto renderizado e elementos sem texto visível
+_BLOCOS = frozenset(
+    "address article aside blockquote br dd div dl dt fieldset figcaption figure footer form "
+    "h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section table tbody thead tfoot tr ul".split()
+)
+_CELULAS = frozenset(("td", "th"))
+_INVISIVEIS = frozenset(("head", "noscript", "script", "style", "template", "title"))
+_ESPACOS = re.compile(r"[ \t\r\n\f\xa0]+")
+
+
+class _ExtratorTexto(HTMLParser):
+    """Texto aproximado do que o Selenium devolve em `.text` (linhas sem espaços nas pontas)."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.partes = []
+        self._invisivel = 0
+        self._pre = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in _INVISIVEIS:
+            self._invisivel += 1
+        elif tag in _BLOCOS:
+            self.partes.append("\n")
+            self._pre += tag == "pre"
+        elif tag in _CELULAS:
+            self.partes.append(" ")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in _BLOCOS:
+            self.partes.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in _INVISIVEIS:
+            self._invisivel = max(0, self._invisivel - 1)
+        elif tag in _BLOCOS:
+            self.partes.append("\n")
+            if tag == "pre":
+                self._pre = max(0, self._pre - 1)
+
+    def handle_data(self, data):
+        if self._invisivel:
+            return
+        if self._pre:
+            self.partes.append(data.replace("\xa0", " "))
+        else:
+            self.partes.append(_ESPACOS.sub(" ", data))
+
+
+def html_para_texto(fragmento):
+    """Converte um fragmento HTML em texto: uma linha por bloco, sem linhas vazias."""
+    if not fragmento:
+        return ""
+    extrator = _ExtratorTexto()
+    extrator.feed(fragmento)
+    extrator.close()
+    linhas = (linha.strip(" \t\xa0") for linha in "".join(extrator.partes).split("\n"))
+    return "\n".join(linha for linha in linhas if linha)
+
+
+def comunica_do_snapshot(snapshot):
+    """Comunica a partir do dicionário devolvido por SCRIPT_DETALHE_COMUNICA."""
+    return Comunica(
+        numero=html_para_texto(snapshot["numero"]),
+        assunto=html_para_texto(snapshot["assunto"]),
+        texto=html_para_texto(snapshot["corpo"]),
+    )
+
+
+def capturar_comunica(driver, numero_anterior, limite_s):
+    """
+    Repete o snapshot até a tela de detalhe mostrar um comunica com ID não vazio
+    e diferente de `numero_anterior` e corpo com texto, e devolve o Comunica
+    (normalmente 1 ou 2 round trips, contra ~8 com esperas e troca de frame
+    separadas). Um corpo sem texto nunca é aceito: viraria um comunica vazio
+    classificado, enviado e registrado como tratado.
+    """
+    def snapshot_novo(drv):
+        snapshot = drv.execute_script(SCRIPT_DETALHE_COMUNICA, ID_CAMPO_NUMERO, ID_CAMPO_ASSUNTO,
+                                      INDICE_IFRAME_CORPO)
+        if not snapshot:
+            return False
+        comunica = comunica_do_snapshot(snapshot)
+        if not comunica.numero or comunica.numero == numero_anterior or not comunica.texto:
+            return False
+        return comunica
+
+    return _esperar(driver, limite_s).until(
+        snapshot_novo, f"O detalhe do comunica não carregou (ID anterior {numero_anterior!r})"
+    )
+
+
+# ==============================================================================
+# SNAPSHOT DA LISTA DE COMUNICAS
+# ==============================================================================
+
+class LinhaComunica(NamedTuple):
+    chave: str          # texto do elemento clicável da linha (identifica o comunica na lista)
+    assunto: str
+    remetente: str
+    celulas: tuple      # texto de todas as células, na ordem da tabela
+    elemento: object    # WebElement clicável (vale até a tabela ser redesenhada)
+
+
+# Cabeçalhos (normalizados) que identificam as colunas de assunto e remetente
+CABECALHOS_ASSUNTO = ("assunto",)
+CABECALHOS_REMETENTE = ("remetente", "origem")
+
+# Para cada elemento da lista: ele mesmo, o texto e as células da linha (<tr>);
+# também os cabeçalhos da tabela, para localizar as colunas pelo nome.
+SCRIPT_LISTA_COMUNICAS = """
+function texto(el) { return (el.textContent || '').replace(/\\s+/g, ' ').trim(); }
+var linhas = [];
+var elementos = document.querySelectorAll(arguments[0]);
+var cabecalhos = [];
+for (var i = 0; i < elementos.length; i++) {
+    var tr = elementos[i].closest('tr');
+    var celulas = tr ? Array.prototype.map.call(tr.querySelectorAll('td'), texto) : [];
+    linhas.push({elemento: elementos[i], chave: texto(elementos[i]), celulas: celulas});
+    if (i === 0 && tr) {
+        var tabela = tr.closest('[id$="tabViewerDec"]') || tr.closest('table');
+        if (tabela) cabecalhos = Array.prototype.map.call(tabela.querySelectorAll('th'), texto);
+    }
+}
+return {cabecalhos: cabecalhos, linhas: linhas};
+"""
+
+# Elemento da lista cujo texto é a chave procurada (null se não está mais na lista)
+SCRIPT_LOCALIZAR_LINHA = """
+var elementos = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < elementos.length; i++) {
+    if ((elementos[i].textContent || '').replace(/\\s+/g, ' ').trim() === arguments[1]) return elementos[i];
+}
+return null;
+"""
+
+
+def _sem_acentos(txt):
+    return "".join(ch for ch in unicodedata.normalize("NFD", txt) if not unicodedata.combining(ch)).lower()
+
+
+def _coluna(cabecalhos, nomes):
+    for indice, cabecalho in enumerate(cabecalhos):
+        if any(nome in _sem_acentos(cabecalho) for nome in nomes):
+            return indice
+    return None
+
+
+def linhas_do_snapshot(snapshot):
+    """[LinhaComunica] a partir do dicionário devolvido por SCRIPT_LISTA_COMUNICAS."""
+    cabecalhos = snapshot.get("cabecalhos") or []
+    coluna_assunto = _coluna(cabecalhos, CABECALHOS_ASSUNTO)
+    coluna_remetente = _coluna(cabecalhos, CABECALHOS_REMETENTE)
+
+    def celula(celulas, indice):
+        return celulas[indice] if indice is not None and indice < len(celulas) else ""
+
+    return [
+        LinhaComunica(
+            chave=linha["chave"],
+            assunto=celula(linha["celulas"], coluna_assunto),
+            remetente=celula(linha["celulas"], coluna_remetente),
+            celulas=tuple(linha["celulas"]),
+            elemento=linha["elemento"],
+        )
+        for linha in snapshot.get("linhas") or []
+    ]
+
+
+def listar_comunicas(driver, seletor_css):
+    """Todas as linhas visíveis da lista em um único round trip."""
+    return linhas_do_snapshot(driver.execute_script(SCRIPT_LISTA_COMUNICAS, seletor_css))
+
+
+def localizar_linha(driver, seletor_css, chave):
+    """Elemento clicável da linha com essa chave, ou None se ela saiu da lista."""
+    return driver.execute_script(SCRIPT_LOCALIZAR_LINHA, seletor_css, chave)
+
+
+# ==============================================================================
+# FILTRO SALVO (ATALHO DO FILTRO DE SETOR)
+# ==============================================================================
+
+ID_FILTRO_DISCLOSURE = "pt1:binbox:messagesTableViewer:sdtFilter::disAcr"
+
+# Componentes ADF da primeira linha do filtro, na ordem em que são preenchidos
+# (cada mudança faz um PPR que redesenha os seguintes)
+COMPONENTES_FILTRO = (
+    "pt1:binbox:messagesTableViewer:table_rtfFilter:0:cbx_col_sel_rtfFilter",  # propriedade
+    "pt1:binbox:messagesTableViewer:table_rtfFilter:0:chk_neg_rtfFilter",      # negar
+    "pt1:binbox:messagesTableViewer:table_rtfFilter:0:cbx_op_sel_rtfFilter",   # operador
+    "pt1:binbox:messagesTableViewer:table_rtfFilter:0:in_value_rtfFilter",     # valor
+)
+
+SCRIPT_LER_FILTRO = """
+if (typeof AdfPage === 'undefined' || !AdfPage.PAGE) return null;
+var valores = [];
+for (var i = 0; i < arguments[0].length; i++) {
+    var componente = AdfPage.PAGE.findComponentByAbsoluteId(arguments[0][i]);
+    if (!componente) return null;
+    valores.push([arguments[0][i], componente.getValue()]);
+}
+return valores;
+"""
+
+# Abre o painel de filtro se preciso e aplica cada valor com um evento de mudança
+# (autoSubmit), esperando o PPR terminar entre um e outro. Tudo dentro do navegador.
+SCRIPT_APLICAR_FILTRO = """
+var passos = arguments[0], idAbrir = arguments[1], limiteMs = arguments[2];
+var pronto = arguments[arguments.length - 1];
+var inicio = Date.now();
+function componente(id) { return AdfPage.PAGE.findComponentByAbsoluteId(id); }
+function ocioso() {
+    return document.readyState === 'complete' && AdfPage.PAGE.isSynchronizedWithServer();
+}
+function esperar(condicao, continuar) {
+    if (Date.now() - inicio > limiteMs) { pronto({erro: 'tempo esgotado'}); return; }
+    if (condicao()) continuar(); else setTimeout(function () { esperar(condicao, continuar); }, 100);
+}
+function passo(i) {
+    if (i >= passos.length) { esperar(ocioso, function () { pronto({ok: true}); }); return; }
+    var c = componente(passos[i][0]);
+    if (!c) { pronto({erro: 'componente ausente: ' + passos[i][0]}); return; }
+    try {
+        var anterior = c.getValue();
+        c.setValue(passos[i][1]);
+        AdfValueChangeEvent.queue(c, anterior, passos[i][1], true);
+    } catch (e) { pronto({erro: String(e)}); return; }
+    setTimeout(function () { esperar(ocioso, function () { passo(i + 1); }); }, 50);
+}
+if (typeof AdfPage === 'undefined' || !AdfPage.PAGE) { pronto({erro: 'página sem ADF'}); return; }
+esperar(ocioso, function () {
+    if (!componente(passos[0][0])) {
+        var abrir = document.getElementById(idAbrir);
+        if (!abrir) { pronto({erro: 'botão do filtro não encontrado'}); return; }
+        abrir.click();
+    }
+    esperar(function () { return ocioso() && componente(passos[0][0]); }, function () { passo(0); });
+});
+"""
+
+
+def capturar_filtro(driver):
+    """[[componente, valor]] do filtro na tela (None se o painel de filtro não está aberto)."""
+    return driver.execute_script(SCRIPT_LER_FILTRO, list(COMPONENTES_FILTRO))
+
+
+def aplicar_filtro_salvo(driver, componentes, limite_s):
+    """
+    Reaplica um filtro capturado em um único round trip e confere os
+    componentes lidos de volta. Lança RuntimeError se o atalho não funcionou.
+    Isso não prova que a tabela foi refiltrada: quem chama confere a lista
+    com conferir_lista_filtrada().
+    """
+    driver.set_script_timeout(limite_s + 5)
+    resultado = driver.execute_async_script(SCRIPT_APLICAR_FILTRO, componentes, ID_FILTRO_DISCLOSURE,
+                                            int(limite_s * 1000))
+    if not resultado or resultado.get("erro"):
+        raise RuntimeError(f"Filtro salvo não aplicado: {(resultado or {}).get('erro', 'sem resposta')}")
+    aguardar_adf_ocioso(driver, limite_s)
+    aplicado = capturar_filtro(driver)
+    if aplicado != componentes:
+        raise RuntimeError(f"Filtro na tela difere do salvo: {aplicado!r}")
+
+
+def conferir_lista_filtrada(driver, seletor_css, setor, limite_s):
+    """
+    Confere na própria lista que o filtro "remetente NÃO termina com <setor>"
+    está valendo: nenhuma linha com remetente do setor. Lança RuntimeError se
+    aparecer uma, ou se a coluna do remetente não foi encontrada.
+    """
+    aguardar_contagem_estavel(driver, (By.CSS_SELECTOR, seletor_css), limite_s)
+    snapshot = driver.execute_script(SCRIPT_LISTA_COMUNICAS, seletor_css)
+    linhas = linhas_do_snapshot(snapshot)
+    if not linhas:
+        return
+    if _coluna(snapshot.get("cabecalhos") or [], CABECALHOS_REMETENTE) is None:
+        raise RuntimeError("Coluna do remetente não encontrada para conferir o filtro")
+    sufixo = _sem_acentos(setor).strip()
+    do_setor = [linha.chave for linha in linhas if _sem_acentos(linha.remetente).strip().endswith(sufixo)]
+    if do_setor:
+        raise RuntimeError(f"Lista ainda tem {len(do_setor)} comunica(s) do setor {setor} (ex.: {do_setor[0]})")
+
+
+def salvar_filtro(caminho, setor, componentes):
+    dados = {"setor": setor, "capturado_em": datetime.now().isoformat(timespec="seconds"),
+             "componentes": componentes}
+    Path(caminho).write_text(json.dumps(dados, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def carregar_filtro(caminho, setor):
+    """Componentes salvos para esse setor, ou None (sem arquivo, arquivo inválido ou outro setor)."""
+    try:
+        dados = json.loads(Path(caminho).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(dados, dict) or dados.get("setor") != setor or not dados.get("componentes"):
+        return None
+    return dados["componentes"]
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+"""
+Leitura dos comunicas por HTTP, sem navegador, reaproveitando a sessão do Selenium.
+
+Depois do login e do filtro feitos pelo Selenium, os cookies e o estado da
+página ADF (URL do formulário e javax.faces.ViewState) passam para uma
+requests.Session. A partir daí as requisições parciais (PPR) que a tela faz
+para listar, selecionar, visualizar e voltar são repetidas a partir de uma
+gravação, e as respostas (XML com fragmentos HTML em CDATA) são lidas
+localmente com html.parser.
+
+Gravação (JSON, capturada uma vez nas ferramentas de desenvolvedor do navegador):
+
+    {
+      "cabecalhos": {"Adf-Rich-Message": "true"},
+      "listar":      {"parametros": {"event": "...:tabViewerDec", ...}},
+      "selecionar":  {"parametros": {"event": "...:tabViewerDec", "event....": "...{linha}..."}},
+      "visualizar":  {"parametros": {"event": "...:btnView", ...}},
+      "voltar":      {"parametros": {"event": "...:m1:btnVoltar", ...}}
+    }
+
+Nos valores, "{linha}" é trocado pelo índice da linha na tabela. O parâmetro
+javax.faces.ViewState é sempre o mais recente (da página ou da última resposta).
+"""
+
+import json
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import urljoin
+
+import requests
+
+from siafe import (
+    ID_CAMPO_ASSUNTO,
+    ID_CAMPO_NUMERO,
+    Comunica,
+    html_para_texto,
+    linhas_do_snapshot,
+)
+
+ETAPAS_GRAVADAS = ("listar", "selecionar", "visualizar", "voltar")
+PARAMETRO_VIEW_STATE = "javax.faces.ViewState"
+
+# Elemento clicável de cada linha da lista (mesmo do seletor CSS do Selenium)
+PADRAO_ID_LINHA = re.compile(r"^pt1:binbox:messagesTableViewer:tabViewerDec:(\d+):j_id8$")
+
+# Sinais de que a resposta é a página de login (sessão expirada)
+MARCADORES_LOGIN = ("loginBox:itxUsuario", "login.jsp")
+
+TEMPO_LIMITE_HTTP_S = 30
+
+_CDATA = re.compile(r"<!\[CDATA\[(.*?)\]\]>", re.DOTALL)
+_VIEW_STATE_UPDATE = re.compile(
+    r'<update[^>]+id="[^"]*javax\.faces\.ViewState[^"]*"[^>]*>\s*<!\[CDATA\[(.*?)\]\]>', re.DOTALL
+)
+_VIEW_STATE_INPUT = re.compile(
+    r'name="javax\.faces\.ViewState"[^>]*value="([^"]*)"|value="([^"]*)"[^>]*name="javax\.faces\.ViewState"'
+)
+_ESPACOS = re.compile(r"\s+")
+
+# Estado da página que a sessão HTTP precisa herdar do navegador
+SCRIPT_ESTADO_ADF = """
+var form = document.forms.length ? document.forms[0] : null;
+var vs = document.querySelector('input[name="javax.faces.ViewState"]');
+return {url: form && form.action ? form.action : location.href,
+        view_state: vs ? vs.value : '',
+        user_agent: navigator.userAgent};
+"""
+
+_VAZIOS = frozenset("area base br col embed hr img input link meta param source track wbr".split())
+
+
+class SessaoHTTPExpirada(RuntimeError):
+    """O SIAFE devolveu a página de login: a sessão herdada do navegador acabou."""
+
+
+# ==============================================================================
+# GRAVAÇÃO
+# ==============================================================================
+
+def carregar_gravacao(caminho):
+    """Lê e valida a gravação das requisições ADF (ValueError se faltar alguma etapa)."""
+    gravacao = json.loads(Path(caminho).read_text(encoding="utf-8"))
+    faltando = [etapa for etapa in ETAPAS_GRAVADAS if "parametros" not in gravacao.get(etapa, {})]
+    if faltando:
+        raise ValueError(f"Gravação {caminho} sem as etapas: {', '.join(faltando)}")
+    return gravacao
+
+# ==============================================================================
+# LEITURA DAS RESPOSTAS
+# ==============================================================================
+
+def conteudo_da_resposta(texto):
+    """HTML de uma resposta ADF: os fragmentos CDATA de uma resposta parcial, ou a página inteira."""
+    fragmentos = _CDATA.findall(texto)
+    return "\n".join(fragmentos) if fragmentos else texto
+
+
+def view_state_da_resposta(texto):
+    """javax.faces.ViewState devolvido na resposta, ou None."""
+    encontrado = _VIEW_STATE_UPDATE.search(texto)
+    if encontrado:
+        return encontrado.group(1).strip()
+    encontrado = _VIEW_STATE_INPUT.search(texto)
+    if encontrado:
+        return encontrado.group(1) if encontrado.group(1) is not None else encontrado.group(2)
+    return None
+
+
+class _ExtratorADF(HTMLParser):
+    """
+    Uma passada pelo HTML guardando: o texto dos elementos com id em `ids`,
+    as linhas da lista (chave + células), os cabeçalhos da tabela e os iframes.
+    """
+
+    def __init__(self, ids=()):
+        super().__init__(convert_charrefs=True)
+        self.ids = set(ids)
+        self.textos = {}
+        self.linhas = []
+        self.cabecalhos = []
+        self.iframes = []
+        self._capturas = []    # [id, profundidade, partes] abertos
+        self._linha = None     # {"elemento", "chave", "celulas"} da <tr> atual
+        self._celula = None    # partes de texto da <td>/<th> atual
+        self._cabecalho = False
+
+    def handle_starttag(self, tag, attrs):
+        atributos = dict(attrs)
+        if tag == "iframe":
+            self.iframes.append(atributos)
+        if tag in _VAZIOS:
+            return
+        for captura in self._capturas:
+            captura[1] += 1
+
+        id_elemento = atributos.get("id") or ""
+        linha = PADRAO_ID_LINHA.match(id_elemento)
+        if linha:
+            if self._linha is None:
+                self._linha = {"elemento": None, "chave": "", "celulas": []}
+            self._linha["elemento"] = int(linha.group(1))
+            self._capturas.append(["#linha", 1, []])
+        elif id_elemento in self.ids:
+            self._capturas.append([id_elemento, 1, []])
+
+        if tag == "tr":
+            self._linha = {"elemento": None, "chave": "", "celulas": []}
+        elif tag in ("td", "th"):
+            self._celula = []
+            self._cabecalho = tag == "th"
+
+    def handle_endtag(self, tag):
+        if tag in _VAZIOS:
+            return
+        for captura in list(self._capturas):
+            captura[1] -= 1
+            if captura[1] == 0:
+                self._capturas.remove(captura)
+                texto = _ESPACOS.sub(" ", "".join(captura[2])).strip()
+                if captura[0] == "#linha":
+                    if self._linha is not None:
+                        self._linha["chave"] = texto
+                else:
+                    self.textos[captura[0]] = texto
+
+        if tag in ("td", "th") and self._celula is not None:
+            texto = _ESPACOS.sub(" ", "".join(self._celula)).strip()
+            if self._cabecalho:
+                self.cabecalhos.append(texto)
+            elif self._linha is not None:
+                self._linha["celulas"].append(texto)
+            self._celula = None
+        elif tag == "tr" and self._linha is not None:
+            if self._linha["elemento"] is not None:
+                self.linhas.append(self._linha)
+            self._linha = None
+
+    def handle_data(self, data):
+        for captura in self._capturas:
+            captura[2].append(data)
+        if self._celula is not None:
+            self._celula.append(data)
+
+
+def extrair(html_adf, ids=()):
+    extrator = _ExtratorADF(ids)
+    extrator.feed(html_adf)
+    extrator.close()
+    return extrator
+
+# ==============================================================================
+# CLIENTE
+# ==============================================================================
+
+class ComunicasHTTP:
+    """Lista e lê comunicas repetindo as requisições ADF gravadas."""
+
+    def __init__(self, url, view_state, gravacao, sessao=None, tempo_limite_s=TEMPO_LIMITE_HTTP_S):
+        self.url = url
+        self.view_state = view_state
+        self.gravacao = gravacao
+        self.sessao = sessao or requests.Session()
+        self.sessao.headers.update(gravacao.get("cabecalhos") or {})
+        self.tempo_limite_s = tempo_limite_s
+        self.requisicoes = 0
+
+    @classmethod
+    def do_navegador(cls, driver, gravacao, **kwargs):
+        """Cliente com os cookies e o estado da página atual do Selenium (após login e filtro)."""
+        estado = driver.execute_script(SCRIPT_ESTADO_ADF)
+        sessao = requests.Session()
+        sessao.headers["User-Agent"] = estado.get("user_agent") or sessao.headers["User-Agent"]
+        for cookie in driver.get_cookies():
+            sessao.cookies.set(cookie["name"], cookie["value"],
+                               domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+        return cls(estado["url"], estado["view_state"], gravacao, sessao=sessao, **kwargs)
+
+    # --- requisições ---
+
+    def _verificar(self, resposta):
+        resposta.raise_for_status()
+        texto = resposta.text
+        if any(marcador in resposta.url for marcador in MARCADORES_LOGIN) or MARCADORES_LOGIN[0] in texto:
+            raise SessaoHTTPExpirada("O SIAFE devolveu a página de login")
+        return texto
+
+    def _postar(self, etapa, linha=None):
+        parametros = {}
+        for nome, valor in self.gravacao[etapa]["parametros"].items():
+            if linha is not None and isinstance(valor, str):
+                valor = valor.replace("{linha}", str(linha))
+            parametros[nome] = valor
+        parametros[PARAMETRO_VIEW_STATE] = self.view_state
+
+        self.requisicoes += 1
+        texto = self._verificar(self.sessao.post(self.url, data=parametros, timeout=self.tempo_limite_s))
+        self.view_state = view_state_da_resposta(texto) or self.view_state
+        return conteudo_da_resposta(texto)
+
+    def _buscar(self, url):
+        self.requisicoes += 1
+        return self._verificar(self.sessao.get(urljoin(self.url, url), timeout=self.tempo_limite_s))
+
+    # --- operações ---
+
+    def listar(self):
+        """[LinhaComunica] da lista filtrada (elemento = índice da linha na tabela)."""
+        extrator = extrair(self._postar("listar"))
+        return linhas_do_snapshot({"cabecalhos": extrator.cabecalhos, "linhas": extrator.linhas})
+
+    def abrir(self, linha):
+        """
+        Seleciona a linha, abre o detalhe, lê o corpo (iframe) e volta para a lista.
+        Lança RuntimeError se a resposta não trouxe o número ou o corpo (gravação
+        desatualizada ou resposta inesperada do ADF), como o capturar_comunica()
+        do Selenium, para quem chama continuar pelo navegador.
+        """
+        self._postar("selecionar", linha.elemento)
+        extrator = extrair(self._postar("visualizar"), ids=(ID_CAMPO_NUMERO, ID_CAMPO_ASSUNTO))
+
+        corpo = ""
+        for iframe in extrator.iframes:
+            if iframe.get("srcdoc"):
+                corpo = iframe["srcdoc"]
+                break
+            if iframe.get("src") and not iframe["src"].startswith(("about:", "javascript:")):
+                corpo = self._buscar(iframe["src"])
+                break
+
+        self._postar("voltar")
+        comunica = Comunica(
+            numero=extrator.textos.get(ID_CAMPO_NUMERO, ""),
+            assunto=extrator.textos.get(ID_CAMPO_ASSUNTO, ""),
+            texto=html_para_texto(corpo),
+            remetente=linha.remetente,
+            chave=linha.chave,
+        )
+        if not comunica.numero or not comunica.texto.strip():
+            raise RuntimeError(f"Detalhe da linha '{linha.chave}' sem "
+                               f"{'número' if not comunica.numero else 'corpo'} na resposta HTTP")
+        return comunica
+
+    def comunicas(self, ja_processado=None):
+        """
+        Gera um Comunica por linha da lista filtrada, relendo a lista depois de
+        cada um (ela muda quando o comunica é lido) até não sobrar linha nova.
+        Linhas com `ja_processado(chave)` verdadeiro não são abertas (só pela
+        chave da linha: um comunica reaberto com o corpo alterado também é pulado).
+        """
+        processados = set()
+        while True:
+            pendentes = [linha for linha in self.listar() if linha.chave not in processados]
+            if ja_processado is not None:
+                processados.update(linha.chave for linha in pendentes if ja_processado(linha.chave))
+                pendentes = [linha for linha in pendentes if linha.chave not in processados]
+            if not pendentes:
+                return
+            processados.add(pendentes[0].chave)
+            yield self.abrir(pendentes[0])
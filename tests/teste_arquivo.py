@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do arquivo local de comunicas (arquivo.py): gravação em lote, mesmo
+comunica arquivado uma vez só, busca FTS5 sem acento/maiúscula, filtro pela
+decisão e exportação lida de volta pelo classificacao_offline.py. Também
+cobre os corpos endereçados pelo hash (guardados uma vez), a compressão com
+dicionário (zlib e zstd), o treino automático e a conversão do arquivo antigo.
+"""
+
+import contextlib
+import io
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import arquivo  # noqa: E402
+from classificacao_offline import ler_comunicas  # noqa: E402
+from classificador import Decisao  # noqa: E402
+from siafe import Comunica  # noqa: E402
+
+COMUNICAS = [
+    (Comunica("2024/101", "Dados bancários", "Favor alterar os DADOS BANCÁRIOS do credor."),
+     Decisao(True, "prioritario", "Dados Bancarios", "dados bancarios", ""), "GERAT"),
+    (Comunica("2024/102", "Reunião", "Convite para reunião de alinhamento."),
+     Decisao(False, "bloqueado", "Reuniao", "reuniao", ""), "SUPCON"),
+    (Comunica("2024/103", "Senha", "Preciso de acesso ao SIAFE-Rio; senha bloqueada."),
+     Decisao(True, "prioritario", "Acesso", "acesso ao siafe", ""), "SEFAZ"),
+]
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_arquivo():
+    print("=== TESTE DO ARQUIVO DE COMUNICAS ===\n")
+    resultados = []
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / "arquivo.db"
+        arq = arquivo.ArquivoComunicas(caminho)
+        for comunica, decisao, remetente in COMUNICAS:
+            arq.adicionar(comunica, decisao, remetente=remetente)
+        resultados.append(verificar("nada é gravado antes do gravar() (lote da execução)", len(arq) == 0))
+        resultados.append(verificar("gravar() grava o lote inteiro", arq.gravar() == 3 and len(arq) == 3))
+
+        comunica, decisao, remetente = COMUNICAS[0]
+        arq.adicionar(comunica, decisao, remetente=remetente)
+        arq.adicionar(comunica._replace(texto=comunica.texto + " Att."), decisao, remetente=remetente)
+        arq.gravar()
+        resultados.append(verificar("mesmo comunica com o mesmo corpo entra uma vez; corpo novo vira outra versão",
+                                    len(arq) == 4 and len(arq.por_numero("2024/101")) == 2))
+
+        encontrados = arq.buscar("dados bancarios")
+        resultados.append(verificar(
+            "busca sem acento e em minúsculas encontra o texto original",
+            {linha["numero"] for linha in encontrados} == {"2024/101"}
+            and "[dados]" in encontrados[0]["trecho_encontrado"]
+            and encontrados[0]["remetente"] == "GERAT",
+        ))
+        resultados.append(verificar("operadores e prefixo do FTS5",
+                                    [l["numero"] for l in arq.buscar("senha AND siafe*")] == ["2024/103"]))
+        resultados.append(verificar("filtro pela decisão",
+                                    [l["numero"] for l in arq.buscar("reuniao OR senha", enviado=False)]
+                                    == ["2024/102"]))
+        resultados.append(verificar("hífen no termo vira frase em vez de erro do FTS5",
+                                    {l["numero"] for l in arq.buscar("dados-bancarios")} == {"2024/101"}
+                                    and [l["numero"] for l in arq.buscar("siafe-rio senha")] == ["2024/103"]))
+        sem_erro = True
+        for consulta in ("2024/1", "c.n.p.j", '"abc', '"dados bancarios', "siafe-rio*"):
+            try:
+                arq.buscar(consulta)
+            except Exception as e:
+                sem_erro = False
+                print(f"   {consulta!r}: {e}")
+        resultados.append(verificar("barra, pontos, aspas sem fechamento e prefixo com hífen não quebram a busca",
+                                    sem_erro and {l["numero"] for l in arq.buscar('"dados bancarios')} == {"2024/101"}))
+        try:
+            arq.buscar("senha AND")
+            invalida = False
+        except ValueError:
+            invalida = True
+        try:
+            arq.buscar("(senha OR reuniao")
+            invalida = False
+        except ValueError:
+            pass
+        resultados.append(verificar("operador sem termo depois ou parêntese aberto vira ValueError", invalida))
+        arq.fechar()
+
+        saida = Path(pasta) / "corpus.jsonl"
+        with contextlib.redirect_stderr(io.StringIO()):
+            codigo = arquivo.main(["--db", str(caminho), "exportar", "-o", str(saida)])
+        exportados = list(ler_comunicas([saida]))
+        resultados.append(verificar(
+            "exportação lida pelo classificacao_offline.py",
+            codigo == 0 and len(exportados) == 4
+            and exportados[0] == {"id": "2024/101", "assunto": "Dados bancários", "texto": COMUNICAS[0][0].texto},
+        ))
+
+        with contextlib.redirect_stdout(io.StringIO()) as texto, contextlib.redirect_stderr(io.StringIO()):
+            arquivo.main(["--db", str(caminho), "buscar", "convite"])
+        resultados.append(verificar("comando buscar", "2024/102" in texto.getvalue()))
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()) as erro:
+            codigo = arquivo.main(["--db", str(caminho), "buscar", "senha AND"])
+        resultados.append(verificar("comando buscar com consulta inválida: mensagem e código 1",
+                                    codigo == 1 and "Consulta inválida" in erro.getvalue()))
+
+    return all(resultados)
+
+
+def corpos_repetitivos(quantidade):
+    assinatura = ("\nAtenciosamente,\nCoordenação de Contabilidade\nSecretaria de Estado de Fazenda - SEFAZ/RJ\n"
+                  "Antes de imprimir, pense em sua responsabilidade e compromisso com o MEIO AMBIENTE.\n")
+    return [f"SECRETARIA DE ESTADO DE FAZENDA\nPrezados,\nSolicitamos a análise do processo {i} "
+            f"referente ao empenho {i * 7} da unidade {i % 13}.{assinatura}" for i in range(quantidade)]
+
+
+def testar_compressao():
+    print("\n=== TESTE DOS CORPOS COMPRIMIDOS ===\n")
+    resultados = []
+    decisao = Decisao(False, "padrao", "", "", "")
+    corpos = corpos_repetitivos(300)
+
+    for codec in ("zlib", "zstd") if arquivo.zstandard is not None else ("zlib",):
+        dicionario = arquivo.treinar_dicionario(codec, [c.encode("utf-8") for c in corpos])
+        com = arquivo.Codificador(codec, dicionario)
+        sem = arquivo.Codificador(codec)
+        dados = corpos[-1].encode("utf-8")
+        resultados.append(verificar(
+            f"{codec}: dicionário treinado comprime mais e descomprime igual "
+            f"({len(sem.comprimir(dados))} -> {len(com.comprimir(dados))} bytes)",
+            com.descomprimir(com.comprimir(dados)) == dados and len(com.comprimir(dados)) < len(sem.comprimir(dados)),
+        ))
+
+    with tempfile.TemporaryDirectory() as pasta:
+        arq = arquivo.ArquivoComunicas(Path(pasta) / "arquivo.db", codec="zlib")
+        minimo, arquivo.AMOSTRAS_MINIMAS_DICIONARIO = arquivo.AMOSTRAS_MINIMAS_DICIONARIO, 50
+        try:
+            for i, corpo in enumerate(corpos[:40]):
+                arq.adicionar(Comunica(f"2024/{i:03d}", "", corpo), decisao)
+            arq.adicionar(Comunica("2024/999", "", corpos[0]), decisao)  # mesmo corpo, outro número
+            arq.gravar()
+            estatisticas = arq.estatisticas()
+            resultados.append(verificar("corpo repetido em outro número é guardado uma vez",
+                                        estatisticas["comunicas"] == 41 and estatisticas["corpos"] == 40))
+            resultados.append(verificar("sem amostras suficientes ainda não há dicionário",
+                                        estatisticas["dicionarios"] == 0))
+
+            for i, corpo in enumerate(corpos[40:], 40):
+                arq.adicionar(Comunica(f"2024/{i:03d}", "", corpo), decisao)
+            arq.gravar()
+            estatisticas = arq.estatisticas()
+            resultados.append(verificar(
+                f"dicionário treinado sozinho e corpos recomprimidos "
+                f"({estatisticas['bytes_brutos'] / (estatisticas['bytes_guardados'] + estatisticas['bytes_dicionarios']):.1f}x)",
+                estatisticas["dicionarios"] == 1
+                and arq.conexao.execute("SELECT COUNT(*) FROM corpos WHERE dicionario = 0").fetchone()[0] == 0,
+            ))
+            resultados.append(verificar("todos os corpos lidos de volta iguais",
+                                        [c["texto"] for c in arq.comunicas()] == [*corpos[:40], corpos[0], *corpos[40:]]))
+        finally:
+            arquivo.AMOSTRAS_MINIMAS_DICIONARIO = minimo
+        arq.fechar()
+
+        antigo = Path(pasta) / "antigo.db"
+        conexao = sqlite3.connect(antigo)
+        conexao.execute("CREATE TABLE comunicas (id INTEGER PRIMARY KEY, numero TEXT, assunto TEXT, remetente TEXT, "
+                        "corpo TEXT, corpo_normalizado TEXT, hash_corpo TEXT, enviado INTEGER, categoria TEXT, "
+                        "conceito TEXT, trecho TEXT, arquivado_em TEXT)")
+        conexao.execute("INSERT INTO comunicas VALUES (1, '2023/001', 'Senha', 'SEFAZ', 'Preciso de acesso ao SIAFE-Rio', "
+                        "'', '', 1, 'prioritario', 'Acesso', 'acesso', '2023-05-02T10:00:00')")
+        conexao.commit()
+        conexao.close()
+        convertido = arquivo.ArquivoComunicas(antigo)
+        versoes = convertido.por_numero("2023/001")
+        resultados.append(verificar(
+            "arquivo da versão anterior convertido (corpo comprimido, busca e data preservadas)",
+            len(versoes) == 1 and versoes[0]["corpo"] == "Preciso de acesso ao SIAFE-Rio"
+            and versoes[0]["arquivado_em"] == "2023-05-02T10:00:00"
+            and [l["numero"] for l in convertido.buscar("siafe")] == ["2023/001"],
+        ))
+        convertido.fechar()
+
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    ok = testar_arquivo()
+    ok = testar_compressao() and ok
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da caixa de saída (caixa_saida.py): mensagem gravada antes do envio,
+espera exponencial com jitter, desistência depois de N tentativas,
+reativação, retomada na execução seguinte (mesmo depois de o processo cair
+com a mensagem na fila), integração com a fila de envio (FilaCorreio), reenvio dentro da própria
+execução e comunicas do resumo em aberto que sobrevivem a uma queda.
+"""
+
+import contextlib
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import caixa_saida  # noqa: E402
+from classificador import PADRAO, Decisao  # noqa: E402
+from correio import FilaCorreio  # noqa: E402
+from resumo import Resumo  # noqa: E402
+from siafe import Comunica  # noqa: E402
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 1_000_000.0
+
+    def __call__(self):
+        return self.agora
+
+
+class CorreioInstavel:
+    """Recusa os envios enquanto `fora_do_ar` estiver ligado."""
+
+    def __init__(self):
+        self.fora_do_ar = True
+        self.enviadas = []
+
+    def enviar(self, remetente, destinatarios, mensagem):
+        if self.fora_do_ar:
+            raise OSError("421 try again later")
+        self.enviadas.append(mensagem)
+        return {}
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_espera():
+    print("=== TESTE DA ESPERA ENTRE TENTATIVAS ===\n")
+    resultados = []
+    minimas = [caixa_saida.espera_da_tentativa(t, 60, 3600, aleatorio=lambda: 0.0) for t in range(1, 9)]
+    maximas = [caixa_saida.espera_da_tentativa(t, 60, 3600, aleatorio=lambda: 1.0) for t in range(1, 9)]
+    resultados.append(verificar(f"espera dobra a cada tentativa até o teto ({[int(m) for m in maximas]})",
+                                maximas == [60, 120, 240, 480, 960, 1920, 3600, 3600]))
+    resultados.append(verificar("jitter: entre metade e o total da espera",
+                                minimas == [m / 2 for m in maximas]))
+    return all(resultados)
+
+
+def testar_caixa_saida():
+    print("\n=== TESTE DA CAIXA DE SAÍDA ===\n")
+    resultados = []
+    relogio = Relogio()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / "caixa.db"
+        caixa = caixa_saida.CaixaDeSaida(caminho, max_tentativas=3, espera_base_s=60, relogio=relogio,
+                                         aleatorio=lambda: 0.5)
+        correio = CorreioInstavel()
+        fila = FilaCorreio(correio, caixa_saida=caixa, registrar_log=lambda _: None)
+
+        fila.enfileirar("robo@sefaz", ["a@sefaz", "b@sefaz"], b"Subject: 2024/101\r\n\r\ncorpo", "Comunica 2024/101")
+        estatisticas = fila.encerrar()
+        pendentes = caixa.vivas()
+        resultados.append(verificar(
+            "envio recusado: mensagem fica na caixa com a falha registrada",
+            len(estatisticas["falhas"]) == 1 and len(pendentes) == 1 and pendentes[0].tentativas == 1
+            and pendentes[0].destinatarios == ["a@sefaz", "b@sefaz"] and "421" in pendentes[0].ultimo_erro,
+        ))
+        resultados.append(verificar("antes da espera (45 s com jitter) não é retomada",
+                                    fila.retomar_pendentes() == 0))
+
+        relogio.agora += 45
+        resultados.append(verificar("passada a espera, a próxima execução retoma a mensagem",
+                                    fila.retomar_pendentes() == 1))
+        fila.encerrar()
+        relogio.agora += 90
+        fila.retomar_pendentes()
+        estatisticas = fila.encerrar()
+        resultados.append(verificar(
+            "depois de 3 tentativas a mensagem vai para as mortas",
+            estatisticas["mortas"] == ["Comunica 2024/101"] and caixa.contagem() == (0, 1)
+            and fila.retomar_pendentes() == 0,
+        ))
+
+        with contextlib.redirect_stdout(io.StringIO()) as saida, contextlib.redirect_stderr(io.StringIO()):
+            caixa_saida.main(["--db", str(caminho), "listar", "--mortas"])
+        resultados.append(verificar("comando listar --mortas", "Comunica 2024/101" in saida.getvalue()))
+
+        correio.fora_do_ar = False
+        resultados.append(verificar("reativar() devolve a morta à fila", caixa.reativar() == 1))
+        caixa.fechar()
+
+        # Processo caiu com a mensagem gravada e ainda na fila (nunca enviada)
+        reaberta = caixa_saida.CaixaDeSaida(caminho, relogio=relogio)
+        reaberta.guardar("robo@sefaz", ["a@sefaz"], "Subject: 2024/102\r\n\r\ncorpo", "Comunica 2024/102")
+        reaberta.fechar()
+
+        caixa = caixa_saida.CaixaDeSaida(caminho, relogio=relogio)
+        fila = FilaCorreio(correio, caixa_saida=caixa, registrar_log=lambda _: None)
+        retomadas = fila.retomar_pendentes()
+        estatisticas = fila.encerrar()
+        resultados.append(verificar(
+            "reativada e interrompida saem na execução seguinte; caixa vazia depois",
+            retomadas == 2 and estatisticas["enviados"] == 2 and estatisticas["retomadas"] == 2
+            and caixa.contagem() == (0, 0) and correio.enviadas[0].startswith(b"Subject: 2024/101"),
+        ))
+
+        fila.enfileirar("robo@sefaz", ["a@sefaz"], b"Subject: 2024/103\r\n\r\ncorpo", "Comunica 2024/103")
+        fila.encerrar()
+        resultados.append(verificar("envio aceito na hora não deixa nada na caixa",
+                                    caixa.contagem() == (0, 0) and len(correio.enviadas) == 3))
+        caixa.fechar()
+
+    return all(resultados)
+
+
+def testar_drenar():
+    print("\n=== TESTE DO REENVIO NO FIM DA EXECUÇÃO ===\n")
+    resultados = []
+    relogio = Relogio()
+    esperas = []
+
+    def dormir(segundos):
+        esperas.append(segundos)
+        relogio.agora += segundos
+
+    caixa = caixa_saida.CaixaDeSaida(":memory:", max_tentativas=6, espera_base_s=60, relogio=relogio,
+                                     aleatorio=lambda: 0.5)
+    correio = CorreioInstavel()
+    fila = FilaCorreio(correio, caixa_saida=caixa, registrar_log=lambda _: None)
+    recusar = iter([True, True, False])
+    enviar_original = correio.enviar
+
+    def enviar(*args):
+        correio.fora_do_ar = next(recusar)
+        return enviar_original(*args)
+
+    correio.enviar = enviar
+    fila.enfileirar("robo@sefaz", ["a@sefaz"], b"Subject: 2024/201\r\n\r\ncorpo", "Comunica 2024/201")
+    reenviadas = fila.drenar(300, dormir=dormir)
+    estatisticas = fila.encerrar()
+    resultados.append(verificar(
+        f"falha passageira reenviada na mesma execução, depois das esperas ({esperas})",
+        reenviadas == 2 and esperas == [45, 90] and estatisticas["enviados"] == 1
+        and caixa.contagem() == (0, 0) and len(correio.enviadas) == 1,
+    ))
+
+    correio.enviar = enviar_original
+    correio.fora_do_ar = True
+    esperas.clear()
+    fila.enfileirar("robo@sefaz", ["a@sefaz"], b"Subject: 2024/202\r\n\r\ncorpo", "Comunica 2024/202")
+    reenviadas = fila.drenar(30, dormir=dormir)
+    fila.encerrar()
+    resultados.append(verificar("espera além do prazo fica para a execução seguinte, sem dormir",
+                                reenviadas == 0 and not esperas and caixa.contagem() == (1, 0)))
+    resultados.append(verificar("sem caixa de saída não há o que drenar",
+                                FilaCorreio(correio, registrar_log=lambda _: None).drenar(300, dormir=dormir) == 0))
+    caixa.fechar()
+
+    return all(resultados)
+
+
+def testar_resumo_aberto():
+    print("\n=== TESTE DO RESUMO EM ABERTO NA CAIXA DE SAÍDA ===\n")
+    resultados = []
+    decisao = Decisao(True, PADRAO, "", "", "[ENVIO DE EMAIL PARA ANALISE] Nenhuma palavra impeditiva encontrada.")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / "caixa.db"
+        # Execução que morre com 3 comunicas na parte em aberto (sem finally, sem fechar())
+        caixa = caixa_saida.CaixaDeSaida(caminho)
+        resumo = Resumo(100 * 1024)
+        for i in range(3):
+            comunica = Comunica(f"2024/{i:03d}", f"Assunto {i}", f"texto “{i}”")
+            resumo.adicionar(comunica, decisao, caixa.guardar_no_resumo(comunica, decisao))
+        caixa.conexao.close()
+
+        caixa = caixa_saida.CaixaDeSaida(caminho)
+        itens = caixa.resumo_aberto()
+        resultados.append(verificar(
+            "comunicas da parte em aberto sobrevivem à queda, na ordem",
+            [(i.numero, i.texto, i.motivo) for i in itens] == [(f"2024/{i:03d}", f"texto “{i}”", decisao.motivo)
+                                                              for i in range(3)],
+        ))
+
+        correio = CorreioInstavel()
+        correio.fora_do_ar = False
+        fila = FilaCorreio(correio, caixa_saida=caixa, registrar_log=lambda _: None)
+        resumo = Resumo(100 * 1024)
+        for item in itens:
+            resumo.adicionar(Comunica(item.numero, item.assunto, item.texto),
+                             Decisao(True, item.categoria, item.conceito, item.trecho, item.motivo), item.id)
+        parte, = resumo.fechar()
+        fila.enfileirar("robo@sefaz", ["a@sefaz"], parte.corpo_html.encode("utf-8"), parte.assunto,
+                        itens_resumo=parte.itens)
+        fila.encerrar()
+        resultados.append(verificar(
+            "a parte retomada sai na execução seguinte e os itens deixam a caixa com ela",
+            caixa.resumo_aberto() == [] and caixa.contagem() == (0, 0)
+            and b"2024/002" in correio.enviadas[0] and parte.corpo_html.count("<h4") == 3,
+        ))
+        caixa.fechar()
+
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    ok = testar_espera()
+    ok = testar_caixa_saida() and ok
+    ok = testar_drenar() and ok
+    ok = testar_resumo_aberto() and ok
+    sys.exit(0 if ok else 1)
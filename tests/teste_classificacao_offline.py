@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste dos comandos `classify` e `backtest` (classificacao_offline.py): leitura de
+JSONL, CSV e diretório de .txt, ordem preservada, mesmo resultado com 1 ou vários
+processos e relatório de mudanças entre duas versões das regras.
+"""
+
+import csv
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import classificacao_offline  # noqa: E402
+from classificador import normalizar, classificar  # noqa: E402
+
+# ==============================================================================
+# CASOS DE TESTE
+# ==============================================================================
+
+casos_teste = [
+    {"id": "1", "assunto": "Senha", "texto": "Senha do SIAFERIO foi esquecida."},
+    {"id": "2", "assunto": "Urgente", "texto": "URGENTE: Precisa resolver até hoje."},
+    {"id": "3", "assunto": "Boleto", "texto": "Segue o boleto do credor."},
+    {"id": "4", "assunto": "Reunião", "texto": "Reunião sobre novos procedimentos.\nLinha 2."},
+    {"id": "5", "assunto": "Programa", "texto": "Cadastrar o programa de trabalho no sistema."},
+]
+
+# ==============================================================================
+# FUNÇÕES DE TESTE
+# ==============================================================================
+
+def esperado(caso):
+    return classificar(normalizar(caso["texto"]))
+
+
+def ler_jsonl(caminho):
+    with open(caminho, encoding="utf-8") as arquivo:
+        return [json.loads(linha) for linha in arquivo]
+
+
+def conferir(nome, resultados, casos):
+    ok = [r["id"] for r in resultados] == [c["id"] for c in casos] and all(
+        (r["enviar"], r["conceito"], r["trecho"]) == (e.enviar, e.conceito, e.trecho)
+        for r, e in zip(resultados, map(esperado, casos))
+    )
+    print(f"{'✅ PASSOU' if ok else '❌ FALHOU'}: {nome} ({len(resultados)} resultado(s))")
+    return ok
+
+
+def testar_classify():
+    print("=== TESTE DO CLASSIFY OFFLINE ===\n")
+    resultados_ok = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        jsonl = tmp / "entrada.jsonl"
+        jsonl.write_text("".join(json.dumps(c, ensure_ascii=False) + "\n" for c in casos_teste), encoding="utf-8")
+
+        csv_entrada = tmp / "entrada.csv"
+        with open(csv_entrada, "w", encoding="utf-8", newline="") as arquivo:
+            escritor = csv.DictWriter(arquivo, fieldnames=["id", "assunto", "texto"])
+            escritor.writeheader()
+            escritor.writerows(casos_teste)
+
+        pasta = tmp / "pasta"
+        pasta.mkdir()
+        for caso in casos_teste:
+            (pasta / f"{caso['id']}.txt").write_text(caso["texto"], encoding="utf-8")
+
+        for nome, entrada in (("jsonl", jsonl), ("csv", csv_entrada), ("diretório", pasta)):
+            saida = tmp / f"saida_{nome}.jsonl"
+            classificacao_offline.main(["classify", str(entrada), "-o", str(saida), "--processos", "1"])
+            resultados_ok.append(conferir(nome, ler_jsonl(saida), casos_teste))
+
+        # Muitos registros, lotes pequenos e 2 processos: ordem e resultado iguais
+        muitos = [dict(c, id=f"{n}-{c['id']}") for n in range(300) for c in casos_teste]
+        grande = tmp / "grande.jsonl"
+        grande.write_text("".join(json.dumps(c, ensure_ascii=False) + "\n" for c in muitos), encoding="utf-8")
+        saida = tmp / "saida_paralela.jsonl"
+        classificacao_offline.main(["classify", str(grande), "-o", str(saida), "--processos", "2", "--lote", "7"])
+        resultados_ok.append(conferir("2 processos", ler_jsonl(saida), muitos))
+
+        saida_csv = tmp / "saida.csv"
+        classificacao_offline.main(["classify", str(jsonl), "-o", str(saida_csv), "--processos", "1"])
+        with open(saida_csv, encoding="utf-8", newline="") as arquivo:
+            linhas = list(csv.DictReader(arquivo))
+        resultados_ok.append(conferir("saída csv", [dict(l, enviar=l["enviar"] == "True") for l in linhas], casos_teste))
+
+    return all(resultados_ok)
+
+REGRAS_CANDIDATAS = """
+from classificador import *
+
+DICIONARIO_DE_BLOQUEIO_REGEX = dict(DICIONARIO_DE_BLOQUEIO_REGEX)
+del DICIONARIO_DE_BLOQUEIO_REGEX['Boleto/Credor']
+DICIONARIO_DE_BLOQUEIO_REGEX['Reuniao'] = r'\\breunia(?:o|oes)\\b'
+"""
+
+
+def testar_backtest():
+    print("\n=== TESTE DO BACKTEST ===\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        candidato = tmp / "regras_candidatas.py"
+        candidato.write_text(REGRAS_CANDIDATAS, encoding="utf-8")
+        corpus = tmp / "corpus.jsonl"
+        muitos = [dict(c, id=f"{n}-{c['id']}") for n in range(50) for c in casos_teste]
+        corpus.write_text("".join(json.dumps(c, ensure_ascii=False) + "\n" for c in muitos), encoding="utf-8")
+
+        relatorio = tmp / "relatorio.json"
+        mudancas = tmp / "mudancas.jsonl"
+        classificacao_offline.main(["backtest", str(corpus), "--candidato", str(candidato),
+                                    "-o", str(mudancas), "--relatorio", str(relatorio),
+                                    "--processos", "2", "--lote", "9"])
+        dados = json.loads(relatorio.read_text(encoding="utf-8"))
+        por_tipo = dados["por_tipo"]
+        alterados = ler_jsonl(mudancas)
+
+    ok = (
+        dados["total"] == 250
+        and dados["mudancas"] == 100
+        and por_tipo["ENVIADO -> BLOQUEADO"]["Reuniao"]["quantidade"] == 50
+        and por_tipo["BLOQUEADO -> ENVIADO"]["Boleto/Credor"]["quantidade"] == 50
+        and len(alterados) == 100
+    )
+    print(f"\n{'✅ PASSOU' if ok else '❌ FALHOU'}: relatório agrupado por conceito")
+    return ok
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    resultados = [testar_classify(), testar_backtest()]
+    sys.exit(0 if all(resultados) else 1)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de equivalência do Classifier (regex combinadas, passada única)
+contra o laço antigo de re.search por conceito, usando os dicionários REAIS
+de classificador.py.
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import classificador  # noqa: E402
+from classificador import (  # noqa: E402
+    Classifier,
+    normalizar,
+    DICIONARIO_DE_ENVIO_PRIORITARIO,
+    PALAVRAS_DE_ENVIO_OBRIGATORIO,
+    DICIONARIO_DE_BLOQUEIO_REGEX,
+    CLASSIFICADOR,
+)
+
+# ==============================================================================
+# IMPLEMENTAÇÃO DE REFERÊNCIA (LAÇO ANTIGO DO main())
+# ==============================================================================
+
+def decisao_referencia(texto):
+    """Reproduz a lógica antiga: um re.search por conceito, na ordem do dicionário."""
+    for conceito, padrao in DICIONARIO_DE_ENVIO_PRIORITARIO.items():
+        match = re.search(padrao, texto, flags=re.IGNORECASE | re.DOTALL)
+        if match:
+            return (True, conceito, match.group(0))
+    for palavra in PALAVRAS_DE_ENVIO_OBRIGATORIO:
+        padrao = r'\b' + re.escape(normalizar(palavra)) + r'\b'
+        match = re.search(padrao, texto, re.IGNORECASE)
+        if match:
+            return (True, palavra, match.group(0))
+    for conceito, padrao in DICIONARIO_DE_BLOQUEIO_REGEX.items():
+        match = re.search(padrao, texto, flags=re.IGNORECASE | re.DOTALL)
+        if match:
+            return (False, conceito, match.group(0))
+    return (True, "", "")
+
+# ==============================================================================
+# CASOS DE TESTE
+# ==============================================================================
+
+casos_teste = [
+    "Solicito inscrição genérica para o fornecedor XYZ.",
+    "Favor criar CGS para o novo credor.",
+    "Necessário BJ para bloqueio de valores.",
+    "Alterar código de barras do documento.",
+    "Programa de trabalho foi cadastrado no sistema ontem.",
+    "Cadastrar o programa de trabalho no sistema.",
+    "Preciso do acesso ao SIAFEM urgente.",
+    "Senha do SIAFERIO foi esquecida.",
+    "O programa específico não precisa de trabalho adicional.",
+    "Relatório de despesas diversas do setor.",
+    "Problema no SIAFERIO, usuários não conseguem acessar.",
+    "FlexVision apresentando inconsistências.",
+    "Fechamento do mês em andamento.",
+    # Conceito de menor prioridade aparece ANTES no texto (ordem do dicionário deve prevalecer)
+    "O credor pediu a inscrição genérica e o boleto.",
+    "Boleto do credor; desconsiderar o pedido de reativação de perfil de usuário.",
+    "Sistema travado. Depois: URGENTE, fechamento do mês.",
+    "Reunião sobre novos procedimentos na próxima semana.",
+]
+
+PALAVRAS_ALEATORIAS = (
+    "credor boleto siafe siaferio siafe-rio acesso senha programa de trabalho cadastrar "
+    "alteracao dados bancarios banco agencia conta corrente urgente para hoje fechamento "
+    "do mes bj igs cgs inscricao generica reativar perfil de usuario gestor flexvision "
+    "sistema fora do ar nao consigo acessar o a os as no sistema foi liberado fonte "
+    "detalhada liscontir desconsiderar informacoes cadastrais codigo de barras reuniao "
+    "relatorio setor despesa pagamento empenho nota"
+).split()
+
+
+def gerar_textos_aleatorios(n, tamanho, semente=42):
+    rnd = random.Random(semente)
+    return [" ".join(rnd.choice(PALAVRAS_ALEATORIAS) for _ in range(tamanho)) for _ in range(n)]
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def testar_equivalencia():
+    print("=== TESTE DE EQUIVALÊNCIA DO CLASSIFIER ===\n")
+    textos = [normalizar(t) for t in casos_teste]
+    textos += gerar_textos_aleatorios(2000, 12)
+    textos += gerar_textos_aleatorios(200, 300, semente=7)
+
+    falhas = 0
+    for texto in textos:
+        esperado = decisao_referencia(texto)
+        decisao = CLASSIFICADOR.classificar(texto)
+        obtido = (decisao.enviar, decisao.conceito, decisao.trecho)
+        if obtido != esperado:
+            falhas += 1
+            if falhas <= 10:
+                print(f"❌ Divergência em: \"{texto[:120]}\"")
+                print(f"   Esperado: {esperado}")
+                print(f"   Obtido:   {obtido}\n")
+
+    print(f"RESULTADO: {len(textos) - falhas}/{len(textos)} textos com a mesma decisão.")
+
+    # Comparação rápida de tempo (informativa) com o caso mais comum: texto sem termos das regras
+    paragrafo = normalizar(
+        "Prezados, encaminhamos para conhecimento a nota técnica referente ao pagamento "
+        "de despesas do exercício corrente, conforme orientação da coordenação. "
+    )
+    longos = [paragrafo * 20] * 300
+    inicio = time.perf_counter()
+    for texto in longos:
+        decisao_referencia(texto)
+    t_ref = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for texto in longos:
+        CLASSIFICADOR.classificar(texto)
+    t_novo = time.perf_counter() - inicio
+    print(f"Tempo (300 textos longos): referência {t_ref*1000:.1f} ms | Classifier {t_novo*1000:.1f} ms")
+
+    return falhas == 0
+
+def testar_prefiltro():
+    """O pré-filtro de âncoras (pyahocorasick ou regex) não pode mudar nenhuma decisão."""
+    print("\n=== TESTE DO PRÉ-FILTRO DE ÂNCORAS ===\n")
+    sem_prefiltro = Classifier(DICIONARIO_DE_ENVIO_PRIORITARIO, DICIONARIO_DE_BLOQUEIO_REGEX,
+                               PALAVRAS_DE_ENVIO_OBRIGATORIO, prefiltro=False)
+
+    # Força o caminho sem pyahocorasick
+    modulo_aho = classificador.ahocorasick
+    classificador.ahocorasick = None
+    try:
+        com_regex = Classifier(DICIONARIO_DE_ENVIO_PRIORITARIO, DICIONARIO_DE_BLOQUEIO_REGEX,
+                               PALAVRAS_DE_ENVIO_OBRIGATORIO)
+    finally:
+        classificador.ahocorasick = modulo_aho
+
+    sem_ancora = [nome for nome, ancoras in CLASSIFICADOR.ancoras_por_conceito().items() if ancoras is None]
+    print(f"Conceitos sem âncora (rodam sempre): {sem_ancora or 'nenhum'}")
+
+    textos = [normalizar(t) for t in casos_teste]
+    textos += gerar_textos_aleatorios(2000, 8, semente=11)
+    # "ſ" casa com "s" no re.IGNORECASE: a âncora "desconsider" não pode descartar o conceito
+    textos.append("favor deſconsiderar o pedido")
+
+    falhas = 0
+    for texto in textos:
+        esperado = sem_prefiltro.classificar(texto)
+        for classificador_testado in (CLASSIFICADOR, com_regex):
+            if classificador_testado.classificar(texto) != esperado:
+                falhas += 1
+                print(f"❌ Divergência em: \"{texto[:120]}\"")
+                break
+
+    print(f"RESULTADO: {len(textos) - falhas}/{len(textos)} textos com a mesma decisão.")
+    return falhas == 0
+
+def testar_orcamento():
+    """Caminho medido (estatísticas/orçamento) decide igual ao rápido; orçamento estourado envia para análise."""
+    print("\n=== TESTE DO CAMINHO MEDIDO E DO ORÇAMENTO ===\n")
+    estatisticas = classificador.EstatisticasConceitos(guardar_amostras=True)
+    textos = [normalizar(t) for t in casos_teste] + gerar_textos_aleatorios(500, 12, semente=3)
+
+    falhas = 0
+    for texto in textos:
+        if CLASSIFICADOR.classificar(texto, estatisticas=estatisticas) != CLASSIFICADOR.classificar(texto):
+            falhas += 1
+            print(f"❌ Divergência no caminho medido: \"{texto[:120]}\"")
+
+    if not estatisticas.mais_lentos(3):
+        falhas += 1
+        print("❌ Nenhuma medição registrada")
+
+    decisao = CLASSIFICADOR.classificar(normalizar("Programa x"), orcamento_s=0)
+    if not (decisao.enviar and decisao.categoria == classificador.ORCAMENTO_EXCEDIDO):
+        falhas += 1
+        print(f"❌ Orçamento zero deveria enviar para análise: {decisao}")
+
+    # Corredor de espaços depois de um verbo: antes levava dezenas de segundos (backtracking)
+    for texto in ("cadastrar" + " " * 40000 + "x programa", "gestor do" + " " * 40000 + "x",
+                  "programa" + "\n" * 40000 + "x"):
+        inicio = time.perf_counter()
+        decisao = CLASSIFICADOR.classificar(texto, orcamento_s=0.05, estatisticas=classificador.EstatisticasConceitos())
+        gasto = time.perf_counter() - inicio
+        if gasto > 0.5 or decisao.categoria != classificador.PADRAO:
+            falhas += 1
+            print(f"❌ Texto adversarial de {len(texto)} caracteres: {gasto*1000:.0f} ms, {decisao.categoria}")
+
+    decisao = CLASSIFICADOR.classificar("favor alterar os   \n  dados   bancarios do credor")
+    if decisao.conceito != "Dados Bancarios" or decisao.trecho != "dados   bancarios":
+        falhas += 1
+        print(f"❌ Espaços repetidos colapsados só para as regex (trecho do original): {decisao}")
+
+    # Trecho tirado do original: com os espaços colapsados é o mesmo que o das regex
+    rnd = random.Random(5)
+    for texto in gerar_textos_aleatorios(300, 20, semente=13):
+        espacado = "".join(c if c != " " else rnd.choice([" ", "  ", " \n ", "\t\t\t"]) for c in texto)
+        decisao = CLASSIFICADOR.classificar(espacado)
+        if decisao != CLASSIFICADOR.classificar(texto)._replace(trecho=decisao.trecho, motivo=decisao.motivo) \
+                or decisao.trecho not in espacado \
+                or classificador.preparar_texto(decisao.trecho).texto != CLASSIFICADOR.classificar(texto).trecho:
+            falhas += 1
+            print(f"❌ Trecho não corresponde ao texto original: {decisao.trecho!r} em {espacado[:120]!r}")
+            break
+
+    # Texto longo demais vai para análise: nunca um bloqueio decidido só pelo começo do texto
+    inicio_bloqueado = normalizar("bloqueio judicial do credor. ")
+    fim_prioritario = normalizar(" urgente: responder hoje")
+    curto = CLASSIFICADOR.classificar(inicio_bloqueado + fim_prioritario)
+    longo = CLASSIFICADOR.classificar(inicio_bloqueado + "texto do comunica " * 7000 + fim_prioritario)
+    if curto.categoria != classificador.PRIORITARIO or not longo.enviar \
+            or longo.categoria != classificador.ORCAMENTO_EXCEDIDO:
+        falhas += 1
+        print(f"❌ Texto acima de {classificador.TAMANHO_MAXIMO_TEXTO} caracteres deveria ir para análise: {longo}")
+
+    print(f"RESULTADO: {'OK' if falhas == 0 else f'{falhas} falha(s)'}")
+    return falhas == 0
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    resultados = [testar_equivalencia(), testar_prefiltro(), testar_orcamento()]
+    sys.exit(0 if all(resultados) else 1)
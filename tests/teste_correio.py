@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da conexão SMTP reaproveitada (correio.py) contra um servidor SMTP
+local (aiosmtpd): vários e-mails numa conexão e num login só, troca de
+conexão no limite de mensagens, reconexão quando o servidor derruba a sessão,
+NOOP na conexão ociosa e QUIT no fechar(). Também cobre a fila de envio em
+segundo plano (FilaCorreio): enfileirar não espera o SMTP, encerrar() espera a
+fila esvaziar e a falha de um envio não para os outros.
+"""
+
+import socket
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from correio import CorreioSMTP, FilaCorreio  # noqa: E402
+
+try:
+    from aiosmtpd.controller import Controller
+    from aiosmtpd.smtp import AuthResult
+except ImportError:
+    Controller = None
+
+# ==============================================================================
+# SERVIDOR DE TESTE
+# ==============================================================================
+
+class Caixa:
+    """Handler do aiosmtpd que guarda as mensagens e conta os comandos recebidos."""
+
+    def __init__(self):
+        self.mensagens = []
+        self.comandos = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.comandos.append("EHLO")
+        session.host_name = hostname
+        return responses
+
+    async def handle_NOOP(self, server, session, envelope, arg):
+        self.comandos.append("NOOP")
+        return "250 OK"
+
+    async def handle_QUIT(self, server, session, envelope):
+        self.comandos.append("QUIT")
+        return "221 Bye"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.mensagens.append((envelope.mail_from, list(envelope.rcpt_tos), envelope.content))
+        return "250 Message accepted for delivery"
+
+
+def autenticar(caixa):
+    def autenticador(server, session, envelope, mechanism, auth_data):
+        caixa.comandos.append("AUTH")
+        ok = auth_data.login == b"robo@sefaz" and auth_data.password == b"segredo"
+        return AuthResult(success=ok)
+    return autenticador
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def mensagem(i):
+    return f"Subject: Comunica {i}\r\n\r\nCorpo do comunica {i}.\r\n"
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_correio():
+    print("=== TESTE DA CONEXÃO SMTP REAPROVEITADA ===\n")
+    if Controller is None:
+        print("aiosmtpd não instalado; teste pulado.")
+        return True
+    resultados = []
+    caixa = Caixa()
+    porta = porta_livre()
+    controller = Controller(caixa, hostname="127.0.0.1", port=porta, auth_require_tls=False,
+                            authenticator=autenticar(caixa))
+    controller.start()
+    logs = []
+    try:
+        correio = CorreioSMTP("127.0.0.1", porta, "robo@sefaz", "segredo", starttls=False, max_mensagens=3,
+                              registrar_log=logs.append)
+
+        for i in range(3):
+            correio.enviar("robo@sefaz", ["a@sefaz", "b@sefaz"], mensagem(i))
+        resultados.append(verificar(
+            "três e-mails numa conexão e num login só",
+            len(caixa.mensagens) == 3 and correio.conexoes == 1 and caixa.comandos.count("AUTH") == 1
+            and caixa.mensagens[0][1] == ["a@sefaz", "b@sefaz"],
+        ))
+
+        correio.enviar("robo@sefaz", ["a@sefaz"], mensagem(3))
+        resultados.append(verificar(
+            "limite de mensagens por conexão: QUIT e conexão nova",
+            correio.conexoes == 2 and caixa.comandos.count("QUIT") == 1 and len(caixa.mensagens) == 4,
+        ))
+
+        correio._smtp.sock.shutdown(socket.SHUT_RDWR)  # sessão derrubada no meio da execução
+        correio.enviar("robo@sefaz", ["a@sefaz"], mensagem(4))
+        resultados.append(verificar(
+            "conexão derrubada: reconecta e envia na segunda tentativa",
+            correio.conexoes == 3 and correio.reconexoes == 1 and len(caixa.mensagens) == 5
+            and any("Reconectando" in log for log in logs),
+        ))
+
+        correio.intervalo_noop_s = 0
+        time.sleep(0.01)
+        correio.enviar("robo@sefaz", ["a@sefaz"], mensagem(5))
+        resultados.append(verificar(
+            "conexão ociosa testada com NOOP e reaproveitada",
+            "NOOP" in caixa.comandos and correio.conexoes == 3 and len(caixa.mensagens) == 6,
+        ))
+
+        quits = caixa.comandos.count("QUIT")
+        correio.fechar()
+        time.sleep(0.1)
+        resultados.append(verificar("fechar() manda o QUIT",
+                                    caixa.comandos.count("QUIT") == quits + 1 and correio._smtp is None))
+        resultados.append(verificar("estatísticas da execução",
+                                    correio.mensagens == 6 and correio.tempo_conectando_s > 0))
+    finally:
+        controller.stop()
+
+    return all(resultados)
+
+
+class CorreioLento:
+    """Finge um SMTP que demora `atraso_s` por mensagem e recusa as com 'falha' no texto."""
+
+    def __init__(self, atraso_s):
+        self.atraso_s = atraso_s
+        self.enviadas = []
+
+    def enviar(self, remetente, destinatarios, mensagem):
+        time.sleep(self.atraso_s)
+        if "falha" in mensagem:
+            raise OSError("servidor recusou")
+        self.enviadas.append(mensagem)
+        return {}
+
+
+def testar_fila():
+    print("\n=== TESTE DA FILA DE ENVIO EM SEGUNDO PLANO ===\n")
+    resultados = []
+    correio = CorreioLento(0.05)
+    fila = FilaCorreio(correio, tamanho_maximo=10, registrar_log=lambda _: None)
+
+    inicio = time.perf_counter()
+    for i in range(5):
+        fila.enfileirar("robo@sefaz", ["a@sefaz"], mensagem(i), descricao=f"Comunica {i}")
+    fila.enfileirar("robo@sefaz", ["a@sefaz"], "falha", descricao="Comunica com falha")
+    enfileirar_s = time.perf_counter() - inicio
+    resultados.append(verificar(f"enfileirar não espera o SMTP ({enfileirar_s*1000:.1f} ms para 6 e-mails)",
+                                enfileirar_s < 0.05 and len(correio.enviadas) < 5))
+
+    estatisticas = fila.encerrar()
+    resultados.append(verificar(
+        "encerrar() espera a fila esvaziar; a falha não para os outros envios",
+        len(correio.enviadas) == 5 and estatisticas["enviados"] == 5
+        and estatisticas["falhas"] == [("Comunica com falha", "servidor recusou")],
+    ))
+    resultados.append(verificar(
+        f"estatísticas da execução (latência p50 {estatisticas['latencia_p50_s']*1000:.0f} ms, "
+        f"fila máx. {estatisticas['profundidade_maxima']})",
+        estatisticas["latencia_p50_s"] >= 0.04 and estatisticas["profundidade_maxima"] >= 4
+        and estatisticas["espera_max_s"] > 0.1,
+    ))
+    resultados.append(verificar("estatísticas zeradas para a próxima execução",
+                                fila.encerrar()["enviados"] == 0))
+
+    pequena = FilaCorreio(CorreioLento(0.05), tamanho_maximo=1, registrar_log=lambda _: None)
+    inicio = time.perf_counter()
+    for i in range(4):
+        pequena.enfileirar("robo@sefaz", ["a@sefaz"], mensagem(i))
+    bloqueado_s = time.perf_counter() - inicio
+    pequena.encerrar()
+    resultados.append(verificar(f"fila cheia segura o loop principal ({bloqueado_s*1000:.0f} ms)",
+                                bloqueado_s >= 0.08))
+
+    fila.enfileirar("robo@sefaz", ["a@sefaz"], mensagem(9))
+    resultados.append(verificar("fila volta a funcionar na execução seguinte",
+                                fila.encerrar()["enviados"] == 1 and len(correio.enviadas) == 6))
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    ok = testar_correio()
+    ok = testar_fila() and ok
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da fábrica de navegadores sem abrir navegador: caminhos do driver
+resolvidos uma vez (processo e arquivo), navegador pré-aquecido entregue
+sem espera e navegador auxiliar sem o diretório de perfil.
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import drivers  # noqa: E402
+
+ATRASO_ABERTURA_S = 0.2
+
+# ==============================================================================
+# NAVEGADOR FALSO
+# ==============================================================================
+
+class NavegadorFalso:
+    def __init__(self, auxiliar):
+        self.auxiliar = auxiliar
+        self.fechado = False
+
+    def execute_script(self, script):
+        return 1
+
+    def quit(self):
+        self.fechado = True
+
+
+class FabricaFalsa(drivers.FabricaDrivers):
+    def _abrir(self, auxiliar):
+        time.sleep(ATRASO_ABERTURA_S)
+        return NavegadorFalso(auxiliar)
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_resolucao():
+    chamadas = []
+
+    def resolver_falso(navegador):
+        chamadas.append(navegador)
+        return {"driver_path": sys.executable, "browser_path": ""}
+
+    original = drivers._resolver
+    drivers._resolver = resolver_falso
+    resultados = []
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            cache = Path(pasta) / "drivers.json"
+            drivers._resolvidos.clear()
+            primeiro = drivers.resolver_binarios("chrome", cache)
+            drivers.resolver_binarios("chrome", cache)
+            resultados.append(verificar("resolução feita uma vez por processo",
+                                        chamadas == ["chrome"] and primeiro["driver_path"] == sys.executable))
+            resultados.append(verificar("caminhos gravados no arquivo de cache",
+                                        json.loads(cache.read_text(encoding="utf-8"))["chrome"] == primeiro))
+
+            drivers._resolvidos.clear()  # novo processo
+            drivers.resolver_binarios("chrome", cache)
+            resultados.append(verificar("novo processo usa o arquivo sem resolver de novo", chamadas == ["chrome"]))
+
+            cache.write_text(json.dumps({"chrome": {"driver_path": "/nao/existe", "browser_path": ""}}),
+                             encoding="utf-8")
+            drivers._resolvidos.clear()
+            drivers.resolver_binarios("chrome", cache)
+            resultados.append(verificar("caminho que sumiu é resolvido de novo", chamadas == ["chrome", "chrome"]))
+    finally:
+        drivers._resolver = original
+        drivers._resolvidos.clear()
+    return resultados
+
+
+def testar_fabrica():
+    log = []
+    fabrica = FabricaFalsa(drivers.ConfiguracaoDriver(diretorio_perfil="/tmp/perfil"), registrar_log=log.append)
+    resultados = []
+
+    inicio = time.perf_counter()
+    frio = fabrica.criar()
+    duracao_fria = time.perf_counter() - inicio
+    resultados.append(verificar(f"abertura a frio medida ({duracao_fria * 1000:.0f} ms)",
+                                len(fabrica.tempos_abertura) == 1 and not frio.auxiliar))
+
+    resultados.append(verificar("preaquecer() abre um só navegador de reserva",
+                                fabrica.preaquecer() and not fabrica.preaquecer()))
+    time.sleep(ATRASO_ABERTURA_S * 2)
+    inicio = time.perf_counter()
+    quente = fabrica.criar()
+    duracao_quente = time.perf_counter() - inicio
+    resultados.append(verificar(f"navegador pré-aquecido entregue sem espera ({duracao_quente * 1000:.0f} ms)",
+                                quente is not frio and duracao_quente < ATRASO_ABERTURA_S / 2))
+
+    fabrica.preaquecer()
+    auxiliar = fabrica.criar(auxiliar=True)
+    resultados.append(verificar("auxiliar não consome a reserva do principal",
+                                auxiliar.auxiliar and fabrica.criar() is not auxiliar))
+
+    fabrica.preaquecer()
+    time.sleep(ATRASO_ABERTURA_S * 2)
+    reserva = fabrica._reserva
+    fabrica.descartar_reserva()
+    resultados.append(verificar("reserva não usada é fechada", reserva is not None and reserva.fechado))
+    return resultados
+
+
+def testar_drivers():
+    print("=== TESTE DA FÁBRICA DE NAVEGADORES ===\n")
+    return all(testar_resolucao() + testar_fabrica())
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    sys.exit(0 if testar_drivers() else 1)
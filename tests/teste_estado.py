@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do registro de comunicas tratados (estado.py): consulta pelo número,
+corpo alterado volta a ser tratado, registro sobrevive a reabrir o banco, a
+consulta custa uma busca na chave primária e a chave da linha da lista é
+guardada junto do número (inclusive em registro de versão anterior).
+"""
+
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import estado  # noqa: E402
+from classificador import Decisao  # noqa: E402
+from siafe import Comunica  # noqa: E402
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_estado():
+    print("=== TESTE DO REGISTRO DE COMUNICAS TRATADOS ===\n")
+    resultados = []
+    comunica = Comunica("2024/101", "Dados bancários", "Favor alterar os dados bancários do credor.")
+    decisao = Decisao(True, "prioritario", "Dados Bancarios", "dados bancarios", "[ENVIO PRIORITÁRIO] ...")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / "estado.db"
+        registro = estado.EstadoComunicas(caminho)
+        resultados.append(verificar("comunica novo não está no registro",
+                                    not registro.ja_processado(comunica.numero)))
+
+        registro.registrar(comunica, decisao)
+        resultados.append(verificar("comunica tratado é encontrado pelo número e pelo corpo",
+                                    registro.ja_processado(comunica.numero)
+                                    and registro.ja_processado(comunica.numero, comunica.texto)))
+        resultados.append(verificar("corpo alterado volta a ser tratado",
+                                    not registro.ja_processado(comunica.numero, comunica.texto + " Att.")))
+        registro.fechar()
+
+        reaberto = estado.EstadoComunicas(caminho)
+        salvo = reaberto.registro(comunica.numero)
+        resultados.append(verificar(
+            "registro sobrevive a reabrir o banco (nova execução)",
+            salvo is not None and salvo.enviado and salvo.categoria == "prioritario"
+            and salvo.conceito == "Dados Bancarios" and salvo.hash_corpo == estado.hash_do_corpo(comunica.texto),
+        ))
+
+        for i in range(5000):
+            reaberto.registrar(Comunica(f"2023/{i:05d}", "", f"texto {i}"), decisao._replace(enviar=False))
+        inicio = time.perf_counter()
+        for i in range(1000):
+            reaberto.ja_processado(f"2023/{i:05d}")
+        por_consulta_us = (time.perf_counter() - inicio) / 1000 * 1e6
+        resultados.append(verificar(f"consulta pelo número com {len(reaberto)} registros: {por_consulta_us:.0f} us",
+                                    por_consulta_us < 1000))
+        reaberto.fechar()
+
+        # Chave da linha da lista guardada junto do número do detalhe
+        chaves = estado.EstadoComunicas(":memory:")
+        chaves.registrar(Comunica("2024/201", "Assunto", "texto", chave="2024/201 "), decisao)
+        chaves.registrar(Comunica("2024/202", "Assunto", "texto"), decisao)
+        resultados.append(verificar(
+            "linha da lista encontrada pela chave guardada, ou pelo número em registro sem chave",
+            chaves.chave_processada("2024/201 ") and chaves.chave_processada("2024/202")
+            and not chaves.chave_processada("2024/203") and chaves.registro("2024/201").chave == "2024/201 ",
+        ))
+        chaves.fechar()
+
+        # Registro de uma versão anterior (sem a coluna chave) ganha a coluna ao abrir
+        antigo = Path(pasta) / "antigo.db"
+        conexao = sqlite3.connect(antigo)
+        conexao.execute("CREATE TABLE comunicas_processados (numero TEXT PRIMARY KEY, hash_corpo TEXT NOT NULL, "
+                        "enviado INTEGER NOT NULL, categoria TEXT NOT NULL, conceito TEXT NOT NULL, "
+                        "processado_em TEXT NOT NULL)")
+        conexao.execute("INSERT INTO comunicas_processados VALUES ('2022/001', 'x', 1, 'PADRAO', '', '2022-01-01')")
+        conexao.commit()
+        conexao.close()
+        convertido = estado.EstadoComunicas(antigo)
+        convertido.registrar(Comunica("2022/002", "Assunto", "texto", chave="2022/002"), decisao)
+        resultados.append(verificar("registro antigo convertido: consultas pela chave e pelo número",
+                                    convertido.chave_processada("2022/001") and convertido.chave_processada("2022/002")
+                                    and len(convertido) == 2))
+        convertido.fechar()
+
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    sys.exit(0 if testar_estado() else 1)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do log da execução (log_execucao.py): cada tipo de evento renderizado
+como o e-mail de log mostrava (título e separador da lista, número do
+comunica destacado, cores da decisão), texto escapado, linhas vazias
+ignoradas, buffer que passa para o disco com memória estável e registro de
+várias threads.
+"""
+
+import sys
+import threading
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import log_execucao  # noqa: E402
+from classificador import BLOQUEADO, PADRAO, PRIORITARIO  # noqa: E402
+from log_execucao import COMUNICA, DECISAO, INFORMATIVO, LISTA, LogExecucao  # noqa: E402
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_log_execucao():
+    print("=== TESTE DO LOG DA EXECUÇÃO ===\n")
+    resultados = []
+    impressas = []
+
+    with LogExecucao(saida=impressas.append) as log:
+        log("\n--- Verificando a lista de comunicas... ---", tipo=LISTA)
+        log("Encontrados 2 comunica(s) na lista.")
+        log("--- Análise do Comunica ID '2024/101 - Dados <bancários>' ---",
+            tipo=COMUNICA, numero="2024/101", assunto="Dados <bancários>")
+        log("[BLOQUEADO] Assunto impeditivo: 'Reuniao'", tipo=DECISAO, categoria=BLOQUEADO)
+        log("   ")
+        log("[ENVIO PRIORITÁRIO] Dados Bancarios detectado", tipo=DECISAO, categoria=PRIORITARIO)
+        log("[ENVIO DE EMAIL PARA ANALISE] Nenhuma palavra impeditiva", tipo=DECISAO, categoria=PADRAO)
+        log("[INFORMATIVO] Fim da lista detectado.", tipo=INFORMATIVO)
+        log("\n--- Verificando a lista de comunicas... (snapshot) ---", tipo=LISTA)
+        linhas = log.html().split("<br>")
+
+        resultados.append(verificar("mensagem impressa como veio (inclusive a vazia)",
+                                    len(impressas) == 9 and impressas[0].startswith("\n---")))
+        resultados.append(verificar(
+            "primeira verificação da lista sem separador; as seguintes com separador antes do título",
+            linhas[0] == "<h4>--- Verificando a lista de comunicas... ---</h4>"
+            and linhas[-2] == log_execucao.SEPARADOR and linhas[-1].startswith("<h4>"),
+        ))
+        resultados.append(verificar(
+            "número do comunica destacado e assunto escapado",
+            '<b style="background-color: #fcf8e3; padding: 2px 5px; border-radius: 3px;">2024/101</b>' in linhas[2]
+            and "Dados &lt;bancários&gt;" in linhas[2],
+        ))
+        resultados.append(verificar(
+            "cor pela categoria da decisão e pelo tipo informativo; linha vazia ignorada",
+            [linha[:33] for linha in linhas[3:7]] == [
+                '<div style="color: #d9534f; font-', '<div style="color: #bc0ec7; font-',
+                '<div style="color: #5cb85c; font-', '<div style="color: #5bc0de; font-',
+            ] and "&#x27;Reuniao&#x27;" in linhas[3] and len(linhas) == 9,
+        ))
+        resultados.append(verificar("texto comum só escapado", linhas[1] == "Encontrados 2 comunica(s) na lista."))
+        resultados.append(verificar("contagem por tipo", log.contagem[DECISAO] == 3 and log.contagem[LISTA] == 2))
+
+    tracemalloc.start()
+    with LogExecucao(memoria_maxima=256 * 1024, saida=None) as longo:
+        for i in range(50_000):
+            longo(f"--- Análise do Comunica ID '2024/{i:05d} - Assunto' ---",
+                  tipo=COMUNICA, numero=f"2024/{i:05d}", assunto="Assunto")
+            longo("[ENVIO DE EMAIL PARA ANALISE] Nenhuma palavra impeditiva encontrada.", tipo=DECISAO, categoria=PADRAO)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        html_final = longo.html()
+        resultados.append(verificar(
+            f"execução longa: {len(html_final) / 1e6:.1f} MB de HTML em disco, pico de {pico / 1e6:.1f} MB em memória",
+            longo.em_disco and pico < 2e6 and html_final.count("<br>") == 99_999,
+        ))
+
+    log = LogExecucao(saida=None)
+    threads = [threading.Thread(target=lambda: [log(f"linha {i}") for i in range(1000)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    resultados.append(verificar("registro de várias threads sem perder linha",
+                                log.linhas == 4000 and log.html().count("<br>") == 3999))
+    log.fechar()
+
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    sys.exit(0 if testar_log_execucao() else 1)
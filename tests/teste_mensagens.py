@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da montagem dos e-mails (mensagens.py): UTF-8 de ponta a ponta (emoji
+no assunto, aspas curvas no comunica), multipart/alternative com texto puro,
+codificação de transferência escolhida pelo tamanho e modelos que escapam os
+campos.
+"""
+
+import email
+import sys
+from email import policy
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import mensagens  # noqa: E402
+from siafe import Comunica  # noqa: E402
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def ler(mensagem):
+    return email.message_from_bytes(mensagem.as_bytes(), policy=policy.default)
+
+
+def testar_mensagens():
+    print("=== TESTE DA MONTAGEM DOS E-MAILS ===\n")
+    resultados = []
+
+    comunica = Comunica("2024/101", "Pagamento “urgente”", "Favor verificar o empenho <123> & a “nota”.\nAtt. 🙂")
+    corpo = mensagens.corpo_comunica(comunica)
+    resultados.append(verificar(
+        "modelo escapa os campos e mantém as quebras de linha do comunica",
+        "empenho &lt;123&gt; &amp; a “nota”.<br>Att. 🙂" in corpo and "(2024/101 - Pagamento “urgente”)" in corpo,
+    ))
+
+    lida = ler(mensagens.montar_mensagem("robo@sefaz", ["a@sefaz", "b@sefaz"], "🛑 Falha na Automação", corpo))
+    partes = [parte.get_content_type() for parte in lida.iter_parts()]
+    resultados.append(verificar(
+        "assunto com emoji e corpo com aspas curvas sobrevivem à ida e volta",
+        lida["Subject"] == "🛑 Falha na Automação" and lida["To"] == "a@sefaz, b@sefaz"
+        and "a “nota”.<br>Att. 🙂" in lida.get_body(("html",)).get_content(),
+    ))
+    texto = lida.get_body(("plain",)).get_content().replace("\r\n", "\n")
+    resultados.append(verificar(
+        "multipart/alternative com texto puro tirado do HTML",
+        lida.get_content_type() == "multipart/alternative" and partes == ["text/plain", "text/html"]
+        and "Favor verificar o empenho <123> & a “nota”.\nAtt. 🙂" in texto and "<p>" not in texto,
+    ))
+
+    codificacoes = {
+        "ascii": mensagens.codificacao_de_transferencia("Relatorio de empenhos\n" * 50),
+        "português": mensagens.codificacao_de_transferencia(
+            "Solicitamos a análise do processo de pagamento referente ao empenho.\n" * 50),
+        "emoji": mensagens.codificacao_de_transferencia("🙂🛑📎 “”\n" * 50),
+        "linha longa": mensagens.codificacao_de_transferencia("x" * 2000),
+    }
+    resultados.append(verificar(
+        f"codificação escolhida pelo tamanho ({codificacoes})",
+        codificacoes == {"ascii": "7bit", "português": "quoted-printable", "emoji": "base64",
+                         "linha longa": "quoted-printable"},
+    ))
+
+    falha = mensagens.corpo_falha(host="vps", url="https://siafe/?a=1&b=2", erro="ValueError('<x>')",
+                                  traceback="Traceback ...", log_html="<b>linha</b>")
+    resultados.append(verificar("corpo de falha: URL e erro escapados, log HTML mantido",
+                                "a=1&amp;b=2" in falha and "&lt;x&gt;" in falha and "<b>linha</b>" in falha))
+    resultados.append(verificar("texto puro sem estilo nem linhas vazias repetidas",
+                                "\n\n\n" not in mensagens.texto_do_html(falha)
+                                and "font-family" not in mensagens.texto_do_html(falha)))
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    sys.exit(0 if testar_mensagens() else 1)
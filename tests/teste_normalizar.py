@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste de equivalência da normalizar() rápida (ASCII / tabela latina / NFD)
+contra a implementação original, caractere a caractere e em textos mistos.
+"""
+
+import random
+import sys
+import unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from classificador import normalizar, normalizar_com_cache  # noqa: E402
+
+# ==============================================================================
+# FUNÇÃO DE NORMALIZAÇÃO ORIGINAL (REFERÊNCIA)
+# ==============================================================================
+
+def normalizar_original(txt: str) -> str:
+    txt = unicodedata.normalize("NFD", txt)
+    txt = "".join(ch for ch in txt if unicodedata.category(ch) != "Mn")
+    return txt.lower()
+
+# ==============================================================================
+# CASOS DE TESTE
+# ==============================================================================
+
+casos_teste = [
+    "",
+    "Texto simples em ASCII.",
+    "Inscrição Genérica, Alteração de Razão Social e Prestação de Contas",
+    "AÇÃO ÚNICA: ÊXITO, ÓRGÃO, PÚBLICO, MÊS, Ñ, Ø, Æ, ß, ẞ",
+    "İstanbul, ǅ, Ǆ, ǈ, Ǳ, ſ, ŉ",                  # maiúsculas/minúsculas especiais
+    "áê (marcas combinantes soltas)",
+    "Σίσυφος ΟΔΥΣΣΕΥΣ",                               # sigma final depende de contexto
+    "“aspas curvas” – travessão — reticências…",
+    "emoji 🛑 no assunto ✅",
+    "ﬁm ﬀ Ⅻ ①",                                     # compatibilidade (NFD não altera)
+]
+
+# ==============================================================================
+# FUNÇÕES DE TESTE
+# ==============================================================================
+
+def testar_caracteres_individuais():
+    """Todos os code points, um a um."""
+    falhas = [c for c in range(0x110000)
+              if normalizar(chr(c)) != normalizar_original(chr(c))]
+    print(f"Caracteres individuais: {0x110000 - len(falhas)}/{0x110000} idênticos")
+    for c in falhas[:10]:
+        print(f"  ❌ U+{c:04X}: {normalizar(chr(c))!r} != {normalizar_original(chr(c))!r}")
+    return not falhas
+
+
+def testar_textos():
+    rnd = random.Random(1)
+    alfabeto_latino = [chr(c) for c in range(0x20, 0x250)]
+    alfabeto_misto = alfabeto_latino + [chr(c) for c in (0x301, 0x302, 0x327, 0x3A3, 0x3C3, 0x130, 0x1F6D1, 0x2026)]
+    textos = list(casos_teste)
+    textos += ["".join(rnd.choice(alfabeto_latino) for _ in range(60)) for _ in range(3000)]
+    textos += ["".join(rnd.choice(alfabeto_misto) for _ in range(60)) for _ in range(3000)]
+
+    falhas = 0
+    for texto in textos:
+        esperado = normalizar_original(texto)
+        if normalizar(texto) != esperado or normalizar_com_cache(texto) != esperado:
+            falhas += 1
+            if falhas <= 10:
+                print(f"  ❌ {texto!r}")
+    print(f"Textos: {len(textos) - falhas}/{len(textos)} idênticos")
+    return falhas == 0
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    print("=== TESTE DA NORMALIZAÇÃO RÁPIDA ===\n")
+    resultados = [testar_caracteres_individuais(), testar_textos()]
+    sys.exit(0 if all(resultados) else 1)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste dos perfis do navegador: argumentos do Chromium, carregamento "eager",
+cache em disco e padrões bloqueados pelo CDP em cada perfil.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from selenium.webdriver.chrome.options import Options  # noqa: E402
+
+import perfil_navegador  # noqa: E402
+
+
+class DriverFalso:
+    def __init__(self):
+        self.comandos = []
+
+    def execute_cdp_cmd(self, comando, parametros):
+        self.comandos.append((comando, parametros))
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_perfis():
+    print("=== TESTE DOS PERFIS DO NAVEGADOR ===\n")
+    resultados = []
+
+    completo = perfil_navegador.configurar_opcoes(Options(), "completo")
+    resultados.append(verificar("perfil completo só define a janela de sempre",
+                                completo.arguments == ["--window-size=1920,1080"]
+                                and completo.page_load_strategy == "normal"))
+
+    enxuto = perfil_navegador.configurar_opcoes(Options(), "enxuto", "/tmp/cache_teste")
+    resultados.append(verificar(
+        "perfil enxuto: extensões e rede em segundo plano desligadas, eager e cache em disco",
+        {"--disable-extensions", "--disable-background-networking", "--disable-component-update",
+         "--disk-cache-dir=/tmp/cache_teste"} <= set(enxuto.arguments)
+        and enxuto.page_load_strategy == "eager",
+    ))
+
+    padrao = perfil_navegador.configurar_opcoes(Options(), "enxuto")
+    resultados.append(verificar("sem diretório, o cache fica em uma pasta fixa (quente entre execuções)",
+                                f"--disk-cache-dir={perfil_navegador.DIRETORIO_CACHE_PADRAO}" in padrao.arguments))
+
+    try:
+        perfil_navegador.configurar_opcoes(Options(), "turbo")
+        recusado = False
+    except ValueError:
+        recusado = True
+    resultados.append(verificar("perfil desconhecido é recusado", recusado))
+
+    driver = DriverFalso()
+    perfil_navegador.aplicar_bloqueios(driver, "completo")
+    resultados.append(verificar("perfil completo não bloqueia nada", driver.comandos == []))
+
+    perfil_navegador.aplicar_bloqueios(driver, "enxuto")
+    bloqueados = driver.comandos[-1][1]["urls"]
+    resultados.append(verificar(
+        "perfil enxuto bloqueia imagens, fontes e analytics, mas não o CSS",
+        driver.comandos[-1][0] == "Network.setBlockedURLs"
+        and {"*.png", "*.woff2", "*google-analytics.com*"} <= set(bloqueados) and "*.css" not in bloqueados,
+    ))
+    resultados.append(verificar("perfil mínimo bloqueia também o CSS",
+                                "*.css" in perfil_navegador.padroes_bloqueados("minimo")))
+
+    if os.path.isdir("/proc"):
+        resultados.append(verificar("RSS do próprio processo medido pelo /proc",
+                                    perfil_navegador.rss_da_arvore_mb(os.getpid()) > 0))
+
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    sys.exit(0 if testar_perfis() else 1)
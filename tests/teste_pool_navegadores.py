@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do PoolNavegadores com navegadores falsos (sleep no lugar do SIAFE):
+detalhes lidos em paralelo, erro de uma chave sem derrubar o pool, nenhum
+navegador auxiliar disponível e consumidor que para no meio.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pool_navegadores  # noqa: E402
+from siafe import Comunica  # noqa: E402
+
+ATRASO_DETALHE_S = 0.05
+
+# ==============================================================================
+# NAVEGADORES FALSOS
+# ==============================================================================
+
+class NavegadoresFalsos:
+    def __init__(self, falha_ao_abrir=False, chaves_com_erro=()):
+        self.falha_ao_abrir = falha_ao_abrir
+        self.chaves_com_erro = set(chaves_com_erro)
+        self.abertos = []
+        self.fechados = []
+        self.simultaneos = 0
+        self.maximo_simultaneos = 0
+        self._trava = threading.Lock()
+
+    def abrir(self, indice):
+        if self.falha_ao_abrir:
+            raise RuntimeError("sessão não herdada")
+        self.abertos.append(indice)
+        return {"indice": indice}
+
+    def ler(self, contexto, chave):
+        with self._trava:
+            self.simultaneos += 1
+            self.maximo_simultaneos = max(self.maximo_simultaneos, self.simultaneos)
+        try:
+            time.sleep(ATRASO_DETALHE_S)
+            if chave in self.chaves_com_erro:
+                raise LookupError(f"comunica '{chave}' não está mais na lista")
+            return Comunica(chave, f"Assunto {chave}", f"Texto {chave}")
+        finally:
+            with self._trava:
+                self.simultaneos -= 1
+
+    def fechar(self, contexto):
+        self.fechados.append(contexto["indice"])
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_pool():
+    print("=== TESTE DO POOL DE NAVEGADORES ===\n")
+    chaves = [f"2024/{i:03d}" for i in range(8)]
+    log = []
+    resultados = []
+
+    navegadores = NavegadoresFalsos(chaves_com_erro={"2024/003"})
+    pool = pool_navegadores.PoolNavegadores(navegadores.abrir, navegadores.ler, navegadores.fechar,
+                                            tamanho=2, registrar_log=log.append)
+    inicio = time.perf_counter()
+    lidos = list(pool.processar(chaves))
+    duracao = time.perf_counter() - inicio
+    resultados.append(verificar("um resultado por chave", sorted(r.chave for r in lidos) == chaves))
+    resultados.append(verificar(
+        "comunicas lidos e erro só na chave que falhou",
+        all(r.comunica == Comunica(r.chave, f"Assunto {r.chave}", f"Texto {r.chave}")
+            for r in lidos if r.chave != "2024/003")
+        and [r.chave for r in lidos if r.erro is not None] == ["2024/003"],
+    ))
+    resultados.append(verificar(
+        f"dois detalhes ao mesmo tempo ({duracao * 1000:.0f} ms para {len(chaves)} x {ATRASO_DETALHE_S * 1000:.0f} ms)",
+        navegadores.maximo_simultaneos == 2 and duracao < len(chaves) * ATRASO_DETALHE_S * 0.75,
+    ))
+    resultados.append(verificar("todos os navegadores auxiliares fechados",
+                                sorted(navegadores.fechados) == [0, 1]))
+
+    grande = pool_navegadores.PoolNavegadores(navegadores.abrir, navegadores.ler, navegadores.fechar, tamanho=10)
+    resultados.append(verificar("tamanho limitado a TAMANHO_MAXIMO",
+                                grande.tamanho == pool_navegadores.TAMANHO_MAXIMO))
+
+    sem_navegador = NavegadoresFalsos(falha_ao_abrir=True)
+    pool = pool_navegadores.PoolNavegadores(sem_navegador.abrir, sem_navegador.ler, sem_navegador.fechar,
+                                            tamanho=2, registrar_log=log.append)
+    lidos = list(pool.processar(chaves))
+    resultados.append(verificar("nenhum navegador abriu: todas as chaves voltam como erro",
+                                sorted(r.chave for r in lidos) == chaves
+                                and all(r.erro is not None for r in lidos)))
+
+    interrompido = NavegadoresFalsos()
+    pool = pool_navegadores.PoolNavegadores(interrompido.abrir, interrompido.ler, interrompido.fechar, tamanho=2)
+    gerador = pool.processar(chaves)
+    next(gerador)
+    gerador.close()
+    resultados.append(verificar("consumidor parou no meio: trabalhadores encerrados e navegadores fechados",
+                                sorted(interrompido.fechados) == [0, 1]
+                                and not any(t.name.startswith("navegador-") for t in threading.enumerate())))
+
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    sys.exit(0 if testar_pool() else 1)
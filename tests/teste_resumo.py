@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do modo de envio em resumo (resumo.py): quem sai na hora em cada modo,
+resumo dividido no limite de tamanho, comunica maior que o limite numa parte
+só dele e texto do comunica escapado no HTML.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import resumo  # noqa: E402
+from classificador import PADRAO, PALAVRA_CHAVE, PRIORITARIO, Decisao  # noqa: E402
+from siafe import Comunica  # noqa: E402
+
+PRIORITARIA = Decisao(True, PRIORITARIO, "Dados Bancarios", "dados bancarios", "[ENVIO PRIORITÁRIO] Dados Bancarios")
+PALAVRA = Decisao(True, PALAVRA_CHAVE, "siafe", "siafe", "[ENVIO PRIORITÁRIO] Palavra-chave 'siafe' encontrada.")
+COMUM = Decisao(True, PADRAO, "", "", "[ENVIO DE EMAIL PARA ANALISE] Nenhuma palavra impeditiva encontrada.")
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_resumo():
+    print("=== TESTE DO MODO DE ENVIO EM RESUMO ===\n")
+    resultados = []
+
+    imediatos = {modo: [resumo.envio_imediato(modo, d) for d in (PRIORITARIA, PALAVRA, COMUM)]
+                 for modo in resumo.MODOS_ENVIO}
+    resultados.append(verificar(
+        "individual envia tudo na hora, resumo nada, híbrido só os prioritários",
+        imediatos == {"individual": [True] * 3, "resumo": [False] * 3, "hibrido": [True, False, False]},
+    ))
+
+    juntos = resumo.Resumo(100 * 1024, data="01/02/2024")
+    fechadas = [p for i in range(20) for p in juntos.adicionar(Comunica(f"2024/{i:03d}", "Assunto", "texto " * 50), COMUM)]
+    partes = juntos.fechar()
+    resultados.append(verificar(
+        "abaixo do limite: um e-mail só, sem numeração de partes",
+        not fechadas and len(partes) == 1 and juntos.partes == 1
+        and partes[0][0] == "Resumo de 20 Comunica(s) Processado(s) Automaticamente - 01/02/2024"
+        and partes[0][1].count("<h4") == 20,
+    ))
+
+    dividido = resumo.Resumo(8 * 1024)
+    partes = [p for i in range(40) for p in dividido.adicionar(Comunica(f"2024/{i:03d}", "Assunto", "x" * 900), COMUM)]
+    partes += dividido.fechar()
+    tamanhos = [len(parte.corpo_html.encode("utf-8")) for parte in partes]
+    resultados.append(verificar(
+        f"acima do limite: dividido em {len(partes)} partes de até 8 KB ({max(tamanhos)} bytes na maior)",
+        len(partes) > 1 and max(tamanhos) <= 8 * 1024
+        and sum(parte.corpo_html.count("<h4") for parte in partes) == 40
+        and [parte.assunto.endswith(f"(parte {i})") for i, parte in enumerate(partes, 1)] == [True] * len(partes),
+    ))
+
+    grande = resumo.Resumo(4 * 1024)
+    partes = grande.adicionar(Comunica("2024/001", "Pequeno", "curto"), COMUM)
+    partes += grande.adicionar(Comunica("2024/002", "Enorme", "y" * 10_000), COMUM)
+    partes += grande.adicionar(Comunica("2024/003", "Pequeno", "curto"), COMUM)
+    partes += grande.fechar()
+    resultados.append(verificar("comunica maior que o limite vai numa parte só dele",
+                                [parte.corpo_html.count("<h4") for parte in partes] == [1, 1, 1]))
+
+    escapado = resumo.Resumo(100 * 1024)
+    escapado.adicionar(Comunica("2024/009", "<b>Assunto</b>", "a < b & c\nlinha 2"), COMUM)
+    corpo = escapado.fechar()[0][1]
+    resultados.append(verificar("texto e assunto escapados no HTML, quebras de linha preservadas",
+                                "&lt;b&gt;Assunto" in corpo and "a &lt; b &amp; c<br>linha 2" in corpo))
+    resultados.append(verificar("resumo vazio não gera e-mail", resumo.Resumo(1024).fechar() == []))
+
+    com_itens = resumo.Resumo(8 * 1024)
+    partes = [p for i in range(20) for p in com_itens.adicionar(Comunica(f"2024/{i:03d}", "Assunto", "x" * 900),
+                                                                  COMUM, id_item=100 + i)]
+    partes += com_itens.fechar()
+    resultados.append(verificar("cada parte leva os ids dos seus comunicas (saem da caixa de saída com ela)",
+                                [i for parte in partes for i in parte.itens] == list(range(100, 120))
+                                and all(len(parte.itens) == parte.corpo_html.count("<h4") for parte in partes)))
+
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    sys.exit(0 if testar_resumo() else 1)
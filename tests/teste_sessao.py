@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do SessaoSiafe com navegadores falsos: reaproveita a sessão válida,
+refaz o login quando ela expira, abre outro navegador quando o anterior morre
+e descarta o navegador depois de uma falha. Também abre um navegador
+adicional logado com os cookies do principal.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from selenium.common.exceptions import WebDriverException  # noqa: E402
+
+import sessao  # noqa: E402
+import siafe  # noqa: E402
+
+# ==============================================================================
+# NAVEGADOR FALSO
+# ==============================================================================
+
+class NavegadorFalso:
+    def __init__(self):
+        self.vivo = True
+        self.logado = False
+        self.fechado = False
+        self.current_url = "https://siafe/login.jsp"
+        self.cookies = []
+
+    def execute_script(self, script, *args):
+        if not self.vivo:
+            raise WebDriverException("navegador morto")
+        return 1 if script == "return 1" else True
+
+    def get(self, url):
+        if not self.vivo:
+            raise WebDriverException("navegador morto")
+        self.logado = self.logado or any(c["name"] == "JSESSIONID" for c in self.cookies)
+        self.current_url = url if self.logado else "https://siafe/login.jsp"
+
+    def get_cookies(self):
+        return [{"name": "JSESSIONID", "value": "abc", "domain": "siafe", "size": 19}] if self.logado else []
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def find_elements(self, by, valor):
+        return ["link"] if self.logado and valor == sessao.ID_LINK_COMUNICAS else []
+
+    def quit(self):
+        self.fechado = True
+
+
+def entrar(driver):
+    driver.logado = True
+    driver.current_url = "https://siafe/faces/inicio"
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_sessao():
+    print("=== TESTE DA SESSÃO DO SIAFE ===\n")
+    siafe.INTERVALO_VERIFICACAO = 0.01
+    criados = []
+
+    def criar_driver():
+        criados.append(NavegadorFalso())
+        return criados[-1]
+
+    sessao_siafe = sessao.SessaoSiafe(criar_driver, entrar, limite_s=1)
+    log = []
+    resultados = []
+
+    primeiro = sessao_siafe.obter(log.append)
+    sessao_siafe.liberar(False, log.append)
+    resultados.append(verificar("primeira execução abre o navegador e faz login",
+                                len(criados) == 1 and sessao_siafe.logins == 1 and not primeiro.fechado))
+
+    segundo = sessao_siafe.obter(log.append)
+    sessao_siafe.liberar(False, log.append)
+    resultados.append(verificar("sessão válida é reaproveitada sem novo login",
+                                segundo is primeiro and sessao_siafe.logins == 1
+                                and sessao_siafe.reaproveitamentos == 1))
+
+    primeiro.logado = False  # sessão expirou no servidor
+    terceiro = sessao_siafe.obter(log.append)
+    resultados.append(verificar("sessão expirada: login de novo no mesmo navegador",
+                                terceiro is primeiro and sessao_siafe.logins == 2 and len(criados) == 1))
+
+    primeiro.vivo = False
+    quarto = sessao_siafe.obter(log.append)
+    resultados.append(verificar("navegador morto: outro navegador e novo login",
+                                quarto is criados[1] and primeiro.fechado and sessao_siafe.logins == 3))
+
+    adicional = sessao_siafe.abrir_navegador_adicional()
+    resultados.append(verificar("navegador adicional herda a sessão sem novo login",
+                                adicional is criados[2] and adicional.current_url == sessao_siafe.url_inicial
+                                and adicional.cookies == [{"name": "JSESSIONID", "value": "abc", "domain": "siafe"}]
+                                and sessao_siafe.logins == 3))
+
+    try:
+        sessao_siafe.abrir_navegador_adicional(cookies=[])
+        sem_sessao_recusado = False
+    except RuntimeError:
+        sem_sessao_recusado = True
+    resultados.append(verificar("navegador adicional sem sessão é recusado e fechado",
+                                sem_sessao_recusado and criados[3].fechado))
+
+    sessao_siafe.liberar(True, log.append)
+    resultados.append(verificar("falha descarta o navegador", quarto.fechado and sessao_siafe.driver is None))
+
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    sys.exit(0 if testar_sessao() else 1)
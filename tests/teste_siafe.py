@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste das esperas por estado de siafe.py com um driver falso (sem navegador):
+a página "fica ocupada" por algumas verificações, o ID muda, a tabela cresce
+até estabilizar e o limite superior gera TimeoutException. Também cobre a
+extração do comunica a partir do snapshot HTML (html_para_texto / capturar_comunica)
+e a leitura da lista de uma vez (linhas_do_snapshot), além do filtro salvo.
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from selenium.common.exceptions import TimeoutException  # noqa: E402
+from selenium.webdriver.common.by import By  # noqa: E402
+
+import siafe  # noqa: E402
+
+siafe.INTERVALO_VERIFICACAO = 0.01
+
+# ==============================================================================
+# DRIVER FALSO
+# ==============================================================================
+
+class ElementoFalso:
+    def __init__(self, texto=""):
+        self.text = texto
+
+    def is_displayed(self):
+        return True
+
+
+class DriverFalso:
+    """Cada chamada de execute_script/find_* avança um 'tique' da página."""
+
+    def __init__(self, ocupado_ate=0, textos=(), linhas=(), snapshots=(), filtro=None, resposta_filtro=None,
+                 lista=None):
+        self.tique = 0
+        self.ocupado_ate = ocupado_ate
+        self.textos = list(textos)        # texto do campo a cada leitura
+        self.linhas = list(linhas)        # quantidade de linhas a cada leitura
+        self.snapshots = list(snapshots)  # retorno do script de detalhe a cada chamada
+        self.filtro = filtro                  # componentes do filtro na tela
+        self.resposta_filtro = resposta_filtro  # retorno do script que aplica o filtro salvo
+        self.lista = lista                    # retorno do script que lê a lista
+
+    def execute_script(self, script, *args):
+        self.tique += 1
+        if script == siafe.SCRIPT_DETALHE_COMUNICA:
+            return self.snapshots.pop(0) if len(self.snapshots) > 1 else self.snapshots[0]
+        if script == siafe.SCRIPT_LER_FILTRO:
+            return self.filtro
+        if script == siafe.SCRIPT_LISTA_COMUNICAS:
+            return self.lista
+        return self.tique > self.ocupado_ate
+
+    def execute_async_script(self, script, componentes, *args):
+        self.tique += 1
+        if self.resposta_filtro.get("ok"):
+            self.filtro = componentes
+        return self.resposta_filtro
+
+    def set_script_timeout(self, segundos):
+        pass
+
+    def find_element(self, by, valor):
+        return ElementoFalso(self.textos.pop(0) if len(self.textos) > 1 else self.textos[0])
+
+    def find_elements(self, by, valor):
+        n = self.linhas.pop(0) if len(self.linhas) > 1 else self.linhas[0]
+        return [ElementoFalso() for _ in range(n)]
+
+# ==============================================================================
+# FUNÇÕES DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_esperas():
+    print("=== TESTE DAS ESPERAS DO SIAFE ===\n")
+    resultados = []
+
+    driver = DriverFalso(ocupado_ate=5)
+    siafe.aguardar_adf_ocioso(driver, 2)
+    resultados.append(verificar("ADF ocioso só depois das requisições pendentes", driver.tique == 6))
+
+    driver = DriverFalso(textos=["", "123", "123", "456"])
+    texto = siafe.aguardar_texto_diferente(driver, (By.ID, "id"), "123", 2)
+    resultados.append(verificar("texto diferente do anterior e não vazio", texto == "456"))
+
+    driver = DriverFalso(linhas=[0, 3, 7, 7, 7])
+    elementos = siafe.aguardar_contagem_estavel(driver, (By.CSS_SELECTOR, "tr"), 2)
+    resultados.append(verificar("contagem de linhas estável", len(elementos) == 7))
+
+    driver = DriverFalso(linhas=[0])
+    elementos = siafe.aguardar_contagem_estavel(driver, (By.CSS_SELECTOR, "tr"), 2)
+    resultados.append(verificar("tabela vazia também encerra a espera", elementos == []))
+
+    driver = DriverFalso(ocupado_ate=10**9)
+    inicio = time.perf_counter()
+    try:
+        siafe.aguardar_adf_ocioso(driver, 0.2)
+        estourou = False
+    except TimeoutException:
+        estourou = True
+    resultados.append(verificar("limite superior gera TimeoutException",
+                                estourou and time.perf_counter() - inicio < 1))
+
+    return all(resultados)
+
+CORPO_HTML = """
+<div style="font-family: Arial">Prezados,<br>
+   solicito a&nbsp;alteração   dos <b>dados bancários</b>.</div>
+<p></p>
+<table><tr><td>Credor</td><td>12.345</td></tr></table>
+<script>var x = "não é texto";</script>
+<pre>linha 1
+linha 2</pre>
+"""
+
+
+def testar_snapshot():
+    print("\n=== TESTE DA EXTRAÇÃO POR SNAPSHOT ===\n")
+    resultados = []
+
+    texto = siafe.html_para_texto(CORPO_HTML)
+    esperado = "Prezados,\nsolicito a alteração dos dados bancários.\nCredor 12.345\nlinha 1\nlinha 2"
+    resultados.append(verificar("HTML do corpo vira o texto visível", texto == esperado))
+    if texto != esperado:
+        print(f"   Obtido: {texto!r}")
+
+    anterior = {"numero": "<span>2024/001</span>", "assunto": "Antigo", "corpo": "<p>velho</p>"}
+    novo = {"numero": " 2024/002 ", "assunto": "Dados &amp; banco", "corpo": CORPO_HTML}
+    driver = DriverFalso(snapshots=[None, anterior, novo])
+    comunica = siafe.capturar_comunica(driver, "2024/001", 2)
+    resultados.append(verificar(
+        "snapshot repetido até o ID mudar, um execute_script por tentativa",
+        comunica == siafe.Comunica("2024/002", "Dados & banco", esperado) and driver.tique == 3,
+    ))
+
+    # ID já trocado, mas o iframe ainda sem o documento novo (corpo só com marcação)
+    sem_texto = dict(novo, corpo="<p> </p><br>")
+    driver = DriverFalso(snapshots=[sem_texto, sem_texto, novo])
+    comunica = siafe.capturar_comunica(driver, "2024/001", 2)
+    resultados.append(verificar("corpo sem texto não é aceito como comunica",
+                                comunica.texto == esperado and driver.tique == 3))
+
+    return all(resultados)
+
+
+def testar_lista():
+    print("\n=== TESTE DA LEITURA DA LISTA ===\n")
+    snapshot = {
+        "cabecalhos": ["", "Número", "Assunto", "Órgão de Origem", "Data"],
+        "linhas": [
+            {"elemento": "el-0", "chave": "2024/010", "celulas": ["", "2024/010", "Boleto", "SEFAZ", "01/02"]},
+            {"elemento": "el-1", "chave": "2024/011", "celulas": ["", "2024/011", "Senha"]},
+        ],
+    }
+    linhas = siafe.linhas_do_snapshot(snapshot)
+    resultados = [
+        verificar("colunas localizadas pelo cabeçalho",
+                  (linhas[0].chave, linhas[0].assunto, linhas[0].remetente) == ("2024/010", "Boleto", "SEFAZ")),
+        verificar("linha com menos células não quebra", (linhas[1].assunto, linhas[1].remetente) == ("Senha", "")),
+        verificar("elemento clicável preservado", [l.elemento for l in linhas] == ["el-0", "el-1"]),
+        verificar("sem cabeçalhos só a chave", siafe.linhas_do_snapshot({"linhas": snapshot["linhas"]})[0].assunto == ""),
+    ]
+    # A chave da linha (texto do link :j_id8, espaços colapsados) é o número que o detalhe
+    # mostra em pt1:m1:itxIdentificador: é por ela que o registro pula os já tratados
+    detalhe = {"numero": "\n    2024/010\n  ", "assunto": "Boleto", "corpo": "<p>texto</p>"}
+    resultados.append(verificar("chave da linha no mesmo formato do número do detalhe",
+                                siafe.comunica_do_snapshot(detalhe).numero == linhas[0].chave == "2024/010"))
+    return all(resultados)
+
+def testar_filtro_salvo():
+    print("\n=== TESTE DO FILTRO SALVO ===\n")
+    componentes = [[nome, valor] for nome, valor in zip(siafe.COMPONENTES_FILTRO, ["3", True, "5", "SUGESC"])]
+    resultados = []
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = Path(pasta) / "filtro.json"
+        resultados.append(verificar("sem arquivo não há atalho", siafe.carregar_filtro(caminho, "SUGESC") is None))
+        siafe.salvar_filtro(caminho, "SUGESC", componentes)
+        resultados.append(verificar("filtro salvo é recarregado", siafe.carregar_filtro(caminho, "SUGESC") == componentes))
+        resultados.append(verificar("filtro de outro setor é ignorado", siafe.carregar_filtro(caminho, "OUTRO") is None))
+
+    driver = DriverFalso(resposta_filtro={"ok": True})
+    siafe.aplicar_filtro_salvo(driver, componentes, 1)
+    resultados.append(verificar("atalho aplicado e conferido", driver.filtro == componentes))
+
+    def lanca_runtime_error(driver):
+        try:
+            siafe.aplicar_filtro_salvo(driver, componentes, 1)
+        except RuntimeError:
+            return True
+        return False
+
+    driver = DriverFalso(resposta_filtro={"erro": "componente ausente"})
+    resultados.append(verificar("erro no navegador vira RuntimeError", lanca_runtime_error(driver)))
+
+    driver = DriverFalso(resposta_filtro={"ok": True})
+    driver.execute_async_script = lambda *args: {"ok": True}  # responde ok sem mudar o filtro na tela
+    resultados.append(verificar("filtro diferente na tela vira RuntimeError", lanca_runtime_error(driver)))
+
+    def lista(*remetentes, cabecalhos=("Número", "Órgão de Origem")):
+        return {"cabecalhos": list(cabecalhos),
+                "linhas": [{"elemento": f"el-{i}", "chave": f"2024/{i:03d}", "celulas": [f"2024/{i:03d}", r]}
+                           for i, r in enumerate(remetentes)]}
+
+    def lista_conferida(snapshot):
+        driver = DriverFalso(linhas=[2], lista=snapshot)
+        try:
+            siafe.conferir_lista_filtrada(driver, "tr", "SUGESC", 1)
+        except RuntimeError:
+            return False
+        return True
+
+    resultados.append(verificar("lista refiltrada (nenhum remetente do setor) é aceita",
+                                lista_conferida(lista("SEFAZ/SUGESC/ATEND", "SUBSEC/SUCON"))))
+    resultados.append(verificar("lista vazia é aceita", lista_conferida(lista())))
+    resultados.append(verificar("remetente do setor na lista vira RuntimeError (tabela não refiltrada)",
+                                not lista_conferida(lista("SUBSEC/SUCON", "SEFAZ/Sugesc "))))
+    resultados.append(verificar("sem coluna de remetente não dá para conferir: RuntimeError",
+                                not lista_conferida(lista("SUBSEC/SUCON", cabecalhos=("Número", "Assunto")))))
+
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    resultados = [testar_esperas(), testar_snapshot(), testar_lista(), testar_filtro_salvo()]
+    sys.exit(0 if all(resultados) else 1)
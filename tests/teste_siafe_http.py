@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste do leitor HTTP (siafe_http.py) contra um servidor local que imita as
+respostas parciais do ADF gravadas do SIAFE: lista, seleção, detalhe com o
+corpo em iframe, volta para a lista e ViewState que muda a cada resposta.
+Também cobre a sessão expirada (sem cookie -> página de login).
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests  # noqa: E402
+
+import siafe_http  # noqa: E402
+from siafe import Comunica  # noqa: E402
+
+# ==============================================================================
+# SERVIDOR COM RESPOSTAS GRAVADAS
+# ==============================================================================
+
+TABELA = "pt1:binbox:messagesTableViewer:tabViewerDec"
+
+COMUNICAS = {
+    "2024/101": ("Alteração de dados bancários", "GERAT", "<p>Favor alterar os <b>dados bancários</b> do credor.</p>"),
+    "2024/102": ("Reunião", "SUPCON", "<div>Convite para reunião&nbsp;de alinhamento.</div><p>Att.</p>"),
+    "2024/103": ("Senha", "SEFAZ", "<p>Preciso de acesso ao SIAFE-Rio</p>"),
+}
+
+GRAVACAO = {
+    "cabecalhos": {"Adf-Rich-Message": "true"},
+    "listar": {"parametros": {"event": TABELA, f"event.{TABELA}": '<m><k v="type"><s>fetch</s></k></m>'}},
+    "selecionar": {"parametros": {
+        "event": TABELA,
+        f"event.{TABELA}": '<m><k v="type"><s>selection</s></k><k v="added"><a><s>{linha}</s></a></k></m>',
+    }},
+    "visualizar": {"parametros": {"event": "pt1:binbox:messagesTableViewer:btnView"}},
+    "voltar": {"parametros": {"event": "pt1:m1:btnVoltar"}},
+}
+
+
+def resposta_parcial(view_state, html_fragmento):
+    return (
+        '<?xml version="1.0" ?><partial-response><changes>'
+        f'<update id="pt1"><![CDATA[{html_fragmento}]]></update>'
+        f'<update id="j_id1:javax.faces.ViewState:0"><![CDATA[{view_state}]]></update>'
+        "</changes></partial-response>"
+    )
+
+
+class EstadoServidor:
+    def __init__(self):
+        self.nao_lidos = list(COMUNICAS)
+        self.selecionado = None
+        self.view_state = 1
+        self.erros = []
+        self.detalhe_sem = None  # "numero" ou "corpo": simula resposta inesperada do detalhe
+
+
+class ManipuladorSIAFE(BaseHTTPRequestHandler):
+    estado = None
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, corpo, status=200, tipo="text/xml"):
+        dados = corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def _logado(self):
+        if "JSESSIONID=abc" not in (self.headers.get("Cookie") or ""):
+            self._responder('<form><input id="loginBox:itxUsuario::content"></form>', tipo="text/html")
+            return False
+        return True
+
+    def do_GET(self):
+        if not self._logado():
+            return
+        numero = self.path.rsplit("/", 1)[-1].replace("-", "/")
+        self._responder(f"<html><body>{COMUNICAS[numero][2]}</body></html>", tipo="text/html")
+
+    def do_POST(self):
+        if not self._logado():
+            return
+        estado = self.estado
+        tamanho = int(self.headers.get("Content-Length", 0))
+        parametros = {k: v[0] for k, v in parse_qs(self.rfile.read(tamanho).decode("utf-8")).items()}
+        if self.headers.get("Adf-Rich-Message") != "true":
+            estado.erros.append("sem cabeçalho Adf-Rich-Message")
+        if parametros.get("javax.faces.ViewState") != str(estado.view_state):
+            estado.erros.append(f"ViewState {parametros.get('javax.faces.ViewState')} != {estado.view_state}")
+            return self._responder("view state inválido", status=500, tipo="text/plain")
+        estado.view_state += 1
+
+        evento = parametros["event"]
+        detalhe = parametros.get(f"event.{TABELA}", "")
+        if evento == TABELA and "fetch" in detalhe:
+            linhas = "".join(
+                f'<tr><td><a id="{TABELA}:{i}:j_id8">{numero}</a></td>'
+                f"<td>{COMUNICAS[numero][0]}</td><td>{COMUNICAS[numero][1]}</td></tr>"
+                for i, numero in enumerate(estado.nao_lidos)
+            )
+            html_fragmento = (f'<div id="{TABELA}"><table><tr><th>Número</th><th>Assunto</th>'
+                              f"<th>Origem Remetente</th></tr>{linhas}</table></div>")
+        elif evento == TABELA and "selection" in detalhe:
+            estado.selecionado = estado.nao_lidos[int(detalhe.split("<s>")[2].split("</s>")[0])]
+            html_fragmento = "<span></span>"
+        elif evento.endswith("btnView"):
+            numero = estado.selecionado
+            html_fragmento = (
+                ("" if estado.detalhe_sem == "numero" else
+                 f'<span id="pt1:m1:itxIdentificador::content">{numero}</span>')
+                + f'<span id="pt1:m1:txtSubject::content">{COMUNICAS[numero][0].replace("ç", "&ccedil;")}</span>'
+                + ('<iframe src="about:blank"></iframe>' if estado.detalhe_sem == "corpo" else
+                   f'<iframe src="corpo/{numero.replace("/", "-")}"></iframe>')
+            )
+        elif evento.endswith("btnVoltar"):
+            estado.nao_lidos.remove(estado.selecionado)
+            html_fragmento = "<span></span>"
+        else:
+            return self._responder("evento desconhecido", status=500, tipo="text/plain")
+        self._responder(resposta_parcial(estado.view_state, html_fragmento))
+
+
+def iniciar_servidor():
+    ManipuladorSIAFE.estado = EstadoServidor()
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ManipuladorSIAFE)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+class NavegadorFalso:
+    """Só o que ComunicasHTTP.do_navegador usa do Selenium."""
+
+    def __init__(self, url):
+        self.url = url
+
+    def execute_script(self, script):
+        return {"url": self.url, "view_state": "1", "user_agent": "teste"}
+
+    def get_cookies(self):
+        return [{"name": "JSESSIONID", "value": "abc", "domain": "127.0.0.1", "path": "/"}]
+
+# ==============================================================================
+# FUNÇÃO DE TESTE
+# ==============================================================================
+
+def verificar(descricao, condicao):
+    print(f"{'✅' if condicao else '❌'} {descricao}")
+    return condicao
+
+
+def testar_leitor_http():
+    print("=== TESTE DO LEITOR HTTP (SERVIDOR LOCAL) ===\n")
+    servidor = iniciar_servidor()
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/Siafe/faces/main.jsf?_adf.ctrl-state=x"
+    resultados = []
+    try:
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = Path(pasta) / "gravacao.json"
+            caminho.write_text(json.dumps(GRAVACAO), encoding="utf-8")
+            gravacao = siafe_http.carregar_gravacao(caminho)
+
+            caminho.write_text(json.dumps({"listar": GRAVACAO["listar"]}), encoding="utf-8")
+            try:
+                siafe_http.carregar_gravacao(caminho)
+                incompleta_recusada = False
+            except ValueError:
+                incompleta_recusada = True
+        resultados.append(verificar("gravação incompleta é recusada", incompleta_recusada))
+
+        cliente = siafe_http.ComunicasHTTP.do_navegador(NavegadorFalso(url), gravacao)
+        linhas = cliente.listar()
+        resultados.append(verificar(
+            "lista lida com chave, assunto e remetente",
+            [(l.chave, l.assunto, l.remetente, l.elemento) for l in linhas]
+            == [(n, a, r, i) for i, (n, (a, r, _)) in enumerate(COMUNICAS.items())],
+        ))
+
+        comunicas = list(cliente.comunicas())
+        esperado = [
+            Comunica("2024/101", "Alteração de dados bancários", "Favor alterar os dados bancários do credor.", "GERAT",
+                     "2024/101"),
+            Comunica("2024/102", "Reunião", "Convite para reunião de alinhamento.\nAtt.", "SUPCON", "2024/102"),
+            Comunica("2024/103", "Senha", "Preciso de acesso ao SIAFE-Rio", "SEFAZ", "2024/103"),
+        ]
+        resultados.append(verificar("todos os comunicas lidos na ordem, com o corpo do iframe e a chave da linha",
+                                    comunicas == esperado))
+        if comunicas != esperado:
+            print(f"   Obtido: {comunicas}")
+        resultados.append(verificar("ViewState acompanhado em todas as requisições",
+                                    not ManipuladorSIAFE.estado.erros))
+        print(f"   {cliente.requisicoes} requisições HTTP para {len(comunicas)} comunicas")
+
+        sem_cookie = siafe_http.ComunicasHTTP(url, "1", gravacao, sessao=requests.Session())
+        try:
+            sem_cookie.listar()
+            expirou = False
+        except siafe_http.SessaoHTTPExpirada:
+            expirou = True
+        resultados.append(verificar("página de login vira SessaoHTTPExpirada", expirou))
+
+        # Resposta do detalhe sem número ou sem corpo: erro (o main() continua pelo navegador)
+        for faltando, nome in (("numero", "número"), ("corpo", "corpo")):
+            ManipuladorSIAFE.estado = EstadoServidor()
+            ManipuladorSIAFE.estado.detalhe_sem = faltando
+            cliente = siafe_http.ComunicasHTTP.do_navegador(NavegadorFalso(url), gravacao)
+            try:
+                lidos = list(cliente.comunicas())
+                recusado = False
+            except RuntimeError:
+                lidos, recusado = [], True
+            resultados.append(verificar(f"detalhe sem {nome} vira RuntimeError, nenhum comunica vazio gerado",
+                                        recusado and not lidos))
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+    return all(resultados)
+
+# ==============================================================================
+# EXECUÇÃO DO TESTE
+# ==============================================================================
+
+if __name__ == "__main__":
+    sys.exit(0 if testar_leitor_http() else 1)